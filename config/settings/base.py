@@ -77,6 +77,7 @@ from csp.constants import SELF, UNSAFE_INLINE
 
 
 MIDDLEWARE = [
+    "src.core.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -362,6 +363,7 @@ ACCOUNT_LOCKOUT_DURATION = 30  # minutes
 
 # Session Settings
 SESSION_TIMEOUT = 30  # minutes
+SESSION_ACTIVITY_RESOLUTION = 60  # seconds between cached activity writes
 MAX_CONCURRENT_SESSIONS = 5
 SESSION_COOKIE_AGE = 1800  # 30 minutes
 SESSION_SAVE_EVERY_REQUEST = True
@@ -408,6 +410,14 @@ AUDIT_EXCLUDE_PATHS = [
 # Audit log retention (in days)
 AUDIT_LOG_RETENTION_DAYS = 365
 
+# Request-path audit logs are queued and written in batches
+AUDIT_LOG_BUFFER = {
+    "ENABLED": True,
+    "BATCH_SIZE": 200,
+    "FLUSH_INTERVAL": 1.0,  # seconds
+    "MAX_QUEUE_SIZE": 10000,
+}
+
 # ==============================================================================
 # EMAIL SETTINGS
 # ==============================================================================
@@ -458,6 +468,13 @@ FILE_UPLOAD_SETTINGS = {
     },
 }
 
+# Data exports
+EXPORT_SETTINGS = {
+    "CHUNK_SIZE": 500,  # Rows fetched per database round trip
+    "BACKGROUND_THRESHOLD": 20000,  # Larger exports run as a Celery job
+    "UPLOAD_TO": "exports/%Y/%m/",
+}
+
 # ==============================================================================
 # CACHE SETTINGS
 # ==============================================================================
@@ -735,6 +752,10 @@ CELERY_BEAT_SCHEDULE = {
         "schedule": 3600.0,  # Run every hour
         "kwargs": {"retention_days": 30},
     },
+    "flush-session-activity": {
+        "task": "accounts.tasks.flush_session_activity",
+        "schedule": 60.0,  # Run every minute
+    },
     "send-password-expiry-reminders": {
         "task": "accounts.tasks.send_password_expiry_reminders",
         "schedule": 86400.0,  # Run daily
@@ -779,6 +800,8 @@ ASSIGNMENTS_SETTINGS = {
     "PEER_REVIEW_ENABLED": True,
     "NOTIFICATION_DAYS_BEFORE": 2,
     "BATCH_SIZE": 100,
+    # Compare submissions against earlier terms of the same subject
+    "PLAGIARISM_CORPUS_ENABLED": False,
 }
 
 # ==============================================================================
@@ -29,5 +29,8 @@ LOGGING = {
     "disable_existing_loggers": True,
 }
 
+# Write audit logs synchronously so tests can assert on them
+AUDIT_LOG_BUFFER = {"ENABLED": False}
+
 # Use a faster test runner
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
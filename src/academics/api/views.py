@@ -14,6 +14,8 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from src.api.viewsets import CachedViewSetMixin
+
 from ..models import AcademicYear, Class, Department, Grade, Section, Term
 from ..services import (
     AcademicYearService,
@@ -40,11 +42,12 @@ from .serializers import (
 )
 
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(CachedViewSetMixin, viewsets.ModelViewSet):
     """ViewSet for Department CRUD operations"""
 
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
+    cache_dependencies = ["teachers.Teacher", "subjects.Subject", "accounts.User"]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["is_active"]
@@ -266,11 +269,18 @@ class TermViewSet(viewsets.ModelViewSet):
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class SectionViewSet(viewsets.ModelViewSet):
+class SectionViewSet(CachedViewSetMixin, viewsets.ModelViewSet):
     """ViewSet for Section CRUD operations"""
 
     queryset = Section.objects.all()
     serializer_class = SectionSerializer
+    cache_dependencies = [
+        Department,
+        Grade,
+        Class,
+        AcademicYear,
+        "students.Student",
+    ]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["is_active", "department"]
@@ -324,11 +334,18 @@ class SectionViewSet(viewsets.ModelViewSet):
         return Response(summary)
 
 
-class GradeViewSet(viewsets.ModelViewSet):
+class GradeViewSet(CachedViewSetMixin, viewsets.ModelViewSet):
     """ViewSet for Grade CRUD operations"""
 
     queryset = Grade.objects.all()
     serializer_class = GradeSerializer
+    cache_dependencies = [
+        Section,
+        Department,
+        Class,
+        AcademicYear,
+        "students.Student",
+    ]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["is_active", "section", "department"]
@@ -422,10 +439,18 @@ class GradeViewSet(viewsets.ModelViewSet):
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ClassViewSet(viewsets.ModelViewSet):
+class ClassViewSet(CachedViewSetMixin, viewsets.ModelViewSet):
     """ViewSet for Class CRUD operations"""
 
     queryset = Class.objects.all()
+    cache_dependencies = [
+        Grade,
+        Section,
+        AcademicYear,
+        "students.Student",
+        "teachers.Teacher",
+        "accounts.User",
+    ]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["is_active", "grade", "section", "academic_year"]
@@ -6,14 +6,22 @@ including model tests, service tests, and API tests.
 """
 
 from datetime import datetime, timedelta
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.test import TestCase, TransactionTestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.test import APITestCase
 
+from src.api.caching import is_cached_model
+from src.core.models import AuditLog
+
+from .api.views import DepartmentViewSet
 from .models import AcademicYear, Class, Department, Grade, Section, Term
 from .services import (
     AcademicYearService,
@@ -508,7 +516,7 @@ class AcademicsAPITestCase(APITestCase):
 
     def test_department_list_api(self):
         """Test department list API"""
-        url = reverse("academics_api:department-list")
+        url = reverse("api:academics_api:department-list")
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -587,6 +595,95 @@ class AcademicsAPITestCase(APITestCase):
         self.assertIn("structure", response.data)
 
 
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "sessions": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "sessions",
+        },
+    }
+)
+class AcademicsAPICacheTestCase(APITestCase):
+    """Test cases for cached Academics API responses"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.department = Department.objects.create(name="Test Department")
+        self.url = reverse("api:academics_api:department-list")
+
+    def _queries(self, *args, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(*args, **kwargs)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_equivalent_query_strings_share_an_entry(self):
+        """Test reordered query parameters are served from the cache"""
+        _, cold = self._queries(self.url, {"is_active": "true", "ordering": "name"})
+        response, warm = self._queries(f"{self.url}?ordering=name&is_active=true")
+
+        self.assertGreater(cold, 0)
+        self.assertEqual(warm, 0)
+        self.assertEqual(response.data["results"][0]["name"], "Test Department")
+
+    def test_responses_are_cached_per_user(self):
+        """Test another user doesn't read the first user's entry"""
+        self._queries(self.url)
+
+        self.client.force_authenticate(user=self.other_user)
+        _, queries = self._queries(self.url)
+
+        self.assertGreater(queries, 0)
+
+    def test_saving_a_dependency_invalidates_the_list(self):
+        """Test saving a row the response depends on drops the cached list"""
+        self._queries(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Department.objects.create(name="Second Department")
+        response, queries = self._queries(self.url)
+
+        self.assertGreater(queries, 0)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_matching_etag_returns_not_modified(self):
+        """Test If-None-Match with the current ETag gets a 304"""
+        response, _ = self._queries(self.url)
+        etag = response["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_cached_retrieve_checks_object_permissions(self):
+        """Test a cached retrieve still runs the object permission checks"""
+        url = reverse("api:academics_api:department-detail", args=[self.department.pk])
+        self._queries(url)
+
+        with mock.patch.object(
+            DepartmentViewSet, "check_object_permissions", side_effect=PermissionDenied
+        ):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_only_dependency_models_bump_generations(self):
+        """Test the cache receivers ignore models no cached view depends on"""
+        self.assertTrue(is_cached_model(Department))
+        self.assertTrue(is_cached_model(User))
+        self.assertFalse(is_cached_model(AuditLog))
+
+
 class AcademicsIntegrationTestCase(TransactionTestCase):
     """Integration tests for academics module"""
 
@@ -375,9 +375,13 @@ class UserSessionManager(models.Manager):
 
     def terminate_user_sessions(self, user, exclude_session=None):
         """Terminate all sessions for a user except the current one."""
+        from .session_utils import SessionActivityTracker
+
         sessions = self.filter(user=user, is_active=True)
 
         if exclude_session:
             sessions = sessions.exclude(session_key=exclude_session)
 
-        return sessions.update(is_active=False)
+        session_keys = list(sessions.values_list("session_key", flat=True))
+        SessionActivityTracker.forget(*session_keys)
+        return self.filter(session_key__in=session_keys).update(is_active=False)
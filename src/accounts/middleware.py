@@ -9,7 +9,10 @@ from django.urls import reverse
 from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
 
+from src.core.audit_buffer import audit_buffer
+
 from .models import UserAuditLog, UserSession
+from .session_utils import SessionActivityTracker
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -53,17 +56,18 @@ class SecurityMiddleware(MiddlewareMixin):
             ):
                 return redirect("accounts:password_change")
 
-            # Update session activity
-            self._update_session_activity(request)
-
-            # Check session timeout
+            # Check session timeout against the previous activity
             if self._is_session_expired(request):
+                SessionActivityTracker.forget(request.session.session_key)
                 logout(request)
                 if request.path.startswith("/api/"):
                     return JsonResponse({"error": "Session expired."}, status=401)
                 else:
                     return redirect(reverse("accounts:login") + "?expired=1")
 
+            # Update session activity
+            self._update_session_activity(request)
+
     def process_response(self, request, response):
         """Process response for additional security measures."""
         # Add security headers
@@ -79,43 +83,12 @@ class SecurityMiddleware(MiddlewareMixin):
         return response
 
     def _update_session_activity(self, request):
-        """Update session activity timestamp."""
-        if hasattr(request, "session") and request.session.session_key:
-            session_key = request.session.session_key
-            ip_address = self._get_client_ip(request)
-            user_agent = request.META.get("HTTP_USER_AGENT", "")
-
-            # Update or create session record
-            session_obj, created = UserSession.objects.get_or_create(
-                session_key=session_key,
-                defaults={
-                    "user": request.user,
-                    "ip_address": ip_address,
-                    "user_agent": user_agent,
-                    "is_active": True,
-                },
-            )
-
-            if not created:
-                session_obj.last_activity = timezone.now()
-                session_obj.save(update_fields=["last_activity"])
+        """Update session activity timestamp in the session cache."""
+        SessionActivityTracker.touch(request)
 
     def _is_session_expired(self, request):
         """Check if the session has expired."""
-        if not hasattr(request, "session") or not request.session.session_key:
-            return False
-
-        try:
-            session_obj = UserSession.objects.get(
-                session_key=request.session.session_key, is_active=True
-            )
-
-            last_activity = session_obj.last_activity
-            timeout_delta = timezone.timedelta(minutes=self.session_timeout)
-
-            return timezone.now() - last_activity > timeout_delta
-        except UserSession.DoesNotExist:
-            return True
+        return SessionActivityTracker.is_expired(request)
 
     def _get_client_ip(self, request):
         """Get the client's IP address."""
@@ -319,13 +292,16 @@ class AuditMiddleware(MiddlewareMixin):
             if request.GET:
                 extra_data["query_params"] = dict(request.GET)
 
-            UserAuditLog.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                action=action,
-                description=description,
-                ip_address=getattr(request, "_audit_ip", None),
-                user_agent=getattr(request, "_audit_user_agent", ""),
-                extra_data=extra_data,
+            # Written in a batch by the audit log buffer, off the request path
+            audit_buffer.add(
+                UserAuditLog(
+                    user=request.user if request.user.is_authenticated else None,
+                    action=action,
+                    description=description,
+                    ip_address=getattr(request, "_audit_ip", None),
+                    user_agent=getattr(request, "_audit_user_agent", ""),
+                    extra_data=extra_data,
+                )
             )
         except Exception as e:
             logger.error(f"Failed to create audit log: {str(e)}")
@@ -407,6 +383,12 @@ class SessionSecurityMiddleware(MiddlewareMixin):
         if not self.max_concurrent_sessions:
             return
 
+        # The session count only changes when a session starts, so it is
+        # checked when a session's activity is loaded from the database
+        SessionActivityTracker.get_state(request)
+        if not request._session_loaded:
+            return
+
         # Count active sessions for the user
         active_sessions = UserSession.objects.get_concurrent_sessions(request.user)
 
@@ -421,36 +403,32 @@ class SessionSecurityMiddleware(MiddlewareMixin):
         if not hasattr(request, "session") or not request.session.session_key:
             return False
 
-        try:
-            session_obj = UserSession.objects.get(
-                session_key=request.session.session_key, is_active=True
-            )
-
-            # Check for IP address changes
-            current_ip = self._get_client_ip(request)
-            if session_obj.ip_address != current_ip:
-                # Allow IP changes for mobile users or proxies, but log them
-                logger.info(
-                    f"IP change detected for user {request.user.username}: {session_obj.ip_address} -> {current_ip}"
-                )
-                # Update IP address
-                session_obj.ip_address = current_ip
-                session_obj.save(update_fields=["ip_address"])
-
-            # Check for User-Agent changes (more suspicious)
-            current_user_agent = request.META.get("HTTP_USER_AGENT", "")
-            if session_obj.user_agent != current_user_agent:
-                # This is more suspicious, but browsers can update
-                logger.warning(
-                    f"User-Agent change detected for user {request.user.username}"
-                )
-                return True
-
-            return False
-        except UserSession.DoesNotExist:
+        session_state = SessionActivityTracker.get_state(request)
+        if session_state is None or not session_state["is_active"]:
             # Session not found in our records - could be suspicious
             return True
 
+        # Check for IP address changes
+        current_ip = self._get_client_ip(request)
+        if session_state["ip_address"] != current_ip:
+            # Allow IP changes for mobile users or proxies, but log them
+            logger.info(
+                f"IP change detected for user {request.user.username}: {session_state['ip_address']} -> {current_ip}"
+            )
+            # Update IP address
+            SessionActivityTracker.touch(request, ip_address=current_ip)
+
+        # Check for User-Agent changes (more suspicious)
+        current_user_agent = request.META.get("HTTP_USER_AGENT", "")
+        if session_state["user_agent"] != current_user_agent:
+            # This is more suspicious, but browsers can update
+            logger.warning(
+                f"User-Agent change detected for user {request.user.username}"
+            )
+            return True
+
+        return False
+
     def _get_client_ip(self, request):
         """Get the client's IP address."""
         x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
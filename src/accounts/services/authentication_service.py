@@ -15,6 +15,7 @@ from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from ..models import UserAuditLog, UserSession
+from ..session_utils import SessionActivityTracker
 from ..utils import get_client_info, send_notification_email
 
 logger = logging.getLogger(__name__)
@@ -215,6 +216,7 @@ class AuthenticationService:
             UserSession.objects.filter(session_key=request.session.session_key).update(
                 is_active=False
             )
+            SessionActivityTracker.forget(request.session.session_key)
             # Clear session data
             request.session.flush()
 
@@ -7,7 +7,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.sessions.models import Session
-from django.core.cache import cache
+from django.core.cache import cache, caches
 from django.db.models import Count, Q
 from django.utils import timezone
 
@@ -57,11 +57,6 @@ class SessionManager:
                     "user": user,
                     "ip_address": client_info.get("ip_address", ""),
                     "user_agent": client_info.get("user_agent", ""),
-                    "country": client_info.get("country", ""),
-                    "city": client_info.get("city", ""),
-                    "device_type": ua_info.get("device_type", "unknown"),
-                    "browser": ua_info.get("browser", ""),
-                    "os": ua_info.get("os", ""),
                     "is_active": True,
                 },
             )
@@ -186,6 +181,7 @@ class SessionManager:
 
             # Clear related cache
             cache.delete(f"session_activity_{session_key}")
+            SessionActivityTracker.forget(session_key)
 
             return True
 
@@ -661,6 +657,192 @@ class SessionManager:
         return timezone.now() > expiry_time
 
 
+class SessionActivityTracker:
+    """
+    Session activity kept in the "sessions" cache instead of the database.
+
+    Each tracked session has one cache entry holding its owner, client and
+    last activity time. Middleware reads it once per request and writes it
+    back at most once per ACTIVITY_RESOLUTION seconds. UserSession rows are
+    only touched when a session is first seen (or its entry was evicted) and
+    by flush_to_database(), which the flush_session_activity task runs
+    periodically to write last_activity back in batches.
+    """
+
+    KEY_PREFIX = "session_state"
+    ACTIVITY_RESOLUTION = getattr(settings, "SESSION_ACTIVITY_RESOLUTION", 60)
+    SESSION_TIMEOUT = getattr(settings, "SESSION_TIMEOUT", 30)  # minutes
+
+    @staticmethod
+    def _cache():
+        return caches["sessions"]
+
+    @classmethod
+    def _make_key(cls, session_key: str) -> str:
+        return f"{cls.KEY_PREFIX}:{session_key}"
+
+    @classmethod
+    def _entry_timeout(cls) -> int:
+        # Entries outlive the inactivity timeout so an idle session is still
+        # found, and recognised as expired, when it comes back
+        return max(cls.SESSION_TIMEOUT * 60 * 2, 3600)
+
+    @classmethod
+    def get_state(cls, request) -> Optional[Dict[str, Any]]:
+        """
+        Activity state of the request's session, loaded once per request.
+
+        Falls back to the UserSession row (creating it for new sessions) when
+        the cache has no entry; request._session_loaded tells callers whether
+        that happened.
+        """
+        if hasattr(request, "_session_activity"):
+            return request._session_activity
+
+        state = None
+        request._session_loaded = False
+        if hasattr(request, "session") and request.session.session_key:
+            session_key = request.session.session_key
+            state = cls._cache().get(cls._make_key(session_key))
+            if state is None:
+                state = cls._load_state(request, session_key)
+                request._session_loaded = True
+
+        request._session_activity = state
+        return state
+
+    @classmethod
+    def _load_state(cls, request, session_key: str) -> Dict[str, Any]:
+        """Build a session's state from its UserSession row"""
+        client_info = get_client_info(request)
+        session_obj, _ = UserSession.objects.get_or_create(
+            session_key=session_key,
+            defaults={
+                "user": request.user,
+                "ip_address": client_info.get("ip_address"),
+                "user_agent": client_info.get("user_agent", ""),
+                "is_active": True,
+            },
+        )
+
+        state = {
+            "user_id": session_obj.user_id,
+            "ip_address": session_obj.ip_address,
+            "user_agent": session_obj.user_agent,
+            "last_activity": session_obj.last_activity,
+            "is_active": session_obj.is_active,
+        }
+        cls._store(session_key, state)
+        return state
+
+    @classmethod
+    def _store(cls, session_key: str, state: Dict[str, Any]):
+        cls._cache().set(cls._make_key(session_key), state, cls._entry_timeout())
+
+    @classmethod
+    def is_expired(cls, request) -> bool:
+        """Whether the session was inactive for longer than SESSION_TIMEOUT"""
+        state = cls.get_state(request)
+        if state is None:
+            return False
+        if not state["is_active"]:
+            return True
+
+        idle = timezone.now() - state["last_activity"]
+        return idle > timedelta(minutes=cls.SESSION_TIMEOUT)
+
+    @classmethod
+    def touch(cls, request, ip_address: Optional[str] = None):
+        """
+        Record activity for the request's session.
+
+        The cache entry is only rewritten when the stored time is older than
+        ACTIVITY_RESOLUTION or the client IP changed. A session just loaded
+        from the database is also updated there, so activity is not lost if
+        the cache is unavailable.
+        """
+        state = cls.get_state(request)
+        if state is None or not state["is_active"]:
+            return
+
+        now = timezone.now()
+        ip_changed = ip_address is not None and ip_address != state["ip_address"]
+        if not ip_changed and now - state["last_activity"] < timedelta(
+            seconds=cls.ACTIVITY_RESOLUTION
+        ):
+            return
+
+        state["last_activity"] = now
+        if ip_changed:
+            state["ip_address"] = ip_address
+        cls._store(request.session.session_key, state)
+
+        if request._session_loaded:
+            UserSession.objects.filter(session_key=request.session.session_key).update(
+                last_activity=now, ip_address=state["ip_address"]
+            )
+
+    @classmethod
+    def forget(cls, *session_keys: str):
+        """Drop cached state, e.g. when sessions are terminated"""
+        cls._cache().delete_many([cls._make_key(key) for key in session_keys])
+
+    @classmethod
+    def flush_to_database(cls, batch_size: int = 500) -> int:
+        """
+        Write cached activity of active sessions back to UserSession.
+
+        Returns the number of sessions updated.
+        """
+        updated = 0
+        sessions = (
+            UserSession.objects.filter(is_active=True)
+            .only("id", "session_key", "last_activity", "ip_address")
+            .order_by("id")
+        )
+
+        batch = []
+        for session_obj in sessions.iterator(chunk_size=batch_size):
+            batch.append(session_obj)
+            if len(batch) >= batch_size:
+                updated += cls._flush_batch(batch)
+                batch = []
+        if batch:
+            updated += cls._flush_batch(batch)
+
+        return updated
+
+    @classmethod
+    def _flush_batch(cls, sessions: List[UserSession]) -> int:
+        states = cls._cache().get_many(
+            [cls._make_key(session_obj.session_key) for session_obj in sessions]
+        )
+
+        changed = []
+        for session_obj in sessions:
+            state = states.get(cls._make_key(session_obj.session_key))
+            if state is None:
+                continue
+
+            last_activity = state["last_activity"]
+            if (
+                last_activity > session_obj.last_activity
+                or state["ip_address"] != session_obj.ip_address
+            ):
+                session_obj.last_activity = max(
+                    last_activity, session_obj.last_activity
+                )
+                session_obj.ip_address = state["ip_address"]
+                changed.append(session_obj)
+
+        if changed:
+            # bulk_update skips auto_now, so the cached times are kept as is
+            UserSession.objects.bulk_update(
+                changed, ["last_activity", "ip_address"], batch_size=len(changed)
+            )
+        return len(changed)
+
+
 # Utility functions for template context
 def get_user_session_context(
     user: User, current_session_key: str = None
@@ -16,6 +16,7 @@ from django.utils import timezone
 
 from .models import UserAuditLog, UserRole, UserRoleAssignment, UserSession
 from .services import AuthenticationService, RoleService, UserAnalyticsService
+from .session_utils import SessionActivityTracker
 from .utils import generate_secure_password, send_notification_email
 
 logger = logging.getLogger(__name__)
@@ -240,6 +241,24 @@ def cleanup_old_sessions(retention_days: int = 30):
         return {"status": "error", "message": str(e)}
 
 
+@shared_task
+def flush_session_activity(batch_size: int = 500):
+    """
+    Write session activity kept in the session cache back to UserSession.
+
+    Args:
+        batch_size: Sessions compared and updated per batch
+    """
+    try:
+        updated_count = SessionActivityTracker.flush_to_database(batch_size)
+        logger.info(f"Flushed activity of {updated_count} sessions")
+        return {"status": "success", "updated_count": updated_count}
+
+    except Exception as e:
+        logger.error(f"Error flushing session activity: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+
 @shared_task
 def send_password_expiry_reminders():
     """
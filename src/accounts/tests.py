@@ -1,14 +1,30 @@
 import unittest
+from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
 from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
-from django.test import TestCase, TransactionTestCase
-
-from ..constants import DEFAULT_ROLES
-from ..models import UserAuditLog, UserProfile, UserRole, UserRoleAssignment
-from ..services import AuthenticationService, RoleService
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+
+from .constants import DEFAULT_ROLES
+from .middleware import SecurityMiddleware
+from .models import (
+    UserAuditLog,
+    UserProfile,
+    UserRole,
+    UserRoleAssignment,
+    UserSession,
+)
+from .services import AuthenticationService, RoleService
+from .session_utils import SessionActivityTracker, SessionManager
 
 User = get_user_model()
 
@@ -429,6 +445,112 @@ class UserAuditLogTest(TestCase):
         self.assertEqual(log.extra_data, extra_data)
 
 
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "sessions": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "sessions",
+        },
+    }
+)
+class SessionActivityTrackerTest(TestCase):
+    """Test cases for cached session activity."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="pass123"
+        )
+        self.session = SessionStore()
+        self.session.create()
+        self.middleware = SecurityMiddleware(lambda request: None)
+
+    def _request(self):
+        request = RequestFactory().get(
+            "/dashboard/", HTTP_USER_AGENT="Browser", REMOTE_ADDR="127.0.0.1"
+        )
+        request.user = self.user
+        request.session = self.session
+        return request
+
+    def test_activity_is_served_from_cache(self):
+        """Test that known sessions are checked without database queries."""
+        self.middleware.process_request(self._request())
+        self.assertTrue(
+            UserSession.objects.filter(session_key=self.session.session_key).exists()
+        )
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.middleware.process_request(self._request()))
+
+    def test_activity_is_flushed_and_expires(self):
+        """Test write-back of cached activity and the inactivity timeout."""
+        request = self._request()
+        self.middleware.process_request(request)
+        stale = timezone.now() - timedelta(minutes=10)
+        UserSession.objects.filter(session_key=self.session.session_key).update(
+            last_activity=stale
+        )
+
+        self.assertEqual(SessionActivityTracker.flush_to_database(), 1)
+        session_obj = UserSession.objects.get(session_key=self.session.session_key)
+        self.assertGreater(session_obj.last_activity, stale)
+
+        state = SessionActivityTracker.get_state(request)
+        state["last_activity"] = timezone.now() - timedelta(
+            minutes=SessionActivityTracker.SESSION_TIMEOUT + 1
+        )
+        SessionActivityTracker._store(self.session.session_key, state)
+
+        response = self.middleware.process_request(self._request())
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("expired=1", response.url)
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "sessions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+)
+class SessionManagerTest(TestCase):
+    """Test cases for session records."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="pass123"
+        )
+        self.request = RequestFactory().get(
+            "/login/", HTTP_USER_AGENT="Browser", REMOTE_ADDR="127.0.0.1"
+        )
+        self.request.session = SessionStore()
+
+    def test_create_session_record(self):
+        """Test that a session is recorded once and refreshed on later logins."""
+        session_obj = SessionManager.create_session_record(self.user, self.request)
+
+        self.assertEqual(session_obj.user, self.user)
+        self.assertTrue(session_obj.is_active)
+        self.assertEqual(
+            UserAuditLog.objects.filter(
+                user=self.user, action="session_created"
+            ).count(),
+            1,
+        )
+
+        UserSession.objects.filter(pk=session_obj.pk).update(is_active=False)
+        again = SessionManager.create_session_record(self.user, self.request)
+
+        self.assertEqual(again.pk, session_obj.pk)
+        self.assertTrue(again.is_active)
+        self.assertEqual(
+            UserAuditLog.objects.filter(
+                user=self.user, action="session_created"
+            ).count(),
+            1,
+        )
+
+
 # Integration tests
 class UserRoleIntegrationTest(TransactionTestCase):
     """Integration tests for user role functionality."""
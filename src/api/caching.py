@@ -0,0 +1,129 @@
+# src/api/caching.py
+"""API response caching"""
+
+import hashlib
+import json
+import logging
+import time
+import zlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import get_resolver
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_KEY_PREFIX = "api_response"
+GENERATION_KEY_PREFIX = "api_generation"
+
+
+_cached_views = []
+_cached_labels = None
+
+
+def register_cached_view(view_class):
+    """Record a viewset whose responses are cached"""
+    global _cached_labels
+    _cached_views.append(view_class)
+    _cached_labels = None
+
+
+def is_cached_model(model):
+    """
+    Whether any cached viewset depends on `model`
+
+    Viewsets register when their module is imported. Loading the URLconf
+    imports all of them, so processes that never serve a request (workers,
+    management commands) still bump the generations the web processes read.
+    """
+    global _cached_labels
+    if _cached_labels is None:
+        try:
+            get_resolver().url_patterns
+        except Exception as e:
+            # Without the full registry, bumping every model is the safe side
+            logger.warning(f"Failed to load cached views: {e}")
+            return True
+        _cached_labels = {
+            dependency._meta.label_lower
+            for view_class in _cached_views
+            if view_class.queryset is not None
+            for dependency in view_class.get_cache_models()
+        }
+    return model._meta.label_lower in _cached_labels
+
+
+def _generation_key(model):
+    return f"{GENERATION_KEY_PREFIX}:{model._meta.label_lower}"
+
+
+def _initial_generation():
+    # A counter lost from the cache restarts from a value never used before,
+    # so entries built on the old counter can't become valid again
+    return int(time.time() * 1000)
+
+
+def get_generations(models):
+    """
+    Current generation of each model, in order, read in one cache round trip
+
+    A model's generation changes whenever one of its rows is saved or
+    deleted, so keys built from it go stale without deleting anything.
+    """
+    keys = [_generation_key(model) for model in models]
+    try:
+        found = cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                cache.add(key, _initial_generation(), None)
+                found[key] = cache.get(key)
+        generations = [found[key] for key in keys]
+    except Exception as e:
+        logger.warning(f"Failed to read cache generations: {e}")
+        return None
+
+    # An unreachable cache can't be trusted to have seen every bump
+    return None if None in generations else generations
+
+
+def bump_generation(model):
+    """
+    Invalidate every cached response built from `model`
+
+    Inside a transaction the bump waits for the commit, otherwise a reader
+    could cache the old rows under the new generation.
+    """
+    transaction.on_commit(lambda: _bump_generation(_generation_key(model)))
+
+
+def _bump_generation(key):
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_generation(), None)
+    except Exception as e:
+        logger.warning(f"Failed to bump cache generation for {key}: {e}")
+
+
+def build_cache_key(*parts):
+    """Stable cache key from JSON-serializable parts"""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{RESPONSE_KEY_PREFIX}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+def encode_payload(data):
+    """
+    Serialize response data for caching
+
+    Returns the ETag for the data and the zlib-compressed JSON.
+    """
+    content = json.dumps(data, cls=JSONEncoder, separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+    return etag, zlib.compress(content)
+
+
+def decode_payload(payload):
+    """Response data from a payload made by encode_payload"""
+    return json.loads(zlib.decompress(payload))
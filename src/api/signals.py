@@ -5,9 +5,11 @@ import logging
 
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
+from .caching import bump_generation, is_cached_model
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
@@ -15,25 +17,28 @@ logger = logging.getLogger(__name__)
 @receiver(post_save)
 def clear_model_cache(sender, instance, **kwargs):
     """Clear related cache when model is saved"""
-    try:
-        model_name = sender.__name__.lower()
-        cache_patterns = [
-            f"{model_name}_list_*",
-            f"{model_name}_detail_{instance.pk}",
-            f"user_perm_{instance.user.pk}_*" if hasattr(instance, "user") else None,
-        ]
-
-        for pattern in cache_patterns:
-            if pattern:
-                # This is a simplified approach
-                # In production, consider using cache versioning or more sophisticated cache invalidation
-                cache.delete_pattern(pattern)
+    # Cached API responses built from this model become unreachable
+    if is_cached_model(sender):
+        bump_generation(sender)
 
-    except Exception as e:
-        logger.warning(f"Failed to clear cache for {sender.__name__}: {e}")
+    user_id = getattr(instance, "user_id", None)
+    if user_id is not None and hasattr(cache, "delete_pattern"):
+        try:
+            cache.delete_pattern(f"user_perm_{user_id}_*")
+        except Exception as e:
+            logger.warning(f"Failed to clear cache for {sender.__name__}: {e}")
 
 
 @receiver(post_delete)
 def clear_model_cache_on_delete(sender, instance, **kwargs):
     """Clear related cache when model is deleted"""
     clear_model_cache(sender, instance, **kwargs)
+
+
+@receiver(m2m_changed)
+def clear_model_cache_on_m2m_change(sender, instance, action, **kwargs):
+    """Clear related cache when a many-to-many relation changes"""
+    if action in ("post_add", "post_remove", "post_clear"):
+        for model in (instance.__class__, kwargs.get("model")):
+            if model is not None and is_cached_model(model):
+                bump_generation(model)
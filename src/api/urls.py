@@ -27,7 +27,7 @@ urlpatterns = [
     path("scheduling/", include("src.scheduling.api.urls")),
     path("assignments/", include("src.assignments.api.urls")),
     path("exams/", include("src.exams.api.urls")),
-    # path("attendance/", include("src.attendance.api.urls")),
+    path("attendance/", include("src.attendance.api.urls")),
     path("finance/", include("src.finance.api.urls")),
     # path("library/", include("src.library.api.urls")),
     # path("transport/", include("src.transport.api.urls")),
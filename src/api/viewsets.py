@@ -3,12 +3,20 @@
 
 import logging
 
+from django.apps import apps
 from django.core.cache import cache
 from django.db import transaction
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from .caching import (
+    build_cache_key,
+    decode_payload,
+    encode_payload,
+    get_generations,
+    register_cached_view,
+)
 from .filters import BaseFilter
 from .paginations import StandardPagination
 from .permissions import RoleBasedPermission
@@ -115,45 +123,124 @@ class ReadOnlyViewSetMixin(BaseViewSetMixin):
 
 
 class CachedViewSetMixin:
-    """Mixin for cached viewsets"""
+    """
+    Mixin for cached viewsets
+
+    List and retrieve responses are cached per user under keys built from
+    the view, the query parameters and the generation of every model the
+    response depends on: the queryset's model plus `cache_dependencies`
+    (models or "app_label.ModelName" strings for nested serializers).
+    Saving or deleting a row of any of them bumps its generation, so stale
+    entries are simply never read again. Payloads are stored compressed
+    with an ETag, and a matching If-None-Match gets a 304.
+
+    Set `cache_scope = "public"` for responses that don't depend on who
+    is asking; permission checks run before the cache is consulted either
+    way. Retrieve still loads the object so object permissions are checked;
+    only its serialization is cached.
+
+    Only models some cached viewset depends on get their generation bumped,
+    so subclasses must set `queryset`.
+    """
 
     cache_timeout = 300  # 5 minutes default
+    cache_scope = "user"
+    cache_dependencies = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        register_cached_view(cls)
 
     def list(self, request, *args, **kwargs):
         """Cached list view"""
-        cache_key = self._get_list_cache_key(request)
-        cached_response = cache.get(cache_key)
-
-        if cached_response:
-            return Response(cached_response)
-
-        response = super().list(request, *args, **kwargs)
-
-        if response.status_code == 200:
-            cache.set(cache_key, response.data, self.cache_timeout)
-
-        return response
+        return self._cached_response(
+            "list",
+            request,
+            lambda: super(CachedViewSetMixin, self).list(request, *args, **kwargs),
+        )
 
     def retrieve(self, request, *args, **kwargs):
         """Cached retrieve view"""
-        cache_key = self._get_detail_cache_key(kwargs.get("pk"))
-        cached_response = cache.get(cache_key)
-
-        if cached_response:
-            return Response(cached_response)
-
-        response = super().retrieve(request, *args, **kwargs)
-
-        if response.status_code == 200:
-            cache.set(cache_key, response.data, self.cache_timeout)
-
+        instance = self.get_object()
+        return self._cached_response(
+            "retrieve",
+            request,
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def _cached_response(self, view_action, request, get_response):
+        cache_key = self._get_cache_key(view_action, request)
+        if cache_key is None:
+            return get_response()
+
+        cached = cache.get(cache_key)
+        if cached is not None:
+            etag, payload = cached
+            if etag in self._if_none_match(request):
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+            return Response(decode_payload(payload), headers={"ETag": etag})
+
+        response = get_response()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        try:
+            etag, payload = encode_payload(response.data)
+            cache.set(cache_key, (etag, payload), self.cache_timeout)
+        except Exception as e:
+            logger.warning(f"Failed to cache response for {request.path}: {e}")
+            return response
+
+        response["ETag"] = etag
+        if etag in self._if_none_match(request):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
         return response
 
-    def _get_list_cache_key(self, request):
-        """Generate cache key for list view"""
-        params = request.query_params.urlencode()
-        return f"{self.__class__.__name__}_list_{hash(params)}"
-
-    def _get_detail_cache_key(self, pk):
-        """Generate cache key for detail view"""
-        return f"{self.__class__.__name__}_detail_{pk}"
+    def _get_cache_key(self, view_action, request):
+        """
+        Cache key for the request, or None when it must not be cached
+
+        Query parameters are sorted so equivalent URLs share an entry.
+        """
+        models = self.get_cache_models()
+        generations = get_generations(models)
+        if generations is None:
+            return None
+
+        return build_cache_key(
+            f"{self.__class__.__module__}.{self.__class__.__name__}",
+            view_action,
+            self.kwargs.get(self.lookup_url_kwarg or self.lookup_field),
+            sorted(
+                (key, sorted(values)) for key, values in request.query_params.lists()
+            ),
+            self._get_cache_scope(request),
+            [model._meta.label_lower for model in models],
+            generations,
+        )
+
+    def _get_cache_scope(self, request):
+        """Who the cached response is shared between"""
+        if self.cache_scope == "public":
+            return "public"
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return "anonymous"
+
+    @classmethod
+    def get_cache_models(cls):
+        """The queryset's model followed by the declared dependencies"""
+        models = [cls.queryset.model]
+        for dependency in cls.cache_dependencies:
+            if isinstance(dependency, str):
+                dependency = apps.get_model(dependency)
+            if dependency not in models:
+                models.append(dependency)
+        return models
+
+    @staticmethod
+    def _if_none_match(request):
+        header = request.headers.get("If-None-Match", "")
+        return {tag.strip() for tag in header.split(",") if tag.strip()}
@@ -48,6 +48,8 @@ Assignment Management:
 - GET    /api/assignments/{id}/export_submissions/   - Export submissions to CSV
 - GET    /api/assignments/upcoming_deadlines/        - Get upcoming deadlines
 - GET    /api/assignments/overdue/                   - Get overdue assignments
+- POST   /api/assignments/batch_plagiarism_check/    - Queue batch plagiarism checks
+- GET    /api/assignments/{id}/plagiarism_progress/  - Poll batch plagiarism progress
 
 Submission Management:
 - GET    /api/submissions/                           - List submissions
@@ -30,6 +30,7 @@ from ..services import (
     AssignmentService,
     # DeadlineService,
     GradingService,
+    PlagiarismBatchService,
     PlagiarismService,
     RubricService,
     SubmissionService,
@@ -316,6 +317,48 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["post"])
+    def batch_plagiarism_check(self, request):
+        """Queue chunked plagiarism checks for several assignments"""
+        try:
+            if not hasattr(request.user, "teacher"):
+                return Response(
+                    {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+                )
+
+            assignment_ids = list(
+                Assignment.objects.filter(
+                    id__in=request.data.get("assignment_ids", []),
+                    teacher=request.user.teacher,
+                ).values_list("id", flat=True)
+            )
+            if not assignment_ids:
+                return Response(
+                    {"error": "No assignments to check"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            from ..tasks import run_batch_plagiarism_check
+
+            for assignment_id in assignment_ids:
+                PlagiarismBatchService.mark_queued(assignment_id)
+            task = run_batch_plagiarism_check.delay(assignment_ids)
+
+            return Response(
+                {"task_id": task.id, "assignment_ids": assignment_ids},
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=["get"])
+    def plagiarism_progress(self, request, pk=None):
+        """Get progress of the assignment's batch plagiarism check"""
+        assignment = self.get_object()
+        progress = PlagiarismBatchService.get_progress(assignment.id)
+        return Response(progress or {"status": "not_started"})
+
 
 class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
     """
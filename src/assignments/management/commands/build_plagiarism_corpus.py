@@ -0,0 +1,65 @@
+"""
+School Management System - Plagiarism Corpus Command
+File: src/assignments/management/commands/build_plagiarism_corpus.py
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.assignments.models import AssignmentSubmission
+from src.assignments.services.similarity_index import (
+    PlagiarismCorpus,
+    SimilarityIndex,
+)
+
+
+class Command(BaseCommand):
+    help = "Add existing submissions to the subject-wide plagiarism corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--subject-id", type=int, help="Only add submissions of this subject"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Submissions loaded per database round trip",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Build the corpus even if PLAGIARISM_CORPUS_ENABLED is off",
+        )
+
+    def handle(self, *args, **options):
+        if not (options["force"] or PlagiarismCorpus.is_enabled()):
+            raise CommandError(
+                "The plagiarism corpus is disabled; set "
+                "ASSIGNMENTS_SETTINGS['PLAGIARISM_CORPUS_ENABLED'] or pass --force"
+            )
+
+        submissions = (
+            AssignmentSubmission.objects.exclude(content="")
+            .filter(corpus_entry__isnull=True)
+            .select_related("assignment", "student")
+            .order_by("id")
+        )
+        if options["subject_id"]:
+            submissions = submissions.filter(
+                assignment__subject_id=options["subject_id"]
+            )
+
+        total = submissions.count()
+        self.stdout.write(f"Adding {total} submissions to the plagiarism corpus")
+
+        added = 0
+        for submission in submissions.iterator(chunk_size=options["batch_size"]):
+            fingerprint = SimilarityIndex.index_submission(submission)
+            if PlagiarismCorpus.add_submission(submission, fingerprint):
+                added += 1
+            if added and added % options["batch_size"] == 0:
+                self.stdout.write(f"  {added}/{total}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Added {added} submissions to the plagiarism corpus")
+        )
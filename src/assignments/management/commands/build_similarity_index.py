@@ -0,0 +1,48 @@
+"""
+School Management System - Similarity Index Command
+File: src/assignments/management/commands/build_similarity_index.py
+"""
+
+from django.core.management.base import BaseCommand
+
+from src.assignments.models import AssignmentSubmission
+from src.assignments.services.similarity_index import SimilarityIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Fingerprint submissions missing from the plagiarism similarity index, "
+        "e.g. those saved before the index existed or written without signals"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--assignment-id", type=int, help="Only index this assignment"
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Re-hash every submission and rebuild stale fingerprints",
+        )
+
+    def handle(self, *args, **options):
+        submissions = AssignmentSubmission.objects.exclude(content="")
+        if options["assignment_id"]:
+            submissions = submissions.filter(assignment_id=options["assignment_id"])
+        if not options["refresh"]:
+            submissions = submissions.filter(fingerprint__isnull=True)
+
+        assignment_ids = list(
+            submissions.order_by("assignment_id")
+            .values_list("assignment_id", flat=True)
+            .distinct()
+        )
+        self.stdout.write(f"Indexing submissions of {len(assignment_ids)} assignments")
+
+        indexed = 0
+        for assignment_id in assignment_ids:
+            indexed += SimilarityIndex.index_assignment(
+                assignment_id, refresh=options["refresh"]
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} submissions"))
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.1 on 2026-10-18 06:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assignments", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionFingerprint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        help_text="SHA-1 of the normalized text", max_length=40
+                    ),
+                ),
+                ("shingle_count", models.PositiveIntegerField(default=0)),
+                ("signature", models.BinaryField(help_text="Packed MinHash signature")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "assignment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fingerprints",
+                        to="assignments.assignment",
+                    ),
+                ),
+                (
+                    "submission",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fingerprint",
+                        to="assignments.assignmentsubmission",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "assignments_submission_fingerprint",
+            },
+        ),
+        migrations.CreateModel(
+            name="SubmissionFingerprintBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("band", models.PositiveSmallIntegerField()),
+                ("bucket", models.BigIntegerField()),
+                (
+                    "assignment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="assignments.assignment",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bands",
+                        to="assignments.submissionfingerprint",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "assignments_fingerprint_band",
+                "indexes": [
+                    models.Index(
+                        fields=["assignment", "band", "bucket"],
+                        name="assignments_assignm_eeef8e_idx",
+                    )
+                ],
+            },
+        ),
+    ]
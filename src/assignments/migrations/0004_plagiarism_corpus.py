@@ -0,0 +1,122 @@
+# Generated by Django 5.2.1 on 2026-10-18 06:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("academics", "0003_initial"),
+        ("assignments", "0003_submissionfingerprint_submissionfingerprintband"),
+        ("subjects", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlagiarismCorpusEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(
+                        help_text="Assignment and student shown in reports",
+                        max_length=255,
+                    ),
+                ),
+                ("content_hash", models.CharField(max_length=40)),
+                ("signature", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "assignment",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="assignments.assignment",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="subjects.subject",
+                    ),
+                ),
+                (
+                    "submission",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="corpus_entry",
+                        to="assignments.assignmentsubmission",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="academics.term",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "assignments_plagiarism_corpus_entry",
+            },
+        ),
+        migrations.CreateModel(
+            name="PlagiarismCorpusBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("band", models.PositiveSmallIntegerField()),
+                ("bucket", models.BigIntegerField()),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="subjects.subject",
+                    ),
+                ),
+                (
+                    "entry",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bands",
+                        to="assignments.plagiarismcorpusentry",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "assignments_plagiarism_corpus_band",
+                "indexes": [
+                    models.Index(
+                        fields=["subject", "band", "bucket"],
+                        name="assignments_subject_fd91c3_idx",
+                    )
+                ],
+            },
+        ),
+    ]
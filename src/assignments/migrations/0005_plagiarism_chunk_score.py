@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assignments", "0004_plagiarism_corpus"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlagiarismChunkScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("job_id", models.CharField(max_length=16)),
+                ("chunk_index", models.PositiveIntegerField()),
+                (
+                    "scores",
+                    models.JSONField(
+                        default=list,
+                        help_text="[first id, second id, similarity] triples",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "assignment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="assignments.assignment",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "assignments_plagiarism_chunk_score",
+                "unique_together": {("assignment", "job_id", "chunk_index")},
+            },
+        ),
+    ]
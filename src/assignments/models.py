@@ -494,3 +494,142 @@ class AssignmentComment(models.Model):
 
     def __str__(self):
         return f"Comment on {self.assignment.title} by {self.user.get_full_name()}"
+
+
+class SubmissionFingerprint(models.Model):
+    """
+    MinHash fingerprint of a submission's text, used for plagiarism lookups
+    """
+
+    submission = models.OneToOneField(
+        AssignmentSubmission, on_delete=models.CASCADE, related_name="fingerprint"
+    )
+    assignment = models.ForeignKey(
+        Assignment, on_delete=models.CASCADE, related_name="fingerprints"
+    )
+    content_hash = models.CharField(
+        max_length=40, help_text="SHA-1 of the normalized text"
+    )
+    shingle_count = models.PositiveIntegerField(default=0)
+    signature = models.BinaryField(help_text="Packed MinHash signature")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "assignments_submission_fingerprint"
+
+    def __str__(self):
+        return f"Fingerprint for {self.submission_id}"
+
+
+class SubmissionFingerprintBand(models.Model):
+    """
+    LSH bucket for one band of a fingerprint signature
+    """
+
+    fingerprint = models.ForeignKey(
+        SubmissionFingerprint, on_delete=models.CASCADE, related_name="bands"
+    )
+    assignment = models.ForeignKey(
+        Assignment, on_delete=models.CASCADE, related_name="+"
+    )
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        db_table = "assignments_fingerprint_band"
+        indexes = [
+            models.Index(fields=["assignment", "band", "bucket"]),
+        ]
+
+    def __str__(self):
+        return f"Band {self.band} of {self.fingerprint_id}"
+
+
+class PlagiarismCorpusEntry(models.Model):
+    """
+    Compact fingerprint of a submission in the subject-wide plagiarism corpus.
+    Only the MinHash signature is kept, so entries outlive the submission text.
+    """
+
+    subject = models.ForeignKey(
+        "subjects.Subject", on_delete=models.CASCADE, related_name="+"
+    )
+    submission = models.OneToOneField(
+        AssignmentSubmission,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="corpus_entry",
+    )
+    assignment = models.ForeignKey(
+        Assignment, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    term = models.ForeignKey(
+        "academics.Term",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    label = models.CharField(
+        max_length=255, help_text="Assignment and student shown in reports"
+    )
+    content_hash = models.CharField(max_length=40)
+    signature = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "assignments_plagiarism_corpus_entry"
+
+    def __str__(self):
+        return self.label
+
+
+class PlagiarismCorpusBand(models.Model):
+    """
+    LSH bucket for one band of a corpus entry signature
+    """
+
+    entry = models.ForeignKey(
+        PlagiarismCorpusEntry, on_delete=models.CASCADE, related_name="bands"
+    )
+    subject = models.ForeignKey(
+        "subjects.Subject", on_delete=models.CASCADE, related_name="+"
+    )
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        db_table = "assignments_plagiarism_corpus_band"
+        indexes = [
+            models.Index(fields=["subject", "band", "bucket"]),
+        ]
+
+    def __str__(self):
+        return f"Band {self.band} of {self.entry_id}"
+
+
+class PlagiarismChunkScore(models.Model):
+    """
+    Similarity scores of one chunk of a batch plagiarism job.
+
+    Kept in the database until the job is finalized, so a finalize step
+    never depends on the cache still holding every chunk.
+    """
+
+    assignment = models.ForeignKey(
+        Assignment, on_delete=models.CASCADE, related_name="+"
+    )
+    job_id = models.CharField(max_length=16)
+    chunk_index = models.PositiveIntegerField()
+    scores = models.JSONField(
+        default=list, help_text="[first id, second id, similarity] triples"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "assignments_plagiarism_chunk_score"
+        unique_together = [["assignment", "job_id", "chunk_index"]]
+
+    def __str__(self):
+        return f"Chunk {self.chunk_index} of job {self.job_id}"
@@ -4,8 +4,10 @@ from .assignment_service import AssignmentService
 
 from .deadline_service import DeadlineService
 from .grading_service import GradingService
+from .plagiarism_batch_service import PlagiarismBatchService
 from .plagiarism_service import PlagiarismService
 from .rubric_service import RubricService
+from .similarity_index import SimilarityIndex
 from .submission_service import SubmissionService
 
 __all__ = [
@@ -13,9 +15,11 @@ __all__ = [
     "SubmissionService",
     "GradingService",
     "PlagiarismService",
+    "PlagiarismBatchService",
     "DeadlineService",
     "RubricService",
     "AssignmentAnalyticsService",
+    "SimilarityIndex",
 ]
 
 """
@@ -0,0 +1,273 @@
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import (
+    Assignment,
+    AssignmentSubmission,
+    PlagiarismChunkScore,
+    SubmissionFingerprint,
+)
+from .plagiarism_service import PlagiarismService
+from .similarity_index import PlagiarismCorpus, SimilarityIndex, text_similarity
+
+logger = logging.getLogger(__name__)
+
+BATCH_PROGRESS_KEY = "plagiarism_batch_{}"
+BATCH_STATE_TIMEOUT = 60 * 60 * 24  # 24 hours
+PAIRS_PER_CHUNK = 200
+
+
+class PlagiarismBatchService:
+    """
+    Chunked batch plagiarism checks for whole assignments.
+
+    A job loads an assignment's corpus once, takes candidate pairs from the
+    similarity index and splits them into chunks that can be scored in
+    parallel. Chunk scores are stored in PlagiarismChunkScore until the job
+    is finalized, so a job that is retried or re-triggered only scores the
+    chunks that are still missing. Progress for polling is kept in the cache.
+    """
+
+    @staticmethod
+    def plan(assignment_id: int, chunk_size: int = PAIRS_PER_CHUNK) -> Dict:
+        """
+        Index the assignment and split its unchecked candidate pairs into chunks
+        """
+        SimilarityIndex.index_assignment(assignment_id, refresh=True)
+
+        unchecked = set(
+            AssignmentSubmission.objects.filter(
+                assignment_id=assignment_id, plagiarism_checked=False
+            ).values_list("id", flat=True)
+        )
+        pairs = sorted(
+            pair
+            for pair in SimilarityIndex.candidate_pairs(assignment_id)
+            if pair[0] in unchecked or pair[1] in unchecked
+        )
+        chunks = [
+            pairs[start : start + chunk_size]
+            for start in range(0, len(pairs), chunk_size)
+        ]
+
+        # The same corpus always maps to the same job, which is what lets a
+        # re-triggered job pick up chunks scored before a failure
+        job_id = hashlib.sha1(
+            repr((sorted(unchecked), pairs, chunk_size)).encode("utf-8")
+        ).hexdigest()[:16]
+
+        chunk_scores = PlagiarismChunkScore.objects.filter(assignment_id=assignment_id)
+        # Scores of superseded jobs can never be finalized
+        chunk_scores.exclude(job_id=job_id).delete()
+        scored = set(
+            chunk_scores.filter(job_id=job_id).values_list("chunk_index", flat=True)
+        )
+        pending = [index for index in range(len(chunks)) if index not in scored]
+
+        PlagiarismBatchService._set_progress(
+            assignment_id,
+            job_id=job_id,
+            status="running",
+            total_submissions=len(unchecked),
+            total_pairs=len(pairs),
+            total_chunks=len(chunks),
+            started_at=timezone.now().isoformat(),
+        )
+
+        return {
+            "assignment_id": assignment_id,
+            "job_id": job_id,
+            "chunks": chunks,
+            "pending_chunks": pending,
+        }
+
+    @staticmethod
+    def score_chunk(
+        assignment_id: int, job_id: str, chunk_index: int, pairs: List
+    ) -> int:
+        """Score one chunk of candidate pairs, skipping it if already scored"""
+        chunk = PlagiarismChunkScore.objects.filter(
+            assignment_id=assignment_id, job_id=job_id, chunk_index=chunk_index
+        )
+        if chunk.exists():
+            return 0
+
+        submission_ids = {submission_id for pair in pairs for submission_id in pair}
+        contents = dict(
+            AssignmentSubmission.objects.filter(id__in=submission_ids).values_list(
+                "id", "content"
+            )
+        )
+
+        scores = [
+            [first, second, text_similarity(contents[first], contents[second]) * 100]
+            for first, second in map(tuple, pairs)
+            if contents.get(first) and contents.get(second)
+        ]
+        # A redelivered task may have stored the chunk meanwhile
+        PlagiarismChunkScore.objects.get_or_create(
+            assignment_id=assignment_id,
+            job_id=job_id,
+            chunk_index=chunk_index,
+            defaults={"scores": scores},
+        )
+        return len(scores)
+
+    @staticmethod
+    def finalize(assignment_id: int, job_id: str, total_chunks: int) -> Dict:
+        """
+        Build reports for every unchecked submission from the scored chunks
+        """
+        chunk_scores = PlagiarismChunkScore.objects.filter(
+            assignment_id=assignment_id, job_id=job_id
+        )
+        stored = dict(chunk_scores.values_list("chunk_index", "scores"))
+        missing = [index for index in range(total_chunks) if index not in stored]
+        if missing:
+            raise RuntimeError(f"Chunks {missing} of job {job_id} are missing")
+
+        scores_by_submission = defaultdict(list)
+        for scores in stored.values():
+            for first, second, similarity in scores:
+                scores_by_submission[first].append((second, similarity))
+                scores_by_submission[second].append((first, similarity))
+
+        submissions = list(
+            AssignmentSubmission.objects.filter(
+                assignment_id=assignment_id, plagiarism_checked=False
+            ).only("id", "plagiarism_score", "plagiarism_checked", "plagiarism_report")
+        )
+        matched_ids = {
+            other_id
+            for submission in submissions
+            for other_id, _ in scores_by_submission[submission.id]
+        }
+        contents = dict(
+            AssignmentSubmission.objects.filter(id__in=matched_ids).values_list(
+                "id", "content"
+            )
+        )
+
+        # Earlier terms of the subject are looked up from stored fingerprints
+        corpus_fingerprints = {}
+        if PlagiarismCorpus.is_enabled():
+            assignment = Assignment.objects.only("id", "subject_id").get(
+                id=assignment_id
+            )
+            corpus_fingerprints = {
+                fingerprint.submission_id: fingerprint
+                for fingerprint in SubmissionFingerprint.objects.filter(
+                    submission__in=submissions
+                )
+            }
+
+        results = {
+            "checked": 0,
+            "suspicious": 0,
+            "errors": [],
+            "total": len(submissions),
+            "suspicious_ids": [],
+        }
+        for submission in submissions:
+            report = PlagiarismService.build_similarity_report(
+                [
+                    (contents[other_id], similarity)
+                    for other_id, similarity in scores_by_submission[submission.id]
+                ]
+            )
+            if corpus_fingerprints:
+                PlagiarismService.add_corpus_matches(
+                    report, corpus_fingerprints.get(submission.id), assignment
+                )
+            submission.plagiarism_score = report["max_similarity"]
+            submission.plagiarism_checked = True
+            submission.plagiarism_report = report
+
+            results["checked"] += 1
+            if report["max_similarity"] > 30:
+                results["suspicious"] += 1
+                results["suspicious_ids"].append(submission.id)
+
+        with transaction.atomic():
+            AssignmentSubmission.objects.bulk_update(
+                submissions,
+                ["plagiarism_score", "plagiarism_checked", "plagiarism_report"],
+                batch_size=200,
+            )
+            chunk_scores.delete()
+
+        PlagiarismBatchService._set_progress(
+            assignment_id,
+            status="completed",
+            completed_chunks=total_chunks,
+            finished_at=timezone.now().isoformat(),
+            result=results,
+        )
+
+        logger.info(
+            f"Batch plagiarism job {job_id} for assignment {assignment_id}: "
+            f"{results['checked']}/{results['total']} checked"
+        )
+        return results
+
+    @staticmethod
+    def run(assignment_id: int, chunk_size: int = PAIRS_PER_CHUNK) -> Dict:
+        """Run a whole batch job in the current process"""
+        plan = PlagiarismBatchService.plan(assignment_id, chunk_size)
+        for chunk_index in plan["pending_chunks"]:
+            PlagiarismBatchService.score_chunk(
+                assignment_id, plan["job_id"], chunk_index, plan["chunks"][chunk_index]
+            )
+        return PlagiarismBatchService.finalize(
+            assignment_id, plan["job_id"], len(plan["chunks"])
+        )
+
+    @staticmethod
+    def mark_queued(assignment_id: int):
+        """Record that a batch job has been requested"""
+        PlagiarismBatchService._set_progress(
+            assignment_id,
+            status="queued",
+            queued_at=timezone.now().isoformat(),
+            replace=True,
+        )
+
+    @staticmethod
+    def mark_failed(assignment_id: int, error: str):
+        PlagiarismBatchService._set_progress(
+            assignment_id, status="failed", error=error
+        )
+
+    @staticmethod
+    def get_progress(assignment_id: int) -> Optional[Dict]:
+        """Current state of the assignment's batch job, for polling"""
+        progress = cache.get(BATCH_PROGRESS_KEY.format(assignment_id))
+        if not progress:
+            return None
+
+        if progress.get("status") == "running":
+            progress["completed_chunks"] = PlagiarismChunkScore.objects.filter(
+                assignment_id=assignment_id, job_id=progress["job_id"]
+            ).count()
+
+        total_chunks = progress.get("total_chunks") or 0
+        completed = progress.get("completed_chunks") or 0
+        progress["percent"] = (
+            round(completed * 100 / total_chunks, 1)
+            if total_chunks
+            else (100.0 if progress.get("status") == "completed" else 0.0)
+        )
+        return progress
+
+    @staticmethod
+    def _set_progress(assignment_id: int, replace: bool = False, **fields):
+        key = BATCH_PROGRESS_KEY.format(assignment_id)
+        progress = {} if replace else cache.get(key) or {}
+        progress.update(fields, assignment_id=assignment_id)
+        cache.set(key, progress, BATCH_STATE_TIMEOUT)
@@ -1,4 +1,3 @@
-import difflib
 import logging
 from typing import Dict, List, Optional, Tuple
 
@@ -8,6 +7,7 @@ from django.db.models import Avg, Count, Q
 from django.utils import timezone
 
 from ..models import Assignment, AssignmentSubmission
+from .similarity_index import PlagiarismCorpus, SimilarityIndex, text_similarity
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +26,13 @@ class PlagiarismService:
             submission = AssignmentSubmission.objects.get(id=submission_id)
 
             # Basic text similarity check
-            similarity_results = PlagiarismService._check_text_similarity(
-                submission.content, submission.assignment
-            )
+            similarity_results = PlagiarismService._check_text_similarity(submission)
+            if PlagiarismCorpus.is_enabled():
+                PlagiarismService.add_corpus_matches(
+                    similarity_results,
+                    SimilarityIndex.index_submission(submission),
+                    submission.assignment,
+                )
 
             # File-based plagiarism check would go here
             # This would integrate with external services like Turnitin
@@ -61,55 +65,27 @@ class PlagiarismService:
             raise
 
     @staticmethod
-    def _check_text_similarity(content: str, assignment) -> Dict:
+    def _check_text_similarity(submission: AssignmentSubmission) -> Dict:
         """
         Check text similarity against other submissions
+
+        Only submissions sharing an LSH bucket with this one are compared.
         """
         try:
+            content = submission.content
+            candidates = SimilarityIndex.find_candidates(submission)
             other_submissions = (
-                AssignmentSubmission.objects.filter(assignment=assignment)
+                AssignmentSubmission.objects.filter(id__in=candidates)
                 .exclude(content="")
                 .values_list("content", flat=True)
             )
 
-            similarities = []
-            max_similarity = 0
-
-            for other_content in other_submissions:
-                if other_content and content:
-                    # Calculate similarity using difflib
-                    similarity = (
-                        difflib.SequenceMatcher(None, content, other_content).ratio()
-                        * 100
-                    )
-                    similarities.append(
-                        {
-                            "similarity_percentage": round(similarity, 2),
-                            "matched_content": (
-                                other_content[:100] + "..."
-                                if len(other_content) > 100
-                                else other_content
-                            ),
-                        }
-                    )
-                    max_similarity = max(max_similarity, similarity)
-
-            return {
-                "max_similarity": round(max_similarity, 2),
-                "average_similarity": (
-                    round(
-                        sum(s["similarity_percentage"] for s in similarities)
-                        / len(similarities),
-                        2,
-                    )
-                    if similarities
-                    else 0
-                ),
-                "total_comparisons": len(similarities),
-                "detailed_similarities": sorted(
-                    similarities, key=lambda x: x["similarity_percentage"], reverse=True
-                )[:5],
-            }
+            scores = [
+                (other_content, text_similarity(content, other_content) * 100)
+                for other_content in other_submissions
+                if other_content and content
+            ]
+            return PlagiarismService.build_similarity_report(scores)
 
         except Exception as e:
             logger.error(f"Error in text similarity check: {str(e)}")
@@ -121,37 +97,76 @@ class PlagiarismService:
             }
 
     @staticmethod
-    def batch_plagiarism_check(assignment_id: int) -> Dict:
+    def build_similarity_report(scores: List[Tuple[str, float]]) -> Dict:
         """
-        Run plagiarism check for all submissions of an assignment
+        Build a plagiarism report from (other content, similarity %) pairs
         """
-        try:
-            assignment = Assignment.objects.get(id=assignment_id)
-            submissions = assignment.submissions.filter(plagiarism_checked=False)
-
-            results = {
-                "checked": 0,
-                "suspicious": 0,
-                "errors": [],
-                "total": submissions.count(),
+        similarities = [
+            {
+                "similarity_percentage": round(similarity, 2),
+                "matched_content": (
+                    other_content[:100] + "..."
+                    if len(other_content) > 100
+                    else other_content
+                ),
             }
+            for other_content, similarity in scores
+        ]
+        max_similarity = max((similarity for _, similarity in scores), default=0)
+
+        return {
+            "max_similarity": round(max_similarity, 2),
+            "average_similarity": (
+                round(
+                    sum(s["similarity_percentage"] for s in similarities)
+                    / len(similarities),
+                    2,
+                )
+                if similarities
+                else 0
+            ),
+            "total_comparisons": len(similarities),
+            "detailed_similarities": sorted(
+                similarities, key=lambda x: x["similarity_percentage"], reverse=True
+            )[:5],
+        }
 
-            for submission in submissions:
-                try:
-                    result = PlagiarismService.check_submission_plagiarism(
-                        submission.id
-                    )
-                    results["checked"] += 1
-                    if result["is_suspicious"]:
-                        results["suspicious"] += 1
-                except Exception as e:
-                    results["errors"].append(
-                        {"submission_id": submission.id, "error": str(e)}
-                    )
+    @staticmethod
+    def add_corpus_matches(report: Dict, fingerprint, assignment) -> Dict:
+        """
+        Add earlier-term matches from the subject corpus to a report
 
-            logger.info(
-                f"Batch plagiarism check completed for assignment {assignment_id}: {results['checked']}/{results['total']} checked"
+        Corpus matches are MinHash estimates, so they can only raise the
+        report's max_similarity, never lower it.
+        """
+        if fingerprint is None:
+            report["corpus_matches"] = []
+            return report
+
+        matches = PlagiarismCorpus.find_matches(
+            fingerprint, assignment.subject_id, exclude_assignment_id=assignment.id
+        )
+        report["corpus_matches"] = matches
+        if matches:
+            report["max_similarity"] = max(
+                report["max_similarity"], matches[0]["similarity_percentage"]
             )
+        return report
+
+    @staticmethod
+    def batch_plagiarism_check(assignment_id: int) -> Dict:
+        """
+        Run plagiarism check for all submissions of an assignment
+
+        The assignment's corpus is loaded once and only candidate pairs from
+        the similarity index are scored.
+        """
+        from .plagiarism_batch_service import PlagiarismBatchService
+
+        try:
+            assignment = Assignment.objects.get(id=assignment_id)
+            results = PlagiarismBatchService.run(assignment.id)
+            results.pop("suspicious_ids", None)
             return results
 
         except Assignment.DoesNotExist:
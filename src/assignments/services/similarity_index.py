@@ -0,0 +1,347 @@
+import difflib
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from ..models import (
+    AssignmentSubmission,
+    PlagiarismCorpusBand,
+    PlagiarismCorpusEntry,
+    SubmissionFingerprint,
+    SubmissionFingerprintBand,
+)
+
+logger = logging.getLogger(__name__)
+
+# Word shingles of this size are hashed into the signature
+SHINGLE_SIZE = 3
+
+# 32 bands of 2 rows put the LSH threshold near 0.18 Jaccard, so half-copied
+# texts (Jaccard ~0.33) become candidates with ~98% probability
+NUM_PERMUTATIONS = 64
+BANDS = 32
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+# Operands are reduced below this prime, so a * hash + b stays under 2**62
+# and the uint64 arithmetic can't wrap
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed: signatures are persisted and must match across processes
+_permutations = np.random.RandomState(20240101)
+_PERM_A = _permutations.randint(1, 1 << 32, NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _permutations.randint(0, 1 << 32, NUM_PERMUTATIONS, dtype=np.uint64)
+# Reduced below the prime, keeping every multiplier non-zero
+_PERM_A = _PERM_A % (_MERSENNE_PRIME - np.uint64(1)) + np.uint64(1)
+_PERM_B %= _MERSENNE_PRIME
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Corpus matches reported per submission
+CORPUS_MATCH_LIMIT = 5
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join((text or "").lower().split())
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of the normalized text"""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Set of overlapping word n-grams of the normalized text"""
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash_signature(shingle_set: Set[str]) -> np.ndarray:
+    """MinHash signature of a shingle set"""
+    signature = np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    if not shingle_set:
+        return signature
+
+    hashes = np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(),
+                "little",
+            )
+            for shingle in shingle_set
+        ),
+        dtype=np.uint64,
+        count=len(shingle_set),
+    )
+    hashes %= _MERSENNE_PRIME
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+
+def pack_signature(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+
+def unpack_signature(data) -> np.ndarray:
+    return np.frombuffer(bytes(data), dtype="<u4").astype(np.uint64)
+
+
+def band_buckets(signature: np.ndarray) -> List[int]:
+    """Hash each band of the signature into a signed 64-bit bucket id"""
+    rows = signature.astype("<u4").reshape(BANDS, ROWS_PER_BAND)
+    return [
+        int.from_bytes(
+            hashlib.blake2b(row.tobytes(), digest_size=8).digest(),
+            "little",
+            signed=True,
+        )
+        for row in rows
+    ]
+
+
+def estimated_similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    """MinHash estimate of the Jaccard similarity of two signatures"""
+    return float(np.mean(signature == other))
+
+
+def text_similarity(text1: str, text2: str) -> float:
+    """Exact similarity ratio of two normalized texts"""
+    return difflib.SequenceMatcher(
+        None, normalize_text(text1), normalize_text(text2)
+    ).ratio()
+
+
+class SimilarityIndex:
+    """
+    Persistent per-assignment MinHash/LSH index of submission texts.
+
+    Each submission's text is reduced to word shingles and a MinHash signature
+    whose bands are stored as LSH buckets. Submissions sharing a bucket with a
+    query are the only ones that need an exact comparison.
+    """
+
+    @staticmethod
+    def index_submission(
+        submission: AssignmentSubmission,
+    ) -> Optional[SubmissionFingerprint]:
+        """Create or refresh a submission's fingerprint if its text changed"""
+        if not (submission.content or "").strip():
+            SubmissionFingerprint.objects.filter(submission=submission).delete()
+            return None
+
+        digest = content_hash(submission.content)
+        fingerprint = SubmissionFingerprint.objects.filter(
+            submission=submission
+        ).first()
+        if fingerprint and fingerprint.content_hash == digest:
+            return fingerprint
+
+        shingle_set = shingles(submission.content)
+        signature = minhash_signature(shingle_set)
+
+        with transaction.atomic():
+            fingerprint, _ = SubmissionFingerprint.objects.update_or_create(
+                submission=submission,
+                defaults={
+                    "assignment_id": submission.assignment_id,
+                    "content_hash": digest,
+                    "shingle_count": len(shingle_set),
+                    "signature": pack_signature(signature),
+                },
+            )
+            fingerprint.bands.all().delete()
+            SubmissionFingerprintBand.objects.bulk_create(
+                SubmissionFingerprintBand(
+                    fingerprint=fingerprint,
+                    assignment_id=submission.assignment_id,
+                    band=band,
+                    bucket=bucket,
+                )
+                for band, bucket in enumerate(band_buckets(signature))
+            )
+
+        return fingerprint
+
+    @staticmethod
+    def index_assignment(assignment, refresh: bool = False) -> int:
+        """
+        Fingerprint submissions of an assignment missing from the index
+
+        With refresh, every submission is re-hashed and stale fingerprints are
+        rebuilt, e.g. after content was changed with queryset.update().
+        """
+        submissions = AssignmentSubmission.objects.filter(
+            assignment=assignment
+        ).exclude(content="")
+        if not refresh:
+            submissions = submissions.filter(fingerprint__isnull=True)
+
+        indexed = 0
+        for submission in submissions.only("id", "assignment_id", "content"):
+            SimilarityIndex.index_submission(submission)
+            indexed += 1
+        return indexed
+
+    @staticmethod
+    def find_candidates(submission: AssignmentSubmission) -> Dict[int, float]:
+        """
+        Submissions sharing at least one LSH bucket with the given one
+
+        Returns a mapping of submission id to estimated Jaccard similarity.
+        The given submission is fingerprinted if needed; the others were
+        indexed when they were saved; older submissions and those written
+        without signals are backfilled by the build_similarity_index command.
+        """
+        fingerprint = SimilarityIndex.index_submission(submission)
+        if fingerprint is None:
+            return {}
+
+        signature = unpack_signature(fingerprint.signature)
+        buckets = Q()
+        for band, bucket in enumerate(band_buckets(signature)):
+            buckets |= Q(band=band, bucket=bucket)
+
+        fingerprint_ids = (
+            SubmissionFingerprintBand.objects.filter(
+                buckets, assignment_id=submission.assignment_id
+            )
+            .exclude(fingerprint=fingerprint)
+            .values_list("fingerprint_id", flat=True)
+            .distinct()
+        )
+
+        return {
+            submission_id: estimated_similarity(signature, unpack_signature(data))
+            for submission_id, data in SubmissionFingerprint.objects.filter(
+                id__in=fingerprint_ids
+            ).values_list("submission_id", "signature")
+        }
+
+    @staticmethod
+    def candidate_pairs(assignment) -> Set[Tuple[int, int]]:
+        """All submission id pairs of an assignment sharing an LSH bucket"""
+        buckets = defaultdict(list)
+        for band, bucket, submission_id in SubmissionFingerprintBand.objects.filter(
+            assignment=assignment
+        ).values_list("band", "bucket", "fingerprint__submission_id"):
+            buckets[(band, bucket)].append(submission_id)
+
+        pairs = set()
+        for submission_ids in buckets.values():
+            if len(submission_ids) > 1:
+                pairs.update(combinations(sorted(submission_ids), 2))
+        return pairs
+
+
+class PlagiarismCorpus:
+    """
+    Opt-in subject-wide corpus of submission fingerprints across terms.
+
+    Entries keep only a MinHash signature and a label, so matches are scored
+    by the estimated Jaccard similarity of the signatures. The corpus is
+    maintained by the submission post_save signal while
+    ASSIGNMENTS_SETTINGS["PLAGIARISM_CORPUS_ENABLED"] is on.
+    """
+
+    @staticmethod
+    def is_enabled() -> bool:
+        assignment_settings = getattr(settings, "ASSIGNMENTS_SETTINGS", {})
+        return bool(assignment_settings.get("PLAGIARISM_CORPUS_ENABLED", False))
+
+    @staticmethod
+    def add_submission(
+        submission: AssignmentSubmission,
+        fingerprint: Optional[SubmissionFingerprint] = None,
+    ) -> Optional[PlagiarismCorpusEntry]:
+        """Add a submission to the corpus or refresh its entry"""
+        fingerprint = fingerprint or SimilarityIndex.index_submission(submission)
+        if fingerprint is None:
+            return None
+
+        entry = PlagiarismCorpusEntry.objects.filter(submission=submission).first()
+        if entry and entry.content_hash == fingerprint.content_hash:
+            return entry
+
+        assignment = submission.assignment
+        signature = unpack_signature(fingerprint.signature)
+
+        with transaction.atomic():
+            entry, _ = PlagiarismCorpusEntry.objects.update_or_create(
+                submission=submission,
+                defaults={
+                    "subject_id": assignment.subject_id,
+                    "assignment": assignment,
+                    "term_id": assignment.term_id,
+                    "label": f"{assignment.title} - {submission.student}"[:255],
+                    "content_hash": fingerprint.content_hash,
+                    "signature": fingerprint.signature,
+                },
+            )
+            entry.bands.all().delete()
+            PlagiarismCorpusBand.objects.bulk_create(
+                PlagiarismCorpusBand(
+                    entry=entry,
+                    subject_id=assignment.subject_id,
+                    band=band,
+                    bucket=bucket,
+                )
+                for band, bucket in enumerate(band_buckets(signature))
+            )
+
+        return entry
+
+    @staticmethod
+    def find_matches(
+        fingerprint: SubmissionFingerprint,
+        subject_id: int,
+        exclude_assignment_id: Optional[int] = None,
+        limit: int = CORPUS_MATCH_LIMIT,
+    ) -> List[Dict]:
+        """
+        Corpus entries of the subject sharing an LSH bucket with a fingerprint
+
+        Entries of exclude_assignment_id are skipped, since the per-assignment
+        index already covers them.
+        """
+        signature = unpack_signature(fingerprint.signature)
+        buckets = Q()
+        for band, bucket in enumerate(band_buckets(signature)):
+            buckets |= Q(band=band, bucket=bucket)
+
+        entry_ids = (
+            PlagiarismCorpusBand.objects.filter(buckets, subject_id=subject_id)
+            .values_list("entry_id", flat=True)
+            .distinct()
+        )
+        entries = PlagiarismCorpusEntry.objects.filter(id__in=entry_ids).exclude(
+            submission_id=fingerprint.submission_id
+        )
+        if exclude_assignment_id is not None:
+            entries = entries.exclude(assignment_id=exclude_assignment_id)
+
+        matches = [
+            {
+                "corpus_entry_id": entry_id,
+                "source": label,
+                "term_id": term_id,
+                "similarity_percentage": round(
+                    estimated_similarity(signature, unpack_signature(data)) * 100, 2
+                ),
+            }
+            for entry_id, label, term_id, data in entries.values_list(
+                "id", "label", "term_id", "signature"
+            )
+        ]
+        matches.sort(key=lambda match: match["similarity_percentage"], reverse=True)
+        return matches[:limit]
@@ -1,4 +1,3 @@
-import difflib
 import hashlib
 from typing import Dict, List, Optional, Tuple
 
@@ -13,6 +12,7 @@ from src.students.models import Student
 from src.teachers.models import Teacher
 
 from ..models import Assignment, AssignmentSubmission
+from .similarity_index import PlagiarismCorpus, SimilarityIndex, text_similarity
 
 User = get_user_model()
 
@@ -295,11 +295,12 @@ class SubmissionService:
         if not submission.content or len(submission.content.strip()) < 50:
             return
 
-        # Compare with other submissions for the same assignment
+        # Compare with submissions sharing an LSH bucket with this one
+        candidates = SimilarityIndex.find_candidates(submission)
         other_submissions = (
-            AssignmentSubmission.objects.filter(assignment=submission.assignment)
-            .exclude(id=submission.id)
+            AssignmentSubmission.objects.filter(id__in=candidates)
             .exclude(content="")
+            .select_related("student__user")
         )
 
         max_similarity = 0
@@ -320,10 +321,28 @@ class SubmissionService:
                 )
                 max_similarity = max(max_similarity, similarity)
 
+        # Compare with earlier terms of the subject when the corpus is on
+        corpus_matches = []
+        if PlagiarismCorpus.is_enabled():
+            corpus_matches = [
+                match
+                for match in PlagiarismCorpus.find_matches(
+                    SimilarityIndex.index_submission(submission),
+                    submission.assignment.subject_id,
+                    exclude_assignment_id=submission.assignment_id,
+                )
+                if match["similarity_percentage"] > 70
+            ]
+            if corpus_matches:
+                max_similarity = max(
+                    max_similarity, corpus_matches[0]["similarity_percentage"] / 100
+                )
+
         # Store results
         submission.plagiarism_score = round(max_similarity * 100, 2)
         submission.plagiarism_report = {
             "similar_submissions": similar_submissions,
+            "corpus_matches": corpus_matches,
             "check_date": timezone.now().isoformat(),
             "threshold_exceeded": max_similarity > 0.7,
         }
@@ -336,13 +355,7 @@ class SubmissionService:
     @staticmethod
     def _calculate_text_similarity(text1: str, text2: str) -> float:
         """Calculate similarity between two texts using difflib"""
-        # Clean and normalize texts
-        text1_clean = " ".join(text1.lower().split())
-        text2_clean = " ".join(text2.lower().split())
-
-        # Use difflib to calculate similarity
-        similarity = difflib.SequenceMatcher(None, text1_clean, text2_clean).ratio()
-        return similarity
+        return text_similarity(text1, text2)
 
     @staticmethod
     def _notify_submission_received(submission: AssignmentSubmission):
@@ -214,6 +214,22 @@ def submission_post_save(sender, instance, created, **kwargs):
         logger.error(f"Error in submission post_save signal: {str(e)}")
 
 
+@receiver(post_save, sender=AssignmentSubmission)
+def submission_fingerprint_post_save(sender, instance, **kwargs):
+    """
+    Keep the plagiarism similarity index in step with submission text
+    """
+    try:
+        from .services.similarity_index import PlagiarismCorpus, SimilarityIndex
+
+        fingerprint = SimilarityIndex.index_submission(instance)
+        if fingerprint is not None and PlagiarismCorpus.is_enabled():
+            PlagiarismCorpus.add_submission(instance, fingerprint)
+
+    except Exception as e:
+        logger.error(f"Error indexing submission fingerprint: {str(e)}")
+
+
 @receiver(post_delete, sender=AssignmentSubmission)
 def submission_post_delete(sender, instance, **kwargs):
     """
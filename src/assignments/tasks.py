@@ -2,7 +2,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List
 
-from celery import shared_task
+from celery import chord, shared_task
 from django.conf import settings
 from django.core.mail import send_mail
 from django.db import transaction
@@ -15,6 +15,7 @@ from assignments.services.plagiarism_service import PlagiarismService
 
 from .models import Assignment, AssignmentRubric, AssignmentSubmission
 from .services.analytics_service import AssignmentAnalyticsService
+from .services.plagiarism_batch_service import PAIRS_PER_CHUNK, PlagiarismBatchService
 
 logger = logging.getLogger(__name__)
 
@@ -427,34 +428,20 @@ def batch_plagiarism_check(self, assignment_id: int = None):
         if assignment_id:
             result = PlagiarismService.batch_plagiarism_check(assignment_id)
         else:
-            # Check all unchecked submissions
-            unchecked_submissions = AssignmentSubmission.objects.filter(
-                plagiarism_checked=False, content__isnull=False
-            ).exclude(content="")
-
-            result = {
-                "checked": 0,
-                "suspicious": 0,
-                "errors": [],
-                "total": unchecked_submissions.count(),
-            }
-
-            for submission in unchecked_submissions:
-                try:
-                    check_result = PlagiarismService.check_submission_plagiarism(
-                        submission.id
-                    )
-                    result["checked"] += 1
-                    if check_result["is_suspicious"]:
-                        result["suspicious"] += 1
+            # Fan out one chunked job per assignment with unchecked submissions
+            assignment_ids = list(
+                AssignmentSubmission.objects.filter(
+                    plagiarism_checked=False, content__isnull=False
+                )
+                .exclude(content="")
+                .values_list("assignment_id", flat=True)
+                .distinct()
+            )
+            for queued_id in assignment_ids:
+                PlagiarismBatchService.mark_queued(queued_id)
+            run_batch_plagiarism_check.delay(assignment_ids)
 
-                        # Send notification for suspicious submission
-                        send_plagiarism_alert.delay(submission.id)
-
-                except Exception as e:
-                    result["errors"].append(
-                        {"submission_id": submission.id, "error": str(e)}
-                    )
+            result = {"assignments_queued": len(assignment_ids)}
 
         logger.info(f"Batch plagiarism check completed: {result}")
         return result
@@ -466,6 +453,86 @@ def batch_plagiarism_check(self, assignment_id: int = None):
         return {"error": str(e)}
 
 
+@shared_task(bind=True, max_retries=2)
+def run_batch_plagiarism_check(
+    self, assignment_ids: List[int], chunk_size: int = PAIRS_PER_CHUNK
+):
+    """
+    Plan batch plagiarism jobs and score their chunks in parallel with a chord
+
+    Chunks scored by an earlier, interrupted run of the same job are reused.
+    """
+    started = []
+    for assignment_id in assignment_ids:
+        try:
+            plan = PlagiarismBatchService.plan(assignment_id, chunk_size)
+            finalize = finalize_batch_plagiarism_check.si(
+                assignment_id, plan["job_id"], len(plan["chunks"])
+            )
+
+            if plan["pending_chunks"]:
+                chord(
+                    score_plagiarism_chunk.s(
+                        assignment_id, plan["job_id"], index, plan["chunks"][index]
+                    )
+                    for index in plan["pending_chunks"]
+                )(finalize)
+            else:
+                finalize.delay()
+
+            started.append(assignment_id)
+
+        except Exception as e:
+            logger.error(
+                f"Error planning batch plagiarism check for assignment "
+                f"{assignment_id}: {str(e)}"
+            )
+            PlagiarismBatchService.mark_failed(assignment_id, str(e))
+
+    return {"started": started}
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True, reject_on_worker_lost=True)
+def score_plagiarism_chunk(
+    self, assignment_id: int, job_id: str, chunk_index: int, pairs: List
+):
+    """
+    Score one chunk of candidate pairs of a batch plagiarism job
+    """
+    try:
+        return PlagiarismBatchService.score_chunk(
+            assignment_id, job_id, chunk_index, pairs
+        )
+    except Exception as e:
+        logger.error(f"Error scoring plagiarism chunk {chunk_index}: {str(e)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=30, exc=e)
+        PlagiarismBatchService.mark_failed(assignment_id, str(e))
+        raise
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True, reject_on_worker_lost=True)
+def finalize_batch_plagiarism_check(
+    self, assignment_id: int, job_id: str, total_chunks: int
+):
+    """
+    Write plagiarism reports once every chunk of a job is scored
+    """
+    try:
+        result = PlagiarismBatchService.finalize(assignment_id, job_id, total_chunks)
+    except Exception as e:
+        logger.error(f"Error finalizing batch plagiarism job {job_id}: {str(e)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=60, exc=e)
+        PlagiarismBatchService.mark_failed(assignment_id, str(e))
+        return {"error": str(e)}
+
+    for submission_id in result.pop("suspicious_ids"):
+        send_plagiarism_alert.delay(submission_id)
+
+    return result
+
+
 @shared_task(bind=True, max_retries=2)
 def send_plagiarism_alert(self, submission_id: int):
     """
@@ -2,34 +2,54 @@ import json
 import os
 import tempfile
 from datetime import datetime, timedelta
+from io import StringIO
 from unittest.mock import Mock, patch
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.db import IntegrityError
-from django.test import Client, TestCase, TransactionTestCase
+from django.test import Client, TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
-from academics.models import AcademicYear, Class, Grade, Section, Term
-from students.models import Student
-from subjects.models import Subject
-from teachers.models import Teacher
+from src.academics.models import (
+    AcademicYear,
+    Class,
+    Department,
+    Grade,
+    Section,
+    Term,
+)
+from src.students.models import Student
+from src.subjects.models import Subject
+from src.teachers.models import Teacher
 
 from .models import (
     Assignment,
     AssignmentComment,
     AssignmentRubric,
     AssignmentSubmission,
+    PlagiarismChunkScore,
+    PlagiarismCorpusEntry,
+    SubmissionFingerprint,
     SubmissionGrade,
 )
 from .services import (
     AssignmentService,
     GradingService,
+    PlagiarismBatchService,
     PlagiarismService,
     SubmissionService,
 )
 from .services.analytics_service import AssignmentAnalyticsService
+from .services.similarity_index import (
+    SimilarityIndex,
+    minhash_signature,
+    shingles,
+)
+from .services import similarity_index
 
 User = get_user_model()
 
@@ -983,6 +1003,207 @@ class AssignmentAPITestCase(TestCase):
         self.assertEqual(response.status_code, 401)  # Unauthorized
 
 
+class PlagiarismIndexTestCase(TestCase):
+    """
+    Base test case with an assignment and three students for plagiarism checks
+    """
+
+    def setUp(self):
+        """Set up test data"""
+        self.teacher_user = User.objects.create_user(
+            username="teacher1", email="teacher@test.com", password="testpass123"
+        )
+        academic_year = AcademicYear.objects.create(
+            name="2024-2025",
+            start_date="2024-04-01",
+            end_date="2025-03-31",
+            is_current=True,
+            created_by=self.teacher_user,
+        )
+        term = Term.objects.create(
+            academic_year=academic_year,
+            name="First Term",
+            term_number=1,
+            start_date="2024-04-01",
+            end_date="2024-08-31",
+            is_current=True,
+        )
+        section = Section.objects.create(name="Primary")
+        class_obj = Class.objects.create(
+            grade=Grade.objects.create(name="Grade 5", section=section),
+            section=section,
+            name="A",
+            academic_year=academic_year,
+        )
+        subject = Subject.objects.create(
+            name="Biology",
+            code="BIO101",
+            department=Department.objects.create(name="Science"),
+        )
+        teacher = Teacher.objects.create(
+            user=self.teacher_user,
+            employee_id="T001",
+            joining_date="2024-04-01",
+            position="Teacher",
+            salary=50000,
+            contract_type="Permanent",
+            status="Active",
+        )
+        self.assignment = Assignment.objects.create(
+            title="Photosynthesis Essay",
+            class_id=class_obj,
+            subject=subject,
+            teacher=teacher,
+            term=term,
+            due_date=timezone.now() + timedelta(days=7),
+            total_marks=100,
+        )
+        self.students = [
+            Student.objects.create(
+                first_name="Student",
+                last_name=str(number),
+                admission_number=f"S00{number}",
+                admission_date=timezone.now().date(),
+                current_class=class_obj,
+                emergency_contact_name="Guardian",
+                emergency_contact_number="1234567890",
+            )
+            for number in range(3)
+        ]
+        self.essay = (
+            "Photosynthesis converts light energy into chemical energy stored in "
+            "glucose, releasing oxygen as a by-product of splitting water molecules."
+        )
+
+
+class SimilarityIndexTestCase(PlagiarismIndexTestCase):
+    """
+    Test cases for the MinHash/LSH submission index
+    """
+
+    def test_minhash_signature_matches_exact_arithmetic(self):
+        """Signatures equal the permutation minimums computed without wrapping"""
+        shingle_set = shingles(" ".join(f"word{number}" for number in range(500)))
+        prime = int(similarity_index._MERSENNE_PRIME)
+        hashes = [
+            int.from_bytes(
+                similarity_index.hashlib.blake2b(
+                    shingle.encode("utf-8"), digest_size=4
+                ).digest(),
+                "little",
+            )
+            for shingle in shingle_set
+        ]
+
+        expected = [
+            min((int(a) * (value % prime) + int(b)) % prime for value in hashes)
+            for a, b in zip(similarity_index._PERM_A, similarity_index._PERM_B)
+        ]
+
+        self.assertEqual(minhash_signature(shingle_set).tolist(), expected)
+
+    def test_find_candidates_uses_submissions_indexed_on_save(self):
+        """Only fingerprinted submissions are candidates, nothing is backfilled"""
+        indexed = AssignmentSubmission.objects.create(
+            assignment=self.assignment, student=self.students[0], content=self.essay
+        )
+        (unindexed,) = AssignmentSubmission.objects.bulk_create(
+            [
+                AssignmentSubmission(
+                    assignment=self.assignment,
+                    student=self.students[1],
+                    content=self.essay,
+                )
+            ]
+        )
+        submission = AssignmentSubmission.objects.create(
+            assignment=self.assignment, student=self.students[2], content=self.essay
+        )
+
+        self.assertEqual(SimilarityIndex.find_candidates(submission), {indexed.id: 1.0})
+        self.assertFalse(
+            SubmissionFingerprint.objects.filter(submission=unindexed).exists()
+        )
+
+        call_command("build_similarity_index", stdout=StringIO())
+        self.assertEqual(
+            SimilarityIndex.find_candidates(submission),
+            {indexed.id: 1.0, unindexed.id: 1.0},
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class PlagiarismBatchServiceTestCase(PlagiarismIndexTestCase):
+    """
+    Test cases for chunked batch plagiarism jobs
+    """
+
+    def setUp(self):
+        super().setUp()
+        for student in self.students[:2]:
+            AssignmentSubmission.objects.create(
+                assignment=self.assignment, student=student, content=self.essay
+            )
+        cache.clear()
+
+    def test_finalize_reads_chunk_scores_from_database(self):
+        """Test that finalize doesn't depend on the cache keeping chunk scores"""
+        plan = PlagiarismBatchService.plan(self.assignment.id, chunk_size=1)
+        self.assertEqual(len(plan["chunks"]), 1)
+        PlagiarismBatchService.score_chunk(
+            self.assignment.id, plan["job_id"], 0, plan["chunks"][0]
+        )
+        cache.clear()
+
+        result = PlagiarismBatchService.finalize(
+            self.assignment.id, plan["job_id"], len(plan["chunks"])
+        )
+
+        self.assertEqual((result["checked"], result["suspicious"]), (2, 2))
+        self.assertFalse(PlagiarismChunkScore.objects.exists())
+
+    def test_replanned_job_skips_stored_chunks(self):
+        """Test that a re-planned job only scores missing chunks"""
+        plan = PlagiarismBatchService.plan(self.assignment.id, chunk_size=1)
+        PlagiarismBatchService.score_chunk(
+            self.assignment.id, plan["job_id"], 0, plan["chunks"][0]
+        )
+        self.assertEqual(
+            PlagiarismBatchService.get_progress(self.assignment.id)["completed_chunks"],
+            1,
+        )
+
+        resumed = PlagiarismBatchService.plan(self.assignment.id, chunk_size=1)
+        self.assertEqual(resumed["job_id"], plan["job_id"])
+        self.assertEqual(resumed["pending_chunks"], [])
+
+        # A new submission changes the job, whose stale scores are dropped
+        AssignmentSubmission.objects.create(
+            assignment=self.assignment, student=self.students[2], content=self.essay
+        )
+        replanned = PlagiarismBatchService.plan(self.assignment.id, chunk_size=1)
+        self.assertNotEqual(replanned["job_id"], plan["job_id"])
+        self.assertEqual(replanned["pending_chunks"], [0, 1, 2])
+        self.assertFalse(
+            PlagiarismChunkScore.objects.filter(job_id=plan["job_id"]).exists()
+        )
+
+    def test_finalize_requires_every_chunk(self):
+        """Test that finalize refuses to write reports from a partial job"""
+        plan = PlagiarismBatchService.plan(self.assignment.id, chunk_size=1)
+
+        with self.assertRaises(RuntimeError):
+            PlagiarismBatchService.finalize(
+                self.assignment.id, plan["job_id"], len(plan["chunks"])
+            )
+
+        self.assertFalse(
+            AssignmentSubmission.objects.filter(plagiarism_checked=True).exists()
+        )
+
+
 class PlagiarismServiceTestCase(TestCase):
     """
     Test cases for PlagiarismService
@@ -1093,6 +1314,41 @@ class PlagiarismServiceTestCase(TestCase):
             result["plagiarism_score"], 0
         )  # No other submissions to compare against
 
+    def test_plagiarism_check_only_compares_index_candidates(self):
+        """Test that only submissions sharing LSH buckets are compared"""
+        copied = (
+            "Photosynthesis converts light energy into chemical energy stored in "
+            "glucose, releasing oxygen as a by-product of splitting water molecules."
+        )
+        AssignmentSubmission.objects.create(
+            assignment=self.assignment, student=self.student, content=copied
+        )
+        submission = AssignmentSubmission.objects.create(
+            assignment=self.assignment, student=self.student2, content=copied
+        )
+
+        student_user3 = User.objects.create_user(
+            username="student3", email="student3@test.com", password="testpass123"
+        )
+        student3 = Student.objects.create(
+            user=student_user3, admission_number="S003", current_class_id=self.class_obj
+        )
+        AssignmentSubmission.objects.create(
+            assignment=self.assignment,
+            student=student3,
+            content=(
+                "The French Revolution reshaped European politics, ending absolute "
+                "monarchy and spreading ideas of citizenship across the continent."
+            ),
+        )
+
+        self.assertTrue(SubmissionFingerprint.objects.filter(submission=submission))
+
+        result = PlagiarismService.check_submission_plagiarism(submission.id)
+
+        self.assertEqual(result["plagiarism_score"], 100)
+        self.assertEqual(result["detailed_report"]["total_comparisons"], 1)
+
     def test_batch_plagiarism_check(self):
         """Test batch plagiarism checking"""
         # Create multiple submissions
@@ -1114,6 +1370,75 @@ class PlagiarismServiceTestCase(TestCase):
         self.assertIn("total", result)
         self.assertEqual(result["total"], 2)
 
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_batch_plagiarism_job_resumes_scored_chunks(self):
+        """Test that a re-planned batch job only scores missing chunks"""
+        content = "Identical essay text shared by both students in this class."
+        AssignmentSubmission.objects.create(
+            assignment=self.assignment, student=self.student, content=content
+        )
+        AssignmentSubmission.objects.create(
+            assignment=self.assignment, student=self.student2, content=content
+        )
+
+        plan = PlagiarismBatchService.plan(self.assignment.id, chunk_size=1)
+        self.assertEqual(len(plan["chunks"]), 1)
+        PlagiarismBatchService.score_chunk(
+            self.assignment.id, plan["job_id"], 0, plan["chunks"][0]
+        )
+
+        progress = PlagiarismBatchService.get_progress(self.assignment.id)
+        self.assertEqual(progress["completed_chunks"], 1)
+
+        resumed = PlagiarismBatchService.plan(self.assignment.id, chunk_size=1)
+        self.assertEqual(resumed["job_id"], plan["job_id"])
+        self.assertEqual(resumed["pending_chunks"], [])
+
+        result = PlagiarismBatchService.finalize(
+            self.assignment.id, plan["job_id"], len(plan["chunks"])
+        )
+        self.assertEqual(result["suspicious"], 2)
+        self.assertEqual(
+            PlagiarismBatchService.get_progress(self.assignment.id)["status"],
+            "completed",
+        )
+
+    @override_settings(ASSIGNMENTS_SETTINGS={"PLAGIARISM_CORPUS_ENABLED": True})
+    def test_plagiarism_check_matches_subject_corpus(self):
+        """Test that submissions are matched against earlier assignments"""
+        essay = (
+            "Newton's laws describe how forces change the motion of bodies, from "
+            "falling apples to the orbits of planets around the sun."
+        )
+        AssignmentSubmission.objects.create(
+            assignment=self.assignment, student=self.student, content=essay
+        )
+        later_assignment = Assignment.objects.create(
+            title="Later Assignment",
+            class_id=self.class_obj,
+            subject=self.subject,
+            teacher=self.teacher,
+            term=self.term,
+            due_date=timezone.now() + timedelta(days=14),
+            total_marks=100,
+        )
+        submission = AssignmentSubmission.objects.create(
+            assignment=later_assignment, student=self.student2, content=essay
+        )
+
+        self.assertEqual(
+            PlagiarismCorpusEntry.objects.filter(subject=self.subject).count(), 2
+        )
+
+        result = PlagiarismService.check_submission_plagiarism(submission.id)
+
+        corpus_matches = result["detailed_report"]["corpus_matches"]
+        self.assertEqual(len(corpus_matches), 1)
+        self.assertIn("Plagiarism Test Assignment", corpus_matches[0]["source"])
+        self.assertEqual(result["plagiarism_score"], 100)
+
 
 class AssignmentAnalyticsTestCase(TestCase):
     """
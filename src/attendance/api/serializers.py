@@ -0,0 +1,77 @@
+from django.utils import timezone
+from rest_framework import serializers
+
+from src.academics.models import Class
+from src.students.models import Student
+
+from ..models import StudentAttendance
+
+MAX_REGISTERS_PER_BATCH = 100
+
+
+class StudentAttendanceEntrySerializer(serializers.Serializer):
+    """One student's mark in a register"""
+
+    student_id = serializers.UUIDField()
+    status = serializers.ChoiceField(
+        choices=StudentAttendance.STATUS_CHOICES, default="present"
+    )
+    remarks = serializers.CharField(max_length=255, allow_blank=True, default="")
+
+
+class AttendanceRegisterSerializer(serializers.Serializer):
+    """Attendance of one class on one date"""
+
+    class_id = serializers.IntegerField()
+    date = serializers.DateField(default=lambda: timezone.now().date())
+    remarks = serializers.CharField(allow_blank=True, default="")
+    students = StudentAttendanceEntrySerializer(many=True)
+
+
+class BatchAttendanceSerializer(serializers.Serializer):
+    """Serializer for marking several class registers in one call"""
+
+    registers = AttendanceRegisterSerializer(many=True)
+
+    def validate_registers(self, registers):
+        """Validate the batch size, duplicates and referenced objects"""
+        if not registers:
+            raise serializers.ValidationError("At least one register is required")
+        if len(registers) > MAX_REGISTERS_PER_BATCH:
+            raise serializers.ValidationError(
+                f"At most {MAX_REGISTERS_PER_BATCH} registers can be marked at once"
+            )
+
+        seen_registers = set()
+        for register in registers:
+            key = (register["class_id"], register["date"])
+            if key in seen_registers:
+                raise serializers.ValidationError(
+                    f"Class {register['class_id']} appears more than once "
+                    f"for {register['date']}"
+                )
+            seen_registers.add(key)
+
+        class_ids = {register["class_id"] for register in registers}
+        missing_classes = class_ids - set(
+            Class.objects.filter(id__in=class_ids).values_list("id", flat=True)
+        )
+        if missing_classes:
+            raise serializers.ValidationError(
+                f"Unknown class IDs: {sorted(missing_classes)}"
+            )
+
+        student_ids = {
+            entry["student_id"]
+            for register in registers
+            for entry in register["students"]
+        }
+        missing_students = student_ids - set(
+            Student.objects.filter(id__in=student_ids).values_list("id", flat=True)
+        )
+        if missing_students:
+            raise serializers.ValidationError(
+                f"Unknown student IDs: {sorted(str(pk) for pk in missing_students)}"
+            )
+
+        return registers
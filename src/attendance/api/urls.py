@@ -0,0 +1,14 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import AttendanceRegisterViewSet
+
+# Create router and register viewsets
+router = DefaultRouter()
+router.register(r"registers", AttendanceRegisterViewSet, basename="register")
+
+app_name = "attendance_api"
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -0,0 +1,48 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from src.api.permissions import HasModulePermission
+
+from ..services import AttendanceService
+from .serializers import BatchAttendanceSerializer
+
+
+class AttendanceRegisterViewSet(viewsets.ViewSet):
+    """Attendance register marking"""
+
+    permission_classes = [IsAuthenticated, HasModulePermission]
+    required_permission = "attendance.add_attendancerecord"
+
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """Mark the registers of several classes in one call"""
+        serializer = BatchAttendanceSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        registers = serializer.validated_data["registers"]
+        try:
+            records = AttendanceService.mark_attendance_batch(registers, request.user)
+        except DjangoValidationError as e:
+            return Response(
+                {"detail": " ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            {
+                "registers": [
+                    {
+                        "attendance_record_id": record.id,
+                        "class_id": record.class_obj_id,
+                        "date": record.date,
+                        "students_marked": len(register["students"]),
+                    }
+                    for register, record in zip(registers, records)
+                ]
+            },
+            status=status.HTTP_200_OK,
+        )
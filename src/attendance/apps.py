@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AttendanceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.attendance"
+
+    def ready(self):
+        """Import signals when the app is ready"""
+        import src.attendance.signals
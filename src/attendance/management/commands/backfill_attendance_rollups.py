@@ -0,0 +1,48 @@
+"""
+School Management System - Attendance Rollup Backfill Command
+File: src/attendance/management/commands/backfill_attendance_rollups.py
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.attendance.services import AttendanceRollupService
+
+
+class Command(BaseCommand):
+    help = "Build the daily, weekly and monthly attendance rollups from history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Only rebuild from the month containing this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rollup rows inserted per statement",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = datetime.strptime(options["since"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format")
+
+        self.stdout.write(
+            f"Rebuilding attendance rollups{f' since {since}' if since else ''}"
+        )
+        written = AttendanceRollupService.rebuild(
+            since=since, batch_size=options["batch_size"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {written['day']} daily, {written['week']} weekly and "
+                f"{written['month']} monthly rollups"
+            )
+        )
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.1 on 2026-10-18 06:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("academics", "0003_initial"),
+        ("attendance", "0001_initial"),
+        ("students", "0002_remove_student_students_st_user_id_362ff8_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttendanceRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period_type",
+                    models.CharField(
+                        choices=[("day", "Day"), ("week", "Week"), ("month", "Month")],
+                        max_length=5,
+                        verbose_name="period type",
+                    ),
+                ),
+                ("period_start", models.DateField(verbose_name="period start")),
+                (
+                    "present",
+                    models.PositiveIntegerField(default=0, verbose_name="present"),
+                ),
+                (
+                    "absent",
+                    models.PositiveIntegerField(default=0, verbose_name="absent"),
+                ),
+                ("late", models.PositiveIntegerField(default=0, verbose_name="late")),
+                (
+                    "excused",
+                    models.PositiveIntegerField(default=0, verbose_name="excused"),
+                ),
+                ("total", models.PositiveIntegerField(default=0, verbose_name="total")),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                (
+                    "class_obj",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance_rollups",
+                        to="academics.class",
+                        verbose_name="class",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance_rollups",
+                        to="students.student",
+                        verbose_name="student",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "attendance rollup",
+                "verbose_name_plural": "attendance rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["period_type", "period_start"],
+                        name="attendance__period__4e0538_idx",
+                    ),
+                    models.Index(
+                        fields=["class_obj", "period_type", "period_start"],
+                        name="attendance__class_o_a6085e_idx",
+                    ),
+                ],
+                "unique_together": {
+                    ("student", "class_obj", "period_type", "period_start")
+                },
+            },
+        ),
+    ]
@@ -71,3 +71,54 @@ class StudentAttendance(models.Model):
 
     def __str__(self):
         return f"{self.student} - {self.get_status_display()} on {self.attendance_record.date}"
+
+
+class AttendanceRollup(models.Model):
+    """
+    Attendance counts of a student in a class over a day, week or month
+
+    Maintained by AttendanceService.mark_attendance so reports can read a
+    handful of pre-aggregated rows instead of every StudentAttendance row.
+    Weeks start on Monday; months on the 1st.
+    """
+
+    PERIOD_CHOICES = (
+        ("day", _("Day")),
+        ("week", _("Week")),
+        ("month", _("Month")),
+    )
+
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name="attendance_rollups",
+        verbose_name=_("student"),
+    )
+    class_obj = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        related_name="attendance_rollups",
+        verbose_name=_("class"),
+    )
+    period_type = models.CharField(
+        _("period type"), max_length=5, choices=PERIOD_CHOICES
+    )
+    period_start = models.DateField(_("period start"))
+    present = models.PositiveIntegerField(_("present"), default=0)
+    absent = models.PositiveIntegerField(_("absent"), default=0)
+    late = models.PositiveIntegerField(_("late"), default=0)
+    excused = models.PositiveIntegerField(_("excused"), default=0)
+    total = models.PositiveIntegerField(_("total"), default=0)
+    updated_at = models.DateTimeField(_("updated at"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("attendance rollup")
+        verbose_name_plural = _("attendance rollups")
+        unique_together = ["student", "class_obj", "period_type", "period_start"]
+        indexes = [
+            models.Index(fields=["period_type", "period_start"]),
+            models.Index(fields=["class_obj", "period_type", "period_start"]),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.period_type} of {self.period_start}"
@@ -1,10 +1,28 @@
 from datetime import datetime, timedelta
-
-from django.db.models import Avg, Case, Count, F, IntegerField, Q, When
-from django.db.models.functions import Extract
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    IntegerField,
+    Q,
+    Sum,
+    When,
+)
+from django.db.models.functions import Extract, TruncMonth, TruncWeek
 from django.utils import timezone
 
-from .models import AttendanceRecord, StudentAttendance
+from src.students.models import Student
+
+from .models import AttendanceRecord, AttendanceRollup, StudentAttendance
+
+ROLLUP_STATUSES = ("present", "absent", "late", "excused")
 
 
 class AttendanceService:
@@ -15,26 +33,139 @@ class AttendanceService:
         class_obj, date, marked_by, student_attendance_data, remarks=""
     ):
         """Mark attendance for a class on a specific date"""
-        # Create or update attendance record
-        attendance_record, created = AttendanceRecord.objects.update_or_create(
-            class_obj=class_obj,
-            date=date,
-            defaults={"marked_by": marked_by, "remarks": remarks},
-        )
+        with transaction.atomic():
+            # Create or update attendance record
+            attendance_record, created = AttendanceRecord.objects.update_or_create(
+                class_obj=class_obj,
+                date=date,
+                defaults={"marked_by": marked_by, "remarks": remarks},
+            )
+
+            # Record individual student attendance
+            AttendanceService._upsert_student_attendance(
+                AttendanceService._student_attendance_rows(
+                    attendance_record, student_attendance_data
+                )
+            )
+
+            AttendanceRollupService.refresh([(attendance_record.class_obj_id, date)])
+
+        return attendance_record
 
-        # Record individual student attendance
+    @staticmethod
+    def mark_attendance_batch(registers, marked_by):
+        """
+        Mark attendance for several classes at once
+
+        Each register is a dict with class_id, date (a date), optional
+        remarks and a students list in the mark_attendance format. A class
+        may appear once per date. Every student must be enrolled in the
+        register's class, otherwise ValidationError is raised and nothing is
+        written. All records and all student rows are upserted with one
+        statement each; returns the records in register order.
+        """
+        AttendanceService._validate_register_students(registers)
+
+        with transaction.atomic():
+            AttendanceRecord.objects.bulk_create(
+                [
+                    AttendanceRecord(
+                        class_obj_id=register["class_id"],
+                        date=register["date"],
+                        marked_by=marked_by,
+                        remarks=register.get("remarks", ""),
+                    )
+                    for register in registers
+                ],
+                update_conflicts=True,
+                unique_fields=["class_obj", "date"],
+                update_fields=["marked_by", "remarks"],
+            )
+
+            # Not every backend returns primary keys of updated rows
+            lookup = Q()
+            for register in registers:
+                lookup |= Q(class_obj_id=register["class_id"], date=register["date"])
+            saved = {
+                (record.class_obj_id, record.date): record
+                for record in AttendanceRecord.objects.filter(lookup)
+            }
+            records = [
+                saved[(register["class_id"], register["date"])]
+                for register in registers
+            ]
+
+            rows = []
+            for register, record in zip(registers, records):
+                rows.extend(
+                    AttendanceService._student_attendance_rows(
+                        record, register.get("students", [])
+                    )
+                )
+            AttendanceService._upsert_student_attendance(rows)
+
+            AttendanceRollupService.refresh(
+                (register["class_id"], register["date"]) for register in registers
+            )
+
+        return records
+
+    @staticmethod
+    def _validate_register_students(registers):
+        """Raise ValidationError for students marked outside their class"""
+        student_ids = {
+            str(entry.get("student_id"))
+            for register in registers
+            for entry in register.get("students", [])
+        }
+        class_by_student = {
+            str(student_id): class_id
+            for student_id, class_id in Student.objects.filter(
+                id__in=student_ids
+            ).values_list("id", "current_class_id")
+        }
+
+        for register in registers:
+            strangers = sorted(
+                {
+                    str(entry.get("student_id"))
+                    for entry in register.get("students", [])
+                    if class_by_student.get(str(entry.get("student_id")))
+                    != register["class_id"]
+                }
+            )
+            if strangers:
+                raise ValidationError(
+                    f"Students not in class {register['class_id']}: "
+                    f"{', '.join(strangers)}"
+                )
+
+    @staticmethod
+    def _student_attendance_rows(attendance_record, student_attendance_data):
+        """Unsaved StudentAttendance rows for a record, one per student"""
+        # The last entry wins: an upsert can't touch the same row twice
+        rows = {}
         for attendance_data in student_attendance_data:
             student_id = attendance_data.get("student_id")
-            status = attendance_data.get("status", "present")
-            student_remarks = attendance_data.get("remarks", "")
-
-            StudentAttendance.objects.update_or_create(
+            rows[str(student_id)] = StudentAttendance(
                 attendance_record=attendance_record,
                 student_id=student_id,
-                defaults={"status": status, "remarks": student_remarks},
+                status=attendance_data.get("status", "present"),
+                remarks=attendance_data.get("remarks", ""),
             )
+        return list(rows.values())
 
-        return attendance_record
+    @staticmethod
+    def _upsert_student_attendance(rows, batch_size=1000):
+        """Insert or update StudentAttendance rows in one statement per batch"""
+        if rows:
+            StudentAttendance.objects.bulk_create(
+                rows,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["attendance_record", "student"],
+                update_fields=["status", "remarks"],
+            )
 
     @staticmethod
     def get_student_attendance_summary(student, start_date=None, end_date=None):
@@ -138,30 +269,29 @@ class AttendanceService:
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days)
 
-        query = StudentAttendance.objects.filter(
-            attendance_record__date__gte=start_date,
-            attendance_record__date__lte=end_date,
+        query = AttendanceRollup.objects.filter(
+            period_type="day", period_start__gte=start_date, period_start__lte=end_date
         )
 
         if class_obj:
-            query = query.filter(attendance_record__class_obj=class_obj)
+            query = query.filter(class_obj=class_obj)
 
         # Group by date and calculate percentages
         trends = (
-            query.values("attendance_record__date")
+            query.values("period_start")
             .annotate(
-                total=Count("id"),
-                present=Count("id", filter=Q(status__in=["present", "late"])),
-                absent=Count("id", filter=Q(status="absent")),
+                total_count=Sum("total"),
+                present_count=Sum("present") + Sum("late"),
+                absent_count=Sum("absent"),
             )
-            .order_by("attendance_record__date")
+            .order_by("period_start")
         )
 
         trend_data = []
         for trend in trends:
-            date = trend["attendance_record__date"]
-            total = trend["total"]
-            present = trend["present"]
+            date = trend["period_start"]
+            total = trend["total_count"]
+            present = trend["present_count"]
             percentage = (present / total * 100) if total > 0 else 0
 
             trend_data.append(
@@ -170,7 +300,7 @@ class AttendanceService:
                     "percentage": round(percentage, 2),
                     "total": total,
                     "present": present,
-                    "absent": trend["absent"],
+                    "absent": trend["absent_count"],
                 }
             )
 
@@ -184,50 +314,75 @@ class AttendanceService:
         if not month:
             month = timezone.now().month
 
-        # Get all attendance records for the month
-        attendance_records = StudentAttendance.objects.filter(
-            attendance_record__date__year=year, attendance_record__date__month=month
-        )
+        month_start = datetime(year, month, 1).date()
 
         # Overall statistics
-        total_records = attendance_records.count()
-        present_records = attendance_records.filter(
-            status__in=["present", "late"]
-        ).count()
-        absent_records = attendance_records.filter(status="absent").count()
-        late_records = attendance_records.filter(status="late").count()
-        excused_records = attendance_records.filter(status="excused").count()
+        overall = AttendanceRollup.objects.filter(
+            period_type="month", period_start=month_start
+        ).aggregate(
+            **{status: Sum(status) for status in ROLLUP_STATUSES},
+            total=Sum("total"),
+        )
+        total_records = overall["total"] or 0
+        present_records = (overall["present"] or 0) + (overall["late"] or 0)
+        absent_records = overall["absent"] or 0
+        late_records = overall["late"] or 0
+        excused_records = overall["excused"] or 0
 
         overall_percentage = (
             (present_records / total_records * 100) if total_records > 0 else 0
         )
 
         # Day-wise breakdown
-        day_wise = (
-            attendance_records.values("attendance_record__date")
+        day_wise = [
+            {
+                "attendance_record__date": day["period_start"],
+                "total": day["total_count"],
+                "present": day["present_count"] + day["late_count"],
+                "absent": day["absent_count"],
+                "late": day["late_count"],
+                "excused": day["excused_count"],
+            }
+            for day in AttendanceRollup.objects.filter(
+                period_type="day",
+                period_start__year=year,
+                period_start__month=month,
+            )
+            .values("period_start")
             .annotate(
-                total=Count("id"),
-                present=Count("id", filter=Q(status__in=["present", "late"])),
-                absent=Count("id", filter=Q(status="absent")),
-                late=Count("id", filter=Q(status="late")),
-                excused=Count("id", filter=Q(status="excused")),
+                total_count=Sum("total"),
+                present_count=Sum("present"),
+                absent_count=Sum("absent"),
+                late_count=Sum("late"),
+                excused_count=Sum("excused"),
             )
-            .order_by("attendance_record__date")
-        )
+            .order_by("period_start")
+        ]
 
         # Class-wise breakdown
-        class_wise = (
-            attendance_records.values(
-                "attendance_record__class_obj__grade__name",
-                "attendance_record__class_obj__section__name",
+        class_wise = [
+            {
+                "attendance_record__class_obj__grade__name": row[
+                    "class_obj__grade__name"
+                ],
+                "attendance_record__class_obj__section__name": row[
+                    "class_obj__section__name"
+                ],
+                "total": row["total_count"],
+                "present": row["present_count"],
+                "absent": row["absent_count"],
+            }
+            for row in AttendanceRollup.objects.filter(
+                period_type="month", period_start=month_start
             )
+            .values("class_obj__grade__name", "class_obj__section__name")
             .annotate(
-                total=Count("id"),
-                present=Count("id", filter=Q(status__in=["present", "late"])),
-                absent=Count("id", filter=Q(status="absent")),
+                total_count=Sum("total"),
+                present_count=Sum("present") + Sum("late"),
+                absent_count=Sum("absent"),
             )
-            .order_by("attendance_record__class_obj__grade__name")
-        )
+            .order_by("class_obj__grade__name")
+        ]
 
         return {
             "overall": {
@@ -238,8 +393,8 @@ class AttendanceService:
                 "excused_records": excused_records,
                 "attendance_percentage": round(overall_percentage, 2),
             },
-            "day_wise": list(day_wise),
-            "class_wise": list(class_wise),
+            "day_wise": day_wise,
+            "class_wise": class_wise,
         }
 
     @staticmethod
@@ -250,30 +405,44 @@ class AttendanceService:
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days)
 
-        low_attendance = []
-        students = Student.objects.filter(status="active").select_related(
-            "user", "current_class"
+        rows = (
+            AttendanceRollup.objects.filter(
+                period_type="day",
+                period_start__gte=start_date,
+                period_start__lte=end_date,
+                student__status="Active",
+            )
+            .values("student_id")
+            .annotate(
+                **{f"{status}_count": Sum(status) for status in ROLLUP_STATUSES},
+                total_days=Sum("total"),
+                percentage=ExpressionWrapper(
+                    (Sum("present") + Sum("late")) * 100.0 / Sum("total"),
+                    output_field=FloatField(),
+                ),
+            )
+            .filter(total_days__gt=0, percentage__lt=threshold)
+            .order_by("percentage")
         )
+        rows = list(rows)
 
-        for student in students:
-            summary = AttendanceService.get_student_attendance_summary(
-                student, start_date, end_date
-            )
+        students = Student.objects.select_related("current_class").in_bulk(
+            [row["student_id"] for row in rows]
+        )
 
-            if (
-                summary["total_days"] > 0
-                and summary["attendance_percentage"] < threshold
-            ):
-                low_attendance.append(
-                    {
-                        "student": student,
-                        "summary": summary,
-                        "percentage": summary["attendance_percentage"],
-                    }
-                )
+        low_attendance = []
+        for row in rows:
+            summary = {status: row[f"{status}_count"] for status in ROLLUP_STATUSES}
+            summary["total_days"] = row["total_days"]
+            summary["attendance_percentage"] = row["percentage"]
+            low_attendance.append(
+                {
+                    "student": students[row["student_id"]],
+                    "summary": summary,
+                    "percentage": row["percentage"],
+                }
+            )
 
-        # Sort by attendance percentage
-        low_attendance.sort(key=lambda x: x["percentage"])
         return low_attendance
 
     @staticmethod
@@ -405,3 +574,164 @@ class AttendanceService:
             )
 
         return report_data
+
+
+class AttendanceRollupService:
+    """
+    Maintains AttendanceRollup rows from StudentAttendance
+
+    Day rows are counted from StudentAttendance; week and month rows are
+    summed from the day rows. Refreshing rebuilds the affected periods
+    rather than applying deltas, so re-marking a register stays correct.
+    """
+
+    @staticmethod
+    def _week_start(date):
+        return date - timedelta(days=date.weekday())
+
+    @staticmethod
+    def _month_start(date):
+        return date.replace(day=1)
+
+    @staticmethod
+    def _day_rows(attendance_queryset):
+        """Unsaved day rollups counted from StudentAttendance rows"""
+        counts = attendance_queryset.values(
+            "student_id",
+            rollup_class_id=F("attendance_record__class_obj_id"),
+            rollup_date=F("attendance_record__date"),
+        ).annotate(
+            **{
+                f"{status}_count": Count("id", filter=Q(status=status))
+                for status in ROLLUP_STATUSES
+            },
+            total_count=Count("id"),
+        )
+        for row in counts.iterator():
+            yield AttendanceRollup(
+                student_id=row["student_id"],
+                class_obj_id=row["rollup_class_id"],
+                period_type="day",
+                period_start=row["rollup_date"],
+                total=row["total_count"],
+                **{status: row[f"{status}_count"] for status in ROLLUP_STATUSES},
+            )
+
+    @staticmethod
+    def _period_rows(day_queryset, period_type):
+        """Unsaved week or month rollups summed from day rollups"""
+        trunc = TruncWeek if period_type == "week" else TruncMonth
+        sums = (
+            day_queryset.annotate(period=trunc("period_start"))
+            .values("student_id", "class_obj_id", "period")
+            .annotate(
+                **{f"{status}_count": Sum(status) for status in ROLLUP_STATUSES},
+                total_count=Sum("total"),
+            )
+        )
+        # Materialized first: the rows are inserted into the table being read
+        for row in list(sums):
+            yield AttendanceRollup(
+                student_id=row["student_id"],
+                class_obj_id=row["class_obj_id"],
+                period_type=period_type,
+                period_start=row["period"],
+                total=row["total_count"],
+                **{status: row[f"{status}_count"] for status in ROLLUP_STATUSES},
+            )
+
+    @staticmethod
+    def _insert(rows, batch_size=1000):
+        """bulk_create rows from a generator in batches; returns the count"""
+        written = 0
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            AttendanceRollup.objects.bulk_create(batch)
+            written += len(batch)
+        return written
+
+    @classmethod
+    def refresh(cls, registers):
+        """
+        Rebuild the rollups of the given (class_id, date) registers and of
+        the weeks and months containing them
+
+        Only the registers passed in are recounted, not every combination of
+        their classes and dates. Runs a fixed number of queries whatever the
+        class size.
+        """
+        registers = set(registers)
+        if not registers:
+            return
+
+        with transaction.atomic():
+            days = Q()
+            attendance = Q()
+            for class_id, date in registers:
+                days |= Q(class_obj_id=class_id, period_start=date)
+                attendance |= Q(
+                    attendance_record__class_obj_id=class_id,
+                    attendance_record__date=date,
+                )
+
+            AttendanceRollup.objects.filter(days, period_type="day").delete()
+            cls._insert(cls._day_rows(StudentAttendance.objects.filter(attendance)))
+
+            for period_type, period_start, period_end in (
+                ("week", cls._week_start, lambda start: start + timedelta(days=6)),
+                ("month", cls._month_start, cls._month_end),
+            ):
+                periods = Q()
+                days = Q()
+                for class_id, start in {
+                    (class_id, period_start(date)) for class_id, date in registers
+                }:
+                    periods |= Q(class_obj_id=class_id, period_start=start)
+                    days |= Q(
+                        class_obj_id=class_id,
+                        period_start__range=(start, period_end(start)),
+                    )
+                AttendanceRollup.objects.filter(
+                    periods, period_type=period_type
+                ).delete()
+                cls._insert(
+                    cls._period_rows(
+                        AttendanceRollup.objects.filter(days, period_type="day"),
+                        period_type,
+                    )
+                )
+
+    @staticmethod
+    def _month_end(month_start):
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        return next_month - timedelta(days=1)
+
+    @classmethod
+    def rebuild(cls, since=None, batch_size=1000):
+        """
+        Rebuild rollups from StudentAttendance history
+
+        With `since`, only periods from the start of its month onwards are
+        rebuilt. Returns the number of rows written per period type.
+        """
+        rollups = AttendanceRollup.objects.all()
+        attendance = StudentAttendance.objects.all()
+        month_start = None
+        if since:
+            month_start = cls._month_start(since)
+            # Weeks starting before the month still need all of their days
+            start = cls._week_start(month_start)
+            rollups = rollups.filter(period_start__gte=start)
+            attendance = attendance.filter(attendance_record__date__gte=start)
+
+        written = {}
+        with transaction.atomic():
+            rollups.delete()
+            written["day"] = cls._insert(cls._day_rows(attendance), batch_size)
+
+            days = rollups.filter(period_type="day")
+            written["week"] = cls._insert(cls._period_rows(days, "week"), batch_size)
+            if month_start:
+                days = days.filter(period_start__gte=month_start)
+            written["month"] = cls._insert(cls._period_rows(days, "month"), batch_size)
+        return written
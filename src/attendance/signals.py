@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import StudentAttendance
+from .services import AttendanceRollupService
+
+
+class _PendingRollupRefresh:
+    """Registers touched in the current transaction, refreshed on commit"""
+
+    def __init__(self):
+        self.registers = {}  # attendance record id -> (class_id, date)
+        self.done = False
+
+    def add(self, instance):
+        if instance.attendance_record_id not in self.registers:
+            record = instance.attendance_record
+            self.registers[record.id] = (record.class_obj_id, record.date)
+
+    def __call__(self):
+        self.done = True
+        AttendanceRollupService.refresh(self.registers.values())
+
+
+def _refresh_rollups(instance):
+    """
+    Refresh the rollups of the instance's register once the data commits
+
+    Rows changed in one transaction (a cascade from AttendanceRecord, an
+    admin bulk action) share a single refresh, queued by the first of them.
+    """
+    connection = transaction.get_connection()
+    for _, callback, _ in connection.run_on_commit:
+        if isinstance(callback, _PendingRollupRefresh) and not callback.done:
+            callback.add(instance)
+            return
+
+    pending = _PendingRollupRefresh()
+    pending.add(instance)
+    transaction.on_commit(pending)
+
+
+# The service's bulk upserts don't send these signals and refresh rollups
+# themselves; these keep rollups current for row-by-row saves and deletes
+# (admin, shell, cascades from AttendanceRecord)
+@receiver(post_save, sender=StudentAttendance)
+def handle_student_attendance_saved(sender, instance, **kwargs):
+    """Keep the rollups in step with a saved attendance row"""
+    _refresh_rollups(instance)
+
+
+@receiver(post_delete, sender=StudentAttendance)
+def handle_student_attendance_deleted(sender, instance, **kwargs):
+    """Keep the rollups in step with a deleted attendance row"""
+    _refresh_rollups(instance)
@@ -1,3 +1,393 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from src.academics.models import AcademicYear, Class, Grade, Section
+from src.students.models import Student
+
+from .models import AttendanceRecord, AttendanceRollup, StudentAttendance
+from .services import AttendanceRollupService, AttendanceService
+
+User = get_user_model()
+
+
+class AttendanceTestMixin:
+    """Two classes with two students each"""
+
+    def setUp(self):
+        self.user = User.objects.create_superuser(
+            username="admin", email="admin@test.com", password="testpass123"
+        )
+        academic_year = AcademicYear.objects.create(
+            name="2024-25",
+            start_date=date(2024, 4, 1),
+            end_date=date(2025, 3, 31),
+            is_current=True,
+            created_by=self.user,
+        )
+        section = Section.objects.create(name="Primary")
+        grade = Grade.objects.create(name="Grade 5", section=section)
+        self.class_a = Class.objects.create(
+            name="A", grade=grade, section=section, academic_year=academic_year
+        )
+        self.class_b = Class.objects.create(
+            name="B", grade=grade, section=section, academic_year=academic_year
+        )
+
+        self.students = {self.class_a.id: [], self.class_b.id: []}
+        for class_obj in (self.class_a, self.class_a, self.class_b, self.class_b):
+            number = sum(len(students) for students in self.students.values())
+            self.students[class_obj.id].append(
+                Student.objects.create(
+                    first_name="Student",
+                    last_name=str(number),
+                    admission_number=f"ADM{number:03d}",
+                    admission_date=date(2024, 4, 1),
+                    current_class=class_obj,
+                    emergency_contact_name="Guardian",
+                    emergency_contact_number="1234567890",
+                )
+            )
+
+    def _register(self, class_obj, day, statuses=("present", "absent")):
+        return {
+            "class_id": class_obj.id,
+            "date": day,
+            "students": [
+                {"student_id": student.id, "status": status}
+                for student, status in zip(self.students[class_obj.id], statuses)
+            ],
+        }
+
+
+class AttendanceBatchServiceTest(AttendanceTestMixin, TestCase):
+    """Test cases for AttendanceService.mark_attendance_batch"""
+
+    def test_marks_every_register(self):
+        """Each register gets a record and a row per student"""
+        records = AttendanceService.mark_attendance_batch(
+            [
+                self._register(self.class_a, date(2024, 5, 6)),
+                self._register(self.class_b, date(2024, 5, 7)),
+            ],
+            self.user,
+        )
+
+        self.assertEqual(
+            [(record.class_obj_id, record.date) for record in records],
+            [(self.class_a.id, date(2024, 5, 6)), (self.class_b.id, date(2024, 5, 7))],
+        )
+        self.assertEqual(StudentAttendance.objects.count(), 4)
+
+    def test_remarking_updates_rows(self):
+        """Marking the same register again overwrites the statuses"""
+        register = self._register(self.class_a, date(2024, 5, 6))
+        AttendanceService.mark_attendance_batch([register], self.user)
+        AttendanceService.mark_attendance_batch(
+            [self._register(self.class_a, date(2024, 5, 6), ("late", "late"))],
+            self.user,
+        )
+
+        self.assertEqual(AttendanceRecord.objects.count(), 1)
+        self.assertEqual(
+            set(StudentAttendance.objects.values_list("status", flat=True)), {"late"}
+        )
+
+    def test_rejects_students_from_another_class(self):
+        """A student outside the register's class is rejected before writing"""
+        register = self._register(self.class_a, date(2024, 5, 6))
+        register["students"].append(
+            {"student_id": self.students[self.class_b.id][0].id, "status": "present"}
+        )
+
+        with self.assertRaises(ValidationError):
+            AttendanceService.mark_attendance_batch([register], self.user)
+
+        self.assertFalse(AttendanceRecord.objects.exists())
+        self.assertFalse(StudentAttendance.objects.exists())
+
+    def test_refreshes_only_marked_registers(self):
+        """Rollups are built for the marked (class, date) pairs only"""
+        AttendanceService.mark_attendance_batch(
+            [
+                self._register(self.class_a, date(2024, 5, 6)),
+                self._register(self.class_b, date(2024, 5, 7)),
+            ],
+            self.user,
+        )
+        # Written directly, so only a cross-product refresh would count it
+        record = AttendanceRecord.objects.create(
+            class_obj=self.class_a, date=date(2024, 5, 7), marked_by=self.user
+        )
+        StudentAttendance.objects.create(
+            attendance_record=record,
+            student=self.students[self.class_a.id][0],
+            status="present",
+        )
+        AttendanceRollup.objects.filter(
+            class_obj=self.class_a, period_start=date(2024, 5, 7)
+        ).delete()
+
+        AttendanceService.mark_attendance_batch(
+            [
+                self._register(self.class_a, date(2024, 5, 6)),
+                self._register(self.class_b, date(2024, 5, 7)),
+            ],
+            self.user,
+        )
+
+        days = set(
+            AttendanceRollup.objects.filter(period_type="day").values_list(
+                "class_obj_id", "period_start"
+            )
+        )
+        self.assertEqual(
+            days,
+            {(self.class_a.id, date(2024, 5, 6)), (self.class_b.id, date(2024, 5, 7))},
+        )
+        week = AttendanceRollup.objects.get(
+            period_type="week",
+            class_obj=self.class_b,
+            student=self.students[self.class_b.id][1],
+        )
+        self.assertEqual(
+            (week.period_start, week.absent, week.total), (date(2024, 5, 6), 1, 1)
+        )
+
+
+class AttendanceRollupServiceTest(AttendanceTestMixin, TestCase):
+    """Test cases for AttendanceRollupService and the rollup-backed reports"""
+
+    def _mark_may(self):
+        """Mark both classes over two weeks of May 2024"""
+        AttendanceService.mark_attendance_batch(
+            [
+                self._register(class_obj, day, statuses)
+                for class_obj in (self.class_a, self.class_b)
+                for day, statuses in (
+                    (date(2024, 5, 3), ("present", "late")),
+                    (date(2024, 5, 6), ("absent", "present")),
+                    (date(2024, 5, 7), ("excused", "present")),
+                )
+            ],
+            self.user,
+        )
+
+    def _rollups(self):
+        return set(
+            AttendanceRollup.objects.values_list(
+                "student_id",
+                "class_obj_id",
+                "period_type",
+                "period_start",
+                "present",
+                "absent",
+                "late",
+                "excused",
+                "total",
+            )
+        )
+
+    def test_refresh_counts_days_weeks_and_months(self):
+        """Day rows count the register; weeks and months sum the days"""
+        self._mark_may()
+        student = self.students[self.class_a.id][0]
+
+        rollups = {
+            (rollup.period_type, rollup.period_start): rollup
+            for rollup in AttendanceRollup.objects.filter(student=student)
+        }
+
+        self.assertEqual(
+            sorted(rollups),
+            [
+                ("day", date(2024, 5, 3)),
+                ("day", date(2024, 5, 6)),
+                ("day", date(2024, 5, 7)),
+                ("month", date(2024, 5, 1)),
+                ("week", date(2024, 4, 29)),
+                ("week", date(2024, 5, 6)),
+            ],
+        )
+        week = rollups[("week", date(2024, 5, 6))]
+        self.assertEqual((week.absent, week.excused, week.total), (1, 1, 2))
+        month = rollups[("month", date(2024, 5, 1))]
+        self.assertEqual(
+            (month.present, month.absent, month.excused, month.total), (1, 1, 1, 3)
+        )
+
+    def test_rebuild_matches_refresh(self):
+        """Rebuilding from history gives the rows kept by refresh"""
+        self._mark_may()
+        expected = self._rollups()
+
+        AttendanceRollup.objects.all().delete()
+        written = AttendanceRollupService.rebuild()
+
+        self.assertEqual(self._rollups(), expected)
+        self.assertEqual(written, {"day": 12, "week": 8, "month": 4})
+
+    def test_rebuild_since_keeps_earlier_periods(self):
+        """A partial rebuild only replaces periods from the given month"""
+        self._mark_may()
+        AttendanceService.mark_attendance_batch(
+            [self._register(self.class_a, date(2024, 4, 15))], self.user
+        )
+        expected = self._rollups()
+
+        AttendanceRollup.objects.filter(period_start__gte=date(2024, 5, 1)).delete()
+        AttendanceRollupService.rebuild(since=date(2024, 5, 20))
+
+        self.assertEqual(self._rollups(), expected)
+
+    def test_signals_refresh_row_by_row_changes(self):
+        """Saving or deleting rows outside the service refreshes the rollups"""
+        with self.captureOnCommitCallbacks(execute=True):
+            record = AttendanceRecord.objects.create(
+                class_obj=self.class_a, date=date(2024, 5, 6), marked_by=self.user
+            )
+            attendance = StudentAttendance.objects.create(
+                attendance_record=record,
+                student=self.students[self.class_a.id][0],
+                status="absent",
+            )
+        day = AttendanceRollup.objects.get(period_type="day")
+        self.assertEqual((day.absent, day.total), (1, 1))
+
+        attendance.status = "present"
+        with self.captureOnCommitCallbacks(execute=True):
+            attendance.save()
+        day = AttendanceRollup.objects.get(period_type="day")
+        self.assertEqual((day.present, day.absent), (1, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record.delete()
+        self.assertFalse(AttendanceRollup.objects.exists())
+
+    def test_signals_refresh_each_transaction_once(self):
+        """Rows changed in one transaction share a single refresh"""
+        with self.captureOnCommitCallbacks(execute=True):
+            record = AttendanceRecord.objects.create(
+                class_obj=self.class_a, date=date(2024, 5, 6), marked_by=self.user
+            )
+            for student in self.students[self.class_a.id]:
+                StudentAttendance.objects.create(
+                    attendance_record=record, student=student, status="present"
+                )
+
+        with patch.object(
+            AttendanceRollupService,
+            "refresh",
+            wraps=AttendanceRollupService.refresh,
+        ) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                record.delete()
+
+        refresh.assert_called_once()
+        self.assertEqual(
+            list(refresh.call_args.args[0]), [(self.class_a.id, date(2024, 5, 6))]
+        )
+        self.assertFalse(AttendanceRollup.objects.exists())
+
+    def test_monthly_stats_match_raw_counts(self):
+        """Rollup-backed monthly stats agree with counting StudentAttendance"""
+        self._mark_may()
+        raw = StudentAttendance.objects.filter(attendance_record__date__month=5)
+
+        stats = AttendanceService.get_monthly_attendance_stats(2024, 5)
+
+        self.assertEqual(
+            stats["overall"],
+            {
+                "total_records": raw.count(),
+                "present_records": raw.filter(status__in=["present", "late"]).count(),
+                "absent_records": raw.filter(status="absent").count(),
+                "late_records": raw.filter(status="late").count(),
+                "excused_records": raw.filter(status="excused").count(),
+                "attendance_percentage": round(
+                    raw.filter(status__in=["present", "late"]).count()
+                    / raw.count()
+                    * 100,
+                    2,
+                ),
+            },
+        )
+        self.assertEqual(
+            [
+                (day["attendance_record__date"], day["total"])
+                for day in stats["day_wise"]
+            ],
+            [
+                (day, raw.filter(attendance_record__date=day).count())
+                for day in (date(2024, 5, 3), date(2024, 5, 6), date(2024, 5, 7))
+            ],
+        )
+
+
+class AttendanceBatchAPITest(AttendanceTestMixin, TestCase):
+    """Test cases for the batch register endpoint"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("api:attendance_api:register-batch")
+
+    def _post(self, registers):
+        for register in registers:
+            register["date"] = register["date"].isoformat()
+            for entry in register["students"]:
+                entry["student_id"] = str(entry["student_id"])
+        return self.client.post(self.url, {"registers": registers}, format="json")
+
+    def test_url(self):
+        """The endpoint lives under the API namespace"""
+        self.assertEqual(self.url, "/api/v1/attendance/registers/batch/")
+
+    def test_batch_marks_registers(self):
+        """Posting registers marks them and reports the counts"""
+        response = self._post(
+            [
+                self._register(self.class_a, date(2024, 5, 6)),
+                self._register(self.class_b, date(2024, 5, 6)),
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (register["class_id"], register["students_marked"])
+                for register in response.data["registers"]
+            ],
+            [(self.class_a.id, 2), (self.class_b.id, 2)],
+        )
+        self.assertEqual(StudentAttendance.objects.count(), 4)
+
+    def test_batch_rejects_students_from_another_class(self):
+        """Students outside the register's class are a bad request"""
+        register = self._register(self.class_a, date(2024, 5, 6))
+        register["students"].append(
+            {"student_id": self.students[self.class_b.id][0].id, "status": "present"}
+        )
+
+        response = self._post([register])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(StudentAttendance.objects.exists())
+
+    def test_batch_rejects_duplicate_registers(self):
+        """A class can appear once per date"""
+        response = self._post(
+            [
+                self._register(self.class_a, date(2024, 5, 6)),
+                self._register(self.class_a, date(2024, 5, 6)),
+            ]
+        )
 
-# Create your tests here.
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -126,19 +126,14 @@ def attendance_dashboard_view(request):
     # Trend data for chart
     trend_data = []
     trend_dates = []
+    daily_percentages = {
+        trend["date"]: trend["percentage"]
+        for trend in AttendanceService.get_attendance_trends(days=days)
+    }
 
     for i in range(days):
         current_date = end_date - timedelta(days=i)
-        daily_attendance = StudentAttendance.objects.filter(
-            attendance_record__date=current_date
-        ).aggregate(
-            total=Count("id"),
-            present=Count("id", filter=Q(status__in=["present", "late"])),
-        )
-
-        percentage = 0
-        if daily_attendance["total"] > 0:
-            percentage = (daily_attendance["present"] / daily_attendance["total"]) * 100
+        percentage = daily_percentages.get(current_date, 0)
 
         trend_data.insert(0, round(percentage, 1))
         trend_dates.insert(0, current_date.strftime("%Y-%m-%d"))
@@ -580,6 +580,44 @@ class SystemHealthMetricsViewSet(viewsets.ReadOnlyModelViewSet):
 
         return Response(status_data)
 
+    @action(detail=False, methods=["get"])
+    def endpoints(self, request):
+        """Get per-view latency, error and query metrics, N+1 offenders first"""
+        from ..instrumentation import RequestMetrics
+
+        try:
+            minutes = min(max(int(request.query_params.get("minutes", 15)), 1), 120)
+        except ValueError:
+            minutes = 15
+        order_by = request.query_params.get("order_by", "avg_queries")
+        if order_by not in (
+            "avg_queries",
+            "avg_response_time_ms",
+            "db_time_ms",
+            "error_rate",
+            "requests",
+        ):
+            order_by = "avg_queries"
+
+        return Response(
+            {
+                "summary": RequestMetrics.summary(minutes),
+                "views": RequestMetrics.view_summary(minutes, order_by=order_by),
+            }
+        )
+
+    @action(detail=False, methods=["get"])
+    def audit_buffer(self, request):
+        """Get audit log buffer queue depth and flush latency"""
+        from ..audit_buffer import AuditLogBuffer, audit_buffer
+
+        return Response(
+            {
+                "process": audit_buffer.metrics(),
+                "cluster": AuditLogBuffer.cluster_metrics(),
+            }
+        )
+
 
 class AnalyticsDashboardView(APIView):
     """API view for analytics dashboard data"""
@@ -0,0 +1,222 @@
+# audit_buffer.py
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+AUDIT_BUFFER_DEFAULTS = {
+    "ENABLED": True,
+    "BATCH_SIZE": 200,  # Rows per bulk_create
+    "FLUSH_INTERVAL": 1.0,  # Seconds between background flushes
+    "MAX_QUEUE_SIZE": 10000,  # Records held before callers write themselves
+}
+
+# Cluster-wide counters, updated once per flush
+METRICS_CACHE_KEY = "audit_buffer:{}"
+METRICS_TIMEOUT = 60 * 60 * 24  # 24 hours
+
+
+class AuditLogBuffer:
+    """
+    In-process buffer for audit log rows written on the request path.
+
+    Requests enqueue unsaved AuditLog/UserAuditLog instances and return
+    immediately; a daemon thread bulk_creates them in batches every
+    FLUSH_INTERVAL seconds, or sooner once a batch is full. The queue is
+    bounded: when it is full the enqueuing request flushes it itself, so
+    records are never dropped. The remaining records are flushed at
+    interpreter exit, which covers graceful worker shutdown.
+    """
+
+    def __init__(self, **options):
+        config = {**AUDIT_BUFFER_DEFAULTS, **getattr(settings, "AUDIT_LOG_BUFFER", {})}
+        config.update(options)
+
+        self.enabled = config["ENABLED"]
+        self.batch_size = config["BATCH_SIZE"]
+        self.flush_interval = config["FLUSH_INTERVAL"]
+        self.queue = queue.Queue(maxsize=config["MAX_QUEUE_SIZE"])
+
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        self._flushes = 0
+        self._flushed = 0
+        self._failed = 0
+        self._last_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+    def add(self, instance):
+        """
+        Queue an unsaved model instance for writing
+
+        Saves it right away when buffering is disabled.
+        """
+        if not self.enabled:
+            instance.save()
+            return instance
+
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(instance)
+        except queue.Full:
+            # Back-pressure instead of loss: write the backlog in this request
+            self.flush()
+            self.queue.put(instance)
+
+        if self.queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return instance
+
+    def flush(self, limit=None) -> int:
+        """
+        Write queued records with bulk_create, at most `limit` of them
+
+        Returns the number of rows written.
+        """
+        with self._flush_lock:
+            records = []
+            while limit is None or len(records) < limit:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not records:
+                return 0
+
+            started = time.perf_counter()
+            written = self._write(records)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            self._flushes += 1
+            self._flushed += written
+            self._failed += len(records) - written
+            self._last_flush_ms = elapsed_ms
+            self._total_flush_ms += elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+
+        self._publish_metrics(written, len(records) - written, elapsed_ms)
+        return written
+
+    def _write(self, records) -> int:
+        by_model = defaultdict(list)
+        for record in records:
+            by_model[type(record)].append(record)
+
+        written = 0
+        for model, instances in by_model.items():
+            try:
+                model.objects.bulk_create(instances, batch_size=self.batch_size)
+                written += len(instances)
+            except Exception as e:
+                # One bad row must not take the whole batch with it
+                logger.error(f"Bulk audit log write failed, saving rows: {str(e)}")
+                for instance in instances:
+                    try:
+                        instance.save()
+                        written += 1
+                    except Exception as row_error:
+                        logger.error(f"Failed to write audit log: {str(row_error)}")
+        return written
+
+    def metrics(self) -> dict:
+        """Queue depth and flush latency of this process's buffer"""
+        return {
+            "pid": os.getpid(),
+            "enabled": self.enabled,
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "flushes": self._flushes,
+            "records_flushed": self._flushed,
+            "records_failed": self._failed,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+            "avg_flush_ms": (
+                round(self._total_flush_ms / self._flushes, 2) if self._flushes else 0
+            ),
+            "max_flush_ms": round(self._max_flush_ms, 2),
+        }
+
+    @staticmethod
+    def cluster_metrics() -> dict:
+        """Flush totals summed over every process"""
+        counters = ["flushes", "records_flushed", "records_failed", "flush_ms"]
+        values = cache.get_many([METRICS_CACHE_KEY.format(name) for name in counters])
+        totals = {
+            name: values.get(METRICS_CACHE_KEY.format(name), 0) for name in counters
+        }
+        totals["avg_flush_ms"] = (
+            round(totals["flush_ms"] / totals["flushes"], 2) if totals["flushes"] else 0
+        )
+        return totals
+
+    def _publish_metrics(self, written, failed, elapsed_ms):
+        try:
+            for name, amount in (
+                ("flushes", 1),
+                ("records_flushed", written),
+                ("records_failed", failed),
+                ("flush_ms", int(elapsed_ms)),
+            ):
+                key = METRICS_CACHE_KEY.format(name)
+                cache.add(key, 0, METRICS_TIMEOUT)
+                cache.incr(key, amount)
+        except Exception as e:
+            logger.warning(f"Could not publish audit buffer metrics: {str(e)}")
+
+    def _ensure_started(self):
+        # Forked workers inherit the buffer object but not its thread
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+
+            if self._pid != os.getpid():
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+                atexit.register(self.shutdown)
+
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="audit-log-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                close_old_connections()
+                while self.flush(limit=self.batch_size) == self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Audit log flusher error: {str(e)}")
+            finally:
+                close_old_connections()
+
+    def shutdown(self):
+        """Flush everything still queued; registered to run at exit"""
+        if self._pid != os.getpid():
+            return
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing audit logs on shutdown: {str(e)}")
+
+
+audit_buffer = AuditLogBuffer()
@@ -1,6 +1,10 @@
 # Create this file: src/core/utils/cache_utils.py
 
 import logging
+import threading
+import time
+from collections import OrderedDict
+
 from django.core.cache import cache
 from django.conf import settings
 
@@ -132,3 +136,99 @@ class CacheManager:
             fetch_func,
             timeout=getattr(settings, "CACHE_TIMEOUTS", {}).get("user_roles", 3600),
         )
+
+
+class LocalLRUCache:
+    """
+    Small thread-safe in-process LRU cache.
+
+    Used in front of the shared cache for hot, rarely changing values; the
+    owner decides when entries go stale and calls clear().
+    """
+
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            except KeyError:
+                return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedVersion:
+    """
+    Version counter in the shared cache, for in-process caches to follow.
+
+    The owner calls check() before trusting its local copy and bump() after
+    changing the data behind it. The shared counter is re-read at most once
+    per check_interval seconds, so other processes notice a bump within it.
+    """
+
+    def __init__(self, key, check_interval=5):
+        self.key = key
+        self.check_interval = check_interval
+        self.current = None
+        self._checked_at = 0.0
+
+    def check(self, now=None):
+        """Re-read the shared version if due; True when it has moved on"""
+        now = time.monotonic() if now is None else now
+        if self.current is not None and now - self._checked_at < self.check_interval:
+            return False
+
+        try:
+            version = cache.get(self.key)
+            if version is None:
+                cache.add(self.key, 1, None)
+                version = cache.get(self.key, 1)
+        except Exception as e:
+            logger.warning(f"Cache version read failed for key {self.key}: {e}")
+            version = self.current or 1
+
+        changed = version != self.current
+        self.current = version
+        self._checked_at = now
+        return changed
+
+    def bump(self, patched=False):
+        """
+        Tell other processes the data changed.
+
+        Returns True when the owner may keep its local copy: it was already
+        patched in place and nobody else bumped the version meanwhile.
+        """
+        try:
+            cache.add(self.key, 1, None)
+            version = cache.incr(self.key)
+        except Exception as e:
+            logger.warning(f"Cache version bump failed for key {self.key}: {e}")
+            version = None
+
+        if patched and version is not None and version == (self.current or 0) + 1:
+            self.current = version
+            return True
+        self.current = None
+        return False
@@ -0,0 +1,271 @@
+# instrumentation.py
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.core.cache import cache, caches
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+METRICS_KEY_PREFIX = "sms:metrics"
+METRICS_RETENTION_SECONDS = 60 * 60 * 2  # Minute buckets kept for 2 hours
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting queries and their time.
+
+    Install it with connection.execute_wrapper(counter) around the code to
+    measure; executemany calls count once.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration_ms += (time.perf_counter() - started) * 1000
+
+
+def latency_bucket(duration_ms: float) -> str:
+    """Histogram bucket label for a request duration"""
+    for bound in LATENCY_BUCKETS_MS:
+        if duration_ms <= bound:
+            return f"le_{bound}"
+    return "le_inf"
+
+
+class RequestMetrics:
+    """
+    Per-minute request metrics aggregated in Redis.
+
+    Every request adds to two hashes for its minute: totals across the site
+    and per-view counters (requests, errors, response time, queries, query
+    time and a latency histogram). All increments for a request go out in
+    one pipeline. Readers sum the minute buckets of a window. Without a Redis
+    cache backend the buckets are kept with plain cache get/set instead.
+    """
+
+    @staticmethod
+    def _minute(moment=None) -> int:
+        return int((moment or timezone.now()).timestamp() // 60)
+
+    @staticmethod
+    def _keys(minute: int):
+        return (
+            f"{METRICS_KEY_PREFIX}:totals:{minute}",
+            f"{METRICS_KEY_PREFIX}:views:{minute}",
+        )
+
+    @staticmethod
+    def _redis_client():
+        """Raw client of the default cache if it is Redis-backed"""
+        from django.core.cache.backends.redis import RedisCache
+
+        default_cache = caches["default"]
+        try:
+            from django_redis.cache import RedisCache as DjangoRedisCache
+
+            if isinstance(default_cache, DjangoRedisCache):
+                return default_cache.client.get_client(write=True)
+        except ImportError:
+            pass
+
+        if isinstance(default_cache, RedisCache):
+            return default_cache._cache.get_client(write=True)
+        return None
+
+    @classmethod
+    def record(
+        cls,
+        view_name: str,
+        duration_ms: float,
+        query_count: int,
+        query_ms: float,
+        is_error: bool,
+    ):
+        """Add one request to the current minute's buckets"""
+        totals_key, views_key = cls._keys(cls._minute())
+        increments = {
+            "requests": 1,
+            "errors": int(is_error),
+            "response_ms": int(round(duration_ms)),
+            "queries": query_count,
+            # Microseconds, since most queries take well under a millisecond
+            "query_us": int(round(query_ms * 1000)),
+        }
+        view_increments = {
+            f"{view_name}|{field}": amount for field, amount in increments.items()
+        }
+        view_increments[f"{view_name}|{latency_bucket(duration_ms)}"] = 1
+
+        try:
+            client = cls._redis_client()
+            if client is not None:
+                pipeline = client.pipeline(transaction=False)
+                for field, amount in increments.items():
+                    pipeline.hincrby(totals_key, field, amount)
+                for field, amount in view_increments.items():
+                    pipeline.hincrby(views_key, field, amount)
+                pipeline.expire(totals_key, METRICS_RETENTION_SECONDS)
+                pipeline.expire(views_key, METRICS_RETENTION_SECONDS)
+                pipeline.execute()
+            else:
+                cls._record_in_cache(totals_key, increments)
+                cls._record_in_cache(views_key, view_increments)
+        except Exception as e:
+            # Metrics must never break a request
+            logger.debug(f"Could not record request metrics: {str(e)}")
+
+    @staticmethod
+    def _record_in_cache(key: str, increments: Dict[str, int]):
+        bucket = cache.get(key) or {}
+        for field, amount in increments.items():
+            bucket[field] = bucket.get(field, 0) + amount
+        cache.set(key, bucket, METRICS_RETENTION_SECONDS)
+
+    @classmethod
+    def _read_buckets(cls, minutes: int):
+        """Sum the totals and per-view hashes of the last `minutes` minutes"""
+        current = cls._minute()
+        keys = [
+            cls._keys(minute) for minute in range(current - minutes + 1, current + 1)
+        ]
+
+        client = cls._redis_client()
+        if client is not None:
+            pipeline = client.pipeline(transaction=False)
+            for totals_key, views_key in keys:
+                pipeline.hgetall(totals_key)
+                pipeline.hgetall(views_key)
+            raw = pipeline.execute()
+            buckets = [
+                {
+                    (field.decode() if isinstance(field, bytes) else field): int(value)
+                    for field, value in bucket.items()
+                }
+                for bucket in raw
+            ]
+        else:
+            stored = cache.get_many([key for pair in keys for key in pair])
+            buckets = [stored.get(key, {}) for pair in keys for key in pair]
+
+        totals = defaultdict(int)
+        views = defaultdict(lambda: defaultdict(int))
+        for index, bucket in enumerate(buckets):
+            if index % 2 == 0:
+                for field, value in bucket.items():
+                    totals[field] += value
+            else:
+                for field, value in bucket.items():
+                    view_name, _, metric = field.rpartition("|")
+                    views[view_name][metric] += value
+        return totals, views
+
+    @classmethod
+    def summary(cls, minutes: int = 15) -> Dict:
+        """
+        Site-wide request metrics over the last `minutes` minutes
+
+        Keys match the SystemHealthMetrics fields they feed.
+        """
+        try:
+            totals, _ = cls._read_buckets(minutes)
+        except Exception as e:
+            logger.error(f"Error reading request metrics: {str(e)}")
+            totals = {}
+
+        requests = totals.get("requests", 0)
+        queries = totals.get("queries", 0)
+        return {
+            "window_minutes": minutes,
+            "requests": requests,
+            "requests_per_minute": round(requests / minutes) if minutes else 0,
+            "avg_response_time_ms": (
+                round(totals.get("response_ms", 0) / requests, 2) if requests else 0
+            ),
+            "error_rate": (
+                round(totals.get("errors", 0) * 100 / requests, 2) if requests else 0
+            ),
+            "db_query_count": queries,
+            "avg_query_time_ms": (
+                round(totals.get("query_us", 0) / 1000 / queries, 2) if queries else 0
+            ),
+        }
+
+    @classmethod
+    def view_summary(
+        cls, minutes: int = 15, order_by: str = "avg_queries", limit: Optional[int] = 20
+    ) -> List[Dict]:
+        """
+        Per-view metrics over the last `minutes` minutes
+
+        Sorted by average queries per request by default, which puts N+1
+        offenders first.
+        """
+        try:
+            _, views = cls._read_buckets(minutes)
+        except Exception as e:
+            logger.error(f"Error reading request metrics: {str(e)}")
+            return []
+
+        rows = []
+        for view_name, metrics in views.items():
+            requests = metrics.get("requests", 0)
+            if not requests:
+                continue
+
+            histogram = {
+                f"le_{bound}": metrics.get(f"le_{bound}", 0)
+                for bound in LATENCY_BUCKETS_MS
+            }
+            histogram["le_inf"] = metrics.get("le_inf", 0)
+
+            rows.append(
+                {
+                    "view": view_name,
+                    "requests": requests,
+                    "errors": metrics.get("errors", 0),
+                    "error_rate": round(metrics.get("errors", 0) * 100 / requests, 2),
+                    "avg_response_time_ms": round(
+                        metrics.get("response_ms", 0) / requests, 2
+                    ),
+                    "p95_response_time_ms": histogram_quantile(histogram, 0.95),
+                    "avg_queries": round(metrics.get("queries", 0) / requests, 2),
+                    "db_time_ms": round(
+                        metrics.get("query_us", 0) / 1000 / requests, 2
+                    ),
+                    "latency_histogram": histogram,
+                }
+            )
+
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit] if limit else rows
+
+
+def histogram_quantile(histogram: Dict[str, int], quantile: float):
+    """
+    Upper bound of the bucket holding the given quantile
+
+    Returns None for the open-ended bucket.
+    """
+    total = sum(histogram.values())
+    if not total:
+        return 0
+
+    seen = 0
+    for bound in LATENCY_BUCKETS_MS:
+        seen += histogram.get(f"le_{bound}", 0)
+        if seen >= total * quantile:
+            return bound
+    return None
@@ -3,9 +3,12 @@ from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse
 from django.core.cache import cache
+from django.db import connections
+from contextlib import ExitStack
 import time
 import logging
 
+from .instrumentation import QueryCounter, RequestMetrics
 from .services import AuditService, ConfigurationService, SecurityService
 from .models import SystemHealthMetrics
 
@@ -98,6 +101,7 @@ class AuditMiddleware:
                 module_name=module_name,
                 view_name=view_name,
                 duration_ms=duration_ms,
+                defer=True,
             )
         except Exception as e:
             logger.error(f"Error logging audit trail: {str(e)}")
@@ -199,18 +203,40 @@ class SecurityMiddleware:
 
 
 class PerformanceMiddleware:
-    """Middleware for performance monitoring"""
+    """
+    Middleware for performance monitoring
+
+    Counts and times the queries of each request with a database execute
+    wrapper and records latency, query and error counters per view in
+    RequestMetrics.
+    """
 
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        start_time = time.time()
+        counter = QueryCounter()
+        start_time = time.perf_counter()
+        response = None
 
-        response = self.get_response(request)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+        finally:
+            # Calculate request duration
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            view_name = self._get_view_name(request)
+            RequestMetrics.record(
+                view_name,
+                duration_ms,
+                counter.count,
+                counter.duration_ms,
+                is_error=response is None or response.status_code >= 500,
+            )
 
-        # Calculate request duration
-        duration_ms = int((time.time() - start_time) * 1000)
+        duration_ms = int(duration_ms)
 
         # Log slow requests
         slow_threshold = ConfigurationService.get_setting(
@@ -221,8 +247,26 @@ class PerformanceMiddleware:
                 f"Slow request: {request.method} {request.path} took {duration_ms}ms"
             )
 
+        # Log likely N+1 query patterns
+        query_threshold = ConfigurationService.get_setting(
+            "system.query_count_warning_threshold", 50
+        )
+        if counter.count > query_threshold:
+            logger.warning(
+                f"High query count: {request.method} {request.path} ({view_name}) "
+                f"ran {counter.count} queries in {counter.duration_ms:.0f}ms"
+            )
+
         # Add performance headers for debugging
         if ConfigurationService.get_setting("system.debug_performance_headers", False):
             response["X-Response-Time"] = f"{duration_ms}ms"
+            response["X-DB-Queries"] = str(counter.count)
 
         return response
+
+    def _get_view_name(self, request):
+        """Name of the resolved view, grouping unresolved paths together"""
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is None:
+            return "unresolved"
+        return resolver_match.view_name or resolver_match._func_path
@@ -6,8 +6,10 @@ from django.utils import timezone
 from django.db.models import Avg, Sum, Count, Max, Min, Q, StdDev
 from django.conf import settings
 from decimal import Decimal
+import copy
 import json
 import logging
+import time
 from typing import Dict, Any, Optional, List, Union
 from datetime import datetime, timedelta
 
@@ -24,6 +26,8 @@ from .models import (
     TeacherPerformanceAnalytics,
     SystemHealthMetrics,
 )
+from .audit_buffer import audit_buffer
+from .cache_utils import LocalLRUCache, SharedVersion
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -36,26 +40,91 @@ class ConfigurationService:
     CACHE_TIMEOUT = 3600  # 1 hour
     CACHE_PREFIX = "system_setting_"
 
+    # Settings are read on every request, so each process keeps recently read
+    # values for a few seconds before going back to the shared cache. Shared
+    # entries are stored under a version number; bumping it invalidates every
+    # setting at once, and other processes notice within LOCAL_CACHE_TIMEOUT.
+    LOCAL_CACHE_TIMEOUT = 5  # seconds
+    VERSION_KEY = "system_setting_version"
+    MISSING = "<system_setting:missing>"  # Cached marker for absent settings
+
+    _local_cache = LocalLRUCache(max_size=512)
+    _version = SharedVersion(VERSION_KEY, check_interval=LOCAL_CACHE_TIMEOUT)
+
     @classmethod
     def get_setting(cls, key: str, default: Any = None, use_cache: bool = True) -> Any:
-        """Get a system setting value with caching"""
+        """
+        Get a system setting value with caching
+
+        Looks in the per-process cache, then the shared cache, then the
+        database. Missing settings are cached too, so a default keeps
+        costing nothing to read.
+        """
+        if not use_cache:
+            try:
+                return SystemSetting.objects.get(setting_key=key).get_typed_value()
+            except SystemSetting.DoesNotExist:
+                return default
+
+        now = time.monotonic()
+        version = cls._get_version(now)
+
+        entry = cls._local_cache.get(key)
+        if entry is not None and entry[1] > now:
+            value = entry[0]
+        else:
+            value = cls._get_shared(key, version)
+            cls._local_cache.set(key, (value, now + cls.LOCAL_CACHE_TIMEOUT))
+
+        if value == cls.MISSING:
+            return default
+        # Callers must not be able to mutate the cached copy
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    @classmethod
+    def _get_shared(cls, key: str, version: int) -> Any:
+        """Read a setting through the shared cache, filling it on a miss"""
         cache_key = f"{cls.CACHE_PREFIX}{key}"
+        try:
+            value = cache.get(cache_key, version=version)
+            if value is not None:
+                return value
+        except Exception as e:
+            logger.warning(f"Error reading setting {key} from cache: {str(e)}")
 
-        if use_cache:
-            cached_value = cache.get(cache_key)
-            if cached_value is not None:
-                return cached_value
+        try:
+            value = SystemSetting.objects.get(setting_key=key).get_typed_value()
+        except SystemSetting.DoesNotExist:
+            value = cls.MISSING
 
         try:
-            setting = SystemSetting.objects.get(setting_key=key)
-            value = setting.get_typed_value()
+            cache.set(
+                cache_key,
+                cls.MISSING if value is None else value,
+                cls.CACHE_TIMEOUT,
+                version=version,
+            )
+        except Exception as e:
+            logger.warning(f"Error caching setting {key}: {str(e)}")
+        return cls.MISSING if value is None else value
 
-            if use_cache:
-                cache.set(cache_key, value, cls.CACHE_TIMEOUT)
+    @classmethod
+    def _get_version(cls, now: float) -> int:
+        """
+        Current settings version, re-read from the shared cache at most once
+        per LOCAL_CACHE_TIMEOUT
 
-            return value
-        except SystemSetting.DoesNotExist:
-            return default
+        The local cache is dropped whenever the version has moved on.
+        """
+        if cls._version.check(now):
+            cls._local_cache.clear()
+        return cls._version.current
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Invalidate cached settings in every process"""
+        cls._local_cache.clear()
+        cls._version.bump()
 
     @classmethod
     def set_setting(
@@ -84,8 +153,7 @@ class ConfigurationService:
         setting.save()
 
         # Clear cache
-        cache_key = f"{cls.CACHE_PREFIX}{key}"
-        cache.delete(cache_key)
+        cls.invalidate_cache()
 
         # Log the change
         AuditService.log_action(
@@ -248,8 +316,14 @@ class AuditService:
         module_name: str = "",
         view_name: str = "",
         duration_ms: int = None,
+        defer: bool = False,
     ) -> AuditLog:
-        """Log an audit entry"""
+        """
+        Log an audit entry
+
+        With defer, the entry is queued on the audit log buffer and written
+        in a batch shortly after, so the returned instance is unsaved.
+        """
 
         content_type = None
         object_id = None
@@ -258,7 +332,7 @@ class AuditService:
             content_type = ContentType.objects.get_for_model(content_object)
             object_id = content_object.pk
 
-        audit_log = AuditLog.objects.create(
+        audit_log = AuditLog(
             user=user,
             action=action,
             content_type=content_type,
@@ -274,6 +348,11 @@ class AuditService:
             duration_ms=duration_ms,
         )
 
+        if defer:
+            audit_buffer.add(audit_log)
+        else:
+            audit_log.save()
+
         return audit_log
 
     @classmethod
@@ -1,23 +1,25 @@
 # signals.py
+import logging
+
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
-from django.core.cache import cache
 
 from .models import SystemSetting
 from .services import AuditService
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=SystemSetting)
+@receiver(post_delete, sender=SystemSetting)
 def clear_setting_cache(sender, instance, **kwargs):
-    """Clear cache when system setting is updated"""
+    """Clear cache when system setting is updated or deleted"""
     from .services import ConfigurationService
 
-    cache_key = f"{ConfigurationService.CACHE_PREFIX}{instance.setting_key}"
-    cache.delete(cache_key)
+    ConfigurationService.invalidate_cache()
 
     logger.info(f"Cleared cache for system setting: {instance.setting_key}")
 
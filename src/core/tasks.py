@@ -25,10 +25,14 @@ from .models import (
     FinancialAnalytics,
     TeacherPerformanceAnalytics,
 )
+from .instrumentation import RequestMetrics
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Matches the collect-system-health schedule in core_settings
+HEALTH_METRICS_WINDOW_MINUTES = 15
+
 
 class CallbackTask(Task):
     """Base task class with callback support"""
@@ -410,6 +414,10 @@ def collect_system_health_metrics(self):
         # Active users (sessions)
         active_users = Session.objects.filter(expire_date__gte=timezone.now()).count()
 
+        # Request and query metrics recorded by PerformanceMiddleware since
+        # the previous run
+        request_metrics = RequestMetrics.summary(minutes=HEALTH_METRICS_WINDOW_MINUTES)
+
         # System metrics
         if psutil:
             # Disk usage
@@ -423,14 +431,14 @@ def collect_system_health_metrics(self):
         # Create health metrics record
         health_metrics = SystemHealthMetrics.objects.create(
             db_connection_count=db_connections,
-            db_query_count=0,  # Would need query counting middleware
-            avg_query_time_ms=0,  # Would need query timing
+            db_query_count=request_metrics["db_query_count"],
+            avg_query_time_ms=request_metrics["avg_query_time_ms"],
             cache_hit_rate=cache_hit_rate,
             cache_memory_usage_mb=cache_memory_usage,
             active_users=active_users,
-            requests_per_minute=0,  # Would need request counting
-            avg_response_time_ms=0,  # Would need response timing
-            error_rate=0,  # Would need error counting
+            requests_per_minute=request_metrics["requests_per_minute"],
+            avg_response_time_ms=request_metrics["avg_response_time_ms"],
+            error_rate=request_metrics["error_rate"],
             pending_tasks=0,  # Would count Celery queue
             failed_tasks=0,
             completed_tasks=0,
@@ -1,5 +1,5 @@
 # tests.py
-from django.test import TestCase, TransactionTestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.urls import reverse
@@ -11,6 +11,7 @@ from rest_framework import status
 from unittest.mock import patch, MagicMock
 from decimal import Decimal
 from datetime import datetime, timedelta
+import io
 import json
 
 from .models import (
@@ -31,6 +32,9 @@ from .services import (
     SecurityService,
     UtilityService,
 )
+from .audit_buffer import AuditLogBuffer
+from .exports import csv_response, should_run_in_background, write_xlsx
+from .instrumentation import QueryCounter, RequestMetrics
 from .utils import ValidationUtils, DateUtils, SecurityUtils, FormatUtils, MathUtils
 from .decorators import audit_action, rate_limit, require_role
 
@@ -145,6 +149,7 @@ class ConfigurationServiceTests(TestCase):
         )
         # Clear cache before each test
         cache.clear()
+        ConfigurationService.invalidate_cache()
 
     def test_get_setting_default(self):
         """Test getting a setting with default value"""
@@ -176,6 +181,32 @@ class ConfigurationServiceTests(TestCase):
         self.assertEqual(value1, value2)
         self.assertEqual(value1, "cached_value")
 
+    def test_cached_reads_skip_database(self):
+        """Test that repeated reads, including misses, run no queries"""
+        ConfigurationService.set_setting("test.local", "local_value", user=self.user)
+        ConfigurationService.get_setting("test.local")
+        ConfigurationService.get_setting("test.missing", "fallback")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                ConfigurationService.get_setting("test.local"), "local_value"
+            )
+            self.assertEqual(
+                ConfigurationService.get_setting("test.missing", "fallback"), "fallback"
+            )
+
+    def test_set_setting_invalidates_cached_values(self):
+        """Test that cached values and misses are dropped on update"""
+        ConfigurationService.set_setting("test.change", "old", user=self.user)
+        self.assertEqual(ConfigurationService.get_setting("test.change"), "old")
+        self.assertIsNone(ConfigurationService.get_setting("test.added"))
+
+        ConfigurationService.set_setting("test.change", "new", user=self.user)
+        ConfigurationService.set_setting("test.added", "added", user=self.user)
+
+        self.assertEqual(ConfigurationService.get_setting("test.change"), "new")
+        self.assertEqual(ConfigurationService.get_setting("test.added"), "added")
+
     def test_get_settings_by_category(self):
         """Test getting settings by category"""
         ConfigurationService.set_setting("cat1.setting1", "value1", category="cat1")
@@ -264,6 +295,27 @@ class AuditServiceTests(TestCase):
         self.assertEqual(deleted_count, 1)
         self.assertEqual(AuditLog.objects.count(), 1)
 
+    def test_deferred_log_action_is_batched(self):
+        """Test that deferred audit entries are written in one batch on flush"""
+        buffer = AuditLogBuffer(ENABLED=True, BATCH_SIZE=50, FLUSH_INTERVAL=3600)
+
+        with patch(f"{AuditService.__module__}.audit_buffer", buffer):
+            for index in range(3):
+                AuditService.log_action(
+                    user=self.user, action="update", description=str(index), defer=True
+                )
+
+        self.assertEqual(AuditLog.objects.count(), 0)
+        self.assertEqual(buffer.metrics()["queue_depth"], 3)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(buffer.flush(), 3)
+
+        self.assertEqual(AuditLog.objects.count(), 3)
+        metrics = buffer.metrics()
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertEqual(metrics["records_flushed"], 3)
+
 
 class ValidationUtilsTests(TestCase):
     """Tests for ValidationUtils"""
@@ -459,6 +511,57 @@ class MathUtilsTests(TestCase):
         self.assertEqual(std_dev, expected)
 
 
+class ExportTests(TestCase):
+    """Tests for streaming exports"""
+
+    header = ["Name", "Class"]
+
+    def rows(self):
+        for index in range(3):
+            yield [f"Student {index}", "Grade 1 A"]
+
+    def test_csv_response_streams_rows(self):
+        """Test CSV rows are streamed rather than buffered"""
+        response = csv_response("students.csv", self.header, self.rows())
+
+        self.assertTrue(response.streaming)
+        self.assertIn("students.csv", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(
+            content.splitlines(),
+            [
+                "Name,Class",
+                "Student 0,Grade 1 A",
+                "Student 1,Grade 1 A",
+                "Student 2,Grade 1 A",
+            ],
+        )
+
+    def test_write_xlsx_sizes_columns_up_front(self):
+        """Test spreadsheets are written in write-only mode with sized columns"""
+        from openpyxl import load_workbook
+
+        output = io.BytesIO()
+        write_xlsx(output, self.header, self.rows(), title="Students")
+        output.seek(0)
+
+        worksheet = load_workbook(output)["Students"]
+        self.assertEqual(worksheet["A1"].value, "Name")
+        self.assertTrue(worksheet["A1"].font.bold)
+        self.assertEqual(worksheet["A4"].value, "Student 2")
+        self.assertEqual(worksheet.column_dimensions["A"].width, 11)
+
+    @override_settings(EXPORT_SETTINGS={"BACKGROUND_THRESHOLD": 1})
+    def test_large_exports_run_in_background(self):
+        """Test exports over the threshold are sent to a background job"""
+        settings = SystemSetting.objects.filter(setting_key__startswith="export.")
+        SystemSetting.objects.create(setting_key="export.a", setting_value="1")
+        self.assertFalse(should_run_in_background(settings))
+
+        SystemSetting.objects.create(setting_key="export.b", setting_value="2")
+        self.assertTrue(should_run_in_background(settings))
+
+
 class CoreAPITests(APITestCase):
     """Tests for Core API endpoints"""
 
@@ -762,6 +865,46 @@ class CoreTasksTests(TestCase):
         mock_create.assert_called_once()
 
 
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class RequestMetricsTests(TestCase):
+    """Tests for request instrumentation"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_query_counter_counts_queries(self):
+        """Test the execute wrapper counts queries run inside it"""
+        from django.db import connection
+
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            list(SystemSetting.objects.all())
+            SystemSetting.objects.count()
+
+        self.assertEqual(counter.count, 2)
+        self.assertGreaterEqual(counter.duration_ms, 0)
+
+    def test_metrics_are_aggregated_per_view(self):
+        """Test request metrics roll up into totals and per-view rows"""
+        RequestMetrics.record("student-list", 40, 30, 12.5, is_error=False)
+        RequestMetrics.record("student-list", 300, 30, 10.0, is_error=False)
+        RequestMetrics.record("student-detail", 80, 2, 1.0, is_error=True)
+
+        summary = RequestMetrics.summary(minutes=5)
+        self.assertEqual(summary["requests"], 3)
+        self.assertEqual(summary["db_query_count"], 62)
+        self.assertEqual(summary["error_rate"], 33.33)
+
+        views = RequestMetrics.view_summary(minutes=5)
+        self.assertEqual(views[0]["view"], "student-list")
+        self.assertEqual(views[0]["avg_queries"], 30)
+        self.assertEqual(views[0]["latency_histogram"]["le_50"], 1)
+        self.assertEqual(views[0]["latency_histogram"]["le_500"], 1)
+        self.assertEqual(views[1]["errors"], 1)
+
+
 class SecurityServiceTests(TestCase):
     """Tests for SecurityService"""
 
@@ -7,9 +7,11 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Avg, Count, F, Max, Min, Q, Sum
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum, Window
+from django.db.models.functions import DenseRank, Rank
 from django.utils import timezone
 
 from src.academics.models import AcademicYear, Class, Term
@@ -26,6 +28,10 @@ from ..models import (
     ReportCard,
     StudentExamResult,
 )
+from .report_card_engine import ReportCardEngine
+
+RANKING_DEBOUNCE_SECONDS = 30
+RANKING_PENDING_KEY = "exam_rankings_pending_{}"
 
 
 class ExamService:
@@ -243,35 +249,64 @@ class ResultService:
 
     @staticmethod
     def enter_results(
-        exam_schedule_id: str, results_data: List[Dict], entered_by
+        exam_schedule_id: str,
+        results_data: List[Dict],
+        entered_by,
+        defer_rankings: bool = False,
     ) -> List[StudentExamResult]:
-        """Bulk entry of exam results"""
+        """
+        Bulk entry of exam results
+
+        Rankings are recalculated once at the end of the batch, or queued as a
+        debounced background task when defer_rankings is set. Either way the
+        saved results are marked so the post_save handler doesn't queue a
+        ranking pass of its own for them.
+        """
         results = []
 
         with transaction.atomic():
-            exam_schedule = ExamSchedule.objects.get(id=exam_schedule_id)
+            exam_schedule = ExamSchedule.objects.select_related(
+                "exam", "class_obj"
+            ).get(id=exam_schedule_id)
+            existing = {
+                result.student_id: result
+                for result in StudentExamResult.objects.select_for_update().filter(
+                    exam_schedule=exam_schedule
+                )
+            }
 
             for data in results_data:
                 student = Student.objects.get(id=data["student_id"])
 
-                result, created = StudentExamResult.objects.update_or_create(
-                    student=student,
-                    exam_schedule=exam_schedule,
-                    defaults={
-                        "marks_obtained": data["marks_obtained"],
-                        "is_absent": data.get("is_absent", False),
-                        "remarks": data.get("remarks", ""),
-                        "entered_by": entered_by,
-                        "term": exam_schedule.exam.term,
-                    },
+                result = existing.get(student.id) or StudentExamResult(
+                    student=student, exam_schedule=exam_schedule
                 )
+                result.marks_obtained = data["marks_obtained"]
+                result.is_absent = data.get("is_absent", False)
+                result.remarks = data.get("remarks", "")
+                result.entered_by = entered_by
+                result.term = exam_schedule.exam.term
+                # Read by handle_exam_result_saved
+                result._rankings_handled = True
+                result.save()
                 results.append(result)
 
             # Update completion count
             ResultService._update_exam_completion_count(exam_schedule.exam)
 
-            # Calculate rankings
-            ResultService._calculate_rankings(exam_schedule)
+            if defer_rankings:
+                ResultService.schedule_rankings(exam_schedule.id)
+            else:
+                ResultService.calculate_rankings(exam_schedule)
+
+                ranks = {
+                    pk: (class_rank, grade_rank)
+                    for pk, class_rank, grade_rank in StudentExamResult.objects.filter(
+                        id__in=[result.id for result in results]
+                    ).values_list("id", "class_rank", "grade_rank")
+                }
+                for result in results:
+                    result.class_rank, result.grade_rank = ranks[result.id]
 
         return results
 
@@ -288,217 +323,90 @@ class ResultService:
             exam.save()
 
     @staticmethod
-    def _calculate_rankings(exam_schedule: ExamSchedule):
-        """Calculate rankings for an exam schedule"""
-        results = StudentExamResult.objects.filter(
-            exam_schedule=exam_schedule, is_absent=False
-        ).order_by("-percentage")
+    def calculate_rankings(exam_schedule: ExamSchedule, dense: bool = False) -> int:
+        """
+        Rank results for an exam schedule's subject across its grade
+
+        Class and grade ranks are computed by window functions in a single
+        query, ordered by percentage. Ties share a rank; with dense=True the
+        next rank follows on without gaps. Only rows whose rank changed are
+        written back. Returns the number of updated results.
+
+        grade_rank is per subject: it compares results for the same exam and
+        subject in every class of the schedule's grade. Earlier versions
+        ranked all of the exam's results, across subjects, for students then
+        in the grade.
+        """
+        rank_function = DenseRank if dense else Rank
+        by_percentage = F("percentage").desc()
 
-        # Class rankings
-        for i, result in enumerate(results, 1):
-            result.class_rank = i
-            result.save(update_fields=["class_rank"])
-
-        # Grade rankings
         grade_results = StudentExamResult.objects.filter(
-            exam_schedule__exam=exam_schedule.exam,
-            student__current_class__grade=exam_schedule.class_obj.grade,
-            is_absent=False,
-        ).order_by("-percentage")
-
-        for i, result in enumerate(grade_results, 1):
-            result.grade_rank = i
-            result.save(update_fields=["grade_rank"])
-
-    @staticmethod
-    def generate_report_cards(
-        term_id: str, class_ids: List[str] = None
-    ) -> List[ReportCard]:
-        """Generate report cards for a term"""
-        term = Term.objects.get(id=term_id)
-
-        if class_ids:
-            classes = Class.objects.filter(id__in=class_ids)
-        else:
-            classes = Class.objects.filter(academic_year=term.academic_year)
-
-        report_cards = []
-
-        with transaction.atomic():
-            for class_obj in classes:
-                students = Student.objects.filter(
-                    current_class=class_obj, status="ACTIVE"
-                )
-
-                for student in students:
-                    report_card = ResultService._generate_student_report_card(
-                        student, term, class_obj
-                    )
-                    if report_card:
-                        report_cards.append(report_card)
-
-        return report_cards
-
-    @staticmethod
-    def _generate_student_report_card(
-        student: Student, term: Term, class_obj: Class
-    ) -> Optional[ReportCard]:
-        """Generate report card for individual student"""
-        results = StudentExamResult.objects.filter(
-            student=student, term=term, exam_schedule__class_obj=class_obj
-        )
-
-        if not results.exists():
-            return None
-
-        # Calculate aggregates
-        totals = results.aggregate(
-            total_marks=Sum("exam_schedule__total_marks"),
-            marks_obtained=Sum("marks_obtained"),
-            avg_percentage=Avg("percentage"),
-        )
+            exam_schedule__exam_id=exam_schedule.exam_id,
+            exam_schedule__subject_id=exam_schedule.subject_id,
+            exam_schedule__class_obj__grade_id=exam_schedule.class_obj.grade_id,
+        ).order_by()
 
-        # Get attendance data
-        attendance_data = ResultService._get_attendance_data(student, term)
-
-        # Calculate rankings
-        rankings = ResultService._calculate_student_rankings(student, term, class_obj)
-
-        report_card, created = ReportCard.objects.update_or_create(
-            student=student,
-            class_obj=class_obj,
-            academic_year=term.academic_year,
-            term=term,
-            defaults={
-                "total_marks": totals["total_marks"] or 0,
-                "marks_obtained": totals["marks_obtained"] or 0,
-                "percentage": totals["avg_percentage"] or 0,
-                "grade": ResultService._calculate_overall_grade(
-                    totals["avg_percentage"]
+        ranked = (
+            grade_results.filter(is_absent=False)
+            .annotate(
+                new_class_rank=Window(
+                    rank_function(),
+                    partition_by=[F("exam_schedule_id")],
+                    order_by=by_percentage,
                 ),
-                "grade_point_average": ResultService._calculate_gpa(results),
-                "class_rank": rankings["class_rank"],
-                "class_size": rankings["class_size"],
-                "grade_rank": rankings.get("grade_rank"),
-                "grade_size": rankings.get("grade_size"),
-                "attendance_percentage": attendance_data["percentage"],
-                "days_present": attendance_data["present"],
-                "days_absent": attendance_data["absent"],
-                "total_days": attendance_data["total"],
-                "status": "PUBLISHED",
-            },
-        )
-
-        return report_card
-
-    @staticmethod
-    def _get_attendance_data(student: Student, term: Term) -> Dict:
-        """Get attendance data for student in term"""
-        from attendance.models import Attendance
-
-        attendance_records = Attendance.objects.filter(student=student, term=term)
-
-        total_days = attendance_records.count()
-        present_days = attendance_records.filter(status="PRESENT").count()
-        absent_days = total_days - present_days
-
-        percentage = (present_days / total_days * 100) if total_days > 0 else 100
-
-        return {
-            "total": total_days,
-            "present": present_days,
-            "absent": absent_days,
-            "percentage": round(percentage, 2),
-        }
-
-    @staticmethod
-    def _calculate_student_rankings(
-        student: Student, term: Term, class_obj: Class
-    ) -> Dict:
-        """Calculate student rankings in class and grade"""
-        # Class ranking
-        class_averages = (
-            ReportCard.objects.filter(class_obj=class_obj, term=term)
-            .order_by("-percentage")
-            .values_list("percentage", flat=True)
+                new_grade_rank=Window(rank_function(), order_by=by_percentage),
+            )
+            .only("id", "class_rank", "grade_rank")
         )
 
-        student_percentage = ReportCard.objects.filter(
-            student=student, term=term
-        ).first()
+        changed = []
+        for result in ranked:
+            ranks = (result.new_class_rank, result.new_grade_rank)
+            if (result.class_rank, result.grade_rank) != ranks:
+                result.class_rank, result.grade_rank = ranks
+                changed.append(result)
 
-        if student_percentage:
-            class_rank = list(class_averages).index(student_percentage.percentage) + 1
-        else:
-            class_rank = len(class_averages) + 1
-
-        rankings = {"class_rank": class_rank, "class_size": len(class_averages)}
-
-        # Grade ranking
-        grade_averages = (
-            ReportCard.objects.filter(class_obj__grade=class_obj.grade, term=term)
-            .order_by("-percentage")
-            .values_list("percentage", flat=True)
-        )
-
-        if student_percentage:
-            grade_rank = list(grade_averages).index(student_percentage.percentage) + 1
-            rankings.update(
-                {"grade_rank": grade_rank, "grade_size": len(grade_averages)}
+        with transaction.atomic():
+            StudentExamResult.objects.bulk_update(
+                changed, ["class_rank", "grade_rank"], batch_size=500
+            )
+            cleared = (
+                grade_results.filter(is_absent=True)
+                .exclude(class_rank__isnull=True, grade_rank__isnull=True)
+                .update(class_rank=None, grade_rank=None)
             )
 
-        return rankings
+        return len(changed) + cleared
 
     @staticmethod
-    def _calculate_overall_grade(percentage: Optional[float]) -> str:
-        """Calculate overall letter grade"""
-        if not percentage:
-            return "F"
-
-        if percentage >= 90:
-            return "A+"
-        elif percentage >= 80:
-            return "A"
-        elif percentage >= 70:
-            return "B+"
-        elif percentage >= 60:
-            return "B"
-        elif percentage >= 50:
-            return "C+"
-        elif percentage >= 40:
-            return "C"
-        elif percentage >= 30:
-            return "D"
-        else:
-            return "F"
+    def schedule_rankings(exam_schedule_id) -> bool:
+        """
+        Queue a debounced ranking task for an exam schedule
+
+        Calls made while a task is already pending are absorbed by it, so a
+        whole entry session triggers a single ranking pass.
+        """
+        from ..tasks import calculate_exam_rankings
+
+        pending_key = RANKING_PENDING_KEY.format(exam_schedule_id)
+        # None means the cache is unreachable: queue rather than drop the pass
+        if cache.add(pending_key, True, RANKING_DEBOUNCE_SECONDS * 4) is False:
+            return False
+
+        transaction.on_commit(
+            lambda: calculate_exam_rankings.apply_async(
+                args=[str(exam_schedule_id)], countdown=RANKING_DEBOUNCE_SECONDS
+            )
+        )
+        return True
 
     @staticmethod
-    def _calculate_gpa(results) -> Decimal:
-        """Calculate GPA based on grade points"""
-        grade_points = {
-            "A+": 4.0,
-            "A": 3.7,
-            "B+": 3.3,
-            "B": 3.0,
-            "C+": 2.7,
-            "C": 2.3,
-            "D": 2.0,
-            "F": 0.0,
-        }
-
-        total_points = 0
-        total_subjects = 0
-
-        for result in results:
-            points = grade_points.get(result.grade, 0.0)
-            total_points += points
-            total_subjects += 1
-
-        return (
-            Decimal(str(total_points / total_subjects))
-            if total_subjects > 0
-            else Decimal("0.0")
-        )
+    def generate_report_cards(
+        term_id: str, class_ids: List[str] = None
+    ) -> List[ReportCard]:
+        """Generate report cards for a term"""
+        term = Term.objects.select_related("academic_year").get(id=term_id)
+        return ReportCardEngine(term, class_ids).generate()
 
 
 class OnlineExamService:
@@ -0,0 +1,277 @@
+"""
+School Management System - Report Card Engine
+File: src/exams/services/report_card_engine.py
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from src.academics.models import Class, Term
+from src.attendance.models import StudentAttendance
+
+from ..models import ReportCard, StudentExamResult
+
+GRADE_POINTS = {
+    "A+": Decimal("4.0"),
+    "A": Decimal("3.7"),
+    "B+": Decimal("3.3"),
+    "B": Decimal("3.0"),
+    "C+": Decimal("2.7"),
+    "C": Decimal("2.3"),
+    "D": Decimal("2.0"),
+    "F": Decimal("0.0"),
+}
+
+OVERALL_GRADE_THRESHOLDS = [
+    (90, "A+"),
+    (80, "A"),
+    (70, "B+"),
+    (60, "B"),
+    (50, "C+"),
+    (40, "C"),
+    (30, "D"),
+]
+
+CARD_FIELDS = [
+    "class_obj",
+    "total_marks",
+    "marks_obtained",
+    "percentage",
+    "grade",
+    "grade_point_average",
+    "class_rank",
+    "class_size",
+    "grade_rank",
+    "grade_size",
+    "attendance_percentage",
+    "days_present",
+    "days_absent",
+    "total_days",
+    "status",
+]
+
+TWO_PLACES = Decimal("0.01")
+
+
+class ReportCardEngine:
+    """
+    Generate a term's report cards from a handful of grouped queries.
+
+    Results and attendance for every student in scope are aggregated in the
+    database, totals, GPA, grades and ranks are computed in memory, and the
+    cards are written with bulk_create/bulk_update.
+    """
+
+    def __init__(
+        self, term: Term, class_ids: Optional[Iterable] = None, batch_size=500
+    ):
+        self.term = term
+        self.batch_size = batch_size
+
+        classes = Class.objects.filter(academic_year=term.academic_year)
+        if class_ids:
+            classes = classes.filter(id__in=class_ids)
+        self.classes = {class_obj.id: class_obj for class_obj in classes}
+        self.class_ids = list(self.classes)
+
+    def generate(self) -> List[ReportCard]:
+        """Build and upsert report cards, returning them"""
+        if not self.classes:
+            return []
+
+        totals = self._result_totals()
+        if not totals:
+            return []
+
+        attendance = self._attendance_totals()
+        cards = [
+            self._build_card(student_id, class_id, summary, attendance)
+            for (student_id, class_id), summary in totals.items()
+        ]
+
+        self._assign_ranks(cards)
+        self._save(cards)
+        return cards
+
+    def _result_totals(self) -> Dict[Tuple, Dict]:
+        """Aggregate each student's results in their current class"""
+        rows = (
+            StudentExamResult.objects.filter(
+                term=self.term,
+                exam_schedule__class_obj_id__in=self.class_ids,
+                student__current_class_id__in=self.class_ids,
+                student__status="Active",
+            )
+            .values(
+                "student_id",
+                "student__current_class_id",
+                "exam_schedule__class_obj_id",
+                "grade",
+            )
+            .annotate(
+                total_marks=Sum("exam_schedule__total_marks"),
+                marks_obtained=Sum("marks_obtained"),
+                percentage=Sum("percentage"),
+                subjects=Count("id"),
+            )
+            .order_by()
+        )
+
+        totals = defaultdict(
+            lambda: {
+                "total_marks": 0,
+                "marks_obtained": Decimal("0"),
+                "percentage": Decimal("0"),
+                "grade_points": Decimal("0"),
+                "subjects": 0,
+            }
+        )
+        for row in rows:
+            class_id = row["exam_schedule__class_obj_id"]
+            if class_id != row["student__current_class_id"]:
+                continue
+
+            summary = totals[(row["student_id"], class_id)]
+            summary["total_marks"] += row["total_marks"] or 0
+            summary["marks_obtained"] += row["marks_obtained"] or 0
+            summary["percentage"] += row["percentage"] or 0
+            summary["grade_points"] += (
+                GRADE_POINTS.get(row["grade"], Decimal("0")) * row["subjects"]
+            )
+            summary["subjects"] += row["subjects"]
+
+        return totals
+
+    def _attendance_totals(self) -> Dict:
+        """Count days attended in the term per student"""
+        rows = (
+            StudentAttendance.objects.filter(
+                student__current_class_id__in=self.class_ids,
+                attendance_record__date__range=(
+                    self.term.start_date,
+                    self.term.end_date,
+                ),
+            )
+            .values("student_id")
+            .annotate(
+                total=Count("id"),
+                present=Count("id", filter=Q(status__in=["present", "late"])),
+            )
+            .order_by()
+        )
+        return {row["student_id"]: row for row in rows}
+
+    def _build_card(self, student_id, class_id, summary, attendance) -> ReportCard:
+        """Create an unsaved report card from aggregated totals"""
+        subjects = summary["subjects"]
+        percentage = (summary["percentage"] / subjects).quantize(TWO_PLACES)
+        gpa = (summary["grade_points"] / subjects).quantize(TWO_PLACES)
+
+        days = attendance.get(student_id, {"total": 0, "present": 0})
+        total_days, present_days = days["total"], days["present"]
+        attendance_percentage = (
+            Decimal(present_days * 100) / total_days if total_days else Decimal(100)
+        ).quantize(TWO_PLACES)
+
+        return ReportCard(
+            student_id=student_id,
+            class_obj=self.classes[class_id],
+            academic_year_id=self.term.academic_year_id,
+            term=self.term,
+            total_marks=summary["total_marks"],
+            marks_obtained=summary["marks_obtained"],
+            percentage=percentage,
+            grade=overall_grade(percentage),
+            grade_point_average=gpa,
+            attendance_percentage=attendance_percentage,
+            days_present=present_days,
+            days_absent=total_days - present_days,
+            total_days=total_days,
+            status="PUBLISHED",
+        )
+
+    def _assign_ranks(self, cards: List[ReportCard]):
+        """Rank cards by percentage within their class and grade"""
+        by_class = defaultdict(list)
+        by_grade = defaultdict(list)
+        for card in cards:
+            by_class[card.class_obj_id].append(card.percentage)
+            by_grade[card.class_obj.grade_id].append(card.percentage)
+
+        # Cards of classes outside this run still count towards grade ranks
+        other_cards = (
+            ReportCard.objects.filter(
+                term=self.term,
+                class_obj__grade_id__in=by_grade,
+            )
+            .exclude(class_obj_id__in=self.class_ids)
+            .exclude(student__current_class_id__in=self.class_ids)
+            .values_list("class_obj__grade_id", "percentage")
+        )
+        for grade_id, percentage in other_cards:
+            by_grade[grade_id].append(percentage)
+
+        class_ranks = {
+            key: competition_ranks(values) for key, values in by_class.items()
+        }
+        grade_ranks = {
+            key: competition_ranks(values) for key, values in by_grade.items()
+        }
+
+        for card in cards:
+            card.class_rank = class_ranks[card.class_obj_id][card.percentage]
+            card.class_size = len(by_class[card.class_obj_id])
+            card.grade_rank = grade_ranks[card.class_obj.grade_id][card.percentage]
+            card.grade_size = len(by_grade[card.class_obj.grade_id])
+
+    @transaction.atomic
+    def _save(self, cards: List[ReportCard]):
+        """Upsert cards on (student, academic_year, term)"""
+        # Reuse existing primary keys so returned cards match stored rows
+        existing = dict(
+            ReportCard.objects.filter(
+                term=self.term, student__current_class_id__in=self.class_ids
+            ).values_list("student_id", "id")
+        )
+        for card in cards:
+            card.id = existing.get(card.student_id, card.id)
+
+        ReportCard.objects.bulk_create(
+            cards,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=["student", "academic_year", "term"],
+            update_fields=CARD_FIELDS,
+        )
+
+        # bulk_create skips the post_save handler that announces published cards
+        published_ids = [str(card.id) for card in cards if card.status == "PUBLISHED"]
+        if published_ids:
+            from ..tasks import send_report_card_notifications
+
+            transaction.on_commit(
+                lambda: send_report_card_notifications.delay(published_ids)
+            )
+
+
+def overall_grade(percentage) -> str:
+    """Letter grade for an overall percentage"""
+    if not percentage:
+        return "F"
+
+    for threshold, grade in OVERALL_GRADE_THRESHOLDS:
+        if percentage >= threshold:
+            return grade
+    return "F"
+
+
+def competition_ranks(values: List) -> Dict:
+    """Map each value to its 1-based rank, highest first, ties sharing a rank"""
+    ranks = {}
+    for position, value in enumerate(sorted(values, reverse=True), 1):
+        ranks.setdefault(value, position)
+    return ranks
@@ -12,9 +12,9 @@ from .models import (
     StudentExamResult,
     StudentOnlineExamAttempt,
 )
+from .services.exam_service import ResultService
 from .tasks import (
     auto_grade_online_exam,
-    calculate_exam_rankings,
     send_report_card_notifications,
     send_result_notifications,
 )
@@ -24,13 +24,10 @@ from .tasks import (
 def handle_exam_result_saved(sender, instance, created, **kwargs):
     """Handle actions when exam result is saved"""
     if created:
-        # Schedule ranking calculation (delayed to batch process)
-        transaction.on_commit(
-            lambda: calculate_exam_rankings.apply_async(
-                args=[str(instance.exam_schedule.id)],
-                countdown=30,  # Wait 30 seconds to batch multiple results
-            )
-        )
+        # Schedule ranking calculation (debounced to batch process), unless
+        # ResultService.enter_results ranks the batch itself
+        if not getattr(instance, "_rankings_handled", False):
+            ResultService.schedule_rankings(instance.exam_schedule_id)
 
         # Send result notification
         transaction.on_commit(
@@ -8,6 +8,7 @@ from typing import Dict, List
 
 from celery import shared_task
 from django.conf import settings
+from django.core.cache import cache
 from django.core.mail import send_mail
 from django.db import transaction
 from django.template.loader import render_to_string
@@ -26,7 +27,7 @@ from .models import (
     StudentOnlineExamAttempt,
 )
 from .services.analytics_service import ExamAnalyticsService
-from .services.exam_service import ExamService, ResultService
+from .services.exam_service import RANKING_PENDING_KEY, ExamService, ResultService
 
 logger = logging.getLogger(__name__)
 
@@ -35,31 +36,17 @@ logger = logging.getLogger(__name__)
 def calculate_exam_rankings(self, exam_schedule_id: str):
     """Calculate rankings for an exam schedule"""
     try:
-        exam_schedule = ExamSchedule.objects.get(id=exam_schedule_id)
+        # Clear the debounce marker first so results entered while ranking
+        # runs queue a fresh pass
+        cache.delete(RANKING_PENDING_KEY.format(exam_schedule_id))
 
-        with transaction.atomic():
-            # Calculate class rankings
-            results = StudentExamResult.objects.filter(
-                exam_schedule=exam_schedule, is_absent=False
-            ).order_by("-percentage")
-
-            for i, result in enumerate(results, 1):
-                result.class_rank = i
-                result.save(update_fields=["class_rank"])
-
-            # Calculate grade rankings
-            grade_results = StudentExamResult.objects.filter(
-                exam_schedule__exam=exam_schedule.exam,
-                student__current_class__grade=exam_schedule.class_obj.grade,
-                is_absent=False,
-            ).order_by("-percentage")
-
-            for i, result in enumerate(grade_results, 1):
-                result.grade_rank = i
-                result.save(update_fields=["grade_rank"])
+        exam_schedule = ExamSchedule.objects.select_related("class_obj").get(
+            id=exam_schedule_id
+        )
+        updated = ResultService.calculate_rankings(exam_schedule)
 
         logger.info(f"Rankings calculated for exam schedule {exam_schedule_id}")
-        return f"Rankings calculated successfully for {len(results)} students"
+        return f"Rankings calculated successfully, {updated} results updated"
 
     except ExamSchedule.DoesNotExist:
         logger.error(f"ExamSchedule {exam_schedule_id} not found")
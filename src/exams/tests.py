@@ -5,6 +5,7 @@ File: src/exams/tests.py
 
 from datetime import date, time, timedelta
 from decimal import Decimal
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
@@ -13,7 +14,19 @@ from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from exams.services.analytics_service import ExamAnalyticsService
+from src.academics.models import (
+    AcademicYear,
+    Class,
+    Department,
+    Grade,
+    Section,
+    Term,
+)
+from src.students.models import Student
+from src.subjects.models import Subject
+from src.teachers.models import Teacher
+
+from .services.analytics_service import ExamAnalyticsService
 
 from .models import (
     Exam,
@@ -30,12 +43,6 @@ from .models import (
 )
 from .services.exam_service import ExamService, OnlineExamService, ResultService
 
-""" from .services.analytics_service import ExamAnalyticsService """
-from academics.models import AcademicYear, Class, Grade, Section, Term
-from students.models import Student
-from subjects.models import Subject
-from teachers.models import Teacher
-
 User = get_user_model()
 
 
@@ -307,6 +314,193 @@ class ExamServiceTests(TestCase):
         self.assertEqual(published_exam.status, "SCHEDULED")
 
 
+class RankingScheduleTests(TestCase):
+    """Test cases for debounced ranking passes"""
+
+    schedule_id = "5b0d6ac4-2f0e-4c1c-9a51-0c1f3f3c2a10"
+
+    def _schedule(self, added):
+        with mock.patch(
+            "src.exams.services.exam_service.cache.add", return_value=added
+        ), mock.patch(
+            "src.exams.tasks.calculate_exam_rankings.apply_async"
+        ) as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                queued = ResultService.schedule_rankings(self.schedule_id)
+        return queued, apply_async
+
+    def test_first_call_queues_a_pass(self):
+        queued, apply_async = self._schedule(True)
+
+        self.assertTrue(queued)
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.kwargs["args"], [self.schedule_id])
+
+    def test_pending_pass_absorbs_calls(self):
+        queued, apply_async = self._schedule(False)
+
+        self.assertFalse(queued)
+        apply_async.assert_not_called()
+
+    def test_unreachable_cache_still_queues(self):
+        # django-redis returns None instead of raising when it ignores errors
+        queued, apply_async = self._schedule(None)
+
+        self.assertTrue(queued)
+        apply_async.assert_called_once()
+
+
+class ReportCardEngineTests(TestCase):
+    """Test cases for bulk report card generation"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.admin_user = User.objects.create_user(
+            username="admin", email="admin@test.com", password="testpass123"
+        )
+
+        self.academic_year = AcademicYear.objects.create(
+            name="2024-25",
+            start_date=date(2024, 4, 1),
+            end_date=date(2025, 3, 31),
+            is_current=True,
+            created_by=self.admin_user,
+        )
+        self.term = Term.objects.create(
+            academic_year=self.academic_year,
+            name="First Term",
+            term_number=1,
+            start_date=date(2024, 4, 1),
+            end_date=date(2024, 8, 31),
+            is_current=True,
+        )
+
+        section = Section.objects.create(name="Primary")
+        grade = Grade.objects.create(name="Grade 5", section=section)
+        self.class_a = Class.objects.create(
+            name="A", grade=grade, section=section, academic_year=self.academic_year
+        )
+        self.class_b = Class.objects.create(
+            name="B", grade=grade, section=section, academic_year=self.academic_year
+        )
+        subject = Subject.objects.create(
+            name="Mathematics",
+            code="MATH5",
+            department=Department.objects.create(name="Mathematics"),
+        )
+
+        exam = Exam.objects.create(
+            name="Midterm",
+            exam_type=ExamType.objects.create(
+                name="Midterm", contribution_percentage=Decimal("50.00")
+            ),
+            academic_year=self.academic_year,
+            term=self.term,
+            start_date=date(2024, 6, 1),
+            end_date=date(2024, 6, 10),
+            created_by=self.admin_user,
+        )
+
+        self.students = []
+        for class_obj, marks in [
+            (self.class_a, 90),
+            (self.class_a, 70),
+            (self.class_b, 60),
+        ]:
+            student = Student.objects.create(
+                first_name="Student",
+                last_name=str(len(self.students)),
+                admission_number=f"ADM{len(self.students):03d}",
+                admission_date=date(2024, 4, 1),
+                current_class=class_obj,
+                emergency_contact_name="Guardian",
+                emergency_contact_number="1234567890",
+            )
+            schedule, _ = ExamSchedule.objects.get_or_create(
+                exam=exam,
+                class_obj=class_obj,
+                subject=subject,
+                defaults={
+                    "date": date(2024, 6, 3),
+                    "start_time": time(9, 0),
+                    "end_time": time(11, 0),
+                    "duration_minutes": 120,
+                    "total_marks": 100,
+                    "passing_marks": 40,
+                },
+            )
+            StudentExamResult.objects.create(
+                student=student,
+                exam_schedule=schedule,
+                term=self.term,
+                marks_obtained=Decimal(marks),
+                entered_by=self.admin_user,
+            )
+            self.students.append(student)
+
+    def _generate(self, class_ids=None):
+        with mock.patch(
+            "src.exams.tasks.send_report_card_notifications.delay"
+        ) as notify:
+            with self.captureOnCommitCallbacks(execute=True):
+                cards = ResultService.generate_report_cards(
+                    str(self.term.id), class_ids
+                )
+        return cards, notify
+
+    def test_generate_report_cards(self):
+        """Test cards carry totals and ranks within class and grade"""
+        cards, _ = self._generate()
+
+        self.assertEqual(ReportCard.objects.count(), 3)
+        top = ReportCard.objects.get(student=self.students[0])
+        self.assertEqual(top.percentage, Decimal("90.00"))
+        self.assertEqual(top.grade, "A+")
+        self.assertEqual((top.class_rank, top.class_size), (1, 2))
+        self.assertEqual((top.grade_rank, top.grade_size), (1, 3))
+        self.assertEqual(ReportCard.objects.get(student=self.students[2]).grade_rank, 3)
+
+    def test_regenerate_updates_existing_cards(self):
+        """Test a second run updates the stored cards in place"""
+        self._generate()
+        card_ids = set(ReportCard.objects.values_list("id", flat=True))
+
+        StudentExamResult.objects.filter(student=self.students[1]).update(
+            marks_obtained=Decimal("95"), percentage=Decimal("95")
+        )
+        cards, _ = self._generate()
+
+        self.assertEqual(set(ReportCard.objects.values_list("id", flat=True)), card_ids)
+        self.assertEqual({str(card.id) for card in cards}, {str(i) for i in card_ids})
+        updated = ReportCard.objects.get(student=self.students[1])
+        self.assertEqual(updated.percentage, Decimal("95.00"))
+        self.assertEqual(updated.class_rank, 1)
+
+    def test_published_cards_are_announced(self):
+        """Test the bulk write still dispatches report card notifications"""
+        cards, notify = self._generate()
+
+        notify.assert_called_once()
+        self.assertEqual(
+            set(notify.call_args.args[0]), {str(card.id) for card in cards}
+        )
+
+    def test_class_ids_stay_within_term_year(self):
+        """Test class_ids narrow the term's classes instead of replacing them"""
+        other_year = AcademicYear.objects.create(
+            name="2023-24",
+            start_date=date(2023, 4, 1),
+            end_date=date(2024, 3, 31),
+            created_by=self.admin_user,
+        )
+        Class.objects.filter(pk=self.class_b.pk).update(academic_year=other_year)
+
+        cards, _ = self._generate([self.class_a.id, self.class_b.id])
+
+        self.assertEqual({card.class_obj_id for card in cards}, {self.class_a.id})
+        self.assertEqual(ReportCard.objects.count(), 2)
+
+
 class ExamAPITests(APITestCase):
     """Test cases for Exam API endpoints"""
 
@@ -865,3 +1059,57 @@ class ExamIntegrationTests(TestCase):
         performance_summary = analytics["performance_summary"]
         self.assertEqual(performance_summary["total_count"], 5)
         self.assertGreater(performance_summary["avg_percentage"], 0)
+
+    def test_rankings_share_rank_on_ties(self):
+        """Test window-function rankings handle tied percentages"""
+        exam_type = ExamType.objects.create(
+            name="Unit Test", contribution_percentage=Decimal("10.00")
+        )
+        exam = ExamService.create_exam(
+            {
+                "name": "Mathematics Unit Test",
+                "exam_type": exam_type,
+                "academic_year": self.academic_year,
+                "term": self.term,
+                "start_date": date(2024, 5, 1),
+                "end_date": date(2024, 5, 2),
+                "created_by": self.admin_user,
+            }
+        )
+        schedule = ExamSchedule.objects.create(
+            exam=exam,
+            class_obj=self.class_obj,
+            subject=self.subject,
+            date=date(2024, 5, 1),
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            duration_minutes=60,
+            total_marks=100,
+            passing_marks=40,
+            supervisor=self.teacher,
+        )
+
+        marks = ["90", "75", "75", "60", "0"]
+        results_data = [
+            {
+                "student_id": str(student.id),
+                "marks_obtained": mark,
+                "is_absent": i == 4,
+            }
+            for i, (student, mark) in enumerate(zip(self.students, marks))
+        ]
+        with mock.patch.object(ResultService, "schedule_rankings") as schedule_rankings:
+            results = ResultService.enter_results(
+                str(schedule.id), results_data, self.teacher_user
+            )
+
+        # Ranked inline, so the post_save handler queues no second pass
+        schedule_rankings.assert_not_called()
+        self.assertEqual([result.class_rank for result in results], [1, 2, 2, 4, None])
+        self.assertEqual([result.grade_rank for result in results], [1, 2, 2, 4, None])
+
+        ResultService.calculate_rankings(schedule, dense=True)
+        dense_ranks = [
+            StudentExamResult.objects.get(id=result.id).class_rank for result in results
+        ]
+        self.assertEqual(dense_ranks, [1, 2, 2, 3, None])
@@ -331,7 +331,9 @@ def result_entry(request, schedule_id):
 
         if not errors:
             try:
-                ResultService.enter_results(schedule_id, results_data, request.user)
+                ResultService.enter_results(
+                    schedule_id, results_data, request.user, defer_rankings=True
+                )
                 messages.success(
                     request,
                     f"Results entered successfully for {len(results_data)} students.",
@@ -395,14 +395,15 @@ class InvoiceViewSet(viewsets.ModelViewSet):
                 from academics.models import AcademicYear, Term
                 from students.models import Student
 
-                student = Student.objects.get(
-                    id=serializer.validated_data["student_id"]
-                )
+                student = Student.objects.select_related(
+                    "current_class__grade__section"
+                ).get(id=serializer.validated_data["student_id"])
                 academic_year = AcademicYear.objects.get(
                     id=serializer.validated_data["academic_year_id"]
                 )
                 term = Term.objects.get(id=serializer.validated_data["term_id"])
 
+                # Fee schedules come from the memoized resolver
                 fee_breakdown = FeeService.calculate_student_fees(
                     student, academic_year, term
                 )
@@ -3,13 +3,13 @@ Finance report generation utilities.
 """
 
 import csv
-import io
+import tempfile
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional, Union
 
 from django.db.models import Avg, Count, Q, Sum
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from django.utils import timezone
 
 from academics.models import AcademicYear, Grade, Section, Term
@@ -693,7 +693,8 @@ class ReportExporter:
 
         try:
             import openpyxl
-            from openpyxl.styles import Font, PatternFill
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Font
         except ImportError:
             # Fallback to CSV if openpyxl is not available
             return ReportExporter.export_to_csv(report_data, filename)
@@ -702,51 +703,50 @@ class ReportExporter:
             timestamp = timezone.now().strftime("%Y%m%d_%H%M%S")
             filename = f"financial_report_{timestamp}.xlsx"
 
-        # Create workbook and worksheet
-        workbook = openpyxl.Workbook()
-        worksheet = workbook.active
-        worksheet.title = "Financial Report"
+        # Write-only mode appends rows straight to disk
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Financial Report")
+        worksheet.column_dimensions["A"].width = 40
+        worksheet.column_dimensions["B"].width = 20
+
+        def styled(value, font):
+            cell = WriteOnlyCell(worksheet, value=value)
+            cell.font = font
+            return cell
 
         # Styling
         header_font = Font(bold=True, size=14)
         subheader_font = Font(bold=True, size=12)
 
-        row = 1
-
         # Write header information
-        worksheet[f"A{row}"] = report_data.get("report_type", "Financial Report")
-        worksheet[f"A{row}"].font = header_font
-        row += 2
-
-        worksheet[f"A{row}"] = (
-            f"Generated: {report_data.get('generated_at', timezone.now())}"
+        worksheet.append(
+            [styled(report_data.get("report_type", "Financial Report"), header_font)]
+        )
+        worksheet.append([])
+        worksheet.append(
+            [f"Generated: {report_data.get('generated_at', timezone.now())}"]
         )
-        row += 2
+        worksheet.append([])
 
         # Write summary if available
         if "summary" in report_data:
-            worksheet[f"A{row}"] = "Summary"
-            worksheet[f"A{row}"].font = subheader_font
-            row += 1
+            worksheet.append([styled("Summary", subheader_font)])
 
             for key, value in report_data["summary"].items():
-                worksheet[f"A{row}"] = key.replace("_", " ").title()
-                worksheet[f"B{row}"] = value
-                row += 1
-            row += 1
+                worksheet.append([key.replace("_", " ").title(), value])
+            worksheet.append([])
 
-        # Save to response
-        output = io.BytesIO()
+        # Save to a temporary file and stream it
+        output = tempfile.TemporaryFile()
         workbook.save(output)
         output.seek(0)
 
-        response = HttpResponse(
-            output.getvalue(),
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=filename,
             content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-
-        return response
 
 
 # Utility functions for quick report generation
@@ -1,8 +1,12 @@
+import time
+from collections import defaultdict
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db.models import Q, Sum
+from django.db import transaction
+from django.db.models import DecimalField, F, Q, Sum, prefetch_related_objects
 from django.utils import timezone
 
 from ..models import (
@@ -15,6 +19,10 @@ from ..models import (
     StudentScholarship,
 )
 
+FEE_SCHEDULE_CACHE_TIMEOUT = 60 * 60  # 1 hour
+FEE_SCHEDULE_VERSION_KEY = "fee_schedule_version_{}_{}"
+SPECIAL_FEE_VERSION_KEY = "special_fee_version_{}"
+
 
 class FeeService:
     """Service for fee calculation and management."""
@@ -33,45 +41,180 @@ class FeeService:
         except AttributeError:
             raise ValidationError("Student must be assigned to a class")
 
-        fee_breakdown = {
-            "base_fees": [],
-            "special_fees": [],
-            "total_amount": Decimal("0.00"),
-            "discount_amount": Decimal("0.00"),
-            "net_amount": Decimal("0.00"),
-            "scholarships_applied": [],
-        }
-
         # 1. Calculate base fees from fee structure
-        base_fees = cls._get_base_fees(section, grade, academic_year, term)
-        fee_breakdown["base_fees"] = base_fees
+        base_fees = cls.get_fee_schedule(academic_year, term, grade)
 
         # 2. Calculate special fees
-        special_fees = cls._get_special_fees(student, current_class, term)
-        fee_breakdown["special_fees"] = special_fees
-
-        # 3. Calculate total before discounts
-        total_base = sum(fee["amount"] for fee in base_fees)
-        total_special = sum(fee["amount"] for fee in special_fees)
-        fee_breakdown["total_amount"] = total_base + total_special
+        special_fees = cls.get_class_special_fees(
+            term, current_class
+        ) + cls.get_student_special_fees(term, student)
 
-        # 4. Apply scholarships and discounts
+        # 3. Apply scholarships and discounts
         scholarships = cls._calculate_scholarships(student, academic_year, term)
+
+        return cls._build_fee_breakdown(base_fees, special_fees, scholarships)
+
+    @classmethod
+    def calculate_fees_for_students(cls, students, academic_year, term) -> Dict:
+        """
+        Calculate fee breakdowns for a cohort of students in a fixed number of
+        queries. Fee structures are resolved once per section and grade, and
+        special fees and scholarships are fetched for the whole cohort.
+        Returns a dict keyed by student id; students without a class are left
+        out.
+        """
+        students = [student for student in students if student.current_class_id]
+        prefetch_related_objects(students, "current_class__grade__section")
+
+        class_ids = {student.current_class_id for student in students}
+        student_ids = [student.id for student in students]
+
+        schedules = {}
+        for student in students:
+            grade = student.current_class.grade
+            if grade.id not in schedules:
+                schedules[grade.id] = cls.get_fee_schedule(academic_year, term, grade)
+
+        class_fees, student_fees = defaultdict(list), defaultdict(list)
+        special_fees = (
+            SpecialFee.objects.filter(term=term, is_active=True)
+            .filter(
+                Q(fee_type="class_based", class_obj_id__in=class_ids)
+                | Q(fee_type="student_specific", student_id__in=student_ids)
+            )
+            .select_related("fee_category")
+        )
+        for fee in special_fees:
+            if fee.fee_type == "class_based":
+                class_fees[fee.class_obj_id].append(
+                    cls._special_fee_entry(fee, "class_special")
+                )
+            else:
+                student_fees[fee.student_id].append(
+                    cls._special_fee_entry(fee, "student_special")
+                )
+
+        scholarships = defaultdict(list)
+        for student_scholarship in cls._active_scholarships(
+            academic_year, student_id__in=student_ids
+        ).prefetch_related("scholarship__applicable_categories"):
+            entry = cls._scholarship_entry(student_scholarship, term)
+            if entry:
+                scholarships[student_scholarship.student_id].append(entry)
+
+        breakdowns = {}
+        for student in students:
+            breakdowns[student.id] = cls._build_fee_breakdown(
+                schedules[student.current_class.grade_id],
+                class_fees[student.current_class_id] + student_fees[student.id],
+                scholarships[student.id],
+            )
+
+        return breakdowns
+
+    @classmethod
+    def _build_fee_breakdown(
+        cls, base_fees: List[Dict], special_fees: List[Dict], scholarships: List[Dict]
+    ) -> Dict:
+        """Total fees and apply scholarship discounts."""
+        total_amount = sum(fee["amount"] for fee in base_fees + special_fees)
+        total_amount = total_amount or Decimal("0.00")
         discount_amount = cls._calculate_discount_amount(
-            fee_breakdown["total_amount"], scholarships, base_fees + special_fees
+            total_amount, scholarships, base_fees + special_fees
         )
 
-        fee_breakdown["discount_amount"] = discount_amount
-        fee_breakdown["net_amount"] = fee_breakdown["total_amount"] - discount_amount
-        fee_breakdown["scholarships_applied"] = scholarships
+        return {
+            "base_fees": base_fees,
+            "special_fees": special_fees,
+            "total_amount": total_amount,
+            "discount_amount": discount_amount,
+            "net_amount": total_amount - discount_amount,
+            "scholarships_applied": scholarships,
+        }
 
-        return fee_breakdown
+    @classmethod
+    def get_fee_schedule(cls, academic_year, term, grade) -> List[Dict]:
+        """
+        Base fees shared by every student of a grade, memoized per
+        (academic year, term, grade) until a fee structure of the term changes.
+        """
+        version = cls._cache_version(
+            FEE_SCHEDULE_VERSION_KEY.format(academic_year.id, term.id)
+        )
+        return cls._cached_entries(
+            f"fee_schedule_{academic_year.id}_{term.id}_{grade.id}_v{version}",
+            lambda: cls._get_base_fees(grade.section, grade, academic_year, term),
+        )
+
+    @classmethod
+    def get_class_special_fees(cls, term, current_class) -> List[Dict]:
+        """Class-based special fees, memoized until a term special fee changes."""
+        version = cls._cache_version(SPECIAL_FEE_VERSION_KEY.format(term.id))
+        return cls._cached_entries(
+            f"class_special_fees_{term.id}_{current_class.id}_v{version}",
+            lambda: [
+                cls._special_fee_entry(fee, "class_special")
+                for fee in SpecialFee.objects.filter(
+                    class_obj=current_class,
+                    term=term,
+                    fee_type="class_based",
+                    is_active=True,
+                ).select_related("fee_category")
+            ],
+        )
+
+    @classmethod
+    def get_student_special_fees(cls, term, student) -> List[Dict]:
+        """Student-specific special fees, memoized like class-based ones."""
+        version = cls._cache_version(SPECIAL_FEE_VERSION_KEY.format(term.id))
+        return cls._cached_entries(
+            f"student_special_fees_{term.id}_{student.id}_v{version}",
+            lambda: [
+                cls._special_fee_entry(fee, "student_special")
+                for fee in SpecialFee.objects.filter(
+                    student=student,
+                    term=term,
+                    fee_type="student_specific",
+                    is_active=True,
+                ).select_related("fee_category")
+            ],
+        )
+
+    @classmethod
+    def invalidate_fee_schedule(cls, academic_year_id, term_id):
+        """Drop memoized fee schedules for a term after a fee structure change."""
+        cache.set(
+            FEE_SCHEDULE_VERSION_KEY.format(academic_year_id, term_id),
+            time.time_ns(),
+            None,
+        )
+
+    @classmethod
+    def invalidate_special_fees(cls, term_id):
+        """Drop memoized special fees for a term after a special fee change."""
+        cache.set(SPECIAL_FEE_VERSION_KEY.format(term_id), time.time_ns(), None)
+
+    @classmethod
+    def _cache_version(cls, version_key) -> int:
+        """Current version stamp; a missing stamp starts a fresh generation."""
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, time.time_ns(), None)
+            version = cache.get(version_key)
+        return version
+
+    @classmethod
+    def _cached_entries(cls, key, loader):
+        """Return cached fee entries, loading and storing them on a miss."""
+        entries = cache.get(key)
+        if entries is None:
+            entries = loader()
+            cache.set(key, entries, FEE_SCHEDULE_CACHE_TIMEOUT)
+        return entries
 
     @classmethod
     def _get_base_fees(cls, section, grade, academic_year, term) -> List[Dict]:
         """Get base fees from fee structure hierarchy."""
-        fees = []
-
         # Section-level fees
         section_fees = FeeStructure.objects.filter(
             academic_year=academic_year,
@@ -81,81 +224,40 @@ class FeeService:
             is_active=True,
         ).select_related("fee_category")
 
-        for fee in section_fees:
-            fees.append(
-                {
-                    "type": "section",
-                    "category": fee.fee_category.name,
-                    "amount": fee.amount,
-                    "due_date": fee.due_date,
-                    "late_fee_percentage": fee.late_fee_percentage,
-                    "grace_period_days": fee.grace_period_days,
-                    "fee_structure_id": fee.id,
-                }
-            )
-
         # Grade-level fees (more specific, so they override section fees)
         grade_fees = FeeStructure.objects.filter(
             academic_year=academic_year, term=term, grade=grade, is_active=True
         ).select_related("fee_category")
 
-        for fee in grade_fees:
-            fees.append(
-                {
-                    "type": "grade",
-                    "category": fee.fee_category.name,
-                    "amount": fee.amount,
-                    "due_date": fee.due_date,
-                    "late_fee_percentage": fee.late_fee_percentage,
-                    "grace_period_days": fee.grace_period_days,
-                    "fee_structure_id": fee.id,
-                }
-            )
-
-        return fees
+        return [cls._base_fee_entry(fee, "section") for fee in section_fees] + [
+            cls._base_fee_entry(fee, "grade") for fee in grade_fees
+        ]
 
     @classmethod
-    def _get_special_fees(cls, student, current_class, term) -> List[Dict]:
-        """Get special fees for student and class."""
-        fees = []
-
-        # Class-based special fees
-        class_fees = SpecialFee.objects.filter(
-            class_obj=current_class, term=term, fee_type="class_based", is_active=True
-        ).select_related("fee_category")
-
-        for fee in class_fees:
-            fees.append(
-                {
-                    "type": "class_special",
-                    "category": fee.fee_category.name,
-                    "name": fee.name,
-                    "amount": fee.amount,
-                    "due_date": fee.due_date,
-                    "reason": fee.reason,
-                    "special_fee_id": fee.id,
-                }
-            )
-
-        # Student-specific special fees
-        student_fees = SpecialFee.objects.filter(
-            student=student, term=term, fee_type="student_specific", is_active=True
-        ).select_related("fee_category")
-
-        for fee in student_fees:
-            fees.append(
-                {
-                    "type": "student_special",
-                    "category": fee.fee_category.name,
-                    "name": fee.name,
-                    "amount": fee.amount,
-                    "due_date": fee.due_date,
-                    "reason": fee.reason,
-                    "special_fee_id": fee.id,
-                }
-            )
+    def _base_fee_entry(cls, fee, fee_type) -> Dict:
+        """Breakdown entry for a fee structure."""
+        return {
+            "type": fee_type,
+            "category": fee.fee_category.name,
+            "amount": fee.amount,
+            "due_date": fee.due_date,
+            "late_fee_percentage": fee.late_fee_percentage,
+            "grace_period_days": fee.grace_period_days,
+            "fee_structure_id": fee.id,
+        }
 
-        return fees
+    @classmethod
+    def _special_fee_entry(cls, fee, fee_type) -> Dict:
+        """Breakdown entry for a special fee."""
+        return {
+            "type": fee_type,
+            "category": fee.fee_category.name,
+            "name": fee.name,
+            "amount": fee.amount,
+            "due_date": fee.due_date,
+            "reason": fee.reason,
+            "special_fee_id": fee.id,
+        }
 
     @classmethod
     def _calculate_scholarships(cls, student, academic_year, term) -> List[Dict]:
@@ -163,43 +265,50 @@ class FeeService:
         scholarships = []
 
         # Get student's active scholarships for the academic year
-        student_scholarships = (
+        for student_scholarship in cls._active_scholarships(
+            academic_year, student=student
+        ):
+            entry = cls._scholarship_entry(student_scholarship, term)
+            if entry:
+                scholarships.append(entry)
+
+        return scholarships
+
+    @classmethod
+    def _active_scholarships(cls, academic_year, **filters):
+        """Approved scholarships currently running in the academic year."""
+        today = timezone.now().date()
+        return (
             StudentScholarship.objects.filter(
-                student=student,
                 scholarship__academic_year=academic_year,
                 status="approved",
-                start_date__lte=timezone.now().date(),
+                start_date__lte=today,
+                **filters,
             )
-            .filter(Q(end_date__gte=timezone.now().date()) | Q(end_date__isnull=True))
+            .filter(Q(end_date__gte=today) | Q(end_date__isnull=True))
             .select_related("scholarship")
         )
 
-        for student_scholarship in student_scholarships:
-            scholarship = student_scholarship.scholarship
-
-            # Check if scholarship applies to this term
-            if (
-                not scholarship.applicable_terms
-                or term.id in scholarship.applicable_terms
-            ):
-
-                scholarships.append(
-                    {
-                        "name": scholarship.name,
-                        "discount_type": scholarship.discount_type,
-                        "discount_value": scholarship.discount_value,
-                        "criteria": scholarship.criteria,
-                        "applicable_categories": list(
-                            scholarship.applicable_categories.values_list(
-                                "name", flat=True
-                            )
-                        ),
-                        "scholarship_id": scholarship.id,
-                        "student_scholarship_id": student_scholarship.id,
-                    }
-                )
-
-        return scholarships
+    @classmethod
+    def _scholarship_entry(cls, student_scholarship, term) -> Optional[Dict]:
+        """Breakdown entry for a scholarship, or None if not valid this term."""
+        scholarship = student_scholarship.scholarship
+
+        # Check if scholarship applies to this term
+        if scholarship.applicable_terms and term.id not in scholarship.applicable_terms:
+            return None
+
+        return {
+            "name": scholarship.name,
+            "discount_type": scholarship.discount_type,
+            "discount_value": scholarship.discount_value,
+            "criteria": scholarship.criteria,
+            "applicable_categories": [
+                category.name for category in scholarship.applicable_categories.all()
+            ],
+            "scholarship_id": scholarship.id,
+            "student_scholarship_id": student_scholarship.id,
+        }
 
     @classmethod
     def _calculate_discount_amount(
@@ -257,6 +366,120 @@ class FeeService:
 
         return total_late_fee
 
+    @classmethod
+    def assess_late_fees(cls, as_of=None, batch_size=500) -> Dict:
+        """
+        Charge late fees for every overdue invoice in one pass.
+
+        Late fees are summed per invoice and grace period in a single
+        aggregate query over invoice items, using the same rule as
+        calculate_late_fees. Each invoice is charged at most once: invoices
+        that already carry a late-fee special fee are skipped, so reruns are
+        safe.
+        """
+        started = time.monotonic()
+        today = as_of or timezone.now().date()
+
+        rows = (
+            InvoiceItem.objects.filter(
+                invoice__due_date__lt=today,
+                invoice__status__in=["unpaid", "partially_paid"],
+                fee_structure__isnull=False,
+            )
+            .values(
+                "invoice_id",
+                "invoice__invoice_number",
+                "invoice__due_date",
+                "invoice__student_id",
+                "invoice__term_id",
+                "fee_structure__grace_period_days",
+            )
+            .annotate(
+                late_fee=Sum(
+                    F("net_amount") * F("fee_structure__late_fee_percentage"),
+                    output_field=DecimalField(max_digits=14, decimal_places=4),
+                )
+            )
+            .order_by()
+        )
+
+        invoices = {}
+        for row in rows:
+            days_overdue = (today - row["invoice__due_date"]).days
+            if days_overdue <= row["fee_structure__grace_period_days"]:
+                continue
+
+            invoice = invoices.setdefault(
+                row["invoice_id"],
+                {
+                    "invoice_number": row["invoice__invoice_number"],
+                    "student_id": row["invoice__student_id"],
+                    "term_id": row["invoice__term_id"],
+                    "late_fee": Decimal("0.00"),
+                },
+            )
+            invoice["late_fee"] += Decimal(row["late_fee"] or 0) / 100
+
+        late_fee_category, _ = FeeCategory.objects.get_or_create(
+            name="Late Fee",
+            defaults={
+                "description": "Late payment charges",
+                "is_mandatory": True,
+                "frequency": "one_time",
+            },
+        )
+
+        names = {
+            invoice_id: f"Late Fee - Invoice {invoice['invoice_number']}"
+            for invoice_id, invoice in invoices.items()
+        }
+        already_charged = set(
+            SpecialFee.objects.filter(
+                fee_category=late_fee_category, name__in=names.values()
+            ).values_list("name", flat=True)
+        )
+
+        charges = []
+        for invoice_id, invoice in invoices.items():
+            amount = invoice["late_fee"].quantize(Decimal("0.01"))
+            if amount <= 0 or names[invoice_id] in already_charged:
+                continue
+
+            charges.append(
+                SpecialFee(
+                    name=names[invoice_id],
+                    fee_category=late_fee_category,
+                    amount=amount,
+                    fee_type="student_specific",
+                    student_id=invoice["student_id"],
+                    term_id=invoice["term_id"],
+                    due_date=today,
+                    reason=(
+                        "Late payment charges for invoice "
+                        f"{invoice['invoice_number']}"
+                    ),
+                )
+            )
+
+        with transaction.atomic():
+            SpecialFee.objects.bulk_create(charges, batch_size=batch_size)
+
+        # bulk_create skips the signals that drop memoized special fees
+        for term_id in {charge.term_id for charge in charges}:
+            cls.invalidate_special_fees(term_id)
+
+        elapsed = time.monotonic() - started
+        return {
+            "invoices_assessed": len(invoices),
+            "late_fees_applied": len(charges),
+            "already_charged": len(already_charged),
+            "total_late_fees": sum(
+                (charge.amount for charge in charges), Decimal("0.00")
+            ),
+            "elapsed_seconds": round(elapsed, 3),
+            "invoices_per_second": round(len(invoices) / elapsed, 1) if elapsed else 0,
+        }
+
     @classmethod
     def create_fee_structure(cls, data: Dict) -> FeeStructure:
         """Create a new fee structure with validation."""
@@ -328,18 +551,28 @@ class FeeService:
             .distinct()
         )
 
+        version = cls._cache_version(
+            FEE_SCHEDULE_VERSION_KEY.format(academic_year.id, term.id)
+        )
+
         for section_data in sections:
             section_id = section_data["grade__section__id"]
             section_name = section_data["grade__section__name"]
 
             # Calculate fees for this section
-            section_fees = FeeStructure.objects.filter(
-                academic_year=academic_year,
-                term=term,
-                section_id=section_id,
-                is_active=True,
-            ).aggregate(
-                total_fees=Sum("amount"), avg_fees=Avg("amount"), fee_count=Count("id")
+            section_fees = cls._cached_entries(
+                f"section_fee_totals_{academic_year.id}_{term.id}_{section_id}"
+                f"_v{version}",
+                lambda: FeeStructure.objects.filter(
+                    academic_year=academic_year,
+                    term=term,
+                    section_id=section_id,
+                    is_active=True,
+                ).aggregate(
+                    total_fees=Sum("amount"),
+                    avg_fees=Avg("amount"),
+                    fee_count=Count("id"),
+                ),
             )
 
             summary[section_name] = {
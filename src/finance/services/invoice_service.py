@@ -2,7 +2,7 @@ from decimal import Decimal
 from typing import Dict, List, Optional
 
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
+from django.db import IntegrityError, models, transaction
 from django.db.models import F, Q, Sum
 from django.utils import timezone
 
@@ -13,6 +13,9 @@ from .fee_service import FeeService
 class InvoiceService:
     """Service for invoice generation and management."""
 
+    # Times bulk generation reserves fresh numbers after losing a race
+    INVOICE_NUMBER_ATTEMPTS = 5
+
     @classmethod
     @transaction.atomic
     def generate_invoice(cls, student, academic_year, term, created_by=None) -> Invoice:
@@ -102,22 +105,190 @@ class InvoiceService:
 
     @classmethod
     def bulk_generate_invoices(
-        cls, students_list, academic_year, term, created_by=None
+        cls, students_list, academic_year, term, created_by=None, batch_size=500
     ) -> Dict:
-        """Generate invoices for multiple students."""
+        """
+        Generate invoices for multiple students.
+
+        Fee breakdowns for the whole cohort are computed in memory from a
+        handful of queries, then invoices and items are written with
+        bulk_create in batches of ``batch_size``.
+        """
         results = {"created": [], "skipped": [], "errors": []}
+        students_list = list(students_list)
 
+        invoiced = set(
+            Invoice.objects.filter(
+                student__in=students_list, academic_year=academic_year, term=term
+            ).values_list("student_id", flat=True)
+        )
+        pending = []
         for student in students_list:
-            try:
-                invoice = cls.generate_invoice(student, academic_year, term, created_by)
-                results["created"].append({"student": student, "invoice": invoice})
-            except ValidationError as e:
-                results["skipped"].append({"student": student, "reason": str(e)})
-            except Exception as e:
-                results["errors"].append({"student": student, "error": str(e)})
+            if student.id in invoiced:
+                results["skipped"].append(
+                    {
+                        "student": student,
+                        "reason": f"Invoice already exists for {student} in {term}",
+                    }
+                )
+            elif not student.current_class_id:
+                results["skipped"].append(
+                    {
+                        "student": student,
+                        "reason": "Student must be assigned to a class",
+                    }
+                )
+            else:
+                pending.append(student)
+
+        if not pending:
+            return results
+
+        try:
+            breakdowns = FeeService.calculate_fees_for_students(
+                pending, academic_year, term
+            )
+            invoices, items = [], []
+            for student in pending:
+                fee_breakdown = breakdowns[student.id]
+                invoice = Invoice(
+                    student=student,
+                    academic_year=academic_year,
+                    term=term,
+                    due_date=cls._calculate_due_date(fee_breakdown),
+                    total_amount=fee_breakdown["total_amount"],
+                    discount_amount=fee_breakdown["discount_amount"],
+                    net_amount=fee_breakdown["net_amount"],
+                    created_by=created_by,
+                )
+                invoices.append(invoice)
+                items.extend(cls._build_invoice_items(invoice, fee_breakdown))
+
+            cls._create_with_invoice_numbers(invoices, items, batch_size)
+
+        except Exception as e:
+            results["errors"].extend(
+                {"student": student, "error": str(e)} for student in pending
+            )
+            return results
+
+        results["created"].extend(
+            {"student": invoice.student, "invoice": invoice} for invoice in invoices
+        )
+
+        # bulk_create skips post_save, so refresh the period summary once
+        cls._schedule_summary_update(academic_year, term)
 
         return results
 
+    @classmethod
+    def _build_invoice_items(cls, invoice, fee_breakdown) -> List[InvoiceItem]:
+        """Build unsaved invoice items, spreading the discount over them."""
+        lines = [
+            (
+                {"fee_structure_id": fee.get("fee_structure_id")},
+                f"{fee['category']} ({fee['type'].title()})",
+                fee["amount"],
+            )
+            for fee in fee_breakdown["base_fees"]
+        ] + [
+            (
+                {"special_fee_id": fee.get("special_fee_id")},
+                f"{fee['name']} - {fee['category']}",
+                fee["amount"],
+            )
+            for fee in fee_breakdown["special_fees"]
+        ]
+
+        total_amount = fee_breakdown["total_amount"]
+        total_discount = fee_breakdown["discount_amount"]
+        items = []
+        for source, description, amount in lines:
+            # Distribute discount proportionally among items
+            discount = Decimal("0.00")
+            if total_discount > 0 and total_amount:
+                discount = total_discount * (amount / total_amount)
+
+            items.append(
+                InvoiceItem(
+                    invoice=invoice,
+                    description=description,
+                    amount=amount,
+                    discount_amount=discount,
+                    net_amount=amount - discount,
+                    **source,
+                )
+            )
+
+        return items
+
+    @classmethod
+    def _create_with_invoice_numbers(cls, invoices, items, batch_size):
+        """
+        Number and insert invoices with their items in one transaction.
+
+        Numbers are reserved by reading what is already taken, so two runs
+        at once can pick the same ones; the unique invoice_number makes the
+        later insert fail, and it retries with numbers reserved afresh.
+        """
+        for attempt in range(cls.INVOICE_NUMBER_ATTEMPTS):
+            numbers = cls._reserve_invoice_numbers(len(invoices))
+            for invoice, invoice_number in zip(invoices, numbers):
+                invoice.invoice_number = invoice_number
+            try:
+                with transaction.atomic():
+                    Invoice.objects.bulk_create(invoices, batch_size=batch_size)
+                    InvoiceItem.objects.bulk_create(items, batch_size=batch_size)
+                return
+            except IntegrityError:
+                numbers_taken = Invoice.objects.filter(
+                    invoice_number__in=numbers
+                ).exists()
+                if not numbers_taken or attempt == cls.INVOICE_NUMBER_ATTEMPTS - 1:
+                    raise
+                # Forget keys from batches that were rolled back
+                for obj in invoices + items:
+                    obj.pk = None
+                for item in items:
+                    item.invoice_id = None
+
+    @classmethod
+    def _reserve_invoice_numbers(cls, count) -> List[str]:
+        """Allocate sequential invoice numbers in the generate_invoice_number format."""
+        year = timezone.now().year
+        next_number = Invoice.objects.filter(created_at__year=year).count() + 1
+
+        numbers = []
+        while len(numbers) < count:
+            candidates = [
+                f"INV{year}{number:06d}"
+                for number in range(next_number, next_number + count - len(numbers))
+            ]
+            taken = set(
+                Invoice.objects.filter(invoice_number__in=candidates).values_list(
+                    "invoice_number", flat=True
+                )
+            )
+            numbers.extend(number for number in candidates if number not in taken)
+            next_number += len(candidates)
+
+        return numbers
+
+    @classmethod
+    def _schedule_summary_update(cls, academic_year, term):
+        """Queue a financial summary refresh for the period."""
+        from ..tasks import update_financial_summary_task
+
+        try:
+            update_financial_summary_task.delay(
+                academic_year.id, term.id if term else None
+            )
+        except Exception:
+            # If Celery is not available, update directly
+            from .analytics_service import FinancialAnalyticsService
+
+            FinancialAnalyticsService.update_financial_analytics(academic_year, term)
+
     @classmethod
     def update_invoice_status(cls, invoice):
         """Update invoice status based on payments."""
@@ -5,13 +5,16 @@ from django.dispatch import receiver
 from django.utils import timezone
 
 from .models import (
+    FeeStructure,
     FinancialSummary,
     Invoice,
     InvoiceItem,
     Payment,
     Scholarship,
+    SpecialFee,
     StudentScholarship,
 )
+from .services.fee_service import FeeService
 
 
 @receiver(post_save, sender=Payment)
@@ -217,6 +220,34 @@ def trigger_analytics_update(sender, instance, created, **kwargs):
             pass
 
 
+@receiver(pre_save, sender=FeeStructure)
+@receiver(pre_save, sender=SpecialFee)
+def invalidate_fee_cache_for_previous_term(sender, instance, **kwargs):
+    """Invalidate memoized fees for the term a fee is being moved away from."""
+
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).first()
+        if previous:
+            _invalidate_fee_cache(previous)
+
+
+@receiver(post_save, sender=FeeStructure)
+@receiver(post_delete, sender=FeeStructure)
+@receiver(post_save, sender=SpecialFee)
+@receiver(post_delete, sender=SpecialFee)
+def invalidate_fee_cache(sender, instance, **kwargs):
+    """Invalidate memoized fees when fee structures or special fees change."""
+
+    _invalidate_fee_cache(instance)
+
+
+def _invalidate_fee_cache(fee):
+    if isinstance(fee, FeeStructure):
+        FeeService.invalidate_fee_schedule(fee.academic_year_id, fee.term_id)
+    else:
+        FeeService.invalidate_special_fees(fee.term_id)
+
+
 # Custom signal for fee structure changes
 from django.dispatch import Signal
 
@@ -233,6 +264,8 @@ def handle_fee_structure_change(sender, **kwargs):
     term = kwargs.get("term")
 
     if academic_year and term:
+        FeeService.invalidate_fee_schedule(academic_year.id, term.id)
+
         # Trigger recalculation of existing invoices if needed
         from .tasks import recalculate_affected_invoices_task
 
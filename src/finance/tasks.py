@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
 
@@ -18,6 +19,8 @@ from .services.invoice_service import InvoiceService
 from .services.payment_service import PaymentService
 from .services.scholarship_service import ScholarshipService
 
+logger = logging.getLogger(__name__)
+
 
 @shared_task(bind=True, max_retries=3)
 def update_financial_summary_task(self, academic_year_id, term_id=None):
@@ -101,30 +104,48 @@ def update_payment_analytics_task(self, academic_year_id, term_id=None):
 
 @shared_task(bind=True)
 def generate_bulk_invoices_task(
-    self, student_ids, academic_year_id, term_id, created_by_id=None
+    self, student_ids, academic_year_id, term_id, created_by_id=None, chunk_size=500
 ):
-    """Generate invoices for multiple students in background."""
+    """Generate invoices for multiple students in background, one chunk at a time.
+
+    Progress is reported through the task state after every chunk so callers
+    can poll the AsyncResult while a whole-term billing run is in flight.
+    """
 
     try:
         from academics.models import AcademicYear, Term
         from accounts.models import User
         from students.models import Student
 
-        students = Student.objects.filter(id__in=student_ids)
         academic_year = AcademicYear.objects.get(id=academic_year_id)
         term = Term.objects.get(id=term_id)
         created_by = User.objects.get(id=created_by_id) if created_by_id else None
 
-        results = InvoiceService.bulk_generate_invoices(
-            list(students), academic_year, term, created_by
-        )
+        totals = {"created_count": 0, "skipped_count": 0, "error_count": 0}
+        total = len(student_ids)
 
-        return {
-            "success": True,
-            "created_count": len(results["created"]),
-            "skipped_count": len(results["skipped"]),
-            "error_count": len(results["errors"]),
-        }
+        for start in range(0, total, chunk_size):
+            students = Student.objects.filter(
+                id__in=student_ids[start : start + chunk_size]
+            ).select_related("current_class__grade__section")
+
+            results = InvoiceService.bulk_generate_invoices(
+                list(students), academic_year, term, created_by
+            )
+            totals["created_count"] += len(results["created"])
+            totals["skipped_count"] += len(results["skipped"])
+            totals["error_count"] += len(results["errors"])
+
+            self.update_state(
+                state="PROGRESS",
+                meta={
+                    "processed": min(start + chunk_size, total),
+                    "total": total,
+                    **totals,
+                },
+            )
+
+        return {"success": True, **totals}
 
     except Exception as exc:
         return {"success": False, "error": str(exc)}
@@ -185,55 +206,23 @@ def calculate_late_fees_task(self):
     """Calculate and apply late fees for overdue invoices."""
 
     try:
-        today = timezone.now().date()
-
-        # Get overdue invoices
-        overdue_invoices = Invoice.objects.filter(
-            due_date__lt=today, status__in=["unpaid", "partially_paid"]
-        ).select_related("student")
-
-        late_fees_applied = 0
-        total_late_fees = Decimal("0.00")
-
-        for invoice in overdue_invoices:
-            try:
-                with transaction.atomic():
-                    late_fee = InvoiceService.calculate_late_fees(invoice)
-
-                    if late_fee > 0:
-                        # Create special fee for late charges
-                        from .models import FeeCategory, SpecialFee
-
-                        late_fee_category, _ = FeeCategory.objects.get_or_create(
-                            name="Late Fee",
-                            defaults={
-                                "description": "Late payment charges",
-                                "is_mandatory": True,
-                                "frequency": "one_time",
-                            },
-                        )
-
-                        SpecialFee.objects.create(
-                            name=f"Late Fee - Invoice {invoice.invoice_number}",
-                            fee_category=late_fee_category,
-                            amount=late_fee,
-                            fee_type="student_specific",
-                            student=invoice.student,
-                            term=invoice.term,
-                            due_date=today,
-                            reason=f"Late payment charges for invoice {invoice.invoice_number}",
-                        )
-
-                        late_fees_applied += 1
-                        total_late_fees += late_fee
-
-            except Exception:
-                continue
+        from .services.fee_service import FeeService
+
+        metrics = FeeService.assess_late_fees()
+        logger.info(
+            "Late fees: %s invoices assessed, %s charged, %s already charged "
+            "in %ss (%s invoices/s)",
+            metrics["invoices_assessed"],
+            metrics["late_fees_applied"],
+            metrics["already_charged"],
+            metrics["elapsed_seconds"],
+            metrics["invoices_per_second"],
+        )
 
         return {
             "success": True,
-            "late_fees_applied": late_fees_applied,
-            "total_late_fees": float(total_late_fees),
+            **metrics,
+            "total_late_fees": float(metrics["total_late_fees"]),
         }
 
     except Exception as exc:
@@ -327,16 +316,21 @@ def recalculate_affected_invoices_task(self, academic_year_id, term_id):
 
         recalculated_count = 0
 
+        # Fee schedules are resolved once per grade from the memoized cache
+        from .services.fee_service import FeeService
+
+        affected_invoices = list(affected_invoices.select_related("student"))
+        breakdowns = FeeService.calculate_fees_for_students(
+            [invoice.student for invoice in affected_invoices], academic_year, term
+        )
+
         for invoice in affected_invoices:
+            fee_breakdown = breakdowns.get(invoice.student_id)
+            if fee_breakdown is None:
+                continue
+
             try:
                 with transaction.atomic():
-                    # Recalculate fees for this student
-                    from .services.fee_service import FeeService
-
-                    fee_breakdown = FeeService.calculate_student_fees(
-                        invoice.student, academic_year, term
-                    )
-
                     # Update invoice if amounts changed
                     if (
                         invoice.total_amount != fee_breakdown["total_amount"]
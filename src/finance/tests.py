@@ -1,9 +1,10 @@
 from datetime import date, timedelta
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.test import TestCase, TransactionTestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.utils import timezone
 
 from academics.models import AcademicYear, Class, Grade, Section, Term
@@ -160,6 +161,52 @@ class FeeServiceTestCase(TestCase):
             fee_breakdown["net_amount"], Decimal("6000.00") - expected_discount
         )
 
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_fee_schedule_memoized_until_fee_structure_changes(self):
+        """Test fee schedules are cached per grade and invalidated on change."""
+        FeeService.get_fee_schedule(self.academic_year, self.term, self.grade)
+
+        with self.assertNumQueries(0):
+            schedule = FeeService.get_fee_schedule(
+                self.academic_year, self.term, self.grade
+            )
+        self.assertEqual(len(schedule), 2)
+
+        self.grade_fee.amount = Decimal("1500.00")
+        self.grade_fee.save()
+
+        schedule = FeeService.get_fee_schedule(
+            self.academic_year, self.term, self.grade
+        )
+        self.assertIn(Decimal("1500.00"), [fee["amount"] for fee in schedule])
+
+    def test_assess_late_fees_is_idempotent(self):
+        """Test late fees are charged once per overdue invoice."""
+        FeeStructure.objects.filter(pk=self.section_fee.pk).update(
+            late_fee_percentage=Decimal("2.00"), grace_period_days=5
+        )
+        invoice = InvoiceService.generate_invoice(
+            self.student, self.academic_year, self.term, self.admin_user
+        )
+        as_of = invoice.due_date + timedelta(days=10)
+
+        metrics = FeeService.assess_late_fees(as_of=as_of)
+        self.assertEqual(metrics["late_fees_applied"], 1)
+        self.assertEqual(metrics["total_late_fees"], Decimal("100.00"))
+
+        late_fee = SpecialFee.objects.get(fee_category__name="Late Fee")
+        self.assertEqual(late_fee.student, self.student)
+        self.assertEqual(late_fee.name, f"Late Fee - Invoice {invoice.invoice_number}")
+
+        metrics = FeeService.assess_late_fees(as_of=as_of)
+        self.assertEqual(metrics["late_fees_applied"], 0)
+        self.assertEqual(metrics["already_charged"], 1)
+        self.assertEqual(
+            SpecialFee.objects.filter(fee_category__name="Late Fee").count(), 1
+        )
+
 
 class InvoiceServiceTestCase(TestCase):
     """Test cases for InvoiceService."""
@@ -234,6 +281,73 @@ class InvoiceServiceTestCase(TestCase):
         self.assertEqual(len(results["skipped"]), 0)
         self.assertEqual(len(results["errors"]), 0)
 
+    def test_bulk_invoice_generation_retries_taken_numbers(self):
+        """Test bulk generation reserves new numbers after losing a race."""
+        other = InvoiceService.generate_invoice(
+            self.student, self.academic_year, self.term, self.admin_user
+        )
+        student2_user = User.objects.create_user(
+            username="student2", email="student2@test.com"
+        )
+        student2 = Student.objects.create(
+            user=student2_user, admission_number="STU002", current_class=self.class_obj
+        )
+
+        reserve = InvoiceService._reserve_invoice_numbers
+        with patch.object(
+            InvoiceService,
+            "_reserve_invoice_numbers",
+            side_effect=[[other.invoice_number], reserve(1)],
+        ) as mock_reserve:
+            results = InvoiceService.bulk_generate_invoices(
+                [student2], self.academic_year, self.term, self.admin_user
+            )
+
+        self.assertEqual(mock_reserve.call_count, 2)
+        self.assertEqual(len(results["created"]), 1)
+        self.assertEqual(len(results["errors"]), 0)
+        self.assertNotEqual(
+            results["created"][0]["invoice"].invoice_number, other.invoice_number
+        )
+        self.assertEqual(Invoice.objects.get(student=student2).items.count(), 2)
+
+    def test_bulk_invoice_generation_matches_single_invoice(self):
+        """Test bulk invoices carry the same amounts and items as single ones."""
+        scholarship = Scholarship.objects.create(
+            name="Merit Scholarship",
+            discount_type="percentage",
+            discount_value=Decimal("10.00"),
+            criteria="merit",
+            academic_year=self.academic_year,
+        )
+        StudentScholarship.objects.create(
+            student=self.student,
+            scholarship=scholarship,
+            status="approved",
+            start_date=date(2024, 4, 1),
+        )
+        expected = FeeService.calculate_student_fees(
+            self.student, self.academic_year, self.term
+        )
+
+        results = InvoiceService.bulk_generate_invoices(
+            [self.student], self.academic_year, self.term, self.admin_user
+        )
+        repeat = InvoiceService.bulk_generate_invoices(
+            [self.student], self.academic_year, self.term, self.admin_user
+        )
+
+        invoice = Invoice.objects.get(student=self.student, term=self.term)
+        self.assertEqual(len(results["created"]), 1)
+        self.assertEqual(len(repeat["skipped"]), 1)
+        self.assertEqual(invoice.total_amount, expected["total_amount"])
+        self.assertEqual(invoice.discount_amount, expected["discount_amount"])
+        self.assertEqual(invoice.items.count(), 2)
+        self.assertEqual(
+            sum(item.discount_amount for item in invoice.items.all()),
+            expected["discount_amount"],
+        )
+
 
 class PaymentServiceTestCase(TestCase):
     """Test cases for PaymentService."""
@@ -491,6 +491,63 @@ class SubstituteTeacherViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+    @action(detail=False, methods=["get"])
+    def day_plan(self, request):
+        """Rank substitutes for every period of an absent teacher's day"""
+        teacher_id = request.query_params.get("teacher_id")
+        date = request.query_params.get("date")
+        limit = request.query_params.get("limit", 5)
+
+        if not teacher_id or not date:
+            return Response(
+                {"error": "teacher_id and date are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            teacher = Teacher.objects.get(id=teacher_id)
+            date_obj = datetime.strptime(date, "%Y-%m-%d").date()
+            limit = max(1, min(int(limit), 20))
+        except (Teacher.DoesNotExist, ValueError):
+            return Response(
+                {"error": "Invalid teacher_id, date (YYYY-MM-DD) or limit"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        plan = SubstituteService.get_day_substitute_plan(teacher, date_obj, limit)
+
+        def teacher_data(teacher):
+            return {
+                "id": teacher.id,
+                "name": teacher.user.get_full_name(),
+                "employee_id": teacher.employee_id,
+                "department": (teacher.department.name if teacher.department else None),
+            }
+
+        return Response(
+            {
+                "teacher": teacher_data(plan["teacher"]),
+                "date": plan["date"],
+                "periods": [
+                    {
+                        "timetable_id": period["timetable"].id,
+                        "time_slot": str(period["timetable"].time_slot),
+                        "class": str(period["timetable"].class_assigned),
+                        "subject": str(period["timetable"].subject),
+                        "suggestions": [
+                            {
+                                **suggestion,
+                                "teacher": teacher_data(suggestion["teacher"]),
+                            }
+                            for suggestion in period["suggestions"]
+                        ],
+                    }
+                    for period in plan["periods"]
+                ],
+                "full_day": [teacher_data(teacher) for teacher in plan["full_day"]],
+            }
+        )
+
     @action(detail=False, methods=["get"])
     def history(self, request):
         """Get substitute assignment history"""
@@ -16,6 +16,9 @@ class SchedulingConfig(AppConfig):
         except ImportError:
             pass
 
+        # Keep the occupancy index in step with timetable changes
+        from .services import occupancy_index  # noqa: F401
+
         # Register module permissions
         self._register_permissions()
 
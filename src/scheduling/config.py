@@ -33,6 +33,11 @@ class SchedulingConfig:
             "tournament_size": 3,
             "elite_size": 5,
         },
+        "genetic_parallel_algorithm": {
+            "workers": None,  # Defaults to the number of CPU cores
+            "migration_interval": 10,
+            "migration_size": 2,
+        },
         "greedy_algorithm": {
             "priority_weights": {
                 "teacher_preference": 0.3,
@@ -43,6 +48,8 @@ class SchedulingConfig:
         },
         "general": {
             "max_execution_time": 3600,  # 1 hour
+            "plateau_generations": 50,  # Stop after this many without improvement
+            "progress_interval": 5,  # Persist best-so-far every N generations
             "convergence_threshold": 0.01,
             "max_retries": 3,
         },
@@ -375,11 +375,11 @@ def validate_timetable_assignment(
         raise InvalidTimeSlotError(time_slot, "cannot assign classes during break time")
 
     # Check teacher assignment validity
-    from teachers.models import TeacherClassAssignment
+    from src.teachers.models import TeacherClassAssignment
 
     teacher_assignment = TeacherClassAssignment.objects.filter(
         teacher=teacher,
-        class_assigned=class_assigned,
+        class_instance=class_assigned,
         subject=subject,
         term=term,
         is_active=True,
@@ -384,6 +384,8 @@ class TimetableGenerationForm(forms.ModelForm):
 
     ALGORITHM_CHOICES = [
         ("genetic", "Genetic Algorithm"),
+        ("genetic_parallel", "Parallel Genetic Algorithm (Island Model)"),
+        ("constraint", "Constraint Propagation + Tabu Search"),
         ("greedy", "Greedy Algorithm"),
     ]
 
@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from src.academics.models import Grade, Term
+from src.scheduling.services.optimization_service import OptimizationService
+
+ALGORITHMS = ["greedy", "genetic", "constraint"]
+
+
+class Command(BaseCommand):
+    """Compare timetable optimization engines on the same term"""
+
+    help = (
+        "Benchmark the timetable optimization engines without saving results. "
+        "Run generate_sample_scheduling_data first for a reproducible data set."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--term-id",
+            type=str,
+            help="Term ID to benchmark (default: current term)",
+        )
+
+        parser.add_argument(
+            "--grade-ids",
+            nargs="+",
+            type=str,
+            help="Grade IDs to include (all if not specified)",
+        )
+
+        parser.add_argument(
+            "--algorithms",
+            nargs="+",
+            choices=ALGORITHMS + ["genetic_parallel"],
+            default=ALGORITHMS,
+            help="Algorithms to compare (default: greedy genetic constraint)",
+        )
+
+        parser.add_argument(
+            "--population-size",
+            type=int,
+            default=50,
+            help="Population size for genetic algorithms (default: 50)",
+        )
+
+        parser.add_argument(
+            "--generations",
+            type=int,
+            default=100,
+            help="Generations or annealing sweeps (default: 100)",
+        )
+
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=None,
+            help="Per-algorithm time budget in seconds",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution"""
+
+        if options["term_id"]:
+            term = Term.objects.filter(id=options["term_id"]).first()
+        else:
+            term = Term.objects.filter(is_current=True).first()
+        if not term:
+            raise CommandError("Term not found")
+
+        if options["grade_ids"]:
+            grades = list(Grade.objects.filter(id__in=options["grade_ids"]))
+        else:
+            grades = list(Grade.objects.all())
+        if not grades:
+            raise CommandError("No grades found")
+
+        self.stdout.write(f"Benchmarking timetable engines for term: {term}")
+        self.stdout.write(f"Including {len(grades)} grades\n")
+
+        rows = []
+        for algorithm in options["algorithms"]:
+            self.stdout.write(f"Running {algorithm}...")
+            optimizer = OptimizationService(term)
+            result = optimizer.generate_optimized_timetable(
+                grades=grades,
+                algorithm=algorithm,
+                population_size=options["population_size"],
+                generations=options["generations"],
+                time_budget=options["time_budget"],
+            )
+            rows.append((algorithm, result))
+
+        self._display_results(rows)
+
+    def _display_results(self, rows):
+        """Print a comparison table"""
+
+        header = (
+            f"{'Algorithm':<18}{'Time (s)':>10}{'Assigned':>10}"
+            f"{'Unassigned':>12}{'Conflicts':>11}{'Score':>10}"
+        )
+        self.stdout.write("\n" + self.style.SUCCESS("Benchmark Results"))
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for algorithm, result in rows:
+            self.stdout.write(
+                f"{algorithm:<18}{result.execution_time:>10.2f}"
+                f"{len(result.assigned_slots):>10}"
+                f"{len(result.unassigned_slots):>12}"
+                f"{len(result.conflicts):>11}"
+                f"{result.optimization_score:>10.2f}"
+            )
+
+        best_algorithm, _ = max(
+            rows,
+            key=lambda row: (
+                -len(row[1].unassigned_slots) - len(row[1].conflicts),
+                row[1].optimization_score,
+            ),
+        )
+        self.stdout.write(f"\nBest result: {best_algorithm}")
@@ -6,8 +6,15 @@ from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
-from academics.models import AcademicYear, Class, Grade, Section, Term
-from scheduling.models import (
+from src.academics.models import (
+    AcademicYear,
+    Class,
+    Department,
+    Grade,
+    Section,
+    Term,
+)
+from src.scheduling.models import (
     Room,
     SchedulingConstraint,
     SubstituteTeacher,
@@ -15,9 +22,9 @@ from scheduling.models import (
     Timetable,
     TimetableTemplate,
 )
-from scheduling.services.timetable_service import TimetableService
-from subjects.models import Subject
-from teachers.models import Teacher, TeacherClassAssignment
+from src.scheduling.services.timetable_service import TimetableService
+from src.subjects.models import Subject
+from src.teachers.models import Teacher, TeacherClassAssignment
 
 User = get_user_model()
 
@@ -208,6 +215,10 @@ class Command(BaseCommand):
         if self.verbose:
             self.stdout.write("Creating academic structure...")
 
+        created_by = User.objects.filter(is_superuser=True).first()
+        if not created_by:
+            raise CommandError("Create a superuser before generating sample data")
+
         # Create academic year
         academic_year, created = AcademicYear.objects.get_or_create(
             name=year_name,
@@ -215,6 +226,7 @@ class Command(BaseCommand):
                 "start_date": date(2024, 4, 1),
                 "end_date": date(2025, 3, 31),
                 "is_current": True,
+                "created_by": created_by,
             },
         )
 
@@ -289,6 +301,7 @@ class Command(BaseCommand):
                     class_obj = Class.objects.create(
                         name=class_name,
                         grade=grade,
+                        section=section,
                         academic_year=academic_year,
                         room_number=f"{grade_number}{k+1:02d}",
                         capacity=random.randint(25, 35),
@@ -321,6 +334,8 @@ class Command(BaseCommand):
             ("Foreign Language", "FL", 3),
         ]
 
+        department, _ = Department.objects.get_or_create(name="General Studies")
+
         subjects = []
         for i in range(min(num_subjects, len(subject_data))):
             name, code, credit_hours = subject_data[i]
@@ -328,6 +343,7 @@ class Command(BaseCommand):
                 name=name,
                 code=f"{code}{i+1:03d}",
                 description=f"{name} curriculum",
+                department=department,
                 credit_hours=credit_hours,
                 is_elective=(i > 7),  # Mark later subjects as elective
             )
@@ -420,7 +436,10 @@ class Command(BaseCommand):
                         "Computer Science",
                     ]
                 ),
-                status="active",
+                position="Teacher",
+                salary=random.randint(30, 80) * 1000,
+                contract_type="Permanent",
+                status="Active",
             )
             teachers.append(teacher)
 
@@ -566,8 +585,9 @@ class Command(BaseCommand):
 
                 assignment = TeacherClassAssignment.objects.create(
                     teacher=teacher,
-                    class_assigned=class_obj,
+                    class_instance=class_obj,
                     subject=subject,
+                    academic_year=term.academic_year,
                     term=term,
                     is_class_teacher=(not class_teacher_assigned),
                 )
@@ -594,7 +614,7 @@ class Command(BaseCommand):
         for class_obj in classes:
             # Get teacher assignments for this class
             assignments = TeacherClassAssignment.objects.filter(
-                class_assigned=class_obj, term=term
+                class_instance=class_obj, term=term
             )
 
             # Create timetable entries
@@ -34,7 +34,7 @@ class Command(BaseCommand):
         parser.add_argument(
             "--algorithm",
             type=str,
-            choices=["genetic", "greedy"],
+            choices=["genetic", "genetic_parallel", "constraint", "greedy"],
             default="genetic",
             help="Optimization algorithm to use (default: genetic)",
         )
@@ -50,7 +50,7 @@ class Command(BaseCommand):
             "--generations",
             type=int,
             default=100,
-            help="Number of generations for genetic algorithm (default: 100)",
+            help="Generations (or annealing sweeps for constraint) (default: 100)",
         )
 
         parser.add_argument(
@@ -60,6 +60,41 @@ class Command(BaseCommand):
             help="Mutation rate for genetic algorithm (default: 0.1)",
         )
 
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of islands/processes for genetic_parallel (default: CPU count)",
+        )
+
+        parser.add_argument(
+            "--migration-interval",
+            type=int,
+            default=10,
+            help="Generations between island migrations for genetic_parallel (default: 10)",
+        )
+
+        parser.add_argument(
+            "--migration-size",
+            type=int,
+            default=2,
+            help="Individuals each island sends per migration for genetic_parallel (default: 2)",
+        )
+
+        parser.add_argument(
+            "--patience",
+            type=int,
+            default=None,
+            help="Stop after this many generations without improvement",
+        )
+
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=None,
+            help="Stop after this many seconds and keep the best result so far",
+        )
+
         parser.add_argument(
             "--clear-existing",
             action="store_true",
@@ -136,6 +171,11 @@ class Command(BaseCommand):
                         "population_size": options["population_size"],
                         "generations": options["generations"],
                         "mutation_rate": options["mutation_rate"],
+                        "workers": options["workers"],
+                        "migration_interval": options["migration_interval"],
+                        "migration_size": options["migration_size"],
+                        "patience": options["patience"],
+                        "time_budget": options["time_budget"],
                     },
                     started_by=admin_user,
                     status="running",
@@ -157,6 +197,12 @@ class Command(BaseCommand):
                     population_size=options["population_size"],
                     generations=options["generations"],
                     mutation_rate=options["mutation_rate"],
+                    workers=options["workers"],
+                    migration_interval=options["migration_interval"],
+                    migration_size=options["migration_size"],
+                    patience=options["patience"],
+                    time_budget=options["time_budget"],
+                    generation=generation,
                 )
 
                 end_time = timezone.now()
@@ -236,6 +282,9 @@ class Command(BaseCommand):
         self.stdout.write(f"Assigned Slots: {len(result.assigned_slots)}")
         self.stdout.write(f"Unassigned Slots: {len(result.unassigned_slots)}")
         self.stdout.write(f"Conflicts: {len(result.conflicts)}")
+        self.stdout.write(
+            f"Generations Run: {result.generations_run} ({result.stop_reason})"
+        )
 
         if result.unassigned_slots and verbose:
             self.stdout.write("\nUNASSIGNED SLOTS:")
@@ -0,0 +1,440 @@
+"""
+Constraint-propagation and local-search engine for timetable optimization.
+
+Works on the same integer encoding as the genetic engine. Scheduling happens
+in three phases:
+
+1. Domain pruning: every gene gets a static domain of (day, period) keys
+   where at least one suitable room exists. During construction the domain
+   is narrowed by the teacher's and class's occupancy, and the lesson group
+   with the least slack (most constrained) is placed first.
+2. Tabu repair: genes left unassigned are inserted with ejection chains,
+   evicting the cheapest set of blocking genes, which are queued for
+   re-insertion. Recently evicted (gene, key) pairs are tabu for a while so
+   the search does not cycle.
+3. Simulated annealing: conflict-free moves to free slots improve the soft
+   constraint score without ever re-introducing hard conflicts.
+"""
+
+import math
+import random
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .genetic_engine import (
+    STOP_CANCELLED,
+    STOP_COMPLETED,
+    STOP_PLATEAU,
+    STOP_TIME_BUDGET,
+    UNASSIGNED,
+    ScheduleState,
+    TimetableProblem,
+)
+
+# Score penalty for each lesson of the same subject already on that day
+SAME_DAY_PENALTY = 20.0
+
+
+class ConstraintEngine:
+    """Domain pruning, tabu repair and simulated annealing over ScheduleState"""
+
+    def __init__(
+        self,
+        problem: TimetableProblem,
+        rng: Optional[random.Random] = None,
+        tabu_tenure: int = 10,
+        max_repair_steps: Optional[int] = None,
+        repair_patience: int = 2000,
+        anneal_sweeps: int = 20,
+        initial_temperature: float = 5.0,
+        cooling_rate: float = 0.9,
+    ):
+        self.problem = problem
+        self.rng = rng or random.Random()
+        self.tabu_tenure = tabu_tenure
+        self.max_repair_steps = max_repair_steps or 50 * max(problem.n_genes, 1)
+        self.repair_patience = repair_patience
+        self.anneal_sweeps = anneal_sweeps
+        self.initial_temperature = initial_temperature
+        self.cooling_rate = cooling_rate
+
+        n_keys = problem.n_keys
+
+        # Static domains: keys where the gene has at least one suitable room
+        self.domains = [
+            problem.all_keys_mask if rooms else 0 for rooms in problem.gene_rooms
+        ]
+
+        # Lessons of the same (teacher, class, subject) share a domain
+        group_index: Dict[Tuple[int, int, int], int] = {}
+        self.gene_group = []
+        self.groups: List[List[int]] = []
+        for gene in range(problem.n_genes):
+            key = (
+                problem.gene_teacher[gene],
+                problem.gene_class[gene],
+                problem.gene_subject[gene],
+            )
+            if key not in group_index:
+                group_index[key] = len(self.groups)
+                self.groups.append([])
+            self.gene_group.append(group_index[key])
+            self.groups[group_index[key]].append(gene)
+
+        self.teacher_groups = [[] for _ in range(problem.n_teachers)]
+        self.class_groups = [[] for _ in range(problem.n_classes)]
+        for group, genes in enumerate(self.groups):
+            self.teacher_groups[problem.gene_teacher[genes[0]]].append(group)
+            self.class_groups[problem.gene_class[genes[0]]].append(group)
+
+        # Which gene holds each teacher/class/room cell (hard constraints are
+        # never violated here, so every cell has at most one owner)
+        self.teacher_owner = [UNASSIGNED] * (problem.n_teachers * n_keys)
+        self.class_owner = [UNASSIGNED] * (problem.n_classes * n_keys)
+        self.room_owner = [UNASSIGNED] * (problem.n_rooms * n_keys)
+        self.subject_day_counts: Dict[Tuple[int, int], int] = {}
+
+        self.generations_run = 0
+        self.stop_reason = STOP_COMPLETED
+        self.stats: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    # Placement bookkeeping
+    # ------------------------------------------------------------------
+
+    def _place(self, state: ScheduleState, gene: int, ts_index: int, room: int):
+        if state.slots[gene] != UNASSIGNED:
+            self._remove(state, gene)
+
+        problem = self.problem
+        key = problem.slot_keys[ts_index]
+        n_keys = problem.n_keys
+        state.assign(gene, ts_index, room)
+        self.teacher_owner[problem.gene_teacher[gene] * n_keys + key] = gene
+        self.class_owner[problem.gene_class[gene] * n_keys + key] = gene
+        self.room_owner[room * n_keys + key] = gene
+
+        day_key = (self.gene_group[gene], problem.key_days[key])
+        self.subject_day_counts[day_key] = self.subject_day_counts.get(day_key, 0) + 1
+
+    def _remove(self, state: ScheduleState, gene: int):
+        ts_index = state.slots[gene]
+        if ts_index == UNASSIGNED:
+            return
+
+        problem = self.problem
+        key = problem.slot_keys[ts_index]
+        n_keys = problem.n_keys
+        self.teacher_owner[problem.gene_teacher[gene] * n_keys + key] = UNASSIGNED
+        self.class_owner[problem.gene_class[gene] * n_keys + key] = UNASSIGNED
+        self.room_owner[state.rooms[gene] * n_keys + key] = UNASSIGNED
+        state.unassign(gene)
+
+        day_key = (self.gene_group[gene], problem.key_days[key])
+        self.subject_day_counts[day_key] -= 1
+
+    def _best_value(self, state: ScheduleState, gene: int) -> Optional[Tuple[int, int]]:
+        """Best conflict-free (time slot, room) for a gene, or None"""
+        problem = self.problem
+        free = state.free_keys(gene) & self.domains[gene]
+        group = self.gene_group[gene]
+        time_scores = problem.gene_time_scores[gene]
+        room_scores = problem.gene_room_scores[gene]
+
+        best, best_score = None, float("-inf")
+        while free:
+            low_bit = free & -free
+            free ^= low_bit
+            key = low_bit.bit_length() - 1
+
+            room = state.find_room(gene, key)
+            if room == UNASSIGNED:
+                continue
+
+            ts_index = problem.key_slots[key]
+            same_day = self.subject_day_counts.get((group, problem.key_days[key]), 0)
+            score = (
+                time_scores[ts_index]
+                + room_scores.get(room, 0.0)
+                - SAME_DAY_PENALTY * same_day
+            )
+            if score > best_score:
+                best, best_score = (ts_index, room), score
+
+        return best
+
+    # ------------------------------------------------------------------
+    # Phase 1: most-constrained-first construction
+    # ------------------------------------------------------------------
+
+    def construct(self, state: ScheduleState) -> List[int]:
+        """Place every gene greedily; return the genes that could not be placed"""
+        problem = self.problem
+        n_keys = problem.n_keys
+        remaining = [list(reversed(genes)) for genes in self.groups]
+        teacher_left = [0] * problem.n_teachers
+        class_left = [0] * problem.n_classes
+        for gene in range(problem.n_genes):
+            teacher_left[problem.gene_teacher[gene]] += 1
+            class_left[problem.gene_class[gene]] += 1
+
+        slack = [0] * len(self.groups)
+        open_groups = set(range(len(self.groups)))
+        unplaced = []
+
+        def refresh(group: int):
+            # Slack of the group itself, and of its teacher's and class's week
+            gene = self.groups[group][0]
+            teacher = problem.gene_teacher[gene]
+            class_index = problem.gene_class[gene]
+            domain = state.free_keys(gene) & self.domains[gene]
+            slack[group] = min(
+                domain.bit_count() - len(remaining[group]),
+                n_keys
+                - state.teacher_bits[teacher].bit_count()
+                - teacher_left[teacher],
+                n_keys
+                - state.class_bits[class_index].bit_count()
+                - class_left[class_index],
+            )
+
+        for group in open_groups:
+            refresh(group)
+
+        while open_groups:
+            group = min(open_groups, key=lambda g: (slack[g], -len(remaining[g]), g))
+            gene = remaining[group].pop()
+            if not remaining[group]:
+                open_groups.discard(group)
+            teacher_left[problem.gene_teacher[gene]] -= 1
+            class_left[problem.gene_class[gene]] -= 1
+
+            value = self._best_value(state, gene)
+            if value is None:
+                unplaced.append(gene)
+            else:
+                self._place(state, gene, *value)
+
+            # Only groups sharing the teacher or the class change slack
+            touched = set(self.teacher_groups[problem.gene_teacher[gene]])
+            touched.update(self.class_groups[problem.gene_class[gene]])
+            for other in touched & open_groups:
+                refresh(other)
+
+        return unplaced
+
+    # ------------------------------------------------------------------
+    # Phase 2: tabu ejection-chain repair
+    # ------------------------------------------------------------------
+
+    def repair(
+        self, state: ScheduleState, unplaced: List[int], deadline: Optional[float]
+    ) -> Tuple[ScheduleState, int]:
+        """Insert unplaced genes by evicting blockers; return (best, steps)"""
+        problem = self.problem
+        n_keys = problem.n_keys
+        pending = deque(gene for gene in unplaced if self.domains[gene])
+        tabu: Dict[Tuple[int, int], int] = {}
+        step = 0
+        best_pending, best_step, best_chromosome = len(pending), 0, None
+
+        while pending and step < self.max_repair_steps:
+            if deadline is not None and time.monotonic() >= deadline:
+                self.stop_reason = STOP_TIME_BUDGET
+                break
+            if len(pending) < best_pending:
+                best_pending, best_step, best_chromosome = len(pending), step, None
+            elif step - best_step > self.repair_patience:
+                break
+            if len(pending) == best_pending and best_chromosome is None:
+                best_chromosome = state.chromosome()
+
+            gene = pending.popleft()
+            step += 1
+
+            value = self._best_value(state, gene)
+            if value is not None:
+                self._place(state, gene, *value)
+                continue
+
+            teacher_base = problem.gene_teacher[gene] * n_keys
+            class_base = problem.gene_class[gene] * n_keys
+            best_move, best_cost = None, float("inf")
+
+            domain = self.domains[gene]
+            while domain:
+                low_bit = domain & -domain
+                domain ^= low_bit
+                key = low_bit.bit_length() - 1
+                if tabu.get((gene, key), 0) > step:
+                    continue
+
+                evict = set()
+                for owner in (
+                    self.teacher_owner[teacher_base + key],
+                    self.class_owner[class_base + key],
+                ):
+                    if owner != UNASSIGNED:
+                        evict.add(owner)
+
+                room = state.find_room(gene, key)
+                if room == UNASSIGNED:
+                    # Take the candidate room whose occupant is cheapest to move
+                    room = min(
+                        problem.gene_rooms[gene],
+                        key=lambda r: self.room_owner[r * n_keys + key] not in evict,
+                    )
+                    evict.add(self.room_owner[room * n_keys + key])
+
+                # Blockers that can move straight to another free key are cheap
+                cost = self.rng.random() * 0.5
+                for other in evict:
+                    escape = state.free_keys(other) & self.domains[other]
+                    cost += 1.0 if escape & ~low_bit else 2.0
+                if cost < best_cost:
+                    best_move, best_cost = (key, room, evict), cost
+
+            if best_move is None:
+                pending.append(gene)
+                continue
+
+            key, room, evict = best_move
+            for other in evict:
+                old_key = problem.slot_keys[state.slots[other]]
+                self._remove(state, other)
+                # Tenure outlasts the queue, or the blocker returns before it expires
+                tabu[(other, old_key)] = step + self.tabu_tenure + len(pending)
+                pending.append(other)
+
+            self._place(state, gene, problem.key_slots[key], room)
+
+        if len(pending) > best_pending and best_chromosome is not None:
+            state = self._load(*best_chromosome)
+        return state, step
+
+    def _load(self, slots: List[int], rooms: List[int]) -> ScheduleState:
+        """Rebuild the state and owner maps from a chromosome"""
+        for owners in (self.teacher_owner, self.class_owner, self.room_owner):
+            owners[:] = [UNASSIGNED] * len(owners)
+        self.subject_day_counts.clear()
+
+        state = ScheduleState(self.problem)
+        for gene, ts_index in enumerate(slots):
+            if ts_index != UNASSIGNED:
+                self._place(state, gene, ts_index, rooms[gene])
+        return state
+
+    # ------------------------------------------------------------------
+    # Phase 3: simulated annealing on soft constraints
+    # ------------------------------------------------------------------
+
+    def anneal(
+        self,
+        state: ScheduleState,
+        sweeps: int,
+        patience: Optional[int],
+        deadline: Optional[float],
+        on_generation: Optional[Callable[[int, ScheduleState, float], bool]],
+    ) -> Tuple[Tuple[List[int], List[int]], float]:
+        """Improve soft constraints with conflict-free moves"""
+        problem = self.problem
+        rng = self.rng
+
+        current = state.fitness()
+        best_chromosome, best_fitness = state.chromosome(), current
+        best_sweep = 0
+        temperature = self.initial_temperature
+
+        for sweep in range(1, sweeps + 1):
+            for _ in range(problem.n_genes):
+                gene = rng.randrange(problem.n_genes)
+                old_ts = state.slots[gene]
+                if old_ts == UNASSIGNED:
+                    continue
+
+                free = state.free_keys(gene) & self.domains[gene]
+                free &= ~(1 << problem.slot_keys[old_ts])
+                keys = [key for key in range(problem.n_keys) if free >> key & 1]
+                if not keys:
+                    continue
+
+                key = rng.choice(keys)
+                room = state.find_room(gene, key)
+                if room == UNASSIGNED:
+                    continue
+
+                old_room = state.rooms[gene]
+                self._place(state, gene, problem.key_slots[key], room)
+                candidate = state.fitness()
+                delta = candidate - current
+
+                if delta >= 0 or rng.random() < math.exp(delta / temperature):
+                    current = candidate
+                    if current > best_fitness:
+                        best_chromosome, best_fitness = state.chromosome(), current
+                        best_sweep = sweep
+                else:
+                    self._place(state, gene, old_ts, old_room)
+
+            temperature = max(temperature * self.cooling_rate, 1e-6)
+            self.generations_run = sweep
+
+            # Moves never change assignments or conflicts, so the current
+            # state reports the same progress as the best one
+            if on_generation and on_generation(sweep, state, best_fitness):
+                self.stop_reason = STOP_CANCELLED
+                break
+            if patience is not None and sweep - best_sweep >= patience:
+                self.stop_reason = STOP_PLATEAU
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                self.stop_reason = STOP_TIME_BUDGET
+                break
+
+        return best_chromosome, best_fitness
+
+    # ------------------------------------------------------------------
+    # Main entry point
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        sweeps: Optional[int] = None,
+        patience: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        on_generation: Optional[Callable[[int, ScheduleState, float], bool]] = None,
+    ) -> Tuple[ScheduleState, float]:
+        """
+        Run all three phases and return (best, best_fitness)
+
+        Annealing runs for ``sweeps`` passes over the genes, stopping early
+        after ``patience`` sweeps without improvement, once ``time_budget``
+        seconds have elapsed, or when ``on_generation`` returns True.
+        """
+        started = time.monotonic()
+        deadline = None if time_budget is None else started + time_budget
+        self.generations_run = 0
+        self.stop_reason = STOP_COMPLETED
+
+        state = ScheduleState(self.problem)
+        unplaced = self.construct(state)
+        self.stats = {"constructed_unassigned": len(unplaced)}
+
+        state, self.stats["repair_steps"] = self.repair(state, unplaced, deadline)
+        self.stats["repaired_unassigned"] = self.problem.n_genes - state.assigned
+
+        if self.stop_reason != STOP_COMPLETED:
+            return state, state.fitness()
+
+        best_chromosome, best_fitness = self.anneal(
+            state,
+            self.anneal_sweeps if sweeps is None else sweeps,
+            patience,
+            deadline,
+            on_generation,
+        )
+        return (
+            ScheduleState.from_chromosome(self.problem, *best_chromosome),
+            best_fitness,
+        )
@@ -0,0 +1,841 @@
+"""
+Array-backed genetic algorithm engine for timetable optimization.
+
+The engine works on an integer encoding of the scheduling problem: every
+required slot is a gene holding a (time slot index, room index) pair, and
+teachers, classes, rooms and (day, period) keys are mapped to dense indices.
+Occupancy is tracked with count arrays plus per-resource bitmaps, and fitness
+is maintained incrementally so that crossover and mutation only re-score the
+genes they touch. Nothing in this module touches the ORM; the optimization
+service encodes the problem before a run and decodes the best schedule after.
+"""
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+UNASSIGNED = -1
+
+# Constraint types whose satisfaction is tracked incrementally
+CONSTRAINT_TEACHER_AVAILABILITY = "teacher_availability"
+CONSTRAINT_CONSECUTIVE_PERIODS = "consecutive_periods"
+CONSTRAINT_DAILY_LIMIT = "daily_limit"
+CONSTRAINT_TIME_PREFERENCE = "time_preference"
+
+DAILY_SUBJECT_LIMIT = 2
+
+# Why a run ended
+STOP_COMPLETED = "completed"
+STOP_PLATEAU = "plateau"
+STOP_TIME_BUDGET = "time_budget"
+STOP_CANCELLED = "cancelled"
+
+
+@dataclass
+class TimetableProblem:
+    """Integer encoding of a timetable scheduling problem"""
+
+    # Per-gene attributes (one gene per required slot)
+    gene_teacher: List[int]
+    gene_class: List[int]
+    gene_subject: List[int]
+    gene_priority: List[int]
+    gene_is_core: List[bool]
+    gene_is_lab: List[bool]
+    gene_rooms: List[List[int]]  # candidate rooms in preference order
+    gene_room_scores: List[Dict[int, float]]
+
+    # Time slot index -> (day, period) key index
+    slot_keys: List[int]
+    slot_periods: List[int]
+    key_days: List[int]
+
+    n_teachers: int
+    n_classes: int
+    n_rooms: int
+    n_subjects: int
+    n_days: int
+
+    # (constraint_type, weight) pairs for active constraints
+    constraint_weights: List[Tuple[str, float]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.n_genes = len(self.gene_teacher)
+        self.n_slots = len(self.slot_keys)
+        self.n_keys = len(self.key_days)
+        self.all_keys_mask = (1 << self.n_keys) - 1
+
+        # First time slot index for every (day, period) key
+        self.key_slots = [UNASSIGNED] * self.n_keys
+        for ts_index, key in enumerate(self.slot_keys):
+            if self.key_slots[key] == UNASSIGNED:
+                self.key_slots[key] = ts_index
+
+        # Candidate rooms as bitmasks: each tier is a run of ascending room
+        # indices, so the lowest free bit of a tier is its most preferred room
+        tier_cache = {}
+        self.gene_room_tiers = []
+        for rooms in self.gene_rooms:
+            if id(rooms) not in tier_cache:
+                tier_cache[id(rooms)] = self._room_tiers(rooms)
+            self.gene_room_tiers.append(tier_cache[id(rooms)])
+
+        # Construction score by priority band, indexed by time slot
+        bands = {
+            band: [self._time_score(band, period) for period in self.slot_periods]
+            for band in (0, 1, 2)
+        }
+        self.gene_time_scores = [
+            bands[self._priority_band(priority)] for priority in self.gene_priority
+        ]
+
+        self.gene_max_room_scores = [
+            max(scores.values(), default=0.0) for scores in self.gene_room_scores
+        ]
+
+        self.class_genes = [[] for _ in range(self.n_classes)]
+        for gene in range(self.n_genes):
+            self.class_genes[self.gene_class[gene]].append(gene)
+
+        active_types = {
+            constraint_type for constraint_type, _ in self.constraint_weights
+        }
+        self.track_consecutive = CONSTRAINT_CONSECUTIVE_PERIODS in active_types
+        self.track_daily_limit = CONSTRAINT_DAILY_LIMIT in active_types
+        self.total_constraint_weight = sum(
+            weight for _, weight in self.constraint_weights
+        )
+
+    @staticmethod
+    def _room_tiers(rooms: Sequence[int]) -> Tuple[int, ...]:
+        tiers = []
+        mask, last = 0, None
+        for room in rooms:
+            if last is not None and room < last:
+                tiers.append(mask)
+                mask = 0
+            mask |= 1 << room
+            last = room
+        if mask:
+            tiers.append(mask)
+        return tuple(tiers)
+
+    @staticmethod
+    def _priority_band(priority: int) -> int:
+        if priority >= 8:
+            return 2
+        if priority <= 5:
+            return 0
+        return 1
+
+    @staticmethod
+    def _time_score(band: int, period: int) -> float:
+        """Time-of-day preference used when constructing schedules"""
+        if band == 2 and period <= 3:
+            return 20.0
+        if band == 0 and period >= 5:
+            return 15.0
+        return 0.0
+
+    def time_preference(self, gene: int, ts_index: int) -> float:
+        """Satisfaction of the time preference constraint for one gene"""
+        is_core = self.gene_is_core[gene]
+        period = self.slot_periods[ts_index]
+        if (is_core and period <= 3) or (not is_core and period > 3):
+            return 1.0
+        return 0.5
+
+
+class ScheduleState:
+    """A chromosome together with its occupancy and fitness aggregates"""
+
+    __slots__ = (
+        "problem",
+        "slots",
+        "rooms",
+        "teacher_occ",
+        "class_occ",
+        "room_occ",
+        "teacher_bits",
+        "class_bits",
+        "room_bits",
+        "key_rooms",
+        "assigned",
+        "conflicts",
+        "time_pref_sum",
+        "daily_counts",
+        "daily_violations",
+        "group_sat",
+        "group_cnt",
+        "consec_sat",
+        "consec_cnt",
+        "dirty_groups",
+    )
+
+    def __init__(self, problem: TimetableProblem, _empty: bool = False):
+        self.problem = problem
+        if _empty:
+            return
+
+        n_keys = problem.n_keys
+        self.slots = [UNASSIGNED] * problem.n_genes
+        self.rooms = [UNASSIGNED] * problem.n_genes
+        self.teacher_occ = [0] * (problem.n_teachers * n_keys)
+        self.class_occ = [0] * (problem.n_classes * n_keys)
+        self.room_occ = [0] * (problem.n_rooms * n_keys)
+        self.teacher_bits = [0] * problem.n_teachers
+        self.class_bits = [0] * problem.n_classes
+        self.room_bits = [0] * problem.n_rooms
+        self.key_rooms = [0] * n_keys
+        self.assigned = 0
+        self.conflicts = 0
+        self.time_pref_sum = 0.0
+        self.daily_counts = (
+            [0] * (problem.n_classes * problem.n_days * problem.n_subjects)
+            if problem.track_daily_limit
+            else []
+        )
+        self.daily_violations = 0
+        n_groups = problem.n_classes * problem.n_days
+        self.group_sat = [0.0] * n_groups if problem.track_consecutive else []
+        self.group_cnt = [0] * n_groups if problem.track_consecutive else []
+        self.consec_sat = 0.0
+        self.consec_cnt = 0
+        self.dirty_groups = set()
+
+    @classmethod
+    def from_chromosome(
+        cls, problem: TimetableProblem, slots: List[int], rooms: List[int]
+    ) -> "ScheduleState":
+        """Rebuild occupancy and fitness aggregates from raw gene arrays"""
+        state = cls(problem)
+        for gene, ts_index in enumerate(slots):
+            if ts_index != UNASSIGNED:
+                state.assign(gene, ts_index, rooms[gene])
+        return state
+
+    def chromosome(self) -> Tuple[List[int], List[int]]:
+        """Raw gene arrays, cheap to pickle between processes"""
+        return self.slots[:], self.rooms[:]
+
+    def copy(self) -> "ScheduleState":
+        """Copy the chromosome and its aggregates (no model objects involved)"""
+        self._flush_groups()
+        clone = ScheduleState(self.problem, _empty=True)
+        clone.slots = self.slots[:]
+        clone.rooms = self.rooms[:]
+        clone.teacher_occ = self.teacher_occ[:]
+        clone.class_occ = self.class_occ[:]
+        clone.room_occ = self.room_occ[:]
+        clone.teacher_bits = self.teacher_bits[:]
+        clone.class_bits = self.class_bits[:]
+        clone.room_bits = self.room_bits[:]
+        clone.key_rooms = self.key_rooms[:]
+        clone.assigned = self.assigned
+        clone.conflicts = self.conflicts
+        clone.time_pref_sum = self.time_pref_sum
+        clone.daily_counts = self.daily_counts[:]
+        clone.daily_violations = self.daily_violations
+        clone.group_sat = self.group_sat[:]
+        clone.group_cnt = self.group_cnt[:]
+        clone.consec_sat = self.consec_sat
+        clone.consec_cnt = self.consec_cnt
+        clone.dirty_groups = set()
+        return clone
+
+    # ------------------------------------------------------------------
+    # Occupancy queries
+    # ------------------------------------------------------------------
+
+    def free_keys(self, gene: int) -> int:
+        """Bitmap of (day, period) keys where the gene's teacher and class are free"""
+        problem = self.problem
+        busy = (
+            self.teacher_bits[problem.gene_teacher[gene]]
+            | self.class_bits[problem.gene_class[gene]]
+        )
+        return problem.all_keys_mask & ~busy
+
+    def find_room(self, gene: int, key: int) -> int:
+        """First candidate room that is free at the given key"""
+        occupied = self.key_rooms[key]
+        for tier in self.problem.gene_room_tiers[gene]:
+            free = tier & ~occupied
+            if free:
+                return (free & -free).bit_length() - 1
+        return UNASSIGNED
+
+    def can_place(self, gene: int, ts_index: int, room: int) -> bool:
+        """Whether a gene can move there without a teacher, class or room clash"""
+        problem = self.problem
+        key = problem.slot_keys[ts_index]
+        n_keys = problem.n_keys
+        current = self.slots[gene]
+        own = 1 if current != UNASSIGNED and problem.slot_keys[current] == key else 0
+
+        teacher_count = self.teacher_occ[problem.gene_teacher[gene] * n_keys + key]
+        if teacher_count - own > 0:
+            return False
+
+        class_count = self.class_occ[problem.gene_class[gene] * n_keys + key]
+        if class_count - own > 0:
+            return False
+
+        room_own = own if self.rooms[gene] == room else 0
+        return self.room_occ[room * n_keys + key] - room_own <= 0
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def assign(self, gene: int, ts_index: int, room: int):
+        """Place a gene, updating only the aggregates it affects"""
+        if self.slots[gene] != UNASSIGNED:
+            self.unassign(gene)
+        self._apply(gene, ts_index, room, 1)
+        self.slots[gene] = ts_index
+        self.rooms[gene] = room
+
+    def unassign(self, gene: int):
+        """Remove a gene from the schedule"""
+        ts_index = self.slots[gene]
+        if ts_index == UNASSIGNED:
+            return
+        self._apply(gene, ts_index, self.rooms[gene], -1)
+        self.slots[gene] = UNASSIGNED
+        self.rooms[gene] = UNASSIGNED
+
+    def _apply(self, gene: int, ts_index: int, room: int, delta: int):
+        problem = self.problem
+        key = problem.slot_keys[ts_index]
+        n_keys = problem.n_keys
+        bit = 1 << key
+
+        teacher = problem.gene_teacher[gene]
+        class_index = problem.gene_class[gene]
+
+        self.conflicts += self._bump(
+            self.teacher_occ,
+            self.teacher_bits,
+            teacher,
+            teacher * n_keys + key,
+            bit,
+            delta,
+        )
+        self._bump(
+            self.class_occ,
+            self.class_bits,
+            class_index,
+            class_index * n_keys + key,
+            bit,
+            delta,
+        )
+        if room != UNASSIGNED:
+            self.conflicts += self._bump(
+                self.room_occ, self.room_bits, room, room * n_keys + key, bit, delta
+            )
+            if self.room_bits[room] & bit:
+                self.key_rooms[key] |= 1 << room
+            else:
+                self.key_rooms[key] &= ~(1 << room)
+
+        self.assigned += delta
+        self.time_pref_sum += delta * problem.time_preference(gene, ts_index)
+
+        day = problem.key_days[key]
+        if problem.track_daily_limit:
+            index = (
+                class_index * problem.n_days + day
+            ) * problem.n_subjects + problem.gene_subject[gene]
+            before = self.daily_counts[index]
+            after = before + delta
+            self.daily_counts[index] = after
+            if before <= DAILY_SUBJECT_LIMIT < after:
+                self.daily_violations += 1
+            elif after <= DAILY_SUBJECT_LIMIT < before:
+                self.daily_violations -= 1
+
+        if problem.track_consecutive:
+            self.dirty_groups.add(class_index * problem.n_days + day)
+
+    @staticmethod
+    def _bump(counts, bits, owner, index, bit, delta) -> int:
+        """Update an occupancy cell and return the resulting conflict delta"""
+        before = counts[index]
+        after = before + delta
+        counts[index] = after
+        if before == 0 and after > 0:
+            bits[owner] |= bit
+        elif after == 0:
+            bits[owner] &= ~bit
+        return max(after - 1, 0) - max(before - 1, 0)
+
+    def _flush_groups(self):
+        """Re-score the (class, day) groups touched since the last evaluation"""
+        if not self.dirty_groups:
+            return
+
+        problem = self.problem
+        for group in self.dirty_groups:
+            class_index, day = divmod(group, problem.n_days)
+
+            entries = []
+            for gene in problem.class_genes[class_index]:
+                ts_index = self.slots[gene]
+                if (
+                    ts_index != UNASSIGNED
+                    and problem.key_days[problem.slot_keys[ts_index]] == day
+                ):
+                    entries.append((problem.slot_periods[ts_index], gene))
+            entries.sort()
+
+            satisfaction = 0.0
+            for (period, gene), (next_period, next_gene) in zip(entries, entries[1:]):
+                if abs(period - next_period) == 1:
+                    if problem.gene_subject[gene] == problem.gene_subject[next_gene]:
+                        satisfaction += 1.0 if problem.gene_is_lab[gene] else 0.3
+                    else:
+                        satisfaction += 0.8
+            count = max(len(entries) - 1, 0)
+
+            self.consec_sat += satisfaction - self.group_sat[group]
+            self.consec_cnt += count - self.group_cnt[group]
+            self.group_sat[group] = satisfaction
+            self.group_cnt[group] = count
+
+        self.dirty_groups.clear()
+
+    # ------------------------------------------------------------------
+    # Fitness
+    # ------------------------------------------------------------------
+
+    def constraint_score(self) -> float:
+        """Weighted constraint satisfaction in the range [0, 1]"""
+        problem = self.problem
+        if problem.total_constraint_weight <= 0:
+            return 0.0
+
+        self._flush_groups()
+        total = 0.0
+        for constraint_type, weight in problem.constraint_weights:
+            if constraint_type == CONSTRAINT_TEACHER_AVAILABILITY:
+                satisfaction = 0.9
+            elif constraint_type == CONSTRAINT_CONSECUTIVE_PERIODS:
+                satisfaction = (
+                    self.consec_sat / self.consec_cnt if self.consec_cnt > 0 else 1.0
+                )
+            elif constraint_type == CONSTRAINT_DAILY_LIMIT:
+                satisfaction = (
+                    max(0.0, 1.0 - self.daily_violations / self.assigned)
+                    if self.assigned > 0
+                    else 1.0
+                )
+            elif constraint_type == CONSTRAINT_TIME_PREFERENCE:
+                satisfaction = (
+                    self.time_pref_sum / self.assigned if self.assigned > 0 else 1.0
+                )
+            else:
+                satisfaction = 1.0
+            total += satisfaction * weight
+
+        return total / problem.total_constraint_weight
+
+    def fitness(self) -> float:
+        """Same scoring as OptimizationService._calculate_fitness"""
+        n_genes = self.problem.n_genes
+        ratio = self.assigned / n_genes if n_genes > 0 else 0
+        return ratio * 400 - self.conflicts * 30 + self.constraint_score() * 300
+
+    def assigned_genes(self) -> List[int]:
+        return [
+            gene for gene, ts_index in enumerate(self.slots) if ts_index != UNASSIGNED
+        ]
+
+
+class GeneticEngine:
+    """Genetic algorithm over ScheduleState chromosomes"""
+
+    def __init__(
+        self,
+        problem: TimetableProblem,
+        rng: Optional[random.Random] = None,
+        crossover_rate: float = 0.3,
+        gene_mutation_rate: float = 0.1,
+        tournament_size: int = 3,
+    ):
+        self.problem = problem
+        self.rng = rng or random.Random()
+        self.crossover_rate = crossover_rate
+        self.gene_mutation_rate = gene_mutation_rate
+        self.tournament_size = tournament_size
+
+        # Genes sorted by priority, highest first (stable like list.sort)
+        self.priority_order = sorted(
+            range(problem.n_genes), key=lambda g: problem.gene_priority[g], reverse=True
+        )
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def construct(self, randomize: bool = False) -> ScheduleState:
+        """Greedy construction mirroring OptimizationService._create_random_schedule"""
+        problem = self.problem
+        state = ScheduleState(problem)
+
+        order = self.priority_order
+        slot_order = list(range(problem.n_slots))
+        if randomize:
+            order = self._shuffled_within_priority(order)
+            self.rng.shuffle(slot_order)
+
+        for gene in order:
+            free = state.free_keys(gene)
+            if not free:
+                continue
+
+            best = None
+            best_score = -1.0
+            room_scores = problem.gene_room_scores[gene]
+            time_scores = problem.gene_time_scores[gene]
+            max_room_score = problem.gene_max_room_scores[gene]
+            for ts_index in slot_order:
+                key = problem.slot_keys[ts_index]
+                if not free >> key & 1:
+                    continue
+                # Skip slots that cannot beat the current best whatever the room
+                if time_scores[ts_index] + max_room_score <= best_score:
+                    continue
+                room = state.find_room(gene, key)
+                if room == UNASSIGNED:
+                    continue
+                score = time_scores[ts_index] + room_scores[room]
+                if score > best_score:
+                    best_score = score
+                    best = (ts_index, room)
+
+            if best:
+                state.assign(gene, *best)
+
+        return state
+
+    def _shuffled_within_priority(self, order: Sequence[int]) -> List[int]:
+        priorities = self.problem.gene_priority
+        keyed = [(-priorities[g], self.rng.random(), g) for g in order]
+        keyed.sort()
+        return [g for _, _, g in keyed]
+
+    # ------------------------------------------------------------------
+    # Genetic operators
+    # ------------------------------------------------------------------
+
+    def tournament(self, population: List[ScheduleState], fitness: List[float]):
+        size = min(self.tournament_size, len(population))
+        indices = self.rng.sample(range(len(population)), size)
+        return population[max(indices, key=lambda i: fitness[i])]
+
+    def crossover(
+        self, parent1: ScheduleState, parent2: ScheduleState
+    ) -> ScheduleState:
+        """Inherit conflict-free assignments from parent2 into a copy of parent1"""
+        child = parent1.copy()
+        rng_random = self.rng.random
+        rate = self.crossover_rate
+
+        for gene in range(self.problem.n_genes):
+            if rng_random() >= rate:
+                continue
+            ts_index = parent2.slots[gene]
+            if ts_index == UNASSIGNED:
+                continue
+            room = parent2.rooms[gene]
+            if child.slots[gene] == ts_index and child.rooms[gene] == room:
+                continue
+            if child.can_place(gene, ts_index, room):
+                child.assign(gene, ts_index, room)
+
+        return child
+
+    def mutate(self, state: ScheduleState) -> ScheduleState:
+        """Move random genes to free slots and retry unassigned genes"""
+        problem = self.problem
+        rng = self.rng
+
+        for gene in range(problem.n_genes):
+            current = state.slots[gene]
+            if current != UNASSIGNED and rng.random() >= self.gene_mutation_rate:
+                continue
+
+            free = state.free_keys(gene)
+            if current != UNASSIGNED:
+                free &= ~(1 << problem.slot_keys[current])
+            keys = [key for key in range(problem.n_keys) if free >> key & 1]
+            if not keys:
+                continue
+
+            key = rng.choice(keys)
+            room = state.find_room(gene, key)
+            if room != UNASSIGNED:
+                state.assign(gene, problem.key_slots[key], room)
+
+        return state
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        population_size: int,
+        generations: int,
+        mutation_rate: float,
+        population: Optional[List[ScheduleState]] = None,
+        patience: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        on_generation: Optional[Callable[[int, ScheduleState, float], bool]] = None,
+    ) -> Tuple[ScheduleState, float, List[ScheduleState]]:
+        """
+        Evolve a population and return (best, best_fitness, final_population).
+
+        The run stops early when the best fitness has not improved for
+        ``patience`` generations, when ``time_budget`` seconds have elapsed,
+        or when ``on_generation(generation, best, best_fitness)`` returns
+        True. ``generations_run`` and ``stop_reason`` describe how it ended.
+        """
+        started = time.monotonic()
+        self.generations_run = 0
+        self.stop_reason = STOP_COMPLETED
+
+        if population is None:
+            population = [
+                self.construct(randomize=i > 0) for i in range(population_size)
+            ]
+
+        fitness = [state.fitness() for state in population]
+        best_index = max(range(len(population)), key=lambda i: fitness[i])
+        best, best_fitness = population[best_index], fitness[best_index]
+        stagnant = 0
+
+        for generation in range(1, generations + 1):
+            improved = False
+            new_population = []
+            new_fitness = []
+            for _ in range(population_size):
+                parent1 = self.tournament(population, fitness)
+                parent2 = self.tournament(population, fitness)
+                child = self.crossover(parent1, parent2)
+
+                if self.rng.random() < mutation_rate:
+                    self.mutate(child)
+
+                child_fitness = child.fitness()
+                if child_fitness > best_fitness:
+                    best, best_fitness = child, child_fitness
+                    improved = True
+
+                new_population.append(child)
+                new_fitness.append(child_fitness)
+
+            population, fitness = new_population, new_fitness
+            self.generations_run = generation
+            stagnant = 0 if improved else stagnant + 1
+
+            if patience and stagnant >= patience:
+                self.stop_reason = STOP_PLATEAU
+                break
+            if time_budget is not None and time.monotonic() - started >= time_budget:
+                self.stop_reason = STOP_TIME_BUDGET
+                break
+            if on_generation and on_generation(generation, best, best_fitness):
+                self.stop_reason = STOP_CANCELLED
+                break
+
+        return best, best_fitness, population
+
+
+# Problem shared by every island evolved in a worker process. It is sent once
+# through the pool initializer so that only chromosomes cross process
+# boundaries between migration rounds.
+_island_problem = None
+
+
+def _init_island_worker(problem: TimetableProblem):
+    global _island_problem
+    _island_problem = problem
+
+
+def _evolve_island(
+    seed: int,
+    chromosomes: Optional[List[Tuple[List[int], List[int]]]],
+    population_size: int,
+    generations: int,
+    mutation_rate: float,
+    time_budget: Optional[float] = None,
+):
+    """Evolve one island and return its ranked population and best individual"""
+    problem = _island_problem
+    engine = GeneticEngine(problem, rng=random.Random(seed))
+
+    population = None
+    if chromosomes:
+        population = [
+            ScheduleState.from_chromosome(problem, slots, rooms)
+            for slots, rooms in chromosomes
+        ]
+
+    best, best_fitness, population = engine.run(
+        population_size,
+        generations,
+        mutation_rate,
+        population=population,
+        time_budget=time_budget,
+    )
+    ranked = sorted(population, key=lambda state: state.fitness(), reverse=True)
+
+    return [state.chromosome() for state in ranked], best.chromosome(), best_fitness
+
+
+class IslandModel:
+    """
+    Island-model genetic algorithm.
+
+    Each island evolves its own sub-population in a separate process. Every
+    ``migration_interval`` generations the islands pause, and the best
+    ``migration_size`` individuals of each island replace the worst ones of
+    its neighbour (ring topology).
+    """
+
+    def __init__(
+        self,
+        problem: TimetableProblem,
+        workers: int = 4,
+        migration_interval: int = 10,
+        migration_size: int = 2,
+        seed: Optional[int] = None,
+    ):
+        self.problem = problem
+        self.workers = max(1, workers)
+        self.migration_interval = max(1, migration_interval)
+        self.migration_size = max(0, migration_size)
+        self.rng = random.Random(seed)
+
+    def run(
+        self,
+        population_size: int,
+        generations: int,
+        mutation_rate: float,
+        patience: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        on_generation: Optional[Callable[[int, ScheduleState, float], bool]] = None,
+    ) -> Tuple[ScheduleState, float]:
+        """
+        Evolve all islands and return the global best (state, fitness).
+
+        Stop conditions behave as in GeneticEngine.run but are checked at
+        migration boundaries; the time budget is also passed to the islands
+        so that a round never overruns it.
+        """
+        rounds = [self.migration_interval] * (generations // self.migration_interval)
+        if generations % self.migration_interval or not rounds:
+            rounds.append(generations % self.migration_interval)
+
+        stop_conditions = (patience, time_budget, on_generation)
+
+        if self.workers == 1:
+            _init_island_worker(self.problem)
+            return self._run_rounds(
+                rounds, population_size, mutation_rate, None, *stop_conditions
+            )
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_island_worker,
+            initargs=(self.problem,),
+        ) as executor:
+            return self._run_rounds(
+                rounds, population_size, mutation_rate, executor, *stop_conditions
+            )
+
+    def _run_rounds(
+        self,
+        rounds,
+        population_size,
+        mutation_rate,
+        executor,
+        patience,
+        time_budget,
+        on_generation,
+    ):
+        started = time.monotonic()
+        self.generations_run = 0
+        self.stop_reason = STOP_COMPLETED
+
+        populations = [None] * self.workers
+        best_chromosome, best_fitness = None, float("-inf")
+        stagnant = 0
+
+        for round_generations in rounds:
+            remaining = (
+                None
+                if time_budget is None
+                else max(time_budget - (time.monotonic() - started), 0.0)
+            )
+            args = [
+                (
+                    self.rng.randrange(2**32),
+                    populations[island],
+                    population_size,
+                    round_generations,
+                    mutation_rate,
+                    remaining,
+                )
+                for island in range(self.workers)
+            ]
+            if executor is None:
+                results = [_evolve_island(*island_args) for island_args in args]
+            else:
+                results = list(executor.map(_evolve_island, *zip(*args)))
+
+            improved = False
+            emigrants = []
+            for island, (ranked, island_best, island_fitness) in enumerate(results):
+                populations[island] = ranked
+                emigrants.append([island_best] + ranked[: self.migration_size - 1])
+                if island_fitness > best_fitness:
+                    best_chromosome, best_fitness = island_best, island_fitness
+                    improved = True
+
+            self._migrate(populations, emigrants)
+            self.generations_run += round_generations
+            stagnant = 0 if improved else stagnant + round_generations
+
+            if patience and stagnant >= patience:
+                self.stop_reason = STOP_PLATEAU
+                break
+            if time_budget is not None and time.monotonic() - started >= time_budget:
+                self.stop_reason = STOP_TIME_BUDGET
+                break
+            if on_generation and on_generation(
+                self.generations_run,
+                ScheduleState.from_chromosome(self.problem, *best_chromosome),
+                best_fitness,
+            ):
+                self.stop_reason = STOP_CANCELLED
+                break
+
+        return (
+            ScheduleState.from_chromosome(self.problem, *best_chromosome),
+            best_fitness,
+        )
+
+    def _migrate(self, populations, emigrants):
+        """Replace each island's worst individuals with its neighbour's best"""
+        if self.workers < 2 or self.migration_size == 0:
+            return
+
+        for island, population in enumerate(populations):
+            migrants = emigrants[island - 1][: self.migration_size]
+            keep = max(len(population) - len(migrants), 0)
+            populations[island] = population[:keep] + migrants
@@ -0,0 +1,530 @@
+"""
+In-memory occupancy index of the timetable
+
+Availability, conflict and substitute queries ask the same question over and
+over: who or what is busy in a given time slot on a given date. The index
+answers it from memory. Every time slot gets a bit, and every teacher, room
+and class gets a bitset of the slots it is booked in for each effective date
+range of its timetable entries. Substitute duties add per-date bitsets.
+
+Terms are loaded lazily, one query each, the first time a date inside them
+is asked about. Changes to timetables and substitutions made in this process
+patch the loaded terms; every other change (and every change made by another
+process) bumps a version number in the shared cache, and an index that sees
+a newer version than its own is thrown away and reloaded.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from django.db import transaction
+from django.db.models import Max, Min
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from src.academics.models import Term
+from src.core.cache_utils import SharedVersion
+from src.teachers.models import Teacher, TeacherClassAssignment
+
+from ..models import Room, SubstituteTeacher, TimeSlot, Timetable
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "scheduling_occupancy_version"
+VERSION_CHECK_INTERVAL = 5  # seconds between shared version checks
+
+
+class Booking(NamedTuple):
+    """An active timetable entry as held by the index"""
+
+    timetable_id: object
+    term_id: int
+    teacher_id: int
+    room_id: Optional[object]
+    class_id: int
+    subject_id: int
+    slot_bit: int
+    effective_from: object
+    effective_to: object
+
+    def covers(self, start, end=None) -> bool:
+        return self.effective_from <= (end or start) and self.effective_to >= start
+
+
+class SubstituteDuty(NamedTuple):
+    """A substitute assignment as held by the index"""
+
+    substitute_id: object
+    teacher_id: int
+    date: object
+    slot_bit: int
+    timetable_id: object
+
+
+class TermOccupancy:
+    """Bookings and slot bitsets of one term"""
+
+    RESOURCES = ("teacher", "room", "class")
+
+    def __init__(self, term_id):
+        self.term_id = term_id
+        self.bookings: Dict[object, Booking] = {}
+        self.by_slot: Dict[int, Set[object]] = defaultdict(set)
+        self.by_resource = {kind: defaultdict(set) for kind in self.RESOURCES}
+        # kind -> resource id -> (from, to) -> bitset of booked slots
+        self.masks = {kind: {} for kind in self.RESOURCES}
+        self.duties: Dict[object, SubstituteDuty] = {}
+        # (teacher id, date) -> bitset of slots covered as a substitute
+        self.duty_masks: Dict[tuple, int] = defaultdict(int)
+
+    @staticmethod
+    def _resource_ids(booking):
+        return {
+            "teacher": booking.teacher_id,
+            "room": booking.room_id,
+            "class": booking.class_id,
+        }
+
+    def add(self, booking: Booking):
+        self.bookings[booking.timetable_id] = booking
+        self.by_slot[booking.slot_bit].add(booking.timetable_id)
+        for kind, resource_id in self._resource_ids(booking).items():
+            if resource_id is None:
+                continue
+            self.by_resource[kind][resource_id].add(booking.timetable_id)
+            self._rebuild_masks(kind, resource_id)
+
+    def remove(self, timetable_id):
+        booking = self.bookings.pop(timetable_id, None)
+        if booking is None:
+            return
+        self.by_slot[booking.slot_bit].discard(timetable_id)
+        for kind, resource_id in self._resource_ids(booking).items():
+            if resource_id is None:
+                continue
+            self.by_resource[kind][resource_id].discard(timetable_id)
+            self._rebuild_masks(kind, resource_id)
+
+    def _rebuild_masks(self, kind, resource_id):
+        masks = defaultdict(int)
+        for timetable_id in self.by_resource[kind][resource_id]:
+            booking = self.bookings[timetable_id]
+            masks[(booking.effective_from, booking.effective_to)] |= (
+                1 << booking.slot_bit
+            )
+        if masks:
+            self.masks[kind][resource_id] = dict(masks)
+        else:
+            self.masks[kind].pop(resource_id, None)
+
+    def add_duty(self, duty: SubstituteDuty):
+        self.remove_duty(duty.substitute_id)
+        self.duties[duty.substitute_id] = duty
+        self.duty_masks[(duty.teacher_id, duty.date)] |= 1 << duty.slot_bit
+
+    def remove_duty(self, substitute_id):
+        duty = self.duties.pop(substitute_id, None)
+        if duty is None:
+            return
+        key = (duty.teacher_id, duty.date)
+        self.duty_masks[key] &= ~(1 << duty.slot_bit)
+        if not self.duty_masks[key]:
+            del self.duty_masks[key]
+
+    def mask(self, kind, resource_id, start, end=None) -> int:
+        """Slots the resource is booked in on any day of start..end"""
+        busy = 0
+        for (effective_from, effective_to), bits in (
+            self.masks[kind].get(resource_id, {}).items()
+        ):
+            if effective_from <= (end or start) and effective_to >= start:
+                busy |= bits
+        return busy
+
+
+class OccupancyIndex:
+    """Process-wide registry of per-term occupancy"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self._version = SharedVersion(VERSION_KEY, VERSION_CHECK_INTERVAL)
+
+    def _reset(self):
+        self._slot_bits = None  # time slot id -> bit
+        self._slots = None  # bit -> (time slot id, day of week, period number)
+        self._term_extents = None  # term id -> (first, last) effective date
+        self._terms: Dict[int, TermOccupancy] = {}
+        self._staff = None
+
+    # Freshness
+
+    def _check_version(self):
+        if self._version.check():
+            self._reset()
+
+    def _bump_version(self, patched: bool):
+        """
+        Tell other processes the timetable changed
+
+        When this process already patched its own index and nobody else
+        changed anything meanwhile, it keeps its index.
+        """
+        with self._lock:
+            if not self._version.bump(patched):
+                self._reset()
+
+    def invalidate(self):
+        """Drop the index in every process"""
+        self._bump_version(patched=False)
+
+    # Loading
+
+    def _ensure_slots(self):
+        if self._slot_bits is not None:
+            return
+        slots = TimeSlot.objects.order_by(
+            "day_of_week", "period_number", "start_time"
+        ).values_list("id", "day_of_week", "period_number")
+        self._slots = list(slots)
+        self._slot_bits = {slot_id: bit for bit, (slot_id, _, _) in enumerate(slots)}
+
+    def _ensure_extents(self):
+        if self._term_extents is not None:
+            return
+        self._term_extents = {
+            row["term_id"]: (row["first"], row["last"])
+            for row in Timetable.objects.filter(is_active=True)
+            .values("term_id")
+            .annotate(first=Min("effective_from_date"), last=Max("effective_to_date"))
+        }
+
+    def _term(self, term_id) -> TermOccupancy:
+        occupancy = self._terms.get(term_id)
+        if occupancy is not None:
+            return occupancy
+
+        self._ensure_slots()
+        occupancy = TermOccupancy(term_id)
+        for row in Timetable.objects.filter(term_id=term_id, is_active=True).values(
+            "id",
+            "teacher_id",
+            "room_id",
+            "class_assigned_id",
+            "subject_id",
+            "time_slot_id",
+            "effective_from_date",
+            "effective_to_date",
+        ):
+            occupancy.add(
+                Booking(
+                    timetable_id=row["id"],
+                    term_id=term_id,
+                    teacher_id=row["teacher_id"],
+                    room_id=row["room_id"],
+                    class_id=row["class_assigned_id"],
+                    subject_id=row["subject_id"],
+                    slot_bit=self._slot_bits[row["time_slot_id"]],
+                    effective_from=row["effective_from_date"],
+                    effective_to=row["effective_to_date"],
+                )
+            )
+        for row in SubstituteTeacher.objects.filter(
+            original_timetable__term_id=term_id
+        ).values(
+            "id",
+            "substitute_teacher_id",
+            "date",
+            "original_timetable_id",
+            "original_timetable__time_slot_id",
+        ):
+            occupancy.add_duty(
+                SubstituteDuty(
+                    substitute_id=row["id"],
+                    teacher_id=row["substitute_teacher_id"],
+                    date=row["date"],
+                    slot_bit=self._slot_bits[row["original_timetable__time_slot_id"]],
+                    timetable_id=row["original_timetable_id"],
+                )
+            )
+
+        self._terms[term_id] = occupancy
+        return occupancy
+
+    def _terms_for(self, start, end=None) -> List[TermOccupancy]:
+        self._ensure_extents()
+        return [
+            self._term(term_id)
+            for term_id, (first, last) in self._term_extents.items()
+            if first <= (end or start) and last >= start
+        ]
+
+    def _ensure_staff(self):
+        if self._staff is not None:
+            return
+        staff = {
+            "active": set(
+                Teacher.objects.filter(status="Active").values_list("id", flat=True)
+            ),
+            "terms": {
+                term_id: (start_date, end_date)
+                for term_id, start_date, end_date in Term.objects.values_list(
+                    "id", "start_date", "end_date"
+                )
+            },
+            "subject": defaultdict(set),  # subject -> (teacher, term) pairs
+            "classes": defaultdict(set),  # teacher -> classes assigned
+        }
+        for (
+            teacher_id,
+            class_id,
+            subject_id,
+            term_id,
+        ) in TeacherClassAssignment.objects.values_list(
+            "teacher_id", "class_instance_id", "subject_id", "term_id"
+        ):
+            staff["subject"][subject_id].add((teacher_id, term_id))
+            staff["classes"][teacher_id].add(class_id)
+        self._staff = staff
+
+    # Queries
+
+    def slot_bit(self, time_slot_id) -> int:
+        with self._lock:
+            self._check_version()
+            self._ensure_slots()
+            return self._slot_bits[time_slot_id]
+
+    def slot_info(self, bit) -> tuple:
+        """(time slot id, day of week, period number) of a bit"""
+        with self._lock:
+            self._check_version()
+            self._ensure_slots()
+            return self._slots[bit]
+
+    def busy_teachers(self, time_slot_id, date) -> Set[int]:
+        """Teachers teaching or substituting in the slot on the date"""
+        with self._lock:
+            self._check_version()
+            self._ensure_slots()
+            bit = self._slot_bits[time_slot_id]
+            busy = set()
+            for occupancy in self._terms_for(date):
+                for timetable_id in occupancy.by_slot.get(bit, ()):
+                    booking = occupancy.bookings[timetable_id]
+                    if booking.covers(date):
+                        busy.add(booking.teacher_id)
+                for (teacher_id, duty_date), bits in occupancy.duty_masks.items():
+                    if duty_date == date and bits >> bit & 1:
+                        busy.add(teacher_id)
+            return busy
+
+    def booked_rooms(self, time_slot_id, date) -> Set[object]:
+        """Rooms booked in the slot on the date"""
+        with self._lock:
+            self._check_version()
+            self._ensure_slots()
+            bit = self._slot_bits[time_slot_id]
+            booked = set()
+            for occupancy in self._terms_for(date):
+                for timetable_id in occupancy.by_slot.get(bit, ()):
+                    booking = occupancy.bookings[timetable_id]
+                    if booking.room_id is not None and booking.covers(date):
+                        booked.add(booking.room_id)
+            return booked
+
+    def conflicting_bookings(
+        self, kind, resource_id, start, end, time_slot_id=None, exclude_id=None
+    ) -> List[object]:
+        """Timetable IDs booking the resource during start..end"""
+        with self._lock:
+            self._check_version()
+            self._ensure_slots()
+            bit = None if time_slot_id is None else self._slot_bits[time_slot_id]
+            conflicts = []
+            for occupancy in self._terms_for(start, end):
+                busy = occupancy.mask(kind, resource_id, start, end)
+                if bit is not None and not busy >> bit & 1:
+                    continue
+                for timetable_id in occupancy.by_resource[kind].get(resource_id, ()):
+                    booking = occupancy.bookings[timetable_id]
+                    if (
+                        timetable_id != exclude_id
+                        and (bit is None or booking.slot_bit == bit)
+                        and booking.covers(start, end)
+                    ):
+                        conflicts.append(timetable_id)
+            return conflicts
+
+    def teacher_day_mask(self, teacher_id, date) -> int:
+        """Slots of the date's weekday the teacher is busy in"""
+        with self._lock:
+            self._check_version()
+            self._ensure_slots()
+            weekday_bits = sum(
+                1 << bit
+                for bit, (_, day, _) in enumerate(self._slots)
+                if day == date.weekday()
+            )
+            busy = 0
+            for occupancy in self._terms_for(date):
+                busy |= occupancy.mask("teacher", teacher_id, date)
+                busy |= occupancy.duty_masks.get((teacher_id, date), 0)
+            return busy & weekday_bits
+
+    def teacher_bookings_on(self, teacher_id, date) -> List[Booking]:
+        """The teacher's timetable entries on the date, in period order"""
+        with self._lock:
+            self._check_version()
+            self._ensure_slots()
+            bookings = []
+            for occupancy in self._terms_for(date):
+                for timetable_id in occupancy.by_resource["teacher"].get(
+                    teacher_id, ()
+                ):
+                    booking = occupancy.bookings[timetable_id]
+                    if (
+                        booking.covers(date)
+                        and self._slots[booking.slot_bit][1] == date.weekday()
+                    ):
+                        bookings.append(booking)
+            return sorted(bookings, key=lambda booking: booking.slot_bit)
+
+    def qualified_teachers(self, subject_id, date=None) -> Set[int]:
+        """Active teachers assigned the subject, in a term covering the date"""
+        with self._lock:
+            self._check_version()
+            self._ensure_staff()
+            terms = self._staff["terms"]
+            teachers = set()
+            for teacher_id, term_id in self._staff["subject"].get(subject_id, ()):
+                if date is None or (
+                    term_id in terms and terms[term_id][0] <= date <= terms[term_id][1]
+                ):
+                    teachers.add(teacher_id)
+            return teachers & self._staff["active"]
+
+    def has_taught_class(self, teacher_id, class_id) -> bool:
+        with self._lock:
+            self._check_version()
+            self._ensure_staff()
+            return class_id in self._staff["classes"].get(teacher_id, ())
+
+    # Patching
+
+    def patch_timetable(self, timetable: Timetable, deleted=False):
+        with self._lock:
+            for occupancy in self._terms.values():
+                occupancy.remove(timetable.pk)
+
+            if not deleted and timetable.is_active:
+                if self._slot_bits is None or timetable.time_slot_id not in (
+                    self._slot_bits
+                ):
+                    self._reset()
+                else:
+                    if self._term_extents is not None:
+                        first, last = self._term_extents.get(
+                            timetable.term_id,
+                            (
+                                timetable.effective_from_date,
+                                timetable.effective_to_date,
+                            ),
+                        )
+                        self._term_extents[timetable.term_id] = (
+                            min(first, timetable.effective_from_date),
+                            max(last, timetable.effective_to_date),
+                        )
+                    occupancy = self._terms.get(timetable.term_id)
+                    if occupancy is not None:
+                        occupancy.add(
+                            Booking(
+                                timetable_id=timetable.pk,
+                                term_id=timetable.term_id,
+                                teacher_id=timetable.teacher_id,
+                                room_id=timetable.room_id,
+                                class_id=timetable.class_assigned_id,
+                                subject_id=timetable.subject_id,
+                                slot_bit=self._slot_bits[timetable.time_slot_id],
+                                effective_from=timetable.effective_from_date,
+                                effective_to=timetable.effective_to_date,
+                            )
+                        )
+
+    def patch_substitute(self, substitute: SubstituteTeacher, deleted=False):
+        with self._lock:
+            for occupancy in self._terms.values():
+                occupancy.remove_duty(substitute.pk)
+
+            if deleted or self._slot_bits is None:
+                return
+            for occupancy in self._terms.values():
+                booking = occupancy.bookings.get(substitute.original_timetable_id)
+                if booking is not None:
+                    occupancy.add_duty(
+                        SubstituteDuty(
+                            substitute_id=substitute.pk,
+                            teacher_id=substitute.substitute_teacher_id,
+                            date=substitute.date,
+                            slot_bit=booking.slot_bit,
+                            timetable_id=booking.timetable_id,
+                        )
+                    )
+                    return
+            # The entry isn't loaded here; it will be read with its term
+            self._reset()
+
+
+occupancy_index = OccupancyIndex()
+
+
+def _after_commit(patch):
+    def apply():
+        try:
+            patch()
+            occupancy_index._bump_version(patched=True)
+        except Exception as e:
+            logger.error(f"Error patching occupancy index: {str(e)}")
+            occupancy_index.invalidate()
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=Timetable)
+def patch_index_on_timetable_save(sender, instance, **kwargs):
+    """Patch the occupancy index with a saved timetable entry"""
+    _after_commit(lambda: occupancy_index.patch_timetable(instance))
+
+
+@receiver(post_delete, sender=Timetable)
+def patch_index_on_timetable_delete(sender, instance, **kwargs):
+    """Remove a deleted timetable entry from the occupancy index"""
+    _after_commit(lambda: occupancy_index.patch_timetable(instance, deleted=True))
+
+
+@receiver(post_save, sender=SubstituteTeacher)
+def patch_index_on_substitute_save(sender, instance, **kwargs):
+    """Patch the occupancy index with a saved substitute assignment"""
+    _after_commit(lambda: occupancy_index.patch_substitute(instance))
+
+
+@receiver(post_delete, sender=SubstituteTeacher)
+def patch_index_on_substitute_delete(sender, instance, **kwargs):
+    """Remove a deleted substitute assignment from the occupancy index"""
+    _after_commit(lambda: occupancy_index.patch_substitute(instance, deleted=True))
+
+
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_delete, sender=TimeSlot)
+@receiver(post_delete, sender=Room)
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_save, sender=TeacherClassAssignment)
+@receiver(post_delete, sender=TeacherClassAssignment)
+def invalidate_index(sender, **kwargs):
+    """Reload the occupancy index after changes it can't patch"""
+    transaction.on_commit(occupancy_index.invalidate)
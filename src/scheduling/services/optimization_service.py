@@ -1,9 +1,11 @@
-import copy
-import random
-from dataclasses import dataclass
+import logging
+import os
+import time
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
+from django.core.cache import cache
 from django.db import transaction
 from django.db.models import Count, Q
 
@@ -18,6 +20,18 @@ from ..models import (
     Timetable,
     TimetableGeneration,
 )
+from .constraint_engine import ConstraintEngine
+from .genetic_engine import (
+    STOP_COMPLETED,
+    UNASSIGNED,
+    GeneticEngine,
+    IslandModel,
+    ScheduleState,
+    TimetableProblem,
+)
+from .occupancy_index import occupancy_index
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -43,6 +57,49 @@ class SchedulingResult:
     conflicts: List[Dict]
     optimization_score: float
     execution_time: float
+    generations_run: int = 0
+    stop_reason: str = STOP_COMPLETED
+
+
+class GenerationProgress:
+    """
+    Progress hook for long optimization runs.
+
+    Every ``interval`` generations the best-so-far score and conflict counts
+    are written to the TimetableGeneration record, and the run is stopped if
+    the record has been cancelled in the meantime.
+    """
+
+    def __init__(self, generation: TimetableGeneration, interval: int = 5):
+        self.generation_id = generation.pk
+        self.interval = max(1, interval)
+        self.started = time.monotonic()
+        self.cancelled = False
+
+    def __call__(self, generation: int, best: ScheduleState, best_fitness: float):
+        if generation % self.interval:
+            return False
+
+        records = TimetableGeneration.objects.filter(pk=self.generation_id)
+        if records.filter(status="cancelled").exists():
+            self.cancelled = True
+            return True
+
+        records.update(
+            optimization_score=best_fitness,
+            conflicts_resolved=best.conflicts,
+            execution_time_seconds=time.monotonic() - self.started,
+            result_summary={
+                "progress": {
+                    "generation": generation,
+                    "best_score": best_fitness,
+                    "conflicts": best.conflicts,
+                    "assigned_slots": best.assigned,
+                    "unassigned_slots": best.problem.n_genes - best.assigned,
+                }
+            },
+        )
+        return False
 
 
 class OptimizationService:
@@ -67,17 +124,61 @@ class OptimizationService:
         population_size: int = 50,
         generations: int = 100,
         mutation_rate: float = 0.1,
+        workers: Optional[int] = None,
+        migration_interval: int = 10,
+        migration_size: int = 2,
+        patience: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        generation: Optional[TimetableGeneration] = None,
+        progress_interval: int = 5,
     ) -> SchedulingResult:
-        """Generate optimized timetable using specified algorithm"""
+        """
+        Generate optimized timetable using specified algorithm
+
+        For the constraint algorithm, ``generations`` is the number of
+        annealing sweeps. Runs stop early after ``patience`` generations without
+        improvement or once ``time_budget`` seconds have elapsed. When a
+        ``generation`` record is given, best-so-far results are persisted to
+        it every ``progress_interval`` generations and cancelling the record
+        stops the run.
+        """
 
         start_time = datetime.now()
+        stop_conditions = {
+            "patience": patience,
+            "time_budget": time_budget,
+            "on_generation": (
+                GenerationProgress(generation, progress_interval)
+                if generation is not None
+                else None
+            ),
+        }
 
         # Get required scheduling slots
         required_slots = self._get_required_slots(grades)
 
         if algorithm == "genetic":
             result = self._genetic_algorithm(
-                required_slots, population_size, generations, mutation_rate
+                required_slots,
+                population_size,
+                generations,
+                mutation_rate,
+                **stop_conditions,
+            )
+        elif algorithm == "genetic_parallel":
+            result = self._parallel_genetic_algorithm(
+                required_slots,
+                population_size,
+                generations,
+                mutation_rate,
+                workers=workers or os.cpu_count() or 1,
+                migration_interval=migration_interval,
+                migration_size=migration_size,
+                **stop_conditions,
+            )
+        elif algorithm == "constraint":
+            result = self._constraint_algorithm(
+                required_slots, generations, **stop_conditions
             )
         elif algorithm == "greedy":
             result = self._greedy_algorithm(required_slots)
@@ -100,7 +201,7 @@ class OptimizationService:
 
             for class_obj in classes:
                 assignments = TeacherClassAssignment.objects.filter(
-                    class_assigned=class_obj, term=self.term, is_active=True
+                    class_instance=class_obj, term=self.term, is_active=True
                 ).select_related("teacher", "subject")
 
                 for assignment in assignments:
@@ -151,47 +252,82 @@ class OptimizationService:
         population_size: int,
         generations: int,
         mutation_rate: float,
+        **stop_conditions,
     ) -> SchedulingResult:
         """Genetic algorithm for timetable optimization"""
 
-        # Initialize population
-        population = []
-        for _ in range(population_size):
-            individual = self._create_random_schedule(required_slots.copy())
-            population.append(individual)
+        problem = self._encode_problem(required_slots)
+        engine = GeneticEngine(problem)
 
-        best_individual = None
-        best_fitness = float("-inf")
+        best_state, best_fitness, _ = engine.run(
+            population_size, generations, mutation_rate, **stop_conditions
+        )
 
-        for generation in range(generations):
-            # Evaluate fitness
-            fitness_scores = []
-            for individual in population:
-                fitness = self._calculate_fitness(individual)
-                fitness_scores.append(fitness)
+        result = self._build_result(required_slots, best_state, best_fitness)
+        result.generations_run = engine.generations_run
+        result.stop_reason = engine.stop_reason
+        return result
 
-                if fitness > best_fitness:
-                    best_fitness = fitness
-                    best_individual = copy.deepcopy(individual)
+    def _parallel_genetic_algorithm(
+        self,
+        required_slots: List[SchedulingSlot],
+        population_size: int,
+        generations: int,
+        mutation_rate: float,
+        workers: int,
+        migration_interval: int,
+        migration_size: int,
+        **stop_conditions,
+    ) -> SchedulingResult:
+        """Island-model genetic algorithm running one sub-population per process"""
+
+        problem = self._encode_problem(required_slots)
+        islands = IslandModel(
+            problem,
+            workers=workers,
+            migration_interval=migration_interval,
+            migration_size=migration_size,
+        )
+
+        best_state, best_fitness = islands.run(
+            population_size, generations, mutation_rate, **stop_conditions
+        )
 
-            # Selection and crossover
-            new_population = []
-            for _ in range(population_size):
-                parent1 = self._tournament_selection(population, fitness_scores)
-                parent2 = self._tournament_selection(population, fitness_scores)
+        result = self._build_result(required_slots, best_state, best_fitness)
+        result.generations_run = islands.generations_run
+        result.stop_reason = islands.stop_reason
+        return result
 
-                child = self._crossover(parent1, parent2)
+    def _constraint_algorithm(
+        self,
+        required_slots: List[SchedulingSlot],
+        sweeps: int,
+        **stop_conditions,
+    ) -> SchedulingResult:
+        """Constraint propagation with tabu repair and simulated annealing"""
 
-                if random.random() < mutation_rate:
-                    child = self._mutate(child)
+        problem = self._encode_problem(required_slots)
+        engine = ConstraintEngine(problem)
 
-                new_population.append(child)
+        best_state, best_fitness = engine.run(sweeps, **stop_conditions)
 
-            population = new_population
+        result = self._build_result(required_slots, best_state, best_fitness)
+        result.generations_run = engine.generations_run
+        result.stop_reason = engine.stop_reason
+        return result
+
+    def _build_result(
+        self,
+        required_slots: List[SchedulingSlot],
+        state: ScheduleState,
+        fitness: float,
+    ) -> SchedulingResult:
+        """Build a SchedulingResult from the best encoded schedule"""
 
-        # Analyze best solution
-        assigned_slots = [slot for slot in best_individual if slot.is_assigned]
-        unassigned_slots = [slot for slot in best_individual if not slot.is_assigned]
+        # Only the best individual is turned back into model-backed slots
+        schedule = self._decode_schedule(required_slots, state)
+        assigned_slots = [slot for slot in schedule if slot.is_assigned]
+        unassigned_slots = [slot for slot in schedule if not slot.is_assigned]
         conflicts = self._detect_conflicts(assigned_slots)
 
         return SchedulingResult(
@@ -199,10 +335,107 @@ class OptimizationService:
             assigned_slots=assigned_slots,
             unassigned_slots=unassigned_slots,
             conflicts=conflicts,
-            optimization_score=best_fitness,
+            optimization_score=fitness,
             execution_time=0,  # Will be set by caller
         )
 
+    def _encode_problem(self, required_slots: List[SchedulingSlot]) -> TimetableProblem:
+        """Map slots, teachers, classes and rooms to dense integer indices"""
+
+        def index_of(mapping: Dict, key) -> int:
+            if key not in mapping:
+                mapping[key] = len(mapping)
+            return mapping[key]
+
+        teacher_index, class_index, subject_index = {}, {}, {}
+        room_index = {room.id: i for i, room in enumerate(self.rooms)}
+
+        key_index, day_index = {}, {}
+        slot_keys, slot_periods = [], []
+        for time_slot in self.time_slots:
+            day_period = (time_slot.day_of_week, time_slot.period_number)
+            slot_keys.append(index_of(key_index, day_period))
+            slot_periods.append(time_slot.period_number)
+            index_of(day_index, time_slot.day_of_week)
+        key_days = [day_index[day] for day, _ in key_index]
+
+        core_subjects = ["mathematics", "english", "science"]
+        room_cache = {}
+
+        gene_teacher, gene_class, gene_subject, gene_priority = [], [], [], []
+        gene_is_core, gene_is_lab, gene_rooms, gene_room_scores = [], [], [], []
+
+        for slot in required_slots:
+            subject_name_lower = slot.subject.name.lower()
+            gene_teacher.append(index_of(teacher_index, slot.teacher.id))
+            gene_class.append(index_of(class_index, slot.class_obj.id))
+            gene_subject.append(index_of(subject_index, slot.subject.id))
+            gene_priority.append(slot.priority)
+            gene_is_core.append(
+                any(core in subject_name_lower for core in core_subjects)
+            )
+            gene_is_lab.append("lab" in subject_name_lower)
+
+            # Candidate rooms depend only on the class and subject
+            cache_key = (slot.class_obj.id, slot.subject.id)
+            if cache_key not in room_cache:
+                candidates = self._get_candidate_rooms(slot)
+                room_cache[cache_key] = (
+                    [room_index[room.id] for room in candidates],
+                    {
+                        room_index[room.id]: self._calculate_room_score(slot, room)
+                        for room in candidates
+                    },
+                )
+            rooms, scores = room_cache[cache_key]
+            gene_rooms.append(rooms)
+            gene_room_scores.append(scores)
+
+        return TimetableProblem(
+            gene_teacher=gene_teacher,
+            gene_class=gene_class,
+            gene_subject=gene_subject,
+            gene_priority=gene_priority,
+            gene_is_core=gene_is_core,
+            gene_is_lab=gene_is_lab,
+            gene_rooms=gene_rooms,
+            gene_room_scores=gene_room_scores,
+            slot_keys=slot_keys,
+            slot_periods=slot_periods,
+            key_days=key_days,
+            n_teachers=len(teacher_index),
+            n_classes=len(class_index),
+            n_rooms=len(self.rooms),
+            n_subjects=len(subject_index),
+            n_days=len(day_index),
+            constraint_weights=[
+                (constraint.constraint_type, constraint.priority / 10.0)
+                for constraint in self.constraints
+            ],
+        )
+
+    def _decode_schedule(
+        self, required_slots: List[SchedulingSlot], state: ScheduleState
+    ) -> List[SchedulingSlot]:
+        """Materialize an encoded schedule as SchedulingSlot objects"""
+        schedule = []
+        for gene, slot in enumerate(required_slots):
+            ts_index = state.slots[gene]
+            if ts_index == UNASSIGNED:
+                schedule.append(
+                    replace(slot, time_slot=None, room=None, is_assigned=False)
+                )
+            else:
+                schedule.append(
+                    replace(
+                        slot,
+                        time_slot=self.time_slots[ts_index],
+                        room=self.rooms[state.rooms[gene]],
+                        is_assigned=True,
+                    )
+                )
+        return schedule
+
     def _create_random_schedule(
         self, slots: List[SchedulingSlot]
     ) -> List[SchedulingSlot]:
@@ -273,10 +506,8 @@ class OptimizationService:
 
         return slots
 
-    def _find_suitable_room(
-        self, slot: SchedulingSlot, day_period: Tuple[int, int], room_schedule: Dict
-    ) -> Optional[Room]:
-        """Find suitable room for a slot"""
+    def _get_preferred_room_types(self, subject: Subject) -> List[str]:
+        """Room types suited to a subject, most preferred first"""
 
         # Room requirements based on subject
         subject_room_preferences = {
@@ -290,37 +521,37 @@ class OptimizationService:
             "art": ["art_room", "classroom"],
         }
 
-        subject_name_lower = slot.subject.name.lower()
-        preferred_types = ["classroom"]  # Default
-
+        subject_name_lower = subject.name.lower()
         for key, types in subject_room_preferences.items():
             if key in subject_name_lower:
-                preferred_types = types
-                break
+                return types
 
-        # Find available rooms
-        for room in self.rooms:
-            # Check if room is free
-            if room.id in room_schedule and day_period in room_schedule[room.id]:
-                continue
+        return ["classroom"]  # Default
 
-            # Check capacity
-            class_size = getattr(slot.class_obj, "student_count", 30)
-            if room.capacity < class_size:
-                continue
+    def _get_candidate_rooms(self, slot: SchedulingSlot) -> List[Room]:
+        """Rooms large enough for the class, preferred room types first"""
+        preferred_types = self._get_preferred_room_types(slot.subject)
+        class_size = getattr(slot.class_obj, "student_count", 30)
+
+        large_enough = [room for room in self.rooms if room.capacity >= class_size]
+        preferred = [room for room in large_enough if room.room_type in preferred_types]
+        fallback = [
+            room for room in large_enough if room.room_type not in preferred_types
+        ]
 
-            # Check room type preference
-            if room.room_type in preferred_types:
-                return room
+        return preferred + fallback
+
+    def _find_suitable_room(
+        self, slot: SchedulingSlot, day_period: Tuple[int, int], room_schedule: Dict
+    ) -> Optional[Room]:
+        """Find suitable room for a slot"""
 
-        # Fallback to any available classroom
-        for room in self.rooms:
+        for room in self._get_candidate_rooms(slot):
+            # Check if room is free
             if room.id in room_schedule and day_period in room_schedule[room.id]:
                 continue
 
-            class_size = getattr(slot.class_obj, "student_count", 30)
-            if room.capacity >= class_size:
-                return room
+            return room
 
         return None
 
@@ -337,6 +568,13 @@ class OptimizationService:
         elif slot.priority <= 5 and time_slot.period_number >= 5:
             score += 15
 
+        return score + self._calculate_room_score(slot, room)
+
+    def _calculate_room_score(self, slot: SchedulingSlot, room: Room) -> float:
+        """Calculate the room-dependent part of an assignment score"""
+
+        score = 0.0
+
         # Room suitability
         subject_name_lower = slot.subject.name.lower()
         if "science" in subject_name_lower and room.room_type == "laboratory":
@@ -578,124 +816,6 @@ class OptimizationService:
 
         return satisfaction / count if count > 0 else 1.0
 
-    def _tournament_selection(
-        self,
-        population: List[List[SchedulingSlot]],
-        fitness_scores: List[float],
-        tournament_size: int = 3,
-    ) -> List[SchedulingSlot]:
-        """Tournament selection for genetic algorithm"""
-
-        tournament_indices = random.sample(range(len(population)), tournament_size)
-        best_index = max(tournament_indices, key=lambda i: fitness_scores[i])
-
-        return copy.deepcopy(population[best_index])
-
-    def _crossover(
-        self, parent1: List[SchedulingSlot], parent2: List[SchedulingSlot]
-    ) -> List[SchedulingSlot]:
-        """Crossover operation for genetic algorithm"""
-
-        child = copy.deepcopy(parent1)
-
-        # Randomly swap some assignments from parent2
-        for i in range(len(child)):
-            if random.random() < 0.3:  # 30% chance to inherit from parent2
-                if i < len(parent2) and parent2[i].is_assigned:
-                    # Check if we can safely inherit this assignment
-                    if not self._would_create_conflict(child, i, parent2[i]):
-                        child[i].time_slot = parent2[i].time_slot
-                        child[i].room = parent2[i].room
-                        child[i].is_assigned = parent2[i].is_assigned
-
-        return child
-
-    def _would_create_conflict(
-        self, schedule: List[SchedulingSlot], index: int, new_assignment: SchedulingSlot
-    ) -> bool:
-        """Check if assignment would create conflict"""
-
-        if not new_assignment.time_slot:
-            return False
-
-        day_period = (
-            new_assignment.time_slot.day_of_week,
-            new_assignment.time_slot.period_number,
-        )
-
-        for i, slot in enumerate(schedule):
-            if i == index or not slot.is_assigned or not slot.time_slot:
-                continue
-
-            other_day_period = (
-                slot.time_slot.day_of_week,
-                slot.time_slot.period_number,
-            )
-            if day_period == other_day_period:
-                # Check for teacher or room conflict
-                if slot.teacher == new_assignment.teacher or (
-                    slot.room
-                    and new_assignment.room
-                    and slot.room == new_assignment.room
-                ):
-                    return True
-
-        return False
-
-    def _mutate(self, individual: List[SchedulingSlot]) -> List[SchedulingSlot]:
-        """Mutation operation for genetic algorithm"""
-
-        mutated = copy.deepcopy(individual)
-
-        # Randomly reassign some slots
-        for slot in mutated:
-            if random.random() < 0.1:  # 10% mutation rate per slot
-                if slot.is_assigned:
-                    # Try to find alternative assignment
-                    available_slots = [
-                        ts
-                        for ts in self.time_slots
-                        if not self._would_create_time_conflict(mutated, slot, ts)
-                    ]
-
-                    if available_slots:
-                        new_time_slot = random.choice(available_slots)
-                        new_room = self._find_suitable_room(
-                            slot,
-                            (new_time_slot.day_of_week, new_time_slot.period_number),
-                            {},
-                        )
-
-                        if new_room:
-                            slot.time_slot = new_time_slot
-                            slot.room = new_room
-
-        return mutated
-
-    def _would_create_time_conflict(
-        self,
-        schedule: List[SchedulingSlot],
-        target_slot: SchedulingSlot,
-        new_time_slot: TimeSlot,
-    ) -> bool:
-        """Check if new time slot would create conflict"""
-
-        day_period = (new_time_slot.day_of_week, new_time_slot.period_number)
-
-        for slot in schedule:
-            if slot == target_slot or not slot.is_assigned or not slot.time_slot:
-                continue
-
-            other_day_period = (
-                slot.time_slot.day_of_week,
-                slot.time_slot.period_number,
-            )
-            if day_period == other_day_period:
-                if slot.teacher == target_slot.teacher:
-                    return True
-
-        return False
-
     def _greedy_algorithm(
         self, required_slots: List[SchedulingSlot]
     ) -> SchedulingResult:
@@ -730,9 +850,110 @@ class OptimizationService:
 
     @transaction.atomic
     def save_schedule_to_database(
+        self,
+        result: SchedulingResult,
+        created_by: "User" = None,
+        bulk: bool = True,
+        diff: bool = True,
+        batch_size: int = 500,
+    ) -> Dict[str, int]:
+        """
+        Save optimized schedule to database
+
+        The bulk path checks conflicts in memory once over the whole result
+        and writes with ``bulk_create`` instead of validating row by row. With
+        ``diff`` it keeps existing entries that are unchanged and only deletes
+        and inserts the difference. ``bulk=False`` keeps the validated
+        per-row path.
+        """
+
+        if not bulk:
+            return self._save_schedule_per_row(result, created_by)
+
+        slots, errors = self._validate_schedule(result.assigned_slots)
+        start_date, end_date = self.term.start_date, self.term.end_date
+
+        # Entries are identified by (class, subject, teacher, time slot, room)
+        wanted = {}
+        for slot in slots:
+            key = (
+                slot.class_obj.id,
+                slot.subject.id,
+                slot.teacher.id,
+                slot.time_slot.id,
+                slot.room.id if slot.room else None,
+            )
+            wanted[key] = slot
+
+        existing = Timetable.objects.filter(term=self.term)
+        keep_ids, reactivate_ids = [], []
+        if diff:
+            for row in existing.values(
+                "id",
+                "class_assigned_id",
+                "subject_id",
+                "teacher_id",
+                "time_slot_id",
+                "room_id",
+                "effective_from_date",
+                "effective_to_date",
+                "is_active",
+            ):
+                key = (
+                    row["class_assigned_id"],
+                    row["subject_id"],
+                    row["teacher_id"],
+                    row["time_slot_id"],
+                    row["room_id"],
+                )
+                same_dates = (row["effective_from_date"], row["effective_to_date"]) == (
+                    start_date,
+                    end_date,
+                )
+                if key in wanted and same_dates:
+                    wanted.pop(key)
+                    keep_ids.append(row["id"])
+                    if not row["is_active"]:
+                        reactivate_ids.append(row["id"])
+
+        # Stale entries go first so new rows cannot hit the unique constraints
+        deleted_count = existing.exclude(id__in=keep_ids).delete()[0]
+        if reactivate_ids:
+            Timetable.objects.filter(id__in=reactivate_ids).update(is_active=True)
+
+        entries = [
+            Timetable(
+                class_assigned=slot.class_obj,
+                subject=slot.subject,
+                teacher=slot.teacher,
+                time_slot=slot.time_slot,
+                room=slot.room,
+                term=self.term,
+                effective_from_date=start_date,
+                effective_to_date=end_date,
+                created_by=created_by,
+            )
+            for slot in wanted.values()
+        ]
+        Timetable.objects.bulk_create(entries, batch_size=batch_size)
+
+        # bulk_create and update() bypass post_save, so clear the per-entity
+        # caches here and reload the occupancy index once the save commits
+        self._invalidate_timetable_caches(slots)
+        transaction.on_commit(occupancy_index.invalidate)
+
+        return {
+            "created": len(entries),
+            "unchanged": len(keep_ids),
+            "deleted": deleted_count,
+            "errors": errors,
+            "unassigned_count": len(result.unassigned_slots),
+        }
+
+    def _save_schedule_per_row(
         self, result: SchedulingResult, created_by: "User" = None
     ) -> Dict[str, int]:
-        """Save optimized schedule to database"""
+        """Delete the term's timetable and save each entry with full validation"""
 
         created_count = 0
         errors = []
@@ -763,3 +984,78 @@ class OptimizationService:
             "errors": errors,
             "unassigned_count": len(result.unassigned_slots),
         }
+
+    def _validate_schedule(
+        self, slots: List[SchedulingSlot]
+    ) -> Tuple[List[SchedulingSlot], List[str]]:
+        """
+        Check a schedule for conflicts in memory before a bulk save
+
+        Mirrors Timetable._check_conflicts: slots clashing with an earlier slot
+        of the same result, or with active entries of other terms overlapping
+        this term's dates, are dropped and reported as errors.
+        """
+
+        busy = set()
+        other_terms = Timetable.objects.filter(
+            is_active=True,
+            time_slot__in={slot.time_slot.id for slot in slots},
+            effective_from_date__lte=self.term.end_date,
+            effective_to_date__gte=self.term.start_date,
+        ).exclude(term=self.term)
+        for teacher_id, room_id, class_id, time_slot_id in other_terms.values_list(
+            "teacher_id", "room_id", "class_assigned_id", "time_slot_id"
+        ):
+            busy.add(("teacher", teacher_id, time_slot_id))
+            busy.add(("class", class_id, time_slot_id))
+            if room_id:
+                busy.add(("room", room_id, time_slot_id))
+
+        valid, errors = [], []
+        for slot in slots:
+            time_slot_id = slot.time_slot.id
+            keys = [
+                ("teacher", slot.teacher.id, time_slot_id),
+                ("class", slot.class_obj.id, time_slot_id),
+            ]
+            if slot.room:
+                keys.append(("room", slot.room.id, time_slot_id))
+
+            conflicts = [
+                {
+                    "teacher": "Teacher already scheduled",
+                    "room": "Room already booked",
+                    "class": "Class already has a subject scheduled",
+                }[key[0]]
+                for key in keys
+                if key in busy
+            ]
+            if conflicts:
+                errors.append(
+                    f"Error saving {slot}: Scheduling conflicts found: {conflicts}"
+                )
+                continue
+
+            busy.update(keys)
+            valid.append(slot)
+
+        return valid, errors
+
+    def _invalidate_timetable_caches(self, slots: List[SchedulingSlot]):
+        """Clear cached class, teacher and room timetables for the term"""
+
+        term_id = self.term.id
+        keys = set()
+        for slot in slots:
+            keys.add(f"class_timetable_{slot.class_obj.id}_{term_id}")
+            keys.add(f"teacher_timetable_{slot.teacher.id}_{term_id}")
+            if slot.room:
+                keys.add(f"room_schedule_{slot.room.id}_{term_id}")
+
+        try:
+            cache.delete_many(list(keys))
+        except Exception:
+            logger.warning(
+                f"Failed to clear {len(keys)} cached timetables for term {term_id}",
+                exc_info=True,
+            )
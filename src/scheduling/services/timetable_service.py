@@ -20,6 +20,7 @@ from ..models import (
     TimetableGeneration,
     TimetableTemplate,
 )
+from .occupancy_index import occupancy_index
 
 
 class TimetableService:
@@ -47,7 +48,7 @@ class TimetableService:
         # Validate teacher assignment
         teacher_assignment = TeacherClassAssignment.objects.filter(
             teacher=teacher,
-            class_assigned=class_assigned,
+            class_instance=class_assigned,
             subject=subject,
             term=term,
             is_active=True,
@@ -146,7 +147,51 @@ class TimetableService:
 
         conflicts = []
 
-        if not any([teacher, room, class_obj]):
+        resources = [
+            ("teacher", teacher, f"Teacher {teacher} already scheduled"),
+            ("room", room, f"Room {room} already booked"),
+            (
+                "class",
+                class_obj,
+                f"Class {class_obj} already has a subject scheduled",
+            ),
+        ]
+        resources = [resource for resource in resources if resource[1]]
+
+        if not resources:
+            return conflicts
+
+        if date_range:
+            # Answer from the occupancy index and only fetch the clashes
+            start_date, end_date = date_range
+            clashes = [
+                (kind, message, timetable_id)
+                for kind, obj, message in resources
+                for timetable_id in occupancy_index.conflicting_bookings(
+                    kind,
+                    obj.pk,
+                    start_date,
+                    end_date,
+                    time_slot_id=time_slot.pk if time_slot else None,
+                    exclude_id=exclude_timetable.pk if exclude_timetable else None,
+                )
+            ]
+            if not clashes:
+                return conflicts
+
+            timetables = Timetable.objects.in_bulk(
+                {timetable_id for _, _, timetable_id in clashes}
+            )
+            for kind, message, timetable_id in clashes:
+                if timetable_id in timetables:
+                    conflicts.append(
+                        {
+                            "type": kind,
+                            "message": message,
+                            "timetable": timetables[timetable_id],
+                            "severity": "high",
+                        }
+                    )
             return conflicts
 
         query = Timetable.objects.filter(is_active=True)
@@ -154,49 +199,16 @@ class TimetableService:
         if time_slot:
             query = query.filter(time_slot=time_slot)
 
-        if date_range:
-            start_date, end_date = date_range
-            query = query.filter(
-                effective_from_date__lte=end_date, effective_to_date__gte=start_date
-            )
-
         if exclude_timetable:
             query = query.exclude(pk=exclude_timetable.pk)
 
-        # Teacher conflicts
-        if teacher:
-            teacher_conflicts = query.filter(teacher=teacher)
-            for conflict in teacher_conflicts:
-                conflicts.append(
-                    {
-                        "type": "teacher",
-                        "message": f"Teacher {teacher} already scheduled",
-                        "timetable": conflict,
-                        "severity": "high",
-                    }
-                )
-
-        # Room conflicts
-        if room:
-            room_conflicts = query.filter(room=room)
-            for conflict in room_conflicts:
-                conflicts.append(
-                    {
-                        "type": "room",
-                        "message": f"Room {room} already booked",
-                        "timetable": conflict,
-                        "severity": "high",
-                    }
-                )
-
-        # Class conflicts
-        if class_obj:
-            class_conflicts = query.filter(class_assigned=class_obj)
-            for conflict in class_conflicts:
+        fields = {"teacher": "teacher", "room": "room", "class": "class_assigned"}
+        for kind, obj, message in resources:
+            for conflict in query.filter(**{fields[kind]: obj}):
                 conflicts.append(
                     {
-                        "type": "class",
-                        "message": f"Class {class_obj} already has a subject scheduled",
+                        "type": kind,
+                        "message": message,
                         "timetable": conflict,
                         "severity": "high",
                     }
@@ -213,30 +225,27 @@ class TimetableService:
     ) -> List[Teacher]:
         """Get teachers available for a specific time slot"""
 
-        # Get teachers who can teach this subject
-        qualified_teachers = Teacher.objects.filter(
-            teacher_assignments__subject=subject,
-            teacher_assignments__term__start_date__lte=date,
-            teacher_assignments__term__end_date__gte=date,
-            status="active",
-        ).distinct()
+        # Teachers assigned the subject in a term covering the date
+        available = occupancy_index.qualified_teachers(subject.pk, date)
 
         if class_obj:
-            qualified_teachers = qualified_teachers.filter(
-                teacher_assignments__class_assigned=class_obj
-            )
+            available = {
+                teacher_id
+                for teacher_id in available
+                if occupancy_index.has_taught_class(teacher_id, class_obj.pk)
+            }
 
-        # Exclude teachers who are already scheduled
-        scheduled_teachers = Timetable.objects.filter(
-            time_slot=time_slot,
-            effective_from_date__lte=date,
-            effective_to_date__gte=date,
-            is_active=True,
-        ).values_list("teacher_id", flat=True)
+        # Exclude teachers who are already scheduled or substituting
+        available -= occupancy_index.busy_teachers(time_slot.pk, date)
 
-        available_teachers = qualified_teachers.exclude(id__in=scheduled_teachers)
+        if not available:
+            return []
 
-        return list(available_teachers)
+        return list(
+            Teacher.objects.filter(id__in=available).select_related(
+                "user", "department"
+            )
+        )
 
     @staticmethod
     def get_available_rooms(
@@ -256,16 +265,11 @@ class TimetableService:
             query = query.filter(capacity__gte=min_capacity)
 
         # Exclude rooms that are already booked
-        booked_rooms = Timetable.objects.filter(
-            time_slot=time_slot,
-            effective_from_date__lte=date,
-            effective_to_date__gte=date,
-            is_active=True,
-        ).values_list("room_id", flat=True)
-
-        available_rooms = query.exclude(id__in=booked_rooms)
+        booked_rooms = occupancy_index.booked_rooms(time_slot.pk, date)
+        if booked_rooms:
+            query = query.exclude(id__in=booked_rooms)
 
-        return list(available_rooms)
+        return list(query)
 
     @staticmethod
     @transaction.atomic
@@ -406,17 +410,39 @@ class SubstituteService:
         suggestions = []
 
         # Get teachers who can teach the same subject
-        qualified_teachers = Teacher.objects.filter(
-            teacher_assignments__subject=original_timetable.subject, status="active"
-        ).exclude(id=original_timetable.teacher.id)
-
-        for teacher in qualified_teachers:
-            # Check availability
-            conflicts = TimetableService.check_conflicts(
-                teacher=teacher,
-                time_slot=original_timetable.time_slot,
-                date_range=(date, date),
+        candidates = occupancy_index.qualified_teachers(original_timetable.subject_id)
+        candidates.discard(original_timetable.teacher_id)
+        if not candidates:
+            return suggestions
+
+        # Check availability
+        clashes = {
+            teacher_id: occupancy_index.conflicting_bookings(
+                "teacher",
+                teacher_id,
+                date,
+                date,
+                time_slot_id=original_timetable.time_slot_id,
             )
+            for teacher_id in candidates
+        }
+        timetables = Timetable.objects.in_bulk(
+            {timetable_id for ids in clashes.values() for timetable_id in ids}
+        )
+
+        for teacher in Teacher.objects.filter(id__in=candidates).select_related(
+            "user", "department"
+        ):
+            conflicts = [
+                {
+                    "type": "teacher",
+                    "message": f"Teacher {teacher} already scheduled",
+                    "timetable": timetables[timetable_id],
+                    "severity": "high",
+                }
+                for timetable_id in clashes[teacher.id]
+                if timetable_id in timetables
+            ]
 
             # Calculate compatibility score
             score = 100
@@ -424,9 +450,9 @@ class SubstituteService:
                 score -= 50  # Penalty for conflicts
 
             # Check if teacher has taught this class before
-            has_taught_class = TeacherClassAssignment.objects.filter(
-                teacher=teacher, class_assigned=original_timetable.class_assigned
-            ).exists()
+            has_taught_class = occupancy_index.has_taught_class(
+                teacher.id, original_timetable.class_assigned_id
+            )
 
             if has_taught_class:
                 score += 20
@@ -445,6 +471,102 @@ class SubstituteService:
 
         return suggestions
 
+    @staticmethod
+    def get_day_substitute_plan(
+        teacher: Teacher, date: datetime.date, limit: int = 5
+    ) -> Dict:
+        """
+        Rank substitutes for every period of an absent teacher's day
+
+        Each period lists the best free, qualified teachers: 100 points, 20
+        more for teachers of the class, less 5 for every period they already
+        teach or cover that day. Teachers free for every period are listed
+        separately as candidates to cover the whole day.
+        """
+
+        bookings = occupancy_index.teacher_bookings_on(teacher.pk, date)
+        if not bookings:
+            return {"teacher": teacher, "date": date, "periods": [], "full_day": []}
+
+        load = {}
+
+        def day_load(teacher_id):
+            if teacher_id not in load:
+                load[teacher_id] = bin(
+                    occupancy_index.teacher_day_mask(teacher_id, date)
+                ).count("1")
+            return load[teacher_id]
+
+        ranked_periods = []
+        for booking in bookings:
+            time_slot_id = occupancy_index.slot_info(booking.slot_bit)[0]
+            free = occupancy_index.qualified_teachers(
+                booking.subject_id
+            ) - occupancy_index.busy_teachers(time_slot_id, date)
+            free.discard(teacher.pk)
+
+            ranked = sorted(
+                (
+                    (
+                        100
+                        + (
+                            20
+                            if occupancy_index.has_taught_class(
+                                teacher_id, booking.class_id
+                            )
+                            else 0
+                        )
+                        - 5 * day_load(teacher_id),
+                        teacher_id,
+                    )
+                    for teacher_id in free
+                ),
+                key=lambda ranking: (-ranking[0], str(ranking[1])),
+            )
+            ranked_periods.append((booking, free, ranked[:limit]))
+
+        full_day = set.intersection(*(free for _, free, _ in ranked_periods))
+        full_day_ranked = sorted(
+            full_day, key=lambda teacher_id: (day_load(teacher_id), str(teacher_id))
+        )[:limit]
+
+        # One query each for the teachers and timetable entries involved
+        teacher_ids = set(full_day_ranked)
+        for _, _, ranked in ranked_periods:
+            teacher_ids.update(teacher_id for _, teacher_id in ranked)
+        teachers = Teacher.objects.select_related("user", "department").in_bulk(
+            teacher_ids
+        )
+        timetables = Timetable.objects.select_related(
+            "class_assigned", "subject", "time_slot", "room"
+        ).in_bulk([booking.timetable_id for booking, _, _ in ranked_periods])
+
+        periods = []
+        for booking, _, ranked in ranked_periods:
+            periods.append(
+                {
+                    "timetable": timetables[booking.timetable_id],
+                    "suggestions": [
+                        {
+                            "teacher": teachers[teacher_id],
+                            "compatibility_score": score,
+                            "has_taught_class": occupancy_index.has_taught_class(
+                                teacher_id, booking.class_id
+                            ),
+                            "periods_that_day": day_load(teacher_id),
+                        }
+                        for score, teacher_id in ranked
+                    ],
+                }
+            )
+
+        return {
+            "teacher": teacher,
+            "date": date,
+            "periods": periods,
+            "full_day": [teachers[teacher_id] for teacher_id in full_day_ranked],
+        }
+
     @staticmethod
     def get_substitute_history(
         teacher: Teacher = None, date_range: Tuple[datetime.date, datetime.date] = None
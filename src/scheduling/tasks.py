@@ -15,8 +15,10 @@ from academics.models import Grade, Term
 from communications.models import Notification
 from teachers.models import Teacher
 
+from .config import SchedulingConfig
 from .models import Room, SubstituteTeacher, TimeSlot, Timetable, TimetableGeneration
 from .services.analytics_service import SchedulingAnalyticsService
+from .services.genetic_engine import STOP_CANCELLED
 from .services.optimization_service import OptimizationService
 from .services.timetable_service import TimetableService
 from .utils import ScheduleValidator
@@ -31,12 +33,18 @@ def generate_optimized_timetable(self, generation_id, algorithm="genetic", **kwa
 
     Args:
         generation_id: TimetableGeneration instance ID
-        algorithm: Optimization algorithm to use
-        **kwargs: Additional parameters for optimization
+        algorithm: Optimization algorithm to use ("genetic", "genetic_parallel",
+            "constraint" or "greedy")
+        **kwargs: Additional parameters for optimization (e.g. workers,
+            migration_interval and migration_size for "genetic_parallel")
     """
     try:
         generation = TimetableGeneration.objects.get(id=generation_id)
 
+        if generation.status == "cancelled":
+            logger.info(f"Timetable generation {generation_id} was cancelled")
+            return {"success": False, "cancelled": True}
+
         # Update status to running
         generation.status = "running"
         generation.save()
@@ -50,19 +58,46 @@ def generate_optimized_timetable(self, generation_id, algorithm="genetic", **kwa
         grades = list(generation.grades.all())
 
         # Set default parameters
+        general_config = SchedulingConfig.get_optimization_config("general")
         default_params = {
             "population_size": 50,
             "generations": 100,
             "mutation_rate": 0.1,
+            "patience": general_config.get("plateau_generations"),
+            "time_budget": general_config.get("max_execution_time"),
+            "progress_interval": general_config.get("progress_interval", 5),
         }
+        if algorithm == "genetic_parallel":
+            default_params.update(
+                {
+                    "workers": None,  # One island per CPU core
+                    "migration_interval": 10,
+                    "migration_size": 2,
+                }
+            )
         default_params.update(generation.parameters or {})
         default_params.update(kwargs)
 
         # Run optimization
         result = optimizer.generate_optimized_timetable(
-            grades=grades, algorithm=algorithm, **default_params
+            grades=grades, algorithm=algorithm, generation=generation, **default_params
         )
 
+        if result.stop_reason == STOP_CANCELLED:
+            # Keep the cancelled status; the best-so-far is recorded but not saved
+            generation.refresh_from_db()
+            generation.result_summary = {
+                "assigned_slots": len(result.assigned_slots),
+                "unassigned_slots": len(result.unassigned_slots),
+                "total_conflicts": len(result.conflicts),
+                "generations_run": result.generations_run,
+                "stop_reason": result.stop_reason,
+                "success": False,
+            }
+            generation.save(update_fields=["result_summary"])
+            logger.info(f"Timetable generation {generation_id} stopped on cancel")
+            return {"success": False, "cancelled": True}
+
         # Update generation with results
         generation.status = "completed" if result.success else "failed"
         generation.optimization_score = result.optimization_score
@@ -72,6 +107,8 @@ def generate_optimized_timetable(self, generation_id, algorithm="genetic", **kwa
             "assigned_slots": len(result.assigned_slots),
             "unassigned_slots": len(result.unassigned_slots),
             "total_conflicts": len(result.conflicts),
+            "generations_run": result.generations_run,
+            "stop_reason": result.stop_reason,
             "success": result.success,
         }
         generation.completed_at = timezone.now()
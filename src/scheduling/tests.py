@@ -1,18 +1,29 @@
 import json
+from dataclasses import replace
 from datetime import date, datetime, time, timedelta
+from io import StringIO
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase, TransactionTestCase
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
-from academics.models import AcademicYear, Class, Grade, Section, Term
-from accounts.models import User
-from subjects.models import Subject
-from teachers.models import Teacher, TeacherClassAssignment
+from src.academics.models import (
+    AcademicYear,
+    Class,
+    Department,
+    Grade,
+    Section,
+    Term,
+)
+from src.accounts.models import User
+from src.subjects.models import Subject
+from src.teachers.models import Teacher, TeacherClassAssignment
 
 from .models import (
     Room,
@@ -24,7 +35,13 @@ from .models import (
     TimetableTemplate,
 )
 from .services.analytics_service import SchedulingAnalyticsService
-from .services.optimization_service import OptimizationService
+from .services.genetic_engine import GeneticEngine
+from .services.occupancy_index import occupancy_index
+from .services.optimization_service import (
+    OptimizationService,
+    SchedulingResult,
+    SchedulingSlot,
+)
 from .services.timetable_service import RoomService, SubstituteService, TimetableService
 
 User = get_user_model()
@@ -34,6 +51,9 @@ class BaseSchedulingTestCase(TestCase):
     """Base test case with common setup for scheduling tests"""
 
     def setUp(self):
+        # Test data is rolled back without signals; start from a fresh index
+        occupancy_index.invalidate()
+
         # Create users
         self.admin_user = User.objects.create_user(
             username="admin",
@@ -52,6 +72,7 @@ class BaseSchedulingTestCase(TestCase):
             start_date=date(2024, 4, 1),
             end_date=date(2025, 3, 31),
             is_current=True,
+            created_by=self.admin_user,
         )
 
         self.term = Term.objects.create(
@@ -72,12 +93,20 @@ class BaseSchedulingTestCase(TestCase):
         )
 
         self.class_obj = Class.objects.create(
-            name="A", grade=self.grade, academic_year=self.academic_year, capacity=30
+            name="A",
+            grade=self.grade,
+            section=self.section,
+            academic_year=self.academic_year,
+            capacity=30,
         )
 
         # Create subject
+        self.department = Department.objects.create(name="Academics")
         self.subject = Subject.objects.create(
-            name="Mathematics", code="MATH001", credit_hours=5
+            name="Mathematics",
+            code="MATH001",
+            credit_hours=5,
+            department=self.department,
         )
 
         # Create teacher
@@ -85,14 +114,17 @@ class BaseSchedulingTestCase(TestCase):
             user=self.teacher_user,
             employee_id="T001",
             joining_date=date(2024, 1, 1),
-            status="active",
+            salary=0,
+            contract_type="Permanent",
+            status="Active",
         )
 
         # Create teacher assignment
         self.teacher_assignment = TeacherClassAssignment.objects.create(
             teacher=self.teacher,
-            class_assigned=self.class_obj,
+            class_instance=self.class_obj,
             subject=self.subject,
+            academic_year=self.term.academic_year,
             term=self.term,
             is_class_teacher=False,
         )
@@ -304,14 +336,15 @@ class TimetableServiceTest(BaseSchedulingTestCase):
         self.assertIn(self.teacher, available_teachers)
 
         # Create timetable and check again
-        TimetableService.create_timetable_entry(
-            class_assigned=self.class_obj,
-            subject=self.subject,
-            teacher=self.teacher,
-            time_slot=self.time_slot,
-            term=self.term,
-            room=self.room,
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            TimetableService.create_timetable_entry(
+                class_assigned=self.class_obj,
+                subject=self.subject,
+                teacher=self.teacher,
+                time_slot=self.time_slot,
+                term=self.term,
+                room=self.room,
+            )
 
         available_teachers = TimetableService.get_available_teachers(
             time_slot=self.time_slot,
@@ -378,7 +411,9 @@ class SubstituteServiceTest(BaseSchedulingTestCase):
             user=self.substitute_user,
             employee_id="S001",
             joining_date=date(2024, 1, 1),
-            status="active",
+            salary=0,
+            contract_type="Permanent",
+            status="Active",
         )
 
     def test_create_substitute_assignment(self):
@@ -404,6 +439,37 @@ class SubstituteServiceTest(BaseSchedulingTestCase):
         teacher_ids = [s["teacher"].id for s in suggestions]
         self.assertIn(self.substitute_teacher.id, teacher_ids)
 
+    def test_day_substitute_plan(self):
+        """Test ranking substitutes for a whole absence day"""
+        TeacherClassAssignment.objects.create(
+            teacher=self.substitute_teacher,
+            class_instance=self.class_obj,
+            subject=self.subject,
+            academic_year=self.term.academic_year,
+            term=self.term,
+        )
+        monday = date(2024, 4, 1)
+
+        plan = SubstituteService.get_day_substitute_plan(self.teacher, monday)
+
+        self.assertEqual(len(plan["periods"]), 1)
+        period = plan["periods"][0]
+        self.assertEqual(period["timetable"], self.timetable)
+        self.assertEqual(period["suggestions"][0]["teacher"], self.substitute_teacher)
+        self.assertEqual(period["suggestions"][0]["compatibility_score"], 120)
+        self.assertEqual(plan["full_day"], [self.substitute_teacher])
+
+        # A substitute duty in the slot makes the teacher unavailable
+        with self.captureOnCommitCallbacks(execute=True):
+            SubstituteService.create_substitute_assignment(
+                original_timetable=self.timetable,
+                substitute_teacher=self.substitute_teacher,
+                date=monday,
+                reason="Sick leave",
+            )
+        plan = SubstituteService.get_day_substitute_plan(self.teacher, monday)
+        self.assertEqual(plan["periods"][0]["suggestions"], [])
+
 
 class RoomServiceTest(BaseSchedulingTestCase):
     """Test RoomService"""
@@ -654,14 +720,15 @@ class OptimizationServiceTest(BaseSchedulingTestCase):
         )
 
         self.subject_2 = Subject.objects.create(
-            name="English", code="ENG001", credit_hours=4
+            name="English", code="ENG001", credit_hours=4, department=self.department
         )
 
         # Create teacher assignment for second subject
         TeacherClassAssignment.objects.create(
             teacher=self.teacher,
-            class_assigned=self.class_obj,
+            class_instance=self.class_obj,
             subject=self.subject_2,
+            academic_year=self.term.academic_year,
             term=self.term,
             is_class_teacher=False,
         )
@@ -687,6 +754,271 @@ class OptimizationServiceTest(BaseSchedulingTestCase):
         self.assertIn(self.subject, subjects_in_slots)
         self.assertIn(self.subject_2, subjects_in_slots)
 
+    def test_cache_invalidation_failures_are_logged(self):
+        """Test failing to clear cached timetables is logged, not hidden"""
+        optimizer = OptimizationService(self.term)
+        slots = optimizer._get_required_slots([self.grade])
+
+        with patch(
+            "src.scheduling.services.optimization_service.cache.delete_many",
+            side_effect=ConnectionError("cache down"),
+        ):
+            with self.assertLogs(
+                "src.scheduling.services.optimization_service", "WARNING"
+            ) as logs:
+                optimizer._invalidate_timetable_caches(slots)
+
+        self.assertIn("cache down", logs.output[0])
+
+    def test_every_engine_schedules_required_slots(self):
+        """Test each engine runs end to end against the assignment fixtures"""
+        # Enough periods for the nine weekly lessons of the two subjects
+        for day in range(1, 5):
+            for period, start in [(1, time(9, 0)), (2, time(10, 0))]:
+                TimeSlot.objects.create(
+                    day_of_week=day,
+                    start_time=start,
+                    end_time=time(start.hour, 45),
+                    duration_minutes=45,
+                    period_number=period,
+                    name=f"Period {period}",
+                )
+
+        for algorithm in ["greedy", "genetic", "genetic_parallel", "constraint"]:
+            with self.subTest(algorithm=algorithm):
+                optimizer = OptimizationService(self.term)
+                required_slots = optimizer._get_required_slots([self.grade])
+                result = optimizer.generate_optimized_timetable(
+                    grades=[self.grade],
+                    algorithm=algorithm,
+                    population_size=4,
+                    generations=3,
+                    workers=1,
+                )
+
+                self.assertTrue(result.success)
+                self.assertEqual(result.conflicts, [])
+                self.assertEqual(result.unassigned_slots, [])
+                self.assertEqual(len(result.assigned_slots), len(required_slots))
+                self.assertEqual(
+                    {slot.teacher for slot in result.assigned_slots}, {self.teacher}
+                )
+
+    def test_genetic_algorithm_score_matches_full_evaluation(self):
+        """Test incremental fitness agrees with the full fitness calculation"""
+        optimizer = OptimizationService(self.term)
+        result = optimizer.generate_optimized_timetable(
+            grades=[self.grade],
+            algorithm="genetic",
+            population_size=4,
+            generations=3,
+        )
+
+        schedule = result.assigned_slots + result.unassigned_slots
+        self.assertEqual(result.conflicts, [])
+        self.assertAlmostEqual(
+            result.optimization_score, optimizer._calculate_fitness(schedule), places=6
+        )
+
+    def test_parallel_genetic_algorithm_single_island(self):
+        """Test island model runs in-process with one worker"""
+        optimizer = OptimizationService(self.term)
+        result = optimizer.generate_optimized_timetable(
+            grades=[self.grade],
+            algorithm="genetic_parallel",
+            population_size=4,
+            generations=4,
+            workers=1,
+            migration_interval=2,
+        )
+
+        self.assertEqual(result.conflicts, [])
+        self.assertGreater(len(result.assigned_slots), 0)
+
+    def test_constraint_algorithm_assigns_without_conflicts(self):
+        """Test constraint propagation engine produces a conflict-free schedule"""
+        optimizer = OptimizationService(self.term)
+        result = optimizer.generate_optimized_timetable(
+            grades=[self.grade],
+            algorithm="constraint",
+            generations=3,
+        )
+
+        # Every available period of the single class is filled
+        schedule = result.assigned_slots + result.unassigned_slots
+        self.assertEqual(result.conflicts, [])
+        self.assertEqual(len(result.assigned_slots), len(optimizer.time_slots))
+        self.assertAlmostEqual(
+            result.optimization_score, optimizer._calculate_fitness(schedule), places=6
+        )
+
+    def test_bulk_save_diffs_existing_timetable(self):
+        """Test bulk save keeps unchanged entries instead of recreating them"""
+        optimizer = OptimizationService(self.term)
+        result = optimizer.generate_optimized_timetable(
+            grades=[self.grade], algorithm="greedy"
+        )
+
+        first = optimizer.save_schedule_to_database(result, self.admin_user)
+        entry_ids = set(
+            Timetable.objects.filter(term=self.term).values_list("id", flat=True)
+        )
+        second = optimizer.save_schedule_to_database(result, self.admin_user)
+
+        self.assertEqual(first["created"], len(result.assigned_slots))
+        self.assertEqual(second["created"], 0)
+        self.assertEqual(second["deleted"], 0)
+        self.assertEqual(second["unchanged"], len(result.assigned_slots))
+        self.assertEqual(
+            set(Timetable.objects.filter(term=self.term).values_list("id", flat=True)),
+            entry_ids,
+        )
+
+    def test_bulk_save_refreshes_availability(self):
+        """Test availability queries see entries written by the bulk save"""
+        monday = date(2024, 4, 1)
+        self.assertEqual(
+            TimetableService.get_available_rooms(self.time_slot, monday), [self.room]
+        )
+
+        optimizer = OptimizationService(self.term)
+        result = optimizer.generate_optimized_timetable(
+            grades=[self.grade], algorithm="greedy"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            optimizer.save_schedule_to_database(result, self.admin_user)
+
+        booked = Timetable.objects.get(term=self.term, time_slot=self.time_slot)
+        self.assertEqual(
+            TimetableService.get_available_rooms(self.time_slot, monday), []
+        )
+        self.assertNotIn(
+            booked.teacher,
+            TimetableService.get_available_teachers(
+                self.time_slot, booked.subject, monday
+            ),
+        )
+
+    def test_bulk_save_skips_conflicting_slots(self):
+        """Test in-memory validation drops slots that clash within the result"""
+        optimizer = OptimizationService(self.term)
+        slot = SchedulingSlot(
+            time_slot=self.time_slot,
+            class_obj=self.class_obj,
+            subject=self.subject,
+            teacher=self.teacher,
+            room=self.room,
+            is_assigned=True,
+        )
+        result = SchedulingResult(
+            success=True,
+            assigned_slots=[slot, replace(slot, subject=self.subject_2)],
+            unassigned_slots=[],
+            conflicts=[],
+            optimization_score=0,
+            execution_time=0,
+        )
+
+        save_result = optimizer.save_schedule_to_database(result, self.admin_user)
+
+        self.assertEqual(save_result["created"], 1)
+        self.assertEqual(len(save_result["errors"]), 1)
+        self.assertEqual(Timetable.objects.filter(term=self.term).count(), 1)
+
+    def test_genetic_algorithm_persists_progress(self):
+        """Test best-so-far results are written to the generation record"""
+        generation = TimetableGeneration.objects.create(
+            term=self.term, status="running"
+        )
+        optimizer = OptimizationService(self.term)
+
+        result = optimizer.generate_optimized_timetable(
+            grades=[self.grade],
+            population_size=4,
+            generations=2,
+            generation=generation,
+            progress_interval=1,
+        )
+
+        generation.refresh_from_db()
+        self.assertEqual(result.generations_run, 2)
+        self.assertEqual(generation.result_summary["progress"]["generation"], 2)
+        self.assertIsNotNone(generation.optimization_score)
+
+    def test_genetic_algorithm_stops_when_cancelled(self):
+        """Test cancelling the generation record stops the run"""
+        generation = TimetableGeneration.objects.create(
+            term=self.term, status="cancelled"
+        )
+        optimizer = OptimizationService(self.term)
+
+        result = optimizer.generate_optimized_timetable(
+            grades=[self.grade],
+            population_size=4,
+            generations=50,
+            generation=generation,
+            progress_interval=1,
+        )
+
+        self.assertEqual(result.stop_reason, "cancelled")
+        self.assertEqual(result.generations_run, 1)
+
+    def test_problem_encoding_round_trip(self):
+        """Test encoded schedules decode back to the original slots"""
+        optimizer = OptimizationService(self.term)
+        required_slots = optimizer._get_required_slots([self.grade])
+        problem = optimizer._encode_problem(required_slots)
+
+        self.assertEqual(problem.n_genes, len(required_slots))
+        self.assertEqual(problem.n_slots, len(optimizer.time_slots))
+
+        state = GeneticEngine(problem).construct()
+        schedule = optimizer._decode_schedule(required_slots, state)
+
+        self.assertEqual(len(schedule), len(required_slots))
+        for slot, original in zip(schedule, required_slots):
+            self.assertEqual(slot.subject, original.subject)
+            self.assertEqual(slot.is_assigned, slot.time_slot is not None)
+
+
+class BenchmarkCommandTest(TestCase):
+    """Smoke test the engine benchmark on generated sample data"""
+
+    def setUp(self):
+        occupancy_index.invalidate()
+        User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="testpass123"
+        )
+
+    def test_benchmark_runs_on_sample_data(self):
+        """Test every engine is benchmarked without saving a timetable"""
+        call_command(
+            "generate_sample_scheduling_data",
+            sections=1,
+            grades_per_section=1,
+            classes_per_grade=2,
+            teachers=6,
+            subjects=6,
+            rooms=10,
+            stdout=StringIO(),
+        )
+
+        out = StringIO()
+        call_command(
+            "benchmark_timetable_engines",
+            algorithms=["greedy", "genetic", "constraint"],
+            population_size=4,
+            generations=2,
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        self.assertIn("Benchmark Results", output)
+        for algorithm in ["greedy", "genetic", "constraint"]:
+            self.assertRegex(output, rf"(?m)^{algorithm}\s+\d")
+        self.assertIn("Best result:", output)
+        self.assertFalse(Timetable.objects.exists())
+
 
 class TimetableIntegrationTest(TransactionTestCase):
     """Integration tests for timetable functionality"""
@@ -763,7 +1095,9 @@ class TimetableIntegrationTest(TransactionTestCase):
                 user=user,
                 employee_id=f"T00{i + 1}",
                 joining_date=date(2024, 1, 1),
-                status="active",
+                salary=0,
+                contract_type="Permanent",
+                status="Active",
             )
             self.teachers.append(teacher)
 
@@ -784,8 +1118,9 @@ class TimetableIntegrationTest(TransactionTestCase):
         for i, (teacher, subject) in enumerate(zip(self.teachers, self.subjects)):
             TeacherClassAssignment.objects.create(
                 teacher=teacher,
-                class_assigned=self.class_obj,
+                class_instance=self.class_obj,
                 subject=subject,
+                academic_year=self.term.academic_year,
                 term=self.term,
                 is_class_teacher=(i == 0),  # First teacher is class teacher
             )
@@ -15,6 +15,7 @@ from ..models import Parent, Student, StudentParentRelation
 from ..permissions import IsParent, IsSchoolAdmin, IsTeacher
 from ..services.analytics_service import StudentAnalyticsService
 from ..services.parent_service import ParentService
+from ..services.search_index import suggest_parents
 from ..services.search_service import StudentSearchService
 from ..services.student_service import StudentService
 from .serializers import (
@@ -157,7 +158,7 @@ def bulk_import_students(request):
 
         result = StudentService.bulk_import_students(
             csv_file=csv_file,
-            send_notifications=send_notifications,
+            send_welcome_emails=send_notifications,
             update_existing=update_existing,
             created_by=request.user,
         )
@@ -281,9 +282,7 @@ def parent_autocomplete(request):
     try:
         query = request.GET.get("q", "")
 
-        parents = Parent.objects.filter(
-            user__first_name__icontains=query
-        ).select_related("user")[:10]
+        parents = suggest_parents(query, 10)
 
         suggestions = [
             {
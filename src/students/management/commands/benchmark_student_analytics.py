@@ -0,0 +1,106 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from src.core.instrumentation import QueryCounter
+from src.students.models import Student
+from src.students.services.analytics_service import StudentAnalyticsService
+
+SECTIONS = [
+    ("student_statistics", StudentAnalyticsService.get_student_statistics),
+    ("parent_statistics", StudentAnalyticsService.get_parent_statistics),
+    ("enrollment_trends", StudentAnalyticsService.get_enrollment_trends),
+    ("demographics", StudentAnalyticsService.get_demographics_analysis),
+    ("performance_metrics", StudentAnalyticsService.get_performance_metrics),
+    ("class_distribution", StudentAnalyticsService.get_class_distribution),
+    ("geographic_analysis", StudentAnalyticsService.get_geographic_analysis),
+    ("communication_stats", StudentAnalyticsService.get_communication_statistics),
+]
+
+
+class Command(BaseCommand):
+    """Measure the queries and time spent building the student dashboard"""
+
+    help = (
+        "Benchmark StudentAnalyticsService.get_comprehensive_dashboard_data, "
+        "reporting query count and wall time with a cold and a warm cache. "
+        "Run generate_sample_students first for a realistic data set."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=3,
+            help="Number of cold-cache runs to average (default: 3)",
+        )
+
+        parser.add_argument(
+            "--sections",
+            action="store_true",
+            help="Also time each dashboard section separately",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution"""
+
+        runs = options["runs"]
+        if runs < 1:
+            raise CommandError("--runs must be at least 1")
+
+        self.stdout.write(
+            f"Benchmarking student dashboard analytics over "
+            f"{Student.objects.count()} students ({runs} runs)\n"
+        )
+
+        rows = []
+        cold = [self._measure(self._cold_dashboard) for _ in range(runs)]
+        rows.append(("dashboard (cold cache)", *self._average(cold)))
+        rows.append(
+            (
+                "dashboard (warm cache)",
+                *self._measure(
+                    StudentAnalyticsService.get_comprehensive_dashboard_data
+                ),
+            )
+        )
+
+        if options["sections"]:
+            for name, method in SECTIONS:
+                rows.append(
+                    (name, *self._average([self._measure(method) for _ in range(runs)]))
+                )
+
+        StudentAnalyticsService.clear_analytics_cache()
+        self._display_results(rows)
+
+    def _cold_dashboard(self):
+        """Build the dashboard from the database"""
+        StudentAnalyticsService.clear_analytics_cache()
+        return StudentAnalyticsService.get_comprehensive_dashboard_data()
+
+    def _measure(self, method):
+        """Run method once and return its query count, query time and wall time"""
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            method()
+        wall_ms = (time.perf_counter() - started) * 1000
+        return counter.count, counter.duration_ms, wall_ms
+
+    def _average(self, measurements):
+        return tuple(sum(values) / len(values) for values in zip(*measurements))
+
+    def _display_results(self, rows):
+        """Print a results table"""
+
+        header = f"{'Measurement':<26}{'Queries':>9}{'SQL (ms)':>11}{'Wall (ms)':>11}"
+        self.stdout.write(self.style.SUCCESS("Benchmark Results"))
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for name, queries, sql_ms, wall_ms in rows:
+            self.stdout.write(
+                f"{name:<26}{queries:>9.0f}{sql_ms:>11.2f}{wall_ms:>11.2f}"
+            )
@@ -376,7 +376,9 @@ class Command(BaseCommand):
             with open(file_path, "rb") as f:
                 if data_type == "students":
                     result = StudentService.bulk_import_students(
-                        f, send_notifications, update_existing
+                        f,
+                        send_welcome_emails=send_notifications,
+                        update_existing=update_existing,
                     )
                 elif data_type == "parents":
                     result = ParentService.bulk_import_parents(
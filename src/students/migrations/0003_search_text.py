@@ -0,0 +1,114 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:32
+
+import re
+import unicodedata
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Frozen copy of search_index.build_search_text as of this migration, so
+# later changes to the live tokenizer can't alter what this backfill writes
+_SEPARATORS = re.compile(r"[^\w@.+/-]+")
+
+
+def search_terms(value):
+    if not value:
+        return []
+    text = str(value)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return [term for term in _SEPARATORS.split(text.lower()) if term]
+
+
+def build_search_text(*values):
+    words = [term for value in values for term in search_terms(value)]
+    return f" {' '.join(words)} " if words else ""
+
+
+TRIGRAM_INDEXES = [
+    ("students_student_search_trgm", "students_student"),
+    ("students_parent_search_trgm", "students_parent"),
+]
+
+
+def fill_search_text(apps, schema_editor):
+    Student = apps.get_model("students", "Student")
+    Parent = apps.get_model("students", "Parent")
+    StudentParentRelation = apps.get_model("students", "StudentParentRelation")
+
+    parent_names = {}
+    relations = StudentParentRelation.objects.values_list(
+        "student_id", "parent__user__first_name", "parent__user__last_name"
+    )
+    for student_id, first_name, last_name in relations.iterator():
+        parent_names.setdefault(student_id, []).extend([first_name, last_name])
+
+    students = []
+    for student in Student.objects.select_related("current_class").iterator():
+        student.search_text = build_search_text(
+            student.first_name,
+            student.last_name,
+            student.admission_number,
+            student.roll_number,
+            student.email,
+            student.current_class.name if student.current_class_id else None,
+            *parent_names.get(student.id, ()),
+        )
+        students.append(student)
+    Student.objects.bulk_update(students, ["search_text"], batch_size=500)
+
+    parents = []
+    for parent in Parent.objects.select_related("user").iterator():
+        parent.search_text = build_search_text(
+            parent.user.first_name,
+            parent.user.last_name,
+            parent.user.email,
+            parent.user.phone_number,
+            parent.occupation,
+            parent.workplace,
+        )
+        parents.append(parent)
+    Parent.objects.bulk_update(parents, ["search_text"], batch_size=500)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes are PostgreSQL-only, so they can't be declared in
+    # Meta.indexes without breaking SQLite databases
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin (search_text gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("students", "0002_remove_student_students_st_user_id_362ff8_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="parent",
+            name="search_text",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="student",
+            name="search_text",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        TrigramExtension(),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -6,7 +6,7 @@ from django.conf import settings
 from django.core.cache import cache
 from django.core.validators import MinLengthValidator, RegexValidator
 from django.db import models
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.utils import timezone
 
 from src.academics.models import AcademicYear, Class
@@ -39,15 +39,15 @@ class StudentQuerySet(models.QuerySet):
         return self.prefetch_related("student_parent_relations__parent__user")
 
     def search(self, query):
+        """Students matching every word of the query, best matches first"""
+        from .services.search_index import matching, rank_students
+
         if not query:
             return self
-        return self.filter(
-            Q(admission_number__icontains=query)
-            | Q(first_name__icontains=query)
-            | Q(last_name__icontains=query)
-            | Q(email__icontains=query)
-            | Q(roll_number__icontains=query)
-        )
+        queryset, terms = matching(self, query)
+        if not terms:
+            return self
+        return rank_students(queryset, query, terms)
 
 
 class Student(models.Model):
@@ -149,6 +149,9 @@ class Student(models.Model):
     previous_school = models.CharField(max_length=200, blank=True)
     transfer_certificate_number = models.CharField(max_length=100, blank=True)
 
+    # Normalized words the student is found by; see services/search_index.py
+    search_text = models.TextField(blank=True, default="", editable=False)
+
     # Status and Metadata
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default="Active", db_index=True
@@ -379,15 +382,15 @@ class ParentQuerySet(models.QuerySet):
         return self.prefetch_related("parent_student_relations__student")
 
     def search(self, query):
+        """Parents matching every word of the query, best matches first"""
+        from .services.search_index import matching, rank_parents
+
         if not query:
             return self
-        return self.filter(
-            Q(user__first_name__icontains=query)
-            | Q(user__last_name__icontains=query)
-            | Q(user__email__icontains=query)
-            | Q(user__phone_number__icontains=query)
-            | Q(occupation__icontains=query)
-        )
+        queryset, terms = matching(self, query)
+        if not terms:
+            return self
+        return rank_parents(queryset, terms)
 
 
 class Parent(models.Model):
@@ -433,6 +436,9 @@ class Parent(models.Model):
     emergency_contact = models.BooleanField(default=True, db_index=True)
     photo = models.ImageField(upload_to="parent_photos/%Y/%m/", blank=True, null=True)
 
+    # Normalized words the parent is found by; see services/search_index.py
+    search_text = models.TextField(blank=True, default="", editable=False)
+
     # Metadata fields
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -1,6 +1,7 @@
 # students/services/__init__.py
 from .analytics_service import StudentAnalyticsService
 from .communication_service import CommunicationService
+from .import_service import StudentImportService
 from .parent_service import ParentService
 from .reporting_service import StudentReportingService
 from .search_service import StudentSearchService
@@ -13,4 +14,5 @@ __all__ = [
     "CommunicationService",
     "StudentSearchService",
     "StudentReportingService",
+    "StudentImportService",
 ]
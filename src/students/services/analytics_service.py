@@ -1,9 +1,33 @@
 # students/services/analytics_service.py
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 from django.core.cache import cache
-from django.db.models import Avg, Count, F, Max, Min, Q
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    Exists,
+    ExpressionWrapper,
+    FloatField,
+    IntegerField,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import (
+    Cast,
+    Coalesce,
+    ExtractMonth,
+    ExtractYear,
+    NullIf,
+)
+from django.db.models.lookups import Exact
 from django.utils import timezone
 
 from ..exceptions import AnalyticsError
@@ -45,70 +69,58 @@ class StudentAnalyticsService:
     def get_student_statistics():
         """Get comprehensive student statistics"""
         try:
-            total_students = Student.objects.count()
-
-            stats = {
-                "total_students": total_students,
-                "active_students": Student.objects.filter(status="Active").count(),
-                "inactive_students": Student.objects.filter(status="Inactive").count(),
-                "graduated_students": Student.objects.filter(
-                    status="Graduated"
-                ).count(),
-                "suspended_students": Student.objects.filter(
-                    status="Suspended"
-                ).count(),
-                "withdrawn_students": Student.objects.filter(
-                    status="Withdrawn"
-                ).count(),
-                "status_breakdown": dict(
-                    Student.objects.values("status")
-                    .annotate(count=Count("id"))
-                    .values_list("status", "count")
+            today = timezone.now().date()
+            has_photo = Q(profile_picture__isnull=False) & ~Q(profile_picture="")
+
+            stats = Student.objects.aggregate(
+                total_students=Count("id"),
+                active_students=Count("id", filter=Q(status="Active")),
+                inactive_students=Count("id", filter=Q(status="Inactive")),
+                graduated_students=Count("id", filter=Q(status="Graduated")),
+                suspended_students=Count("id", filter=Q(status="Suspended")),
+                withdrawn_students=Count("id", filter=Q(status="Withdrawn")),
+                students_with_photos=Count("id", filter=has_photo),
+                students_without_parents=Count(
+                    "id", filter=~Q(StudentAnalyticsService._has_parent())
                 ),
-                "blood_group_distribution": dict(
-                    Student.objects.values("blood_group")
-                    .annotate(count=Count("id"))
-                    .values_list("blood_group", "count")
+                students_with_medical_conditions=Count(
+                    "id",
+                    filter=Q(medical_conditions__isnull=False)
+                    & ~Q(medical_conditions=""),
                 ),
-                "students_with_photos": Student.objects.exclude(photo="").count(),
-                "students_without_parents": Student.objects.filter(
-                    student_parent_relations__isnull=True
-                ).count(),
-                "students_with_medical_conditions": Student.objects.exclude(
-                    medical_conditions__isnull=True
-                )
-                .exclude(medical_conditions="")
-                .count(),
-                "recent_admissions": Student.objects.filter(
-                    admission_date__gte=timezone.now().date() - timedelta(days=30)
-                ).count(),
-                "completion_percentage": StudentAnalyticsService._calculate_overall_completion_percentage(),
-            }
+                recent_admissions=Count(
+                    "id", filter=Q(admission_date__gte=today - timedelta(days=30))
+                ),
+                completion_score=Avg(StudentAnalyticsService._completion_score()),
+            )
+            total_students = stats["total_students"]
+            stats["completion_percentage"] = StudentAnalyticsService._score_percentage(
+                stats.pop("completion_score")
+            )
+
+            stats["status_breakdown"] = dict(
+                Student.objects.order_by()
+                .values("status")
+                .annotate(count=Count("id"))
+                .values_list("status", "count")
+            )
+            stats["blood_group_distribution"] = dict(
+                Student.objects.order_by()
+                .values("blood_group")
+                .annotate(count=Count("id"))
+                .values_list("blood_group", "count")
+            )
 
             # Calculate percentages
-            if total_students > 0:
-                stats["active_percentage"] = round(
-                    (stats["active_students"] / total_students) * 100, 2
-                )
-                stats["photo_completion_percentage"] = round(
-                    (stats["students_with_photos"] / total_students) * 100, 2
-                )
-                stats["parent_linkage_percentage"] = round(
-                    (
-                        (total_students - stats["students_without_parents"])
-                        / total_students
-                    )
-                    * 100,
-                    2,
-                )
-            else:
-                stats.update(
-                    {
-                        "active_percentage": 0,
-                        "photo_completion_percentage": 0,
-                        "parent_linkage_percentage": 0,
-                    }
-                )
+            stats["active_percentage"] = StudentAnalyticsService._percentage(
+                stats["active_students"], total_students
+            )
+            stats["photo_completion_percentage"] = StudentAnalyticsService._percentage(
+                stats["students_with_photos"], total_students
+            )
+            stats["parent_linkage_percentage"] = StudentAnalyticsService._percentage(
+                total_students - stats["students_without_parents"], total_students
+            )
 
             return stats
         except Exception as e:
@@ -119,57 +131,51 @@ class StudentAnalyticsService:
     def get_parent_statistics():
         """Get comprehensive parent statistics"""
         try:
-            total_parents = Parent.objects.count()
+            relation_breakdown = dict(
+                Parent.objects.order_by()
+                .values("relation_with_student")
+                .annotate(count=Count("id"))
+                .values_list("relation_with_student", "count")
+            )
 
-            stats = {
-                "total_parents": total_parents,
-                "fathers": Parent.objects.filter(
-                    relation_with_student="Father"
-                ).count(),
-                "mothers": Parent.objects.filter(
-                    relation_with_student="Mother"
-                ).count(),
-                "guardians": Parent.objects.filter(
-                    relation_with_student="Guardian"
-                ).count(),
-                "emergency_contacts": Parent.objects.filter(
-                    emergency_contact=True
-                ).count(),
-                "relation_breakdown": dict(
-                    Parent.objects.values("relation_with_student")
-                    .annotate(count=Count("id"))
-                    .values_list("relation_with_student", "count")
+            # A parent has several children if another child's relation exists
+            other_child = StudentParentRelation.objects.filter(
+                parent=OuterRef("parent"), student_id__lt=OuterRef("student_id")
+            )
+            stats = Parent.objects.aggregate(
+                total_parents=Count("id"),
+                emergency_contacts=Count("id", filter=Q(emergency_contact=True)),
+                parents_with_workplace_info=Count(
+                    "id", filter=Q(workplace__isnull=False) & ~Q(workplace="")
                 ),
-                "parents_with_multiple_children": Parent.objects.annotate(
-                    child_count=Count("parent_student_relations")
-                )
-                .filter(child_count__gt=1)
-                .count(),
-                "parents_with_workplace_info": Parent.objects.exclude(
-                    workplace__isnull=True
+            )
+            stats.update(
+                StudentParentRelation.objects.aggregate(
+                    parents_with_multiple_children=Count(
+                        "parent", distinct=True, filter=Q(Exists(other_child))
+                    ),
+                    primary_contacts=Count("id", filter=Q(is_primary_contact=True)),
+                    financial_responsible_parents=Count(
+                        "id", filter=Q(financial_responsibility=True)
+                    ),
                 )
-                .exclude(workplace="")
-                .count(),
-                "primary_contacts": StudentParentRelation.objects.filter(
-                    is_primary_contact=True
-                ).count(),
-                "financial_responsible_parents": StudentParentRelation.objects.filter(
-                    financial_responsibility=True
-                ).count(),
-            }
+            )
 
-            # Calculate percentages
-            if total_parents > 0:
-                stats["emergency_percentage"] = round(
-                    (stats["emergency_contacts"] / total_parents) * 100, 2
-                )
-                stats["workplace_completion_percentage"] = round(
-                    (stats["parents_with_workplace_info"] / total_parents) * 100, 2
-                )
-            else:
-                stats.update(
-                    {"emergency_percentage": 0, "workplace_completion_percentage": 0}
-                )
+            total_parents = stats["total_parents"]
+            stats.update(
+                {
+                    "fathers": relation_breakdown.get("Father", 0),
+                    "mothers": relation_breakdown.get("Mother", 0),
+                    "guardians": relation_breakdown.get("Guardian", 0),
+                    "relation_breakdown": relation_breakdown,
+                    "emergency_percentage": StudentAnalyticsService._percentage(
+                        stats["emergency_contacts"], total_parents
+                    ),
+                    "workplace_completion_percentage": StudentAnalyticsService._percentage(
+                        stats["parents_with_workplace_info"], total_parents
+                    ),
+                }
+            )
 
             return stats
         except Exception as e:
@@ -181,41 +187,40 @@ class StudentAnalyticsService:
         """Get enrollment trends over time"""
         try:
             # Get enrollment by year
-            yearly_enrollments = (
-                Student.objects.extra(
-                    select={"year": "EXTRACT(year FROM admission_date)"}
-                )
+            yearly_enrollments = list(
+                Student.objects.annotate(year=ExtractYear("admission_date"))
+                .order_by("year")
                 .values("year")
                 .annotate(count=Count("id"))
-                .order_by("year")
             )
 
             # Get enrollment by month for current year
             current_year = timezone.now().year
-            monthly_enrollments = (
+            monthly_enrollments = list(
                 Student.objects.filter(admission_date__year=current_year)
-                .extra(select={"month": "EXTRACT(month FROM admission_date)"})
+                .annotate(month=ExtractMonth("admission_date"))
+                .order_by("month")
                 .values("month")
                 .annotate(count=Count("id"))
-                .order_by("month")
             )
 
             # Get class-wise enrollment
-            class_enrollments = (
+            class_enrollments = list(
                 Student.objects.filter(status="Active", current_class__isnull=False)
+                .order_by("current_class__grade__name")
                 .values("current_class__grade__name", "current_class__section__name")
                 .annotate(count=Count("id"))
-                .order_by("current_class__grade__name")
             )
 
+            by_year = {row["year"]: row["count"] for row in yearly_enrollments}
             return {
-                "yearly_trends": list(yearly_enrollments),
-                "monthly_trends_current_year": list(monthly_enrollments),
-                "class_wise_enrollment": list(class_enrollments),
-                "total_current_year": Student.objects.filter(
-                    admission_date__year=current_year
-                ).count(),
-                "growth_rate": StudentAnalyticsService._calculate_enrollment_growth_rate(),
+                "yearly_trends": yearly_enrollments,
+                "monthly_trends_current_year": monthly_enrollments,
+                "class_wise_enrollment": class_enrollments,
+                "total_current_year": by_year.get(current_year, 0),
+                "growth_rate": StudentAnalyticsService._calculate_enrollment_growth_rate(
+                    by_year
+                ),
             }
         except Exception as e:
             logger.error(f"Error getting enrollment trends: {str(e)}")
@@ -223,58 +228,18 @@ class StudentAnalyticsService:
 
     @staticmethod
     def get_demographics_analysis():
-        """Get demographic analysis"""
-        try:
-            # Age distribution
-            age_stats = StudentAnalyticsService._get_age_statistics()
-
-            # Geographic distribution
-            city_distribution = dict(
-                Student.objects.exclude(city__isnull=True)
-                .exclude(city="")
-                .values("city")
-                .annotate(count=Count("id"))
-                .order_by("-count")[:10]
-                .values_list("city", "count")
-            )
-
-            state_distribution = dict(
-                Student.objects.exclude(state__isnull=True)
-                .exclude(state="")
-                .values("state")
-                .annotate(count=Count("id"))
-                .order_by("-count")
-                .values_list("state", "count")
-            )
-
-            # Nationality distribution
-            nationality_distribution = dict(
-                Student.objects.exclude(nationality__isnull=True)
-                .exclude(nationality="")
-                .values("nationality")
-                .annotate(count=Count("id"))
-                .order_by("-count")
-                .values_list("nationality", "count")
-            )
-
-            # Religion distribution
-            religion_distribution = dict(
-                Student.objects.exclude(religion__isnull=True)
-                .exclude(religion="")
-                .values("religion")
-                .annotate(count=Count("id"))
-                .order_by("-count")
-                .values_list("religion", "count")
-            )
+        """
+        Get demographic analysis
 
+        Students carry no city, state, nationality or religion fields, so
+        those distributions stay empty and only ages are analysed.
+        """
+        try:
             return {
-                "age_statistics": age_stats,
-                "geographic_distribution": {
-                    "cities": city_distribution,
-                    "states": state_distribution,
-                },
-                "nationality_distribution": nationality_distribution,
-                "religion_distribution": religion_distribution,
+                "age_statistics": StudentAnalyticsService._get_age_statistics(),
+                "geographic_distribution": {"cities": {}, "states": {}},
+                "nationality_distribution": {},
+                "religion_distribution": {},
                 "diversity_index": StudentAnalyticsService._calculate_diversity_index(),
             }
         except Exception as e:
@@ -294,54 +259,74 @@ class StudentAnalyticsService:
 
             # Try to calculate if attendance data available
             try:
-                attendance_data = []
-                for student in Student.objects.filter(status="Active"):
-                    percentage = student.get_attendance_percentage()
-                    attendance_data.append(percentage)
-
-                if attendance_data:
-                    attendance_stats = {
-                        "students_with_good_attendance": len(
-                            [p for p in attendance_data if p >= 90]
-                        ),
-                        "students_with_poor_attendance": len(
-                            [p for p in attendance_data if p < 75]
-                        ),
-                        "average_attendance": round(
-                            sum(attendance_data) / len(attendance_data), 2
-                        ),
-                    }
-            except:
-                pass  # Attendance module might not be available
-
-            # Family structure analysis
-            family_stats = {
-                "students_with_both_parents": StudentParentRelation.objects.filter(
-                    parent__relation_with_student__in=["Father", "Mother"]
-                )
+                attendance_stats = StudentAnalyticsService._get_attendance_statistics()
+            except Exception as e:
+                # Attendance module might not be available
+                logger.warning(f"Attendance metrics unavailable: {str(e)}")
+
+            relations = StudentParentRelation.objects.filter(student=OuterRef("pk"))
+            parent_counts = (
+                relations.order_by()
                 .values("student")
-                .annotate(parent_count=Count("parent"))
-                .filter(parent_count=2)
-                .count(),
-                "students_with_single_parent": Student.objects.annotate(
-                    parent_count=Count("student_parent_relations")
-                )
-                .filter(parent_count=1)
-                .count(),
-                "students_with_guardians": Student.objects.filter(
-                    student_parent_relations__parent__relation_with_student="Guardian"
-                )
-                .distinct()
-                .count(),
-            }
+                .annotate(count=Count("id"))
+                .values("count")
+            )
+            # "Both parents" means exactly two Father/Mother links
+            mother_father_counts = parent_counts.filter(
+                parent__relation_with_student__in=["Father", "Mother"]
+            )
+            has_photo = Q(profile_picture__isnull=False) & ~Q(profile_picture="")
+
+            # Family structure and completion rates in one pass over students
+            totals = Student.objects.aggregate(
+                total=Count("id"),
+                students_with_both_parents=Count(
+                    "id",
+                    filter=Exact(
+                        Subquery(mother_father_counts, output_field=IntegerField()), 2
+                    ),
+                ),
+                students_with_single_parent=Count(
+                    "id",
+                    filter=Exact(
+                        Subquery(parent_counts, output_field=IntegerField()), 1
+                    ),
+                ),
+                students_with_guardians=Count(
+                    "id",
+                    filter=Q(
+                        Exists(
+                            relations.filter(parent__relation_with_student="Guardian")
+                        )
+                    ),
+                ),
+                with_photos=Count("id", filter=has_photo),
+                with_parents=Count(
+                    "id", filter=Q(StudentAnalyticsService._has_parent())
+                ),
+                completion_score=Avg(StudentAnalyticsService._completion_score()),
+            )
 
+            total = totals["total"]
             return {
                 "attendance_metrics": attendance_stats,
-                "family_structure": family_stats,
+                "family_structure": {
+                    "students_with_both_parents": totals["students_with_both_parents"],
+                    "students_with_single_parent": totals[
+                        "students_with_single_parent"
+                    ],
+                    "students_with_guardians": totals["students_with_guardians"],
+                },
                 "completion_rates": {
-                    "profile_completion": StudentAnalyticsService._calculate_overall_completion_percentage(),
-                    "document_completion": StudentAnalyticsService._calculate_document_completion(),
-                    "parent_linkage": StudentAnalyticsService._calculate_parent_linkage_completion(),
+                    "profile_completion": StudentAnalyticsService._score_percentage(
+                        totals["completion_score"]
+                    ),
+                    "document_completion": StudentAnalyticsService._percentage(
+                        totals["with_photos"], total
+                    ),
+                    "parent_linkage": StudentAnalyticsService._percentage(
+                        totals["with_parents"], total
+                    ),
                 },
             }
         except Exception as e:
@@ -353,41 +338,35 @@ class StudentAnalyticsService:
         """Get class-wise distribution analysis"""
         try:
             # Get class distribution
-            class_data = (
+            class_data = list(
                 Student.objects.filter(status="Active", current_class__isnull=False)
+                .order_by("current_class__grade__name", "current_class__section__name")
                 .values(
                     "current_class__grade__name",
                     "current_class__section__name",
                     "current_class__id",
+                    "current_class__capacity",
                 )
                 .annotate(student_count=Count("id"))
-                .order_by("current_class__grade__name", "current_class__section__name")
             )
 
             # Calculate capacity utilization if available
             capacity_analysis = []
             for class_info in class_data:
-                try:
-                    from src.academics.models import Class
-
-                    class_obj = Class.objects.get(id=class_info["current_class__id"])
-                    if class_obj.capacity:
-                        utilization = (
-                            class_info["student_count"] / class_obj.capacity
-                        ) * 100
-                        capacity_analysis.append(
-                            {
-                                "class_name": f"{class_info['current_class__grade__name']} {class_info['current_class__section__name']}",
-                                "student_count": class_info["student_count"],
-                                "capacity": class_obj.capacity,
-                                "utilization_percentage": round(utilization, 2),
-                            }
-                        )
-                except:
-                    pass
+                capacity = class_info.pop("current_class__capacity")
+                if capacity:
+                    utilization = (class_info["student_count"] / capacity) * 100
+                    capacity_analysis.append(
+                        {
+                            "class_name": f"{class_info['current_class__grade__name']} {class_info['current_class__section__name']}",
+                            "student_count": class_info["student_count"],
+                            "capacity": capacity,
+                            "utilization_percentage": round(utilization, 2),
+                        }
+                    )
 
             return {
-                "class_wise_distribution": list(class_data),
+                "class_wise_distribution": class_data,
                 "capacity_analysis": capacity_analysis,
                 "total_classes": len(class_data),
                 "average_class_size": (
@@ -405,149 +384,232 @@ class StudentAnalyticsService:
 
     @staticmethod
     def get_geographic_analysis():
-        """Get detailed geographic analysis"""
-        try:
-            # City-wise analysis
-            city_analysis = (
-                Student.objects.exclude(city__isnull=True)
-                .exclude(city="")
-                .values("city", "state")
-                .annotate(count=Count("id"))
-                .order_by("-count")
-            )
-
-            # State-wise summary
-            state_summary = {}
-            for item in city_analysis:
-                state = item["state"] or "Unknown"
-                if state not in state_summary:
-                    state_summary[state] = {"cities": 0, "students": 0}
-                state_summary[state]["cities"] += 1
-                state_summary[state]["students"] += item["count"]
+        """
+        Get detailed geographic analysis
 
-            return {
-                "city_analysis": list(city_analysis),
-                "state_summary": state_summary,
-                "coverage_area": {
-                    "total_cities": len(set(item["city"] for item in city_analysis)),
-                    "total_states": len(state_summary),
-                    "students_with_address": Student.objects.exclude(city__isnull=True)
-                    .exclude(city="")
-                    .count(),
-                },
-            }
-        except Exception as e:
-            logger.error(f"Error getting geographic analysis: {str(e)}")
-            raise AnalyticsError(f"Failed to get geographic analysis: {str(e)}")
+        Students only have a free-text address, with no city or state to
+        group by, so every breakdown is empty.
+        """
+        return {
+            "city_analysis": [],
+            "state_summary": {},
+            "coverage_area": {
+                "total_cities": 0,
+                "total_states": 0,
+                "students_with_address": 0,
+            },
+        }
 
     @staticmethod
     def get_communication_statistics():
         """Get communication and engagement statistics"""
         try:
-            relations = StudentParentRelation.objects.all()
-
-            stats = {
-                "total_relationships": relations.count(),
-                "email_enabled": relations.filter(receive_email=True).count(),
-                "sms_enabled": relations.filter(receive_sms=True).count(),
-                "push_enabled": relations.filter(
-                    receive_push_notifications=True
-                ).count(),
-                "grade_access": relations.filter(access_to_grades=True).count(),
-                "attendance_access": relations.filter(
-                    access_to_attendance=True
-                ).count(),
-                "financial_access": relations.filter(
-                    access_to_financial_info=True
-                ).count(),
-                "pickup_authorized": relations.filter(can_pickup=True).count(),
-                "primary_contacts": relations.filter(is_primary_contact=True).count(),
-            }
+            stats = StudentParentRelation.objects.aggregate(
+                total_relationships=Count("id"),
+                email_enabled=Count("id", filter=Q(receive_email=True)),
+                sms_enabled=Count("id", filter=Q(receive_sms=True)),
+                push_enabled=Count("id", filter=Q(receive_push_notifications=True)),
+                grade_access=Count("id", filter=Q(access_to_grades=True)),
+                attendance_access=Count("id", filter=Q(access_to_attendance=True)),
+                financial_access=Count("id", filter=Q(access_to_financial_info=True)),
+                pickup_authorized=Count("id", filter=Q(can_pickup=True)),
+                primary_contacts=Count("id", filter=Q(is_primary_contact=True)),
+            )
 
             # Calculate engagement percentages
             total = stats["total_relationships"]
-            if total > 0:
-                stats["engagement_percentages"] = {
-                    "email_engagement": round(
-                        (stats["email_enabled"] / total) * 100, 2
-                    ),
-                    "sms_engagement": round((stats["sms_enabled"] / total) * 100, 2),
-                    "push_engagement": round((stats["push_enabled"] / total) * 100, 2),
-                }
-            else:
-                stats["engagement_percentages"] = {
-                    "email_engagement": 0,
-                    "sms_engagement": 0,
-                    "push_engagement": 0,
-                }
+            stats["engagement_percentages"] = {
+                "email_engagement": StudentAnalyticsService._percentage(
+                    stats["email_enabled"], total
+                ),
+                "sms_engagement": StudentAnalyticsService._percentage(
+                    stats["sms_enabled"], total
+                ),
+                "push_engagement": StudentAnalyticsService._percentage(
+                    stats["push_enabled"], total
+                ),
+            }
 
             return stats
         except Exception as e:
             logger.error(f"Error getting communication statistics: {str(e)}")
             raise AnalyticsError(f"Failed to get communication statistics: {str(e)}")
 
+    @staticmethod
+    def _percentage(part, total):
+        return round((part / total) * 100, 2) if total else 0
+
+    @staticmethod
+    def _has_parent():
+        return Exists(StudentParentRelation.objects.filter(student=OuterRef("pk")))
+
+    @staticmethod
+    def _completion_score():
+        """
+        Number of filled-in profile fields of a student, as a SQL expression
+
+        Scores 0-10: names, email, date of birth, emergency contact name and
+        number, photo, address, class, and a linked parent.
+        """
+        filled = [
+            ~Q(first_name=""),
+            ~Q(last_name=""),
+            Q(email__isnull=False) & ~Q(email=""),
+            Q(date_of_birth__isnull=False),
+            ~Q(emergency_contact_name=""),
+            ~Q(emergency_contact_number=""),
+            Q(profile_picture__isnull=False) & ~Q(profile_picture=""),
+            ~Q(address=""),
+            Q(current_class__isnull=False),
+            Q(StudentAnalyticsService._has_parent()),
+        ]
+        score = Value(0)
+        for condition in filled:
+            score = score + Case(When(condition, then=Value(1)), default=Value(0))
+        return ExpressionWrapper(score, output_field=IntegerField())
+
+    @staticmethod
+    def _score_percentage(average_score):
+        """Average completion score (out of 10) as a percentage"""
+        return round(average_score * 10, 2) if average_score is not None else 0
+
+    @staticmethod
+    def _years_before(day, years):
+        """The date `years` years before `day`; 29 February falls back a day"""
+        try:
+            return day.replace(year=day.year - years)
+        except ValueError:
+            return day.replace(year=day.year - years, day=28)
+
+    @staticmethod
+    def _age_on(day, date_of_birth):
+        return (
+            day.year
+            - date_of_birth.year
+            - ((day.month, day.day) < (date_of_birth.month, date_of_birth.day))
+        )
+
     @staticmethod
     def _get_age_statistics():
-        """Calculate age-related statistics"""
-        ages = []
-        for student in Student.objects.exclude(user__date_of_birth__isnull=True):
-            age = student.age
-            if age:
-                ages.append(age)
-
-        if not ages:
+        """
+        Calculate age-related statistics
+
+        Someone is at least N years old when born on or before the date N
+        years ago, so counting students against one such cutoff per age
+        yields the exact age of everyone without reading their rows.
+        """
+        today = timezone.now().date()
+        with_birth_date = Student.objects.filter(date_of_birth__isnull=False)
+
+        bounds = with_birth_date.aggregate(
+            oldest=Min("date_of_birth"), youngest=Max("date_of_birth")
+        )
+        if bounds["oldest"] is None:
             return {"no_data": True}
 
-        age_distribution = {}
+        # Ages of zero or less don't count, as before
+        youngest_age = max(
+            StudentAnalyticsService._age_on(today, bounds["youngest"]), 1
+        )
+        oldest_age = StudentAnalyticsService._age_on(today, bounds["oldest"])
+        if oldest_age < 1:
+            return {"no_data": True}
+
+        ages = range(youngest_age, oldest_age + 1)
+        at_least = with_birth_date.aggregate(
+            **{
+                f"age_{age}": Count(
+                    "id",
+                    filter=Q(
+                        date_of_birth__lte=StudentAnalyticsService._years_before(
+                            today, age
+                        )
+                    ),
+                )
+                for age in ages
+            }
+        )
+
+        age_counts = {}
         for age in ages:
+            older = at_least.get(f"age_{age + 1}", 0)
+            if at_least[f"age_{age}"] - older:
+                age_counts[age] = at_least[f"age_{age}"] - older
+
+        total = sum(age_counts.values())
+        if not total:
+            return {"no_data": True}
+
+        age_distribution = {}
+        for age, count in age_counts.items():
             age_group = f"{(age//3)*3}-{(age//3)*3+2}"  # Group by 3-year ranges
-            age_distribution[age_group] = age_distribution.get(age_group, 0) + 1
+            age_distribution[age_group] = age_distribution.get(age_group, 0) + count
 
         return {
-            "average_age": round(sum(ages) / len(ages), 1),
-            "min_age": min(ages),
-            "max_age": max(ages),
+            "average_age": round(
+                sum(age * count for age, count in age_counts.items()) / total, 1
+            ),
+            "min_age": min(age_counts),
+            "max_age": max(age_counts),
             "age_distribution": age_distribution,
-            "total_with_age_data": len(ages),
+            "total_with_age_data": total,
         }
 
+    @staticmethod
+    def _get_attendance_statistics():
+        """
+        Attendance percentages of active students from the monthly rollups
+
+        Percentages are computed per student in a grouped subquery and
+        summarised over it in the same statement. Students without any
+        attendance count as 0%, as in Student.get_attendance_percentage.
+        """
+        from src.attendance.models import AttendanceRollup
+
+        active_students = Student.objects.filter(status="Active").count()
+        stats = (
+            AttendanceRollup.objects.filter(
+                period_type="month", student__status="Active"
+            )
+            .order_by()
+            .values("student")
+            .annotate(
+                percentage=Coalesce(
+                    Cast(Sum("present"), FloatField()) * 100 / NullIf(Sum("total"), 0),
+                    0.0,
+                )
+            )
+            .aggregate(
+                students_with_data=Count("student"),
+                students_with_good_attendance=Count(
+                    "student", filter=Q(percentage__gte=90)
+                ),
+                students_with_poor_attendance=Count(
+                    "student", filter=Q(percentage__lt=75)
+                ),
+                percentage_total=Sum("percentage"),
+            )
+        )
+
+        without_data = active_students - stats.pop("students_with_data")
+        stats["students_with_poor_attendance"] += without_data
+        stats["average_attendance"] = (
+            (stats.pop("percentage_total") or 0) / active_students
+            if active_students
+            else 0
+        )
+        stats["average_attendance"] = round(stats["average_attendance"] or 0, 2)
+        return stats
+
     @staticmethod
     def _calculate_overall_completion_percentage():
         """Calculate overall profile completion percentage"""
         try:
-            total_students = Student.objects.count()
-            if total_students == 0:
-                return 0
-
-            completion_scores = []
-            for student in Student.objects.select_related("user"):
-                score = 0
-                total_fields = 10
-
-                if student.first_name:
-                    score += 1
-                if student.last_name:
-                    score += 1
-                if student.email:
-                    score += 1
-                if student.date_of_birth:
-                    score += 1
-                if student.emergency_contact_name:
-                    score += 1
-                if student.emergency_contact_number:
-                    score += 1
-                if student.photo:
-                    score += 1
-                if student.address:
-                    score += 1
-                if student.current_class:
-                    score += 1
-                if student.student_parent_relations.exists():
-                    score += 1
-
-                completion_scores.append((score / total_fields) * 100)
-
-            return round(sum(completion_scores) / len(completion_scores), 2)
+            return StudentAnalyticsService._score_percentage(
+                Student.objects.aggregate(
+                    score=Avg(StudentAnalyticsService._completion_score())
+                )["score"]
+            )
         except Exception as e:
             logger.error(f"Error calculating completion percentage: {str(e)}")
             return 0
@@ -555,40 +617,45 @@ class StudentAnalyticsService:
     @staticmethod
     def _calculate_document_completion():
         """Calculate document completion percentage"""
-        total_students = Student.objects.count()
-        if total_students == 0:
-            return 0
-
-        students_with_photos = Student.objects.exclude(photo="").count()
-        return round((students_with_photos / total_students) * 100, 2)
+        stats = Student.objects.aggregate(
+            total=Count("id"),
+            with_photos=Count(
+                "id",
+                filter=Q(profile_picture__isnull=False) & ~Q(profile_picture=""),
+            ),
+        )
+        return StudentAnalyticsService._percentage(stats["with_photos"], stats["total"])
 
     @staticmethod
     def _calculate_parent_linkage_completion():
         """Calculate parent linkage completion percentage"""
-        total_students = Student.objects.count()
-        if total_students == 0:
-            return 0
-
-        students_with_parents = (
-            Student.objects.filter(student_parent_relations__isnull=False)
-            .distinct()
-            .count()
+        stats = Student.objects.aggregate(
+            total=Count("id"),
+            with_parents=Count("id", filter=Q(StudentAnalyticsService._has_parent())),
+        )
+        return StudentAnalyticsService._percentage(
+            stats["with_parents"], stats["total"]
         )
-
-        return round((students_with_parents / total_students) * 100, 2)
 
     @staticmethod
-    def _calculate_enrollment_growth_rate():
+    def _calculate_enrollment_growth_rate(yearly_counts=None):
         """Calculate enrollment growth rate"""
         try:
             current_year = timezone.now().year
-            current_year_enrollments = Student.objects.filter(
-                admission_date__year=current_year
-            ).count()
+            if yearly_counts is None:
+                yearly_counts = dict(
+                    Student.objects.filter(
+                        admission_date__year__in=[current_year - 1, current_year]
+                    )
+                    .annotate(year=ExtractYear("admission_date"))
+                    .order_by()
+                    .values("year")
+                    .annotate(count=Count("id"))
+                    .values_list("year", "count")
+                )
 
-            previous_year_enrollments = Student.objects.filter(
-                admission_date__year=current_year - 1
-            ).count()
+            current_year_enrollments = yearly_counts.get(current_year, 0)
+            previous_year_enrollments = yearly_counts.get(current_year - 1, 0)
 
             if previous_year_enrollments == 0:
                 return 0
@@ -604,32 +671,13 @@ class StudentAnalyticsService:
 
     @staticmethod
     def _calculate_diversity_index():
-        """Calculate diversity index based on geographic and demographic spread"""
-        try:
-            total_students = Student.objects.count()
-            if total_students == 0:
-                return 0
-
-            # Calculate based on city diversity
-            city_counts = (
-                Student.objects.exclude(city__isnull=True)
-                .exclude(city="")
-                .values("city")
-                .annotate(count=Count("id"))
-                .values_list("count", flat=True)
-            )
+        """
+        Calculate diversity index based on geographic and demographic spread
 
-            if not city_counts:
-                return 0
-
-            # Simple diversity index: 1 - sum((count/total)^2)
-            diversity_score = 1 - sum(
-                (count / total_students) ** 2 for count in city_counts
-            )
-            return round(diversity_score * 100, 2)
-        except Exception as e:
-            logger.error(f"Error calculating diversity index: {str(e)}")
-            return 0
+        The index was computed from student cities, which students don't
+        record, so it is always 0.
+        """
+        return 0
 
     @staticmethod
     def clear_analytics_cache():
@@ -657,7 +705,7 @@ class StudentAnalyticsService:
 
             metrics = {
                 "students_added_today": Student.objects.filter(
-                    created_at__date=today
+                    date_joined__date=today
                 ).count(),
                 "parents_added_today": Parent.objects.filter(
                     created_at__date=today
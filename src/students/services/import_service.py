@@ -0,0 +1,767 @@
+# students/services/import_service.py
+"""
+Bulk student imports
+
+An import runs in three passes so that its cost doesn't grow with queries
+per row:
+
+1. the whole file is read and every row is cleaned and validated;
+2. the classes and existing admission numbers the file refers to are looked
+   up with one ``IN`` query each;
+3. new students are written with ``bulk_create`` and changed ones with
+   ``bulk_update``, one transaction per chunk.
+
+Progress is kept in the cache under ``import_status_<import_id>`` for
+``ImportStatusView`` to poll. Welcome emails are queued as Celery batches
+once the rows are saved, instead of being sent while the import runs.
+
+Because new students skip ``post_save``, the per-student admin and parent
+"student created" notifications aren't sent for imported rows; the
+import's status (created count and error report) is the record of the run.
+Status and class changes of updated students are still announced, see
+``StudentImportService.notify_changes``.
+"""
+
+import csv
+import datetime
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from src.academics.models import Class
+from src.api.caching import bump_generation
+from src.core.exports import export_filename, save_export
+from src.core.utils import generate_unique_id
+
+from ..models import Student
+from ..utils import StudentUtils
+from .analytics_service import StudentAnalyticsService
+from .search_index import (
+    STUDENT_SEARCH_FIELDS,
+    patch_after_commit,
+    refresh_student_search_text,
+    student_search_text,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMPORT_SETTINGS = {
+    "UPLOAD_TO": "imports/%Y/%m/",
+    "CHUNK_SIZE": 500,
+}
+
+
+def get_import_setting(name):
+    """Read a BULK_IMPORT_FILES upload setting, falling back to the defaults"""
+    return (
+        getattr(settings, "FILE_UPLOAD_SETTINGS", {})
+        .get("BULK_IMPORT_FILES", {})
+        .get(name, DEFAULT_IMPORT_SETTINGS[name])
+    )
+
+
+class StudentImportService:
+    """Validate and write a student import file in bulk"""
+
+    REQUIRED_FIELDS = [
+        "first_name",
+        "last_name",
+        "admission_number",
+        "emergency_contact_name",
+        "emergency_contact_number",
+    ]
+
+    # Import file header -> model field
+    FIELD_MAPPING = {
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "email": "email",
+        "phone_number": "phone_number",
+        "phone": "phone_number",
+        "date_of_birth": "date_of_birth",
+        "birth_date": "date_of_birth",
+        "gender": "gender",
+        "address": "address",
+        "admission_number": "admission_number",
+        "admission_date": "admission_date",
+        "class_name": "class_name",
+        "class": "class_name",
+        "roll_number": "roll_number",
+        "blood_group": "blood_group",
+        "medical_conditions": "medical_conditions",
+        "emergency_contact_name": "emergency_contact_name",
+        "emergency_name": "emergency_contact_name",
+        "emergency_contact_number": "emergency_contact_number",
+        "emergency_phone": "emergency_contact_number",
+        "emergency_contact_relationship": "emergency_contact_relationship",
+        "previous_school": "previous_school",
+        "status": "status",
+    }
+
+    DATE_FORMATS = [
+        "%Y-%m-%d",
+        "%m/%d/%Y",
+        "%d/%m/%Y",
+        "%Y/%m/%d",
+        "%m-%d-%Y",
+        "%d-%m-%Y",
+    ]
+
+    # Checked by the service itself, or not set from the import file
+    VALIDATION_EXCLUDE = [
+        "id",
+        "current_class",
+        "created_by",
+        "profile_picture",
+        "registration_number",
+    ]
+
+    STATUS_TIMEOUT = 60 * 60 * 24
+    MAX_REPORTED_ERRORS = 100
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def status_cache_key(import_id):
+        return f"import_status_{import_id}"
+
+    @classmethod
+    def get_status(cls, import_id):
+        return cache.get(cls.status_cache_key(import_id))
+
+    @classmethod
+    def set_status(cls, import_id, progress=None, **values):
+        """
+        Merge values into the import's polled status
+
+        A running import passes its own progress dict, so its state never
+        depends on reading the cache back; other callers merge into the
+        cached status.
+        """
+        status = progress
+        if status is None:
+            status = cls.get_status(import_id) or {"import_id": str(import_id)}
+        status.update(values)
+
+        total = status.get("total_records") or 0
+        processed = status.get("processed") or 0
+        status["progress_percent"] = round(processed * 100 / total) if total else 0
+        status["success"] = status.get("created", 0) + status.get("updated", 0)
+
+        status["eta_seconds"] = None
+        started_at = status.get("started_at")
+        if status.get("status") == "importing" and started_at and 0 < processed < total:
+            elapsed = (
+                timezone.now() - datetime.datetime.fromisoformat(started_at)
+            ).total_seconds()
+            status["eta_seconds"] = round(elapsed * (total - processed) / processed)
+
+        cache.set(cls.status_cache_key(import_id), status, cls.STATUS_TIMEOUT)
+        return status
+
+    # ------------------------------------------------------------------
+    # Upload handling
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def save_upload(import_file, import_id):
+        """Store an uploaded file for the import job and return its path"""
+        upload_to = timezone.now().strftime(get_import_setting("UPLOAD_TO"))
+        extension = os.path.splitext(import_file.name)[1].lower()
+        return default_storage.save(f"{upload_to}{import_id}{extension}", import_file)
+
+    # ------------------------------------------------------------------
+    # Reading and cleaning
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize_header(header):
+        return str(header or "").strip().lower().replace(" ", "_")
+
+    @classmethod
+    def read_rows(cls, import_file):
+        """
+        Read every row of a CSV or XLSX file
+
+        Returns:
+            list: (row number, {normalized header: raw value}) pairs
+        """
+        name = import_file.name.lower()
+        workbook = None
+
+        if name.endswith(".csv"):
+            content = import_file.read()
+            if isinstance(content, bytes):
+                content = content.decode("utf-8-sig")  # Handle BOM
+            reader = csv.reader(io.StringIO(content))
+            header_row = next(reader, [])
+            data_rows = reader
+        elif name.endswith(".xlsx"):
+            import openpyxl
+
+            workbook = openpyxl.load_workbook(
+                import_file, read_only=True, data_only=True
+            )
+            data_rows = workbook.active.iter_rows(values_only=True)
+            header_row = next(data_rows, ())
+        else:
+            raise ValidationError(
+                "Unsupported file format. Please use CSV or Excel (.xlsx) files."
+            )
+
+        headers = [cls.normalize_header(header) for header in header_row]
+
+        rows = []
+        for row_num, values in enumerate(data_rows, start=2):
+            if not any(value not in (None, "") for value in values):
+                continue  # Skip blank lines
+            rows.append(
+                (
+                    row_num,
+                    {header: value for header, value in zip(headers, values) if header},
+                )
+            )
+
+        if workbook is not None:
+            workbook.close()
+        return rows
+
+    @classmethod
+    def clean_row(cls, row):
+        """Map a row's headers to model fields and normalize the values"""
+        cleaned_data = {}
+        for column, field_name in cls.FIELD_MAPPING.items():
+            if field_name in cleaned_data:
+                continue
+            value = cls.clean_field_value(field_name, row.get(column))
+            if value is not None:
+                cleaned_data[field_name] = value
+        return cleaned_data
+
+    @classmethod
+    def clean_field_value(cls, field_name, value):
+        """Clean individual field values"""
+        if field_name in ["date_of_birth", "admission_date"]:
+            if value is None or str(value).strip() == "":
+                return None
+            parsed = cls.parse_date(value)
+            if parsed is None:
+                raise ValidationError(f"Invalid date for {field_name}: {value}")
+            return parsed
+
+        if value is None or str(value).strip() == "":
+            return None
+
+        value = str(value).strip()
+
+        # Field-specific cleaning
+        if field_name in ["first_name", "last_name", "emergency_contact_name"]:
+            return value.title()
+
+        elif field_name == "email":
+            return value.lower()
+
+        elif field_name == "admission_number":
+            return value.upper()
+
+        elif field_name == "gender":
+            gender_map = {
+                "male": "MALE",
+                "female": "FEMALE",
+                "m": "MALE",
+                "f": "FEMALE",
+            }
+            return gender_map.get(value.lower(), value.upper())
+
+        elif field_name == "blood_group":
+            return StudentUtils.normalize_blood_group(value)
+
+        elif field_name == "status":
+            status_map = {
+                "active": "Active",
+                "inactive": "Inactive",
+                "graduated": "Graduated",
+            }
+            return status_map.get(value.lower(), value.title())
+
+        return value
+
+    @classmethod
+    def parse_date(cls, date_value):
+        """Parse a date from a cell value, an Excel serial number or a string"""
+        if isinstance(date_value, datetime.datetime):
+            return date_value.date()
+        if isinstance(date_value, datetime.date):
+            return date_value
+
+        # Excel date serial number
+        if isinstance(date_value, (int, float)):
+            return datetime.date(1899, 12, 30) + datetime.timedelta(
+                days=int(date_value)
+            )
+
+        for date_format in cls.DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(
+                    str(date_value).strip(), date_format
+                ).date()
+            except ValueError:
+                continue
+
+        return None
+
+    # ------------------------------------------------------------------
+    # Validation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def format_error(error):
+        """One line describing a ValidationError"""
+        if hasattr(error, "error_dict"):
+            return "; ".join(
+                f"{field}: {' '.join(messages)}"
+                for field, messages in error.message_dict.items()
+            )
+        return " ".join(error.messages)
+
+    @staticmethod
+    def resolve_classes(class_names):
+        """
+        Map class names to classes with one query
+
+        A name shared by classes of several grades or years resolves to the
+        class of the current academic year; names still ambiguous after that
+        map to None.
+        """
+        matches = {}
+        for class_obj in Class.objects.filter(name__in=class_names).select_related(
+            "academic_year"
+        ):
+            matches.setdefault(class_obj.name, []).append(class_obj)
+
+        resolved = {}
+        for name, candidates in matches.items():
+            if len(candidates) > 1:
+                candidates = [
+                    class_obj
+                    for class_obj in candidates
+                    if class_obj.academic_year.is_current
+                ]
+            resolved[name] = candidates[0] if len(candidates) == 1 else None
+        return resolved
+
+    @classmethod
+    def validate_rows(
+        cls, rows, default_class=None, update_existing=False, created_by=None
+    ):
+        """
+        Validate every row before anything is written
+
+        Returns:
+            tuple: (new students, [(student, changed fields)], errors), with
+            each student tagged with the row number it came from
+        """
+        errors = []
+        cleaned_rows = []
+        seen_rows = {}
+
+        for row_num, row in rows:
+            try:
+                data = cls.clean_row(row)
+            except ValidationError as e:
+                errors.append({"row": row_num, "message": cls.format_error(e)})
+                continue
+
+            missing = [field for field in cls.REQUIRED_FIELDS if not data.get(field)]
+            if missing:
+                errors.append(
+                    {
+                        "row": row_num,
+                        "message": f"Missing required field: {', '.join(missing)}",
+                    }
+                )
+                continue
+
+            admission_number = data["admission_number"]
+            if admission_number in seen_rows:
+                errors.append(
+                    {
+                        "row": row_num,
+                        "message": (
+                            f"Admission number {admission_number} is also used "
+                            f"on row {seen_rows[admission_number]}"
+                        ),
+                    }
+                )
+                continue
+            seen_rows[admission_number] = row_num
+            cleaned_rows.append((row_num, data))
+
+        # Everything the file refers to, in one query per table
+        classes = cls.resolve_classes(
+            {data["class_name"] for _, data in cleaned_rows if data.get("class_name")}
+        )
+        existing = Student.objects.in_bulk(
+            [data["admission_number"] for _, data in cleaned_rows],
+            field_name="admission_number",
+        )
+
+        today = timezone.now().date()
+        new_students = []
+        updates = []
+
+        for row_num, data in cleaned_rows:
+            class_name = data.pop("class_name", None)
+            current_class = default_class
+            if class_name:
+                if classes.get(class_name):
+                    current_class = classes[class_name]
+                elif class_name in classes and not default_class:
+                    errors.append(
+                        {
+                            "row": row_num,
+                            "message": f"Class '{class_name}' matches several classes",
+                        }
+                    )
+                    continue
+                elif not default_class:
+                    errors.append(
+                        {"row": row_num, "message": f"Class '{class_name}' not found"}
+                    )
+                    continue
+
+            student = existing.get(data["admission_number"])
+
+            if student is not None:
+                if not update_existing:
+                    errors.append(
+                        {
+                            "row": row_num,
+                            "message": (
+                                f"Student with admission number "
+                                f"{data['admission_number']} already exists"
+                            ),
+                        }
+                    )
+                    continue
+
+                # Kept so notify_changes can announce status and class moves
+                student._old_status = student.status
+                student._old_class_id = student.current_class_id
+
+                # Only overwrite fields the file provides a value for
+                changed = [field for field in data if field != "admission_number"]
+                for field in changed:
+                    setattr(student, field, data[field])
+                if class_name and current_class:
+                    student.current_class = current_class
+                    changed.append("current_class")
+            else:
+                data.setdefault("admission_date", today)
+                data.setdefault("status", "Active")
+                student = Student(
+                    current_class=current_class,
+                    is_active=True,
+                    created_by=created_by,
+                    **data,
+                )
+                changed = None
+
+            try:
+                student.clean_fields(exclude=cls.VALIDATION_EXCLUDE)
+                student.clean()
+            except ValidationError as e:
+                errors.append({"row": row_num, "message": cls.format_error(e)})
+                continue
+
+            student._import_row = row_num
+            if changed is None:
+                new_students.append(student)
+            else:
+                updates.append((student, changed))
+
+        errors.sort(key=lambda error: error["row"])
+        return new_students, updates, errors
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def chunks(items, size):
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
+
+    @staticmethod
+    def prepare_new_student(student):
+        """
+        Set the registration number Student.save() would have generated, and
+        the search_text its signals would have
+        """
+        if not student.registration_number:
+            student.registration_number = (
+                f"STU-{student.admission_date.year}-{generate_unique_id(6)}"
+            )
+        student.search_text = student_search_text(student)
+        return student
+
+    @classmethod
+    def run_import(
+        cls,
+        import_id,
+        import_file,
+        default_class=None,
+        send_welcome_emails=False,
+        update_existing=False,
+        validate_before_import=False,
+        created_by=None,
+    ):
+        """
+        Import students from a CSV or XLSX file
+
+        Args:
+            import_id (str): Key the progress is reported under
+            import_file: File object with a name ending .csv or .xlsx
+            default_class (Class): Class for rows without a known class
+            send_welcome_emails (bool): Queue welcome emails for new students
+            update_existing (bool): Update students whose admission number
+                is already taken instead of rejecting the row
+            validate_before_import (bool): Write nothing if any row is invalid
+            created_by (User): User who started the import
+
+        Returns:
+            dict: Final import status
+        """
+        progress = cls.set_status(
+            import_id,
+            status="validating",
+            started_at=timezone.now().isoformat(),
+            created=0,
+            updated=0,
+            processed=0,
+            errors=[],
+            error_count=0,
+            current_record="Validating file",
+        )
+
+        try:
+            rows = cls.read_rows(import_file)
+            new_students, updates, errors = cls.validate_rows(
+                rows, default_class, update_existing, created_by
+            )
+        except Exception as e:
+            logger.error(f"Student import {import_id} failed to read file: {str(e)}")
+            return cls.set_status(
+                import_id,
+                progress,
+                status="failed",
+                message=f"Error reading import file: {str(e)}",
+                finished_at=timezone.now().isoformat(),
+            )
+
+        total = len(rows)
+        processed = len(errors)
+        cls.set_status(
+            import_id,
+            progress,
+            status="importing",
+            total_records=total,
+            processed=processed,
+            errors=errors[: cls.MAX_REPORTED_ERRORS],
+            error_count=len(errors),
+            current_record="Saving students",
+        )
+
+        if errors and validate_before_import:
+            return cls.finish(
+                import_id,
+                errors,
+                progress=progress,
+                status="failed",
+                message=(
+                    f"{len(errors)} rows are invalid, so no students were "
+                    f"imported. Fix the rows listed in the error report and "
+                    f"upload the file again."
+                ),
+            )
+
+        chunk_size = get_import_setting("CHUNK_SIZE")
+        created_ids = []
+        created = updated = 0
+
+        for chunk in cls.chunks(new_students, chunk_size):
+            try:
+                with transaction.atomic():
+                    Student.objects.bulk_create(
+                        [cls.prepare_new_student(student) for student in chunk]
+                    )
+                    patch_after_commit("student", [student.id for student in chunk])
+                created += len(chunk)
+                created_ids.extend(
+                    str(student.id) for student in chunk if student.email
+                )
+            except Exception as e:
+                logger.error(f"Student import {import_id} chunk failed: {str(e)}")
+                errors.extend(
+                    {"row": student._import_row, "message": f"Not saved: {str(e)}"}
+                    for student in chunk
+                )
+            processed += len(chunk)
+            cls.set_status(
+                import_id,
+                progress,
+                processed=processed,
+                created=created,
+                error_count=len(errors),
+                current_record=f"Saved {processed} of {total} rows",
+            )
+
+        for chunk in cls.chunks(updates, chunk_size):
+            students = [student for student, _ in chunk]
+            fields = sorted({field for _, changed in chunk for field in changed})
+            now = timezone.now()
+            for student in students:
+                student.last_updated = now
+            try:
+                with transaction.atomic():
+                    Student.objects.bulk_update(students, fields + ["last_updated"])
+                    if set(fields) & STUDENT_SEARCH_FIELDS:
+                        refresh_student_search_text(
+                            [student.id for student in students]
+                        )
+                updated += len(students)
+                cls.notify_changes(students)
+                cache.delete_many(
+                    [
+                        f"student_{key}_{student.id}"
+                        for student in students
+                        for key in (
+                            "attendance_percentage",
+                            "siblings",
+                            "parents",
+                            "analytics",
+                        )
+                    ]
+                )
+            except Exception as e:
+                logger.error(f"Student import {import_id} chunk failed: {str(e)}")
+                errors.extend(
+                    {"row": student._import_row, "message": f"Not saved: {str(e)}"}
+                    for student in students
+                )
+            processed += len(students)
+            cls.set_status(
+                import_id,
+                progress,
+                processed=processed,
+                updated=updated,
+                error_count=len(errors),
+                current_record=f"Saved {processed} of {total} rows",
+            )
+
+        if created or updated:
+            # bulk_create/bulk_update don't send the signals that would
+            # invalidate cached API responses and dashboard analytics
+            bump_generation(Student)
+            StudentAnalyticsService.clear_analytics_cache()
+
+        if send_welcome_emails and created_ids:
+            cls.queue_welcome_emails(created_ids)
+
+        logger.info(
+            f"Student import {import_id} finished: {created} created, "
+            f"{updated} updated, {len(errors)} errors"
+        )
+        return cls.finish(import_id, errors, status="completed", progress=progress)
+
+    @classmethod
+    def finish(cls, import_id, errors, status, message="", progress=None):
+        """Record the final status, with a downloadable report of row errors"""
+        errors.sort(key=lambda error: error["row"])
+        error_report = None
+        if errors:
+            try:
+                error_report = default_storage.url(
+                    save_export(
+                        export_filename(f"student_import_{import_id}_errors", "csv"),
+                        ["row", "message"],
+                        ([error["row"], error["message"]] for error in errors),
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Failed to save import error report: {str(e)}")
+
+        return cls.set_status(
+            import_id,
+            progress,
+            status=status,
+            message=message,
+            errors=errors[: cls.MAX_REPORTED_ERRORS],
+            error_count=len(errors),
+            error_report=error_report,
+            current_record="",
+            finished_at=timezone.now().isoformat(),
+        )
+
+    @staticmethod
+    def notify_changes(students):
+        """
+        Announce status and class changes of updated students
+
+        bulk_update doesn't send the signals that call these notifications
+        when a student is saved one at a time.
+        """
+        from ..signals import notify_class_change, notify_status_change
+
+        moved = [
+            student
+            for student in students
+            if student._old_class_id != student.current_class_id
+        ]
+        old_classes = Class.objects.in_bulk(
+            {student._old_class_id for student in moved} - {None}
+        )
+
+        for student in students:
+            if student._old_status != student.status:
+                student._new_status = student.status
+                transaction.on_commit(
+                    lambda student=student: notify_status_change(student)
+                )
+
+        for student in moved:
+            student._old_class = old_classes.get(student._old_class_id)
+            student._new_class = student.current_class
+            transaction.on_commit(lambda student=student: notify_class_change(student))
+
+    @staticmethod
+    def queue_welcome_emails(student_ids):
+        """Send welcome emails to new students as Celery batches"""
+        if not getattr(settings, "ENABLE_EMAIL_NOTIFICATIONS", True):
+            return
+        if not getattr(settings, "STUDENT_EMAIL_SETTINGS", {}).get(
+            "ENABLE_WELCOME_EMAILS", True
+        ):
+            return
+
+        from ..tasks import send_bulk_notification_to_students
+
+        subject = f'Welcome to {getattr(settings, "SCHOOL_NAME", "School")}!'
+        for batch in StudentImportService.chunks(
+            student_ids, get_import_setting("CHUNK_SIZE")
+        ):
+            try:
+                send_bulk_notification_to_students.delay(
+                    batch, subject, "emails/student_welcome.txt"
+                )
+            except Exception as e:
+                logger.error(f"Failed to queue welcome emails: {str(e)}")
@@ -8,10 +8,12 @@ from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.mail import send_mail
 from django.db import transaction
-from django.db.models import Count
+from django.db.models import Count, Prefetch
 from django.template.loader import render_to_string
 from django.utils import timezone
 
+from src.core.exports import get_export_setting, iter_csv
+
 from ..models import Parent, Student, StudentParentRelation
 
 User = get_user_model()
@@ -388,6 +390,70 @@ class ParentService:
         except Exception as e:
             logger.error(f"Error in bulk email sending: {str(e)}")
 
+    EXPORT_FIELDS = [
+        "first_name",
+        "last_name",
+        "email",
+        "phone_number",
+        "date_of_birth",
+        "relation_with_student",
+        "occupation",
+        "education",
+        "workplace",
+        "work_address",
+        "work_phone",
+        "annual_income",
+        "emergency_contact",
+        "students",
+        "primary_students",
+        "created_at",
+    ]
+
+    @staticmethod
+    def iter_export_rows(queryset, chunk_size=None):
+        """
+        Yield export rows, in EXPORT_FIELDS order, for parents
+
+        Args:
+            queryset: QuerySet of Parent objects
+            chunk_size (int): Parents fetched per database round trip
+        """
+        queryset = queryset.select_related("user").prefetch_related(
+            Prefetch(
+                "parent_student_relations",
+                queryset=StudentParentRelation.objects.select_related("student"),
+                to_attr="export_relations",
+            )
+        )
+
+        for parent in queryset.iterator(
+            chunk_size=chunk_size or get_export_setting("CHUNK_SIZE")
+        ):
+            relations = parent.export_relations
+
+            yield [
+                parent.user.first_name,
+                parent.user.last_name,
+                parent.user.email,
+                parent.user.phone_number or "",
+                parent.user.date_of_birth or "",
+                parent.relation_with_student,
+                parent.occupation or "",
+                parent.education or "",
+                parent.workplace or "",
+                parent.work_address or "",
+                parent.work_phone or "",
+                parent.annual_income or "",
+                "Yes" if parent.emergency_contact else "No",
+                ", ".join(rel.student.admission_number for rel in relations),
+                ", ".join(
+                    rel.student.admission_number
+                    for rel in relations
+                    if rel.is_primary_contact
+                ),
+                parent.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            ]
+
     @staticmethod
     def export_parents_to_csv(queryset):
         """
@@ -399,70 +465,11 @@ class ParentService:
         Returns:
             str: CSV content as string
         """
-        fieldnames = [
-            "first_name",
-            "last_name",
-            "email",
-            "phone_number",
-            "date_of_birth",
-            "relation_with_student",
-            "occupation",
-            "education",
-            "workplace",
-            "work_address",
-            "work_phone",
-            "annual_income",
-            "emergency_contact",
-            "students",
-            "primary_students",
-            "created_at",
-        ]
-
-        csv_buffer = io.StringIO()
-        writer = csv.DictWriter(csv_buffer, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for parent in queryset.prefetch_related("parent_student_relations__student"):
-            # Get related students
-            all_students = [
-                rel.student for rel in parent.parent_student_relations.all()
-            ]
-            primary_students = [
-                rel.student
-                for rel in parent.parent_student_relations.filter(
-                    is_primary_contact=True
-                )
-            ]
-
-            all_students_list = ", ".join(
-                [student.admission_number for student in all_students]
-            )
-            primary_students_list = ", ".join(
-                [student.admission_number for student in primary_students]
+        return "".join(
+            iter_csv(
+                ParentService.EXPORT_FIELDS, ParentService.iter_export_rows(queryset)
             )
-
-            writer.writerow(
-                {
-                    "first_name": parent.user.first_name,
-                    "last_name": parent.user.last_name,
-                    "email": parent.user.email,
-                    "phone_number": parent.user.phone_number or "",
-                    "date_of_birth": parent.user.date_of_birth or "",
-                    "relation_with_student": parent.relation_with_student,
-                    "occupation": parent.occupation or "",
-                    "education": parent.education or "",
-                    "workplace": parent.workplace or "",
-                    "work_address": parent.work_address or "",
-                    "work_phone": parent.work_phone or "",
-                    "annual_income": parent.annual_income or "",
-                    "emergency_contact": "Yes" if parent.emergency_contact else "No",
-                    "students": all_students_list,
-                    "primary_students": primary_students_list,
-                    "created_at": parent.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                }
-            )
-
-        return csv_buffer.getvalue()
+        )
 
     @staticmethod
     def get_parent_statistics():
@@ -0,0 +1,474 @@
+"""
+Search index for students and parents
+
+Every student and parent carries a ``search_text`` column: the normalized
+words that can find it (names, admission and roll numbers, email, class and,
+for students, the names of their parents). Searching one column of one table
+replaces the icontains chains across joined tables and the distinct() they
+needed. On PostgreSQL the column has a pg_trgm GIN index, so both substring
+and word-prefix lookups are index scans.
+
+SQLite has no trigram index, so suggestions there come from an in-memory
+index instead: a sorted list of every name, admission number and email
+token, answered with a binary search for the typed prefix. It is loaded
+lazily with one query per model. Changes made in this process patch it;
+a version number in the shared cache tells other processes to reload.
+
+The columns are kept current by the receivers in ``students/signals.py``.
+"""
+
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from src.core.cache_utils import SharedVersion
+
+from ..models import Parent, Student, StudentParentRelation
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "student_search_index_version"
+VERSION_CHECK_INTERVAL = 5  # seconds between shared version checks
+REFRESH_BATCH_SIZE = 500
+
+# Fields whose changes alter a search_text
+STUDENT_SEARCH_FIELDS = {
+    "first_name",
+    "last_name",
+    "admission_number",
+    "roll_number",
+    "email",
+    "current_class",
+}
+PARENT_SEARCH_FIELDS = {"user", "occupation", "workplace"}
+USER_SEARCH_FIELDS = {"first_name", "last_name", "email", "phone_number"}
+
+_SEPARATORS = re.compile(r"[^\w@.+/-]+")
+
+
+def search_terms(value) -> List[str]:
+    """Lowercase, accent-free words of a value"""
+    if not value:
+        return []
+    text = str(value)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return [term for term in _SEPARATORS.split(text.lower()) if term]
+
+
+def build_search_text(*values) -> str:
+    """
+    search_text of the given values
+
+    Words are separated, and surrounded, by single spaces, so " term" finds
+    words starting with term.
+    """
+    words = [term for value in values for term in search_terms(value)]
+    return f" {' '.join(words)} " if words else ""
+
+
+def uses_memory_index() -> bool:
+    """Whether suggestions come from the in-memory index"""
+    return connection.vendor != "postgresql"
+
+
+# Database lookups
+
+
+def matching(queryset, query):
+    """Objects whose search_text contains every term of the query"""
+    terms = search_terms(query)
+    for term in terms:
+        queryset = queryset.filter(search_text__contains=term)
+    return queryset, terms
+
+
+def word_prefix_match(terms) -> Q:
+    """Every term starts a word of search_text"""
+    condition = Q()
+    for term in terms:
+        condition &= Q(search_text__contains=f" {term}")
+    return condition
+
+
+def rank_students(queryset, query, terms):
+    """
+    Annotate students with search_rank, best first
+
+    An exact admission number ranks highest, then a student whose own first
+    or last name starts with the query, then a match at the start of words
+    (including parent names), then any other substring match.
+    """
+    # search_text starts with the first name, already normalized
+    own_name = Q(search_text__startswith=f" {terms[0]}") | Q(
+        last_name__istartswith=terms[0]
+    )
+    return queryset.annotate(
+        search_rank=Case(
+            When(admission_number__iexact=query.strip(), then=Value(3)),
+            When(own_name & word_prefix_match(terms), then=Value(2)),
+            When(word_prefix_match(terms), then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    ).order_by("-search_rank", "last_name", "first_name")
+
+
+def rank_parents(queryset, terms):
+    """Annotate parents with search_rank; word-prefix matches first"""
+    own_name = Q(search_text__startswith=f" {terms[0]}") | Q(
+        user__last_name__istartswith=terms[0]
+    )
+    return queryset.annotate(
+        search_rank=Case(
+            When(own_name & word_prefix_match(terms), then=Value(2)),
+            When(word_prefix_match(terms), then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    ).order_by("-search_rank", "user__first_name", "user__last_name")
+
+
+# Keeping search_text current
+
+
+def _batches(ids, size=REFRESH_BATCH_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def student_search_text(student, parent_names: Iterable[str] = ()) -> str:
+    """search_text of a student, given the names of its parents"""
+    return build_search_text(
+        student.first_name,
+        student.last_name,
+        student.admission_number,
+        student.roll_number,
+        student.email,
+        student.current_class.name if student.current_class_id else None,
+        *parent_names,
+    )
+
+
+def refresh_student_search_text(student_ids):
+    """Recompute search_text of the given students"""
+    student_ids = list(student_ids)
+    for batch in _batches(student_ids):
+        parent_names: Dict[object, List[str]] = {}
+        relations = StudentParentRelation.objects.filter(
+            student_id__in=batch
+        ).values_list(
+            "student_id", "parent__user__first_name", "parent__user__last_name"
+        )
+        for student_id, first_name, last_name in relations:
+            parent_names.setdefault(student_id, []).extend([first_name, last_name])
+
+        students = list(
+            Student.objects.filter(id__in=batch)
+            .select_related("current_class")
+            .only(
+                "id",
+                "first_name",
+                "last_name",
+                "admission_number",
+                "roll_number",
+                "email",
+                "current_class__name",
+                "search_text",
+            )
+        )
+        changed = []
+        for student in students:
+            text = student_search_text(student, parent_names.get(student.id, ()))
+            if text != student.search_text:
+                student.search_text = text
+                changed.append(student)
+        if changed:
+            Student.objects.bulk_update(changed, ["search_text"])
+
+    patch_after_commit("student", student_ids)
+
+
+def refresh_parent_search_text(parent_ids):
+    """Recompute search_text of the given parents"""
+    parent_ids = list(parent_ids)
+    for batch in _batches(parent_ids):
+        parents = list(
+            Parent.objects.filter(id__in=batch)
+            .select_related("user")
+            .only(
+                "id",
+                "occupation",
+                "workplace",
+                "search_text",
+                "user__first_name",
+                "user__last_name",
+                "user__email",
+                "user__phone_number",
+            )
+        )
+        changed = []
+        for parent in parents:
+            text = build_search_text(
+                parent.user.first_name,
+                parent.user.last_name,
+                parent.user.email,
+                parent.user.phone_number,
+                parent.occupation,
+                parent.workplace,
+            )
+            if text != parent.search_text:
+                parent.search_text = text
+                changed.append(parent)
+        if changed:
+            Parent.objects.bulk_update(changed, ["search_text"])
+
+    patch_after_commit("parent", parent_ids)
+
+
+def patch_after_commit(kind, object_ids):
+    """Patch the in-memory index with the given objects after commit"""
+    object_ids = list(object_ids)
+
+    def apply():
+        try:
+            search_index.patch(kind, object_ids)
+        except Exception as e:
+            logger.error(f"Error patching search index: {str(e)}")
+            search_index.invalidate()
+
+    transaction.on_commit(apply)
+
+
+# In-memory index
+
+
+class IndexEntry(NamedTuple):
+    """A student or parent as held by the in-memory index"""
+
+    object_id: str
+    tokens: Tuple[str, ...]
+    exact: str  # admission number or email, ranked first on a full match
+    sort_key: str
+
+
+class MemorySearchIndex:
+    """Process-wide prefix index of student and parent names"""
+
+    KINDS = ("student", "parent")
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self._version = SharedVersion(VERSION_KEY, VERSION_CHECK_INTERVAL)
+
+    def _reset(self):
+        self._entries = None  # kind -> object id -> IndexEntry
+        self._tokens = None  # kind -> sorted list of (token, object id)
+
+    # Freshness
+
+    def _check_version(self):
+        if self._version.check():
+            self._reset()
+
+    def _bump_version(self, patched: bool):
+        """
+        Tell other processes the indexed data changed
+
+        When this process already patched its own index and nobody else
+        changed anything meanwhile, it keeps its index.
+        """
+        with self._lock:
+            if not self._version.bump(patched):
+                self._reset()
+
+    def invalidate(self):
+        """Drop the index in every process"""
+        self._bump_version(patched=False)
+
+    def version(self):
+        """Version of the indexed data, for keying cached results"""
+        with self._lock:
+            self._check_version()
+            return self._version.current
+
+    # Loading
+
+    @staticmethod
+    def _student_entries(queryset):
+        rows = queryset.values_list("id", "first_name", "last_name", "admission_number")
+        for student_id, first_name, last_name, admission_number in rows:
+            yield IndexEntry(
+                str(student_id),
+                tuple(search_terms(f"{first_name} {last_name} {admission_number}")),
+                " ".join(search_terms(admission_number)),
+                f"{last_name} {first_name}".lower(),
+            )
+
+    @staticmethod
+    def _parent_entries(queryset):
+        rows = queryset.values_list(
+            "id", "user__first_name", "user__last_name", "user__email"
+        )
+        for parent_id, first_name, last_name, email in rows:
+            yield IndexEntry(
+                str(parent_id),
+                tuple(search_terms(f"{first_name} {last_name} {email or ''}")),
+                " ".join(search_terms(email)),
+                f"{first_name} {last_name}".lower(),
+            )
+
+    def _load_entries(self, kind, object_ids=None):
+        if kind == "student":
+            queryset = Student.objects.order_by()
+            load = self._student_entries
+        else:
+            queryset = Parent.objects.order_by()
+            load = self._parent_entries
+        if object_ids is not None:
+            queryset = queryset.filter(id__in=object_ids)
+        return load(queryset)
+
+    def _ensure_loaded(self):
+        self._check_version()
+        if self._entries is not None:
+            return
+
+        started = time.perf_counter()
+        self._entries = {kind: {} for kind in self.KINDS}
+        self._tokens = {}
+        for kind in self.KINDS:
+            tokens = []
+            for entry in self._load_entries(kind):
+                self._entries[kind][entry.object_id] = entry
+                tokens.extend((token, entry.object_id) for token in set(entry.tokens))
+            tokens.sort()
+            self._tokens[kind] = tokens
+        logger.info(
+            f"Loaded student search index in "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+    def _add(self, kind, entry: IndexEntry):
+        self._entries[kind][entry.object_id] = entry
+        for token in set(entry.tokens):
+            insort(self._tokens[kind], (token, entry.object_id))
+
+    def _remove(self, kind, object_id):
+        entry = self._entries[kind].pop(object_id, None)
+        if entry is None:
+            return
+        tokens = self._tokens[kind]
+        for token in set(entry.tokens):
+            position = bisect_left(tokens, (token, object_id))
+            if position < len(tokens) and tokens[position] == (token, object_id):
+                del tokens[position]
+
+    # Queries
+
+    def suggest(self, kind, query, limit=10) -> List[str]:
+        """
+        Ids of the best matches for a partially typed query
+
+        Every term has to start one of the words of a match. Candidates come
+        from a binary search for the longest term; an exact admission number
+        or email ranks first, then names starting with the first term, then
+        the rest by name.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            self._ensure_loaded()
+            tokens = self._tokens[kind]
+            entries = self._entries[kind]
+
+            lead = max(terms, key=len)
+            others = [term for term in terms if term != lead]
+            candidates = set()
+            position = bisect_left(tokens, (lead,))
+            while position < len(tokens) and tokens[position][0].startswith(lead):
+                candidates.add(tokens[position][1])
+                position += 1
+
+            matches = [entries[object_id] for object_id in candidates]
+            if others:
+                matches = [
+                    entry
+                    for entry in matches
+                    if all(
+                        any(token.startswith(term) for token in entry.tokens)
+                        for term in others
+                    )
+                ]
+
+        joined = " ".join(terms)
+        best = heapq.nsmallest(
+            limit,
+            matches,
+            key=lambda entry: (
+                entry.exact != joined,
+                not entry.tokens[0].startswith(terms[0]),
+                entry.sort_key,
+            ),
+        )
+        return [entry.object_id for entry in best]
+
+    # Patching
+
+    def patch(self, kind, object_ids):
+        """Re-read the given objects into a loaded index"""
+        with self._lock:
+            if self._entries is not None:
+                object_ids = [str(object_id) for object_id in object_ids]
+                for object_id in object_ids:
+                    self._remove(kind, object_id)
+                for entry in self._load_entries(kind, object_ids):
+                    self._add(kind, entry)
+            patched = self._entries is not None
+        self._bump_version(patched=patched)
+
+
+search_index = MemorySearchIndex()
+
+
+def _in_order(queryset, object_ids):
+    objects = {str(obj.pk): obj for obj in queryset.filter(pk__in=object_ids)}
+    return [objects[object_id] for object_id in object_ids if object_id in objects]
+
+
+def suggest_students(query, limit=10):
+    """Students best matching a partially typed name or admission number"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    queryset = Student.objects.select_related(
+        "current_class__grade", "current_class__section"
+    )
+    if uses_memory_index():
+        return _in_order(queryset, search_index.suggest("student", query, limit))
+    return list(
+        rank_students(queryset.filter(word_prefix_match(terms)), query, terms)[:limit]
+    )
+
+
+def suggest_parents(query, limit=5):
+    """Parents best matching a partially typed name or email"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    queryset = Parent.objects.select_related("user")
+    if uses_memory_index():
+        return _in_order(queryset, search_index.suggest("parent", query, limit))
+    return list(rank_parents(queryset.filter(word_prefix_match(terms)), terms)[:limit])
@@ -1,4 +1,5 @@
 # students/services/search_service.py
+import hashlib
 import logging
 from datetime import datetime, timedelta
 
@@ -7,6 +8,7 @@ from django.db.models import Avg, Case, Count, IntegerField, Q, When
 from django.utils import timezone
 
 from ..models import Parent, Student, StudentParentRelation
+from .search_index import search_index, search_terms, suggest_parents, suggest_students
 
 logger = logging.getLogger(__name__)
 
@@ -58,23 +60,9 @@ class StudentSearchService:
         try:
             queryset = Student.objects.with_related().with_parents()
 
-            # Text search across multiple fields
+            # Text search over names, numbers, class and parent names
             if params.get("search"):
-                search_query = params["search"]
-                queryset = queryset.filter(
-                    Q(admission_number__icontains=search_query)
-                    | Q(user__first_name__icontains=search_query)
-                    | Q(user__last_name__icontains=search_query)
-                    | Q(user__email__icontains=search_query)
-                    | Q(roll_number__icontains=search_query)
-                    | Q(current_class__name__icontains=search_query)
-                    | Q(
-                        student_parent_relations__parent__user__first_name__icontains=search_query
-                    )
-                    | Q(
-                        student_parent_relations__parent__user__last_name__icontains=search_query
-                    )
-                )
+                queryset = queryset.search(params["search"])
 
             # Status filters (multiple)
             if params.get("status"):
@@ -285,28 +273,28 @@ class StudentSearchService:
     def get_search_suggestions(query, limit=10):
         """Get search suggestions based on partial query"""
         try:
-            if len(query) < 2:
+            terms = search_terms(query)
+            if len(query.strip()) < 2 or not terms:
                 return []
 
-            cache_key = f"search_suggestions_{query.lower()}_{limit}"
+            # The index version changes with every student or parent change
+            cache_key = "search_suggestions_{}_{}_{}".format(
+                search_index.version(),
+                hashlib.md5(" ".join(terms).encode("utf-8")).hexdigest(),
+                limit,
+            )
             suggestions = cache.get(cache_key)
 
             if suggestions is None:
                 suggestions = []
 
                 # Student name suggestions
-                students = Student.objects.filter(
-                    Q(user__first_name__icontains=query)
-                    | Q(user__last_name__icontains=query)
-                    | Q(admission_number__icontains=query)
-                ).select_related("user", "current_class")[:limit]
-
-                for student in students:
+                for student in suggest_students(query, limit):
                     suggestions.append(
                         {
                             "type": "student",
                             "id": str(student.id),
-                            "text": f"{student.get_full_name()} ({student.admission_number})",
+                            "text": f"{student.full_name} ({student.admission_number})",
                             "category": "Students",
                             "class": (
                                 str(student.current_class)
@@ -336,13 +324,7 @@ class StudentSearchService:
                     )
 
                 # Parent suggestions
-                parents = Parent.objects.filter(
-                    Q(user__first_name__icontains=query)
-                    | Q(user__last_name__icontains=query)
-                    | Q(user__email__icontains=query)
-                ).select_related("user")[:5]
-
-                for parent in parents:
+                for parent in suggest_parents(query, 5):
                     suggestions.append(
                         {
                             "type": "parent",
@@ -368,15 +350,7 @@ class StudentSearchService:
 
             # Basic search
             if filters.get("search"):
-                search_query = filters["search"]
-                queryset = queryset.filter(
-                    Q(user__first_name__icontains=search_query)
-                    | Q(user__last_name__icontains=search_query)
-                    | Q(user__email__icontains=search_query)
-                    | Q(user__phone_number__icontains=search_query)
-                    | Q(occupation__icontains=search_query)
-                    | Q(workplace__icontains=search_query)
-                )
+                queryset = queryset.search(filters["search"])
 
             # Relation filter
             if filters.get("relation"):
@@ -409,26 +383,16 @@ class StudentSearchService:
         """Search student-parent relationships"""
         try:
             queryset = StudentParentRelation.objects.select_related(
-                "student__user", "parent__user"
+                "student", "parent__user"
             )
 
             # Student search
-            if filters.get("student_search"):
-                search_query = filters["student_search"]
-                queryset = queryset.filter(
-                    Q(student__admission_number__icontains=search_query)
-                    | Q(student__user__first_name__icontains=search_query)
-                    | Q(student__user__last_name__icontains=search_query)
-                )
+            for term in search_terms(filters.get("student_search")):
+                queryset = queryset.filter(student__search_text__contains=term)
 
             # Parent search
-            if filters.get("parent_search"):
-                search_query = filters["parent_search"]
-                queryset = queryset.filter(
-                    Q(parent__user__first_name__icontains=search_query)
-                    | Q(parent__user__last_name__icontains=search_query)
-                    | Q(parent__user__email__icontains=search_query)
-                )
+            for term in search_terms(filters.get("parent_search")):
+                queryset = queryset.filter(parent__search_text__contains=term)
 
             # Relationship type filters
             if filters.get("is_primary_contact") is not None:
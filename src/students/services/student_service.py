@@ -11,6 +11,7 @@ from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.mail import send_mail
 from django.db import transaction
+from django.db.models import Prefetch
 from django.template.loader import render_to_string
 from django.utils import timezone
 from PIL import Image
@@ -20,7 +21,10 @@ from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.pdfgen import canvas
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
+from src.core.exports import get_export_setting, iter_csv
+
 from ..models import Parent, Student, StudentParentRelation
+from .import_service import StudentImportService
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -532,95 +536,52 @@ Best regards,
 
     @staticmethod
     def bulk_import_students(
-        csv_file, default_class=None, send_welcome_emails=True, created_by=None
+        csv_file,
+        default_class=None,
+        send_welcome_emails=True,
+        created_by=None,
+        update_existing=False,
     ):
         """
-        Import students from CSV file
+        Import students from a CSV or XLSX file
 
         Args:
-            csv_file: CSV file object
+            csv_file: CSV or XLSX file object
             default_class (Class): Default class for students
             send_welcome_emails (bool): Whether to send welcome emails
             created_by (User): User who imported the students
+            update_existing (bool): Update students that already exist
 
         Returns:
             dict: Import results
         """
-        created_count = 0
-        failed_count = 0
-        errors = []
+        if not getattr(csv_file, "name", None):
+            csv_file.name = "bulk_import.csv"
 
         try:
-            # Read CSV
-            csv_content = csv_file.read().decode("utf-8")
-            csv_reader = csv.DictReader(io.StringIO(csv_content))
-
-            with transaction.atomic():
-                for row_num, row in enumerate(csv_reader, start=2):
-                    try:
-                        # Extract student data from CSV row
-                        student_data = {
-                            "first_name": row.get("first_name", "").strip(),
-                            "last_name": row.get("last_name", "").strip(),
-                            "email": row.get("email", "").strip() or None,
-                            "phone_number": row.get("phone_number", "").strip() or None,
-                            "admission_number": row.get("admission_number", "").strip(),
-                            "emergency_contact_name": row.get(
-                                "emergency_contact_name", ""
-                            ).strip(),
-                            "emergency_contact_number": row.get(
-                                "emergency_contact_number", ""
-                            ).strip(),
-                            "blood_group": row.get("blood_group", "Unknown"),
-                            "gender": row.get("gender", "").strip()[:1].upper() or "",
-                        }
-
-                        # Set class
-                        class_name = row.get("class_name", "").strip()
-                        if class_name:
-                            from src.academics.models import Class
-
-                            try:
-                                student_data["current_class"] = Class.objects.get(
-                                    name=class_name
-                                )
-                            except Class.DoesNotExist:
-                                if default_class:
-                                    student_data["current_class"] = default_class
-                        elif default_class:
-                            student_data["current_class"] = default_class
-
-                        # Create student
-                        student = StudentService.create_student(
-                            student_data, created_by
-                        )
-                        created_count += 1
-
-                        # Send welcome email if enabled
-                        if (
-                            send_welcome_emails
-                            and student.email
-                            and getattr(settings, "ENABLE_EMAIL_NOTIFICATIONS", True)
-                        ):
-                            try:
-                                StudentService.send_welcome_email(student)
-                            except Exception as e:
-                                logger.error(f"Failed to send welcome email: {str(e)}")
-
-                    except Exception as e:
-                        failed_count += 1
-                        error_msg = f"Row {row_num}: {str(e)}"
-                        errors.append(error_msg)
-                        logger.error(f"Failed to import student from {error_msg}")
-
+            result = StudentImportService.run_import(
+                uuid.uuid4().hex,
+                csv_file,
+                default_class=default_class,
+                send_welcome_emails=send_welcome_emails,
+                update_existing=update_existing,
+                created_by=created_by,
+            )
         except Exception as e:
             logger.error(f"Error during bulk import: {str(e)}")
             raise InvalidStudentDataError(f"Import failed: {str(e)}")
 
+        if result["status"] == "failed":
+            raise InvalidStudentDataError(result["message"])
+
         return {
-            "created": created_count,
-            "failed": failed_count,
-            "errors": errors,
+            "success": True,
+            "created": result["created"],
+            "updated": result["updated"],
+            "failed": result["error_count"],
+            "errors": [
+                f"Row {error['row']}: {error['message']}" for error in result["errors"]
+            ],
         }
 
     @staticmethod
@@ -750,6 +711,94 @@ Best regards,
         except Exception as e:
             logger.error(f"Error in graduation notifications: {str(e)}")
 
+    EXPORT_FIELDS = [
+        "admission_number",
+        "registration_number",
+        "first_name",
+        "last_name",
+        "email",
+        "phone_number",
+        "date_of_birth",
+        "gender",
+        "status",
+        "current_class",
+        "roll_number",
+        "blood_group",
+        "nationality",
+        "religion",
+        "address",
+        "city",
+        "state",
+        "postal_code",
+        "country",
+        "emergency_contact_name",
+        "emergency_contact_number",
+        "medical_conditions",
+        "admission_date",
+        "previous_school",
+        "primary_parent_name",
+        "primary_parent_phone",
+        "created_at",
+    ]
+
+    @staticmethod
+    def iter_export_rows(queryset, chunk_size=None):
+        """
+        Yield export rows, in EXPORT_FIELDS order, for students
+
+        Students are fetched chunk_size at a time together with their class
+        and primary parent, so memory stays flat however many are exported.
+
+        Args:
+            queryset: QuerySet of Student objects
+            chunk_size (int): Students fetched per database round trip
+        """
+        queryset = queryset.select_related("current_class__grade").prefetch_related(
+            Prefetch(
+                "student_parent_relations",
+                queryset=StudentParentRelation.objects.filter(
+                    is_primary_contact=True
+                ).select_related("parent__user"),
+                to_attr="primary_parent_relations",
+            )
+        )
+
+        for student in queryset.iterator(
+            chunk_size=chunk_size or get_export_setting("CHUNK_SIZE")
+        ):
+            relations = student.primary_parent_relations
+            primary_parent = relations[0].parent if relations else None
+
+            yield [
+                student.admission_number,
+                student.registration_number or "",
+                student.first_name,
+                student.last_name,
+                student.email or "",
+                student.phone_number or "",
+                student.date_of_birth or "",
+                student.gender or "",
+                student.status,
+                str(student.current_class) if student.current_class else "",
+                student.roll_number or "",
+                student.blood_group,
+                "",  # nationality: removed field
+                "",  # religion: removed field
+                student.address or "",
+                "",  # city: removed field
+                "",  # state: removed field
+                "",  # postal_code: removed field
+                "",  # country: removed field
+                student.emergency_contact_name,
+                student.emergency_contact_number,
+                student.medical_conditions or "",
+                student.admission_date,
+                student.previous_school or "",
+                primary_parent.get_full_name() if primary_parent else "",
+                primary_parent.user.phone_number if primary_parent else "",
+                student.date_joined.strftime("%Y-%m-%d %H:%M:%S"),
+            ]
+
     @staticmethod
     def export_students_to_csv(queryset):
         """
@@ -761,84 +810,12 @@ Best regards,
         Returns:
             str: CSV content as string
         """
-        fieldnames = [
-            "admission_number",
-            "registration_number",
-            "first_name",
-            "last_name",
-            "email",
-            "phone_number",
-            "date_of_birth",
-            "gender",
-            "status",
-            "current_class",
-            "roll_number",
-            "blood_group",
-            "nationality",
-            "religion",
-            "address",
-            "city",
-            "state",
-            "postal_code",
-            "country",
-            "emergency_contact_name",
-            "emergency_contact_number",
-            "medical_conditions",
-            "admission_date",
-            "previous_school",
-            "primary_parent_name",
-            "primary_parent_phone",
-            "created_at",
-        ]
-
-        csv_buffer = io.StringIO()
-        writer = csv.DictWriter(csv_buffer, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for student in queryset.select_related(
-            "current_class"
-        ).prefetch_related("student_parent_relations__parent__user"):
-            primary_parent = student.get_primary_parent()
-
-            writer.writerow(
-                {
-                    "admission_number": student.admission_number,
-                    "registration_number": student.registration_number or "",
-                    "first_name": student.first_name,
-                    "last_name": student.last_name,
-                    "email": student.email or "",
-                    "phone_number": student.phone_number or "",
-                    "date_of_birth": student.date_of_birth or "",
-                    "gender": student.gender or "",
-                    "status": student.status,
-                    "current_class": (
-                        str(student.current_class) if student.current_class else ""
-                    ),
-                    "roll_number": student.roll_number or "",
-                    "blood_group": student.blood_group,
-                    "nationality": "",  # Removed field
-                    "religion": "",  # Removed field
-                    "address": student.address or "",
-                    "city": "",  # Removed field
-                    "state": "",  # Removed field
-                    "postal_code": "",  # Removed field
-                    "country": "",  # Removed field
-                    "emergency_contact_name": student.emergency_contact_name,
-                    "emergency_contact_number": student.emergency_contact_number,
-                    "medical_conditions": student.medical_conditions or "",
-                    "admission_date": student.admission_date,
-                    "previous_school": student.previous_school or "",
-                    "primary_parent_name": (
-                        primary_parent.get_full_name() if primary_parent else ""
-                    ),
-                    "primary_parent_phone": (
-                        primary_parent.user.phone_number if primary_parent else ""
-                    ),
-                    "created_at": student.date_joined.strftime("%Y-%m-%d %H:%M:%S"),
-                }
+        return "".join(
+            iter_csv(
+                StudentService.EXPORT_FIELDS,
+                StudentService.iter_export_rows(queryset),
             )
-
-        return csv_buffer.getvalue()
+        )
 
     @staticmethod
     def get_student_statistics():
@@ -853,7 +830,9 @@ Best regards,
             "graduated_students": Student.objects.filter(status="Graduated").count(),
             "suspended_students": Student.objects.filter(status="Suspended").count(),
             "withdrawn_students": Student.objects.filter(status="Withdrawn").count(),
-            "students_with_photos": Student.objects.exclude(profile_picture__isnull=True)
+            "students_with_photos": Student.objects.exclude(
+                profile_picture__isnull=True
+            )
             .exclude(profile_picture="")
             .count(),
             "students_without_parents": Student.objects.filter(
@@ -11,7 +11,10 @@ from django.dispatch import receiver
 from django.template.loader import render_to_string
 from django.utils import timezone
 
+from src.academics.models import Class
+
 from .models import Parent, Student, StudentParentRelation
+from .services import search_index
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -262,6 +265,84 @@ def handle_student_parent_relation_deleted(sender, instance, **kwargs):
         logger.error(f"Error in student-parent relation deletion signal: {str(e)}")
 
 
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Parent)
+@receiver(post_delete, sender=Parent)
+@receiver(post_save, sender=StudentParentRelation)
+@receiver(post_delete, sender=StudentParentRelation)
+def invalidate_student_analytics(sender, instance, **kwargs):
+    """Drop cached dashboard analytics once the change is committed"""
+    transaction.on_commit(clear_analytics_cache)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def update_student_search_text(sender, instance, update_fields=None, **kwargs):
+    """Keep the student's search_text and suggestion entry current"""
+    if update_fields and not set(update_fields) & search_index.STUDENT_SEARCH_FIELDS:
+        return
+    try:
+        search_index.refresh_student_search_text([instance.pk])
+    except Exception as e:
+        logger.error(f"Error updating student search text: {str(e)}")
+
+
+@receiver(post_save, sender=Parent)
+@receiver(post_delete, sender=Parent)
+def update_parent_search_text(sender, instance, update_fields=None, **kwargs):
+    """Keep the parent's search_text and suggestion entry current"""
+    if update_fields and not set(update_fields) & search_index.PARENT_SEARCH_FIELDS:
+        return
+    try:
+        search_index.refresh_parent_search_text([instance.pk])
+    except Exception as e:
+        logger.error(f"Error updating parent search text: {str(e)}")
+
+
+@receiver(post_save, sender=StudentParentRelation)
+@receiver(post_delete, sender=StudentParentRelation)
+def update_search_text_on_relation_change(sender, instance, **kwargs):
+    """Students are found by their parents' names"""
+    try:
+        search_index.refresh_student_search_text([instance.student_id])
+    except Exception as e:
+        logger.error(f"Error updating student search text: {str(e)}")
+
+
+@receiver(post_save, sender=User)
+def update_search_text_on_user_change(sender, instance, update_fields=None, **kwargs):
+    """Parent names live on their user accounts"""
+    if update_fields and not set(update_fields) & search_index.USER_SEARCH_FIELDS:
+        return
+    try:
+        parent_ids = list(
+            Parent.objects.filter(user=instance).values_list("id", flat=True)
+        )
+        if parent_ids:
+            search_index.refresh_parent_search_text(parent_ids)
+            search_index.refresh_student_search_text(
+                StudentParentRelation.objects.filter(
+                    parent_id__in=parent_ids
+                ).values_list("student_id", flat=True)
+            )
+    except Exception as e:
+        logger.error(f"Error updating parent search text: {str(e)}")
+
+
+@receiver(post_save, sender=Class)
+def update_search_text_on_class_change(sender, instance, created, **kwargs):
+    """Students are found by their class name"""
+    if created:
+        return
+    try:
+        search_index.refresh_student_search_text(
+            Student.objects.filter(current_class=instance).values_list("id", flat=True)
+        )
+    except Exception as e:
+        logger.error(f"Error updating student search text: {str(e)}")
+
+
 # Helper functions for notifications
 
 
@@ -614,3 +695,13 @@ def clear_student_caches(student):
 
     except Exception as e:
         logger.error(f"Error clearing student caches: {str(e)}")
+
+
+def clear_analytics_cache():
+    """Clear the cached student analytics"""
+    from .services.analytics_service import StudentAnalyticsService
+
+    try:
+        StudentAnalyticsService.clear_analytics_cache()
+    except Exception as e:
+        logger.error(f"Error clearing analytics cache: {str(e)}")
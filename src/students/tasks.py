@@ -11,6 +11,7 @@ from django.template.loader import render_to_string
 from django.utils import timezone
 
 from .models import Parent, Student, StudentParentRelation
+from .services.import_service import StudentImportService
 from .services.parent_service import ParentService
 from .services.student_service import StudentService
 
@@ -115,7 +116,7 @@ def bulk_import_students_task(
         # Perform the import
         result = StudentService.bulk_import_students(
             csv_file=csv_file,
-            send_notifications=send_notifications,
+            send_welcome_emails=send_notifications,
             update_existing=update_existing,
             created_by=created_by,
         )
@@ -128,6 +129,69 @@ def bulk_import_students_task(
         raise
 
 
+@shared_task
+def import_students_task(
+    import_id,
+    file_path,
+    default_class_id=None,
+    send_welcome_emails=False,
+    update_existing=False,
+    validate_before_import=False,
+    created_by_id=None,
+):
+    """Import an uploaded student file, reporting progress under import_id"""
+    from django.contrib.auth import get_user_model
+    from django.core.files.storage import default_storage
+
+    from src.academics.models import Class
+
+    User = get_user_model()
+
+    try:
+        default_class = (
+            Class.objects.filter(id=default_class_id).first()
+            if default_class_id
+            else None
+        )
+        created_by = (
+            User.objects.filter(id=created_by_id).first() if created_by_id else None
+        )
+
+        with default_storage.open(file_path, "rb") as import_file:
+            result = StudentImportService.run_import(
+                import_id,
+                import_file,
+                default_class=default_class,
+                send_welcome_emails=send_welcome_emails,
+                update_existing=update_existing,
+                validate_before_import=validate_before_import,
+                created_by=created_by,
+            )
+
+        return {
+            "status": result["status"],
+            "created": result["created"],
+            "updated": result["updated"],
+            "errors": result["error_count"],
+        }
+
+    except Exception as e:
+        logger.error(f"Student import {import_id} failed: {str(e)}")
+        StudentImportService.set_status(
+            import_id,
+            status="failed",
+            message=f"Import failed: {str(e)}",
+            finished_at=timezone.now().isoformat(),
+        )
+        raise
+
+    finally:
+        try:
+            default_storage.delete(file_path)
+        except Exception as e:
+            logger.warning(f"Failed to delete import upload {file_path}: {str(e)}")
+
+
 @shared_task
 def bulk_import_parents_task(
     csv_content, send_notifications=False, update_existing=False, created_by_id=None
@@ -165,6 +229,110 @@ def bulk_import_parents_task(
         raise
 
 
+def build_bulk_export(export_type, filters=None):
+    """
+    Describe a bulk export: (file prefix, header, rows, queryset)
+
+    Rows are generated lazily from the queryset, so the caller decides
+    whether to stream them to the client or write them to storage.
+    """
+    filters = filters or {}
+
+    if export_type == "students":
+        search_filters = {
+            "status": filters.get("status"),
+            "class_id": filters.get("class_id") or filters.get("class"),
+            "blood_group": filters.get("blood_group"),
+            "admission_year": filters.get("admission_year"),
+        }
+        queryset = StudentService.search_students("", search_filters)
+
+        fields = filters.get("fields")
+        if fields:
+            # Columns picked on the student export form
+            from .views.import_export_views import StudentExportView
+
+            exporter = StudentExportView()
+            if "parents" in fields:
+                queryset = queryset.with_parents()
+            return (
+                "students_export",
+                exporter.get_export_headers(fields),
+                exporter.iter_export_rows(queryset, fields),
+                queryset,
+            )
+
+        return (
+            "students_export",
+            StudentService.EXPORT_FIELDS,
+            StudentService.iter_export_rows(queryset),
+            queryset,
+        )
+
+    if export_type == "parents":
+        queryset = Parent.objects.all().with_related()
+        if filters.get("relation"):
+            queryset = queryset.filter(relation_with_student=filters["relation"])
+        if filters.get("emergency_contact"):
+            queryset = queryset.filter(
+                emergency_contact=filters["emergency_contact"] == "true"
+            )
+        if filters.get("search"):
+            queryset = queryset.search(filters["search"])
+        return (
+            "parents_export",
+            ParentService.EXPORT_FIELDS,
+            ParentService.iter_export_rows(queryset),
+            queryset,
+        )
+
+    raise ValueError(f"Unknown export type: {export_type}")
+
+
+@shared_task
+def export_data_task(user_id, export_type, export_format="csv", filters=None):
+    """Write a large export to storage and notify the user who requested it"""
+    from django.contrib.auth import get_user_model
+    from django.core.files.storage import default_storage
+
+    from src.communications.services import NotificationService
+    from src.core.exports import export_filename, save_export
+
+    User = get_user_model()
+
+    try:
+        user = User.objects.get(id=user_id)
+        prefix, header, rows, _ = build_bulk_export(export_type, filters)
+        extension = "xlsx" if export_format == "xlsx" else "csv"
+
+        path = save_export(
+            export_filename(prefix, extension),
+            header,
+            rows,
+            export_format=extension,
+            title=export_type.title(),
+        )
+
+        NotificationService.create_notification(
+            user=user,
+            title="Your export is ready",
+            content=(
+                f"The {export_type} export you requested is ready to download: "
+                f"{default_storage.url(path)}"
+            ),
+            notification_type="export_ready",
+            reference_id=path,
+            reference_type="export",
+        )
+
+        logger.info(f"Export of {export_type} for user {user_id} saved to {path}")
+        return {"status": "success", "path": path}
+
+    except Exception as e:
+        logger.error(f"Export of {export_type} for user {user_id} failed: {str(e)}")
+        raise
+
+
 @shared_task
 def generate_student_reports_batch(student_ids, report_type="comprehensive"):
     """Generate reports for multiple students in batch"""
@@ -287,7 +455,9 @@ def send_bulk_notification_to_students(
             try:
                 # Skip students without email
                 if not student.email:
-                    logger.info(f"Student {student.admission_number} has no email address")
+                    logger.info(
+                        f"Student {student.admission_number} has no email address"
+                    )
                     continue
 
                 # Prepare context for each student
@@ -2,21 +2,27 @@
 import csv
 import io
 import tempfile
+from datetime import timedelta
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase, TransactionTestCase
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
-from src.courses.models import AcademicYear, Class, Department, Grade, Section
+from src.academics.models import AcademicYear, Class, Department, Grade, Section
 
 from .models import Parent, Student, StudentParentRelation
+from .services.analytics_service import StudentAnalyticsService
+from .services import search_index
+from .services.import_service import StudentImportService
 from .services.parent_service import ParentService
 from .services.student_service import StudentService
+from .tasks import build_bulk_export
 
 User = get_user_model()
 
@@ -397,6 +403,407 @@ Alice,Smith,alice@example.com,IMP-002,Bob Smith,+1234567891"""
         self.assertEqual(rows[0]["last_name"], "Student")
 
 
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class StudentImportServiceTest(TestCase):
+    HEADER = (
+        "first_name,last_name,email,admission_number,"
+        "emergency_contact_name,emergency_contact_number,class_name"
+    )
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username="admin", email="admin@test.com", password="testpass123"
+        )
+        self.section = Section.objects.create(name="A")
+        self.grade = Grade.objects.create(name="Test Grade", section=self.section)
+        self.academic_year = AcademicYear.objects.create(
+            name="2024-2025",
+            start_date="2024-04-01",
+            end_date="2025-03-31",
+            is_current=True,
+            created_by=self.admin_user,
+        )
+        self.class_obj = Class.objects.create(
+            name="North",
+            grade=self.grade,
+            section=self.section,
+            academic_year=self.academic_year,
+        )
+        cache.clear()
+
+    def make_file(self, *rows):
+        content = "\n".join((self.HEADER,) + rows)
+        return SimpleUploadedFile(
+            "students.csv", content.encode("utf-8"), content_type="text/csv"
+        )
+
+    def test_import_reports_row_errors_and_progress(self):
+        import_file = self.make_file(
+            "john,doe,john@example.com,imp-001,Jane Doe,+1234567890,North",
+            "alice,smith,,IMP-002,Bob Smith,+1234567891,",
+            "bad,email,not-an-email,IMP-003,Bob Smith,+1234567891,North",
+            "dup,row,,IMP-001,Bob Smith,+1234567891,North",
+            "no,class,,IMP-004,Bob Smith,+1234567891,South",
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            status = StudentImportService.run_import("test-import", import_file)
+
+        # One lookup each for classes and existing students, one insert
+        statements = [query["sql"].split()[0] for query in queries.captured_queries]
+        self.assertEqual(statements.count("SELECT"), 2)
+        self.assertEqual(statements.count("INSERT"), 1)
+
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["created"], 2)
+        self.assertEqual(status["processed"], 5)
+        self.assertEqual(status["progress_percent"], 100)
+        self.assertEqual([error["row"] for error in status["errors"]], [4, 5, 6])
+        self.assertEqual(StudentImportService.get_status("test-import"), status)
+
+        student = Student.objects.get(admission_number="IMP-001")
+        self.assertEqual(student.first_name, "John")
+        self.assertEqual(student.current_class, self.class_obj)
+        self.assertTrue(student.registration_number.startswith("STU-"))
+
+    def test_import_completes_when_cache_reads_fail(self):
+        import_file = self.make_file(
+            "john,doe,,IMP-001,Jane Doe,+1234567890,North",
+            "alice,smith,,IMP-002,Bob Smith,+1234567891,North",
+        )
+
+        # An unreachable cache that ignores exceptions reads back as a miss
+        with patch.object(cache, "get", return_value=None):
+            status = StudentImportService.run_import("test-import", import_file)
+
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["created"], 2)
+        self.assertEqual(Student.objects.count(), 2)
+
+    def test_validate_before_import_writes_nothing(self):
+        import_file = self.make_file(
+            "john,doe,,IMP-001,Jane Doe,+1234567890,North",
+            ",doe,,IMP-002,Jane Doe,+1234567890,North",
+        )
+
+        status = StudentImportService.run_import(
+            "test-import", import_file, validate_before_import=True
+        )
+
+        self.assertEqual(status["status"], "failed")
+        self.assertEqual(status["error_count"], 1)
+        self.assertFalse(Student.objects.exists())
+
+    @patch("src.students.tasks.send_bulk_notification_to_students.delay")
+    def test_updates_existing_and_queues_welcome_emails(self, mock_delay):
+        existing = Student.objects.create(
+            first_name="Old",
+            last_name="Name",
+            admission_number="IMP-001",
+            admission_date=timezone.now().date(),
+            emergency_contact_name="Emergency Contact",
+            emergency_contact_number="1234567890",
+        )
+        import_file = self.make_file(
+            "new,name,,IMP-001,Jane Doe,+1234567890,North",
+            "alice,smith,alice@example.com,IMP-002,Bob Smith,+1234567891,North",
+        )
+
+        status = StudentImportService.run_import(
+            "test-import",
+            import_file,
+            send_welcome_emails=True,
+            update_existing=True,
+        )
+
+        self.assertEqual((status["created"], status["updated"]), (1, 1))
+        existing.refresh_from_db()
+        self.assertEqual(existing.first_name, "New")
+        self.assertEqual(existing.current_class, self.class_obj)
+
+        new_student = Student.objects.get(admission_number="IMP-002")
+        mock_delay.assert_called_once()
+        self.assertEqual(mock_delay.call_args.args[0], [str(new_student.id)])
+
+    @patch("src.students.signals.notify_class_change")
+    @patch("src.students.signals.notify_status_change")
+    def test_updates_announce_status_and_class_changes(
+        self, mock_status_change, mock_class_change
+    ):
+        old_class = Class.objects.create(
+            name="South",
+            grade=self.grade,
+            section=self.section,
+            academic_year=self.academic_year,
+        )
+        moved, suspended = Student.objects.bulk_create(
+            [
+                Student(
+                    first_name="Student",
+                    last_name=str(number),
+                    admission_number=f"IMP-00{number}",
+                    admission_date=timezone.now().date(),
+                    current_class=old_class,
+                    emergency_contact_name="Emergency Contact",
+                    emergency_contact_number="1234567890",
+                    status="Active",
+                )
+                for number in (1, 2)
+            ]
+        )
+        self.HEADER += ",status"
+        import_file = self.make_file(
+            "student,1,,IMP-001,Jane Doe,+1234567890,North,Active",
+            "student,2,,IMP-002,Jane Doe,+1234567890,,Suspended",
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            status = StudentImportService.run_import(
+                "test-import", import_file, update_existing=True
+            )
+
+        self.assertEqual(status["updated"], 2)
+        mock_class_change.assert_called_once()
+        student = mock_class_change.call_args.args[0]
+        self.assertEqual(student.pk, moved.pk)
+        self.assertEqual(
+            (student._old_class, student._new_class), (old_class, self.class_obj)
+        )
+        mock_status_change.assert_called_once()
+        student = mock_status_change.call_args.args[0]
+        self.assertEqual(student.pk, suspended.pk)
+        self.assertEqual(
+            (student._old_status, student._new_status), ("Active", "Suspended")
+        )
+
+
+@override_settings(EXPORT_SETTINGS={"BACKGROUND_THRESHOLD": 1})
+class StudentExportViewTest(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username="admin", email="admin@test.com", password="testpass123"
+        )
+        section = Section.objects.create(name="A")
+        grade = Grade.objects.create(name="Test Grade", section=section)
+        academic_year = AcademicYear.objects.create(
+            name="2024-2025",
+            start_date="2024-04-01",
+            end_date="2025-03-31",
+            is_current=True,
+            created_by=self.admin_user,
+        )
+        self.class_obj = Class.objects.create(
+            name="North", grade=grade, section=section, academic_year=academic_year
+        )
+        for number, class_obj in (("EXP-001", self.class_obj), ("EXP-002", None)):
+            Student.objects.create(
+                first_name="Export",
+                last_name="Student",
+                admission_number=number,
+                admission_date=timezone.now().date(),
+                current_class=class_obj,
+                emergency_contact_name="Emergency Contact",
+                emergency_contact_number="+1234567890",
+            )
+        self.client.force_login(self.admin_user)
+
+    @patch("src.students.views.import_export_views.export_data_task.delay")
+    def test_large_form_exports_run_in_background(self, mock_delay):
+        url = reverse("students:student-export")
+        response = self.client.post(
+            url,
+            {
+                "export_format": "excel",
+                "include_fields": ["admission_number", "current_class"],
+                "status_filter": "Active",
+            },
+        )
+
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        user_id, export_type, export_format, filters = mock_delay.call_args.args
+        self.assertEqual(
+            (user_id, export_type, export_format),
+            (self.admin_user.id, "students", "xlsx"),
+        )
+
+        # The background job writes the columns picked on the form
+        _, header, rows, _ = build_bulk_export(export_type, filters)
+        self.assertEqual(header, ["Admission Number", "Current Class"])
+        self.assertEqual(
+            sorted(rows), [["EXP-001", str(self.class_obj)], ["EXP-002", ""]]
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class StudentAnalyticsServiceTest(TestCase):
+    def setUp(self):
+        today = timezone.now().date()
+        self.students = [
+            Student.objects.create(
+                first_name="Student",
+                last_name=str(index),
+                admission_number=f"ANA-{index:03d}",
+                admission_date=today,
+                date_of_birth=birth_date,
+                emergency_contact_name="Emergency Contact",
+                emergency_contact_number="1234567890",
+            )
+            for index, birth_date in enumerate(
+                [
+                    today.replace(year=today.year - 10),
+                    today.replace(year=today.year - 10) + timedelta(days=1),
+                    today.replace(year=today.year - 14),
+                    None,
+                ]
+            )
+        ]
+        parent_user = User.objects.create_user(
+            username="analyticsparent@example.com",
+            email="analyticsparent@example.com",
+        )
+        self.parent = Parent.objects.create(
+            user=parent_user, relation_with_student="Mother"
+        )
+        StudentParentRelation.objects.create(
+            student=self.students[0], parent=self.parent
+        )
+        cache.clear()
+
+    def test_age_statistics_match_student_age(self):
+        with self.assertNumQueries(2):
+            stats = StudentAnalyticsService._get_age_statistics()
+
+        ages = [student.age for student in self.students if student.date_of_birth]
+        self.assertEqual(ages, [10, 9, 14])
+        self.assertEqual(stats["min_age"], 9)
+        self.assertEqual(stats["max_age"], 14)
+        self.assertEqual(stats["average_age"], 11.0)
+        self.assertEqual(stats["age_distribution"], {"9-11": 2, "12-14": 1})
+
+    def test_completion_percentage_in_one_query(self):
+        # Names, emergency contact name and number score 4 of 10 fields for
+        # everyone; three have a date of birth and one a parent: 20 of 40
+        with self.assertNumQueries(1):
+            percentage = (
+                StudentAnalyticsService._calculate_overall_completion_percentage()
+            )
+
+        self.assertEqual(percentage, 50.0)
+
+    def test_dashboard_cache_cleared_on_commit(self):
+        StudentAnalyticsService.get_comprehensive_dashboard_data()
+        self.assertIsNotNone(cache.get("student_dashboard_analytics"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentParentRelation.objects.create(
+                student=self.students[1], parent=self.parent
+            )
+
+        self.assertIsNone(cache.get("student_dashboard_analytics"))
+
+    def test_both_parents_counts_two_father_or_mother_links(self):
+        # Mother and Father, two mothers, a father alone, nobody
+        for student, relation in [
+            (self.students[0], "Father"),
+            (self.students[1], "Mother"),
+            (self.students[1], "Mother"),
+            (self.students[2], "Father"),
+        ]:
+            number = Parent.objects.count()
+            user = User.objects.create_user(
+                username=f"parent{number}@example.com",
+                email=f"parent{number}@example.com",
+            )
+            StudentParentRelation.objects.create(
+                student=student,
+                parent=Parent.objects.create(user=user, relation_with_student=relation),
+            )
+
+        metrics = StudentAnalyticsService.get_performance_metrics()
+
+        self.assertEqual(metrics["family_structure"]["students_with_both_parents"], 2)
+        self.assertEqual(metrics["family_structure"]["students_with_single_parent"], 1)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class StudentSearchIndexTest(TestCase):
+    def setUp(self):
+        self.student = Student.objects.create(
+            first_name="José",
+            last_name="Álvarez",
+            admission_number="SRCH-001",
+            admission_date=timezone.now().date(),
+            emergency_contact_name="Emergency Contact",
+            emergency_contact_number="1234567890",
+        )
+        self.other = Student.objects.create(
+            first_name="Maria",
+            last_name="Ajoseph",
+            admission_number="SRCH-002",
+            admission_date=timezone.now().date(),
+            emergency_contact_name="Emergency Contact",
+            emergency_contact_number="1234567890",
+        )
+        self.parent_user = User.objects.create_user(
+            username="searchparent@example.com",
+            email="searchparent@example.com",
+            first_name="Carmen",
+            last_name="Ortega",
+        )
+        self.parent = Parent.objects.create(
+            user=self.parent_user, relation_with_student="Mother"
+        )
+        StudentParentRelation.objects.create(student=self.student, parent=self.parent)
+        cache.clear()
+        search_index.search_index.invalidate()
+
+    def test_search_text_follows_parent_names(self):
+        self.student.refresh_from_db()
+        self.assertEqual(
+            self.student.search_text, " jose alvarez srch-001 carmen ortega "
+        )
+
+        self.parent_user.last_name = "Ruiz"
+        self.parent_user.save()
+
+        self.assertEqual(list(Student.objects.search("ruiz")), [self.student])
+        self.assertFalse(Student.objects.search("ortega").exists())
+
+    def test_search_ranks_own_names_first(self):
+        results = list(Student.objects.search("jos"))
+
+        # Both match; José by first name, Maria only inside her last name
+        self.assertEqual(results, [self.student, self.other])
+        self.assertEqual(
+            [student.search_rank for student in results],
+            [2, 0],
+        )
+        self.assertEqual(list(Student.objects.search("srch-002")), [self.other])
+
+    def test_suggestions_use_patched_memory_index(self):
+        self.assertEqual(search_index.suggest_students("jo al"), [self.student])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.first_name = "Joanna"
+            self.other.save()
+
+        with self.assertNumQueries(1):
+            suggestions = search_index.suggest_students("jo")
+
+        self.assertEqual(suggestions, [self.other, self.student])
+        self.assertEqual(
+            [parent.id for parent in search_index.suggest_parents("carm")],
+            [self.parent.id],
+        )
+
+
 class StudentViewsTest(TransactionTestCase):
     def setUp(self):
         # Create admin user
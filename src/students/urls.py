@@ -35,6 +35,7 @@ from .views.parent_views import (
 
 # Import new import/export views
 from .views.import_export_views import (
+    ImportStatusView,
     StudentImportView,
     StudentExportView,
     download_import_template,
@@ -87,6 +88,7 @@ urlpatterns = [
     path("import/", login_required(StudentImportView.as_view()), name="student-import"),
     path("import/template/", download_import_template, name="download-import-template"),
     path("import/validate/", validate_import_file, name="validate-import-file"),
+    path("import/status/", ImportStatusView.as_view(), name="import-status"),
     # Export operations
     path("export/", login_required(StudentExportView.as_view()), name="student-export"),
     path("export/csv/", export_students_csv, name="export-csv"),
@@ -1,36 +1,45 @@
 # students/views/import_export_views.py
 import csv
-import datetime
 import io
+import uuid
 
 import logging
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.core.exceptions import ValidationError
-from django.db import transaction
-from django.core.cache import cache
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.views.generic import FormView, TemplateView, View
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill
-from openpyxl.utils import get_column_letter
+from src.core.exports import (
+    csv_response,
+    export_filename,
+    get_export_setting,
+    should_run_in_background,
+    xlsx_response,
+)
 
 from ..forms import *
 from ..models import Parent, Student
+from ..services.import_service import StudentImportService
 from ..services.parent_service import ParentService
 from ..services.student_service import StudentService
+from ..tasks import build_bulk_export, export_data_task, import_students_task
 from ..utils import StudentUtils
 
 logger = logging.getLogger(__name__)
 
+BACKGROUND_EXPORT_MESSAGE = (
+    "This export is large, so it is being prepared in the "
+    "background. You will be notified when it is ready to download."
+)
+
 
 class StudentImportView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
     """
@@ -44,333 +53,48 @@ class StudentImportView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
     success_url = reverse_lazy("students:student-list")
 
     def form_valid(self, form):
-        try:
-            import_file = form.cleaned_data["import_file"]
-            default_class = form.cleaned_data.get("default_class")
-            send_welcome_emails = form.cleaned_data.get("send_welcome_emails", False)
-            update_existing = form.cleaned_data.get("update_existing", False)
-
-            # Determine file type
-            if import_file.name.endswith(".csv"):
-                result = self.process_csv_import(
-                    import_file, default_class, send_welcome_emails, update_existing
-                )
-            elif import_file.name.endswith((".xlsx", ".xls")):
-                result = self.process_excel_import(
-                    import_file, default_class, send_welcome_emails, update_existing
-                )
-            else:
-                messages.error(
-                    self.request,
-                    "Unsupported file format. Please use CSV or Excel files.",
-                )
-                return self.form_invalid(form)
-
-            # Display results
-            if result["created"] > 0:
-                messages.success(
-                    self.request, f"Successfully imported {result['created']} students."
-                )
-
-            if result["updated"] > 0:
-                messages.success(
-                    self.request, f"Successfully updated {result['updated']} students."
-                )
-
-            if result["errors"]:
-                for error in result["errors"][:10]:  # Show first 10 errors
-                    messages.error(
-                        self.request, f"Row {error['row']}: {error['message']}"
-                    )
-
-                if len(result["errors"]) > 10:
-                    messages.warning(
-                        self.request,
-                        f"And {len(result['errors']) - 10} more errors. Check the detailed report.",
-                    )
+        import_file = form.cleaned_data["import_file"]
 
-            return super().form_valid(form)
-
-        except Exception as e:
-            logger.error(f"Error during student import: {str(e)}")
-            messages.error(self.request, f"Import failed: {str(e)}")
+        if not import_file.name.lower().endswith((".csv", ".xlsx")):
+            messages.error(
+                self.request,
+                "Unsupported file format. Please use CSV or Excel (.xlsx) files.",
+            )
             return self.form_invalid(form)
 
-    def process_csv_import(
-        self, csv_file, default_class, send_welcome_emails, update_existing
-    ):
-        """Process CSV file import"""
-        result = {"created": 0, "updated": 0, "errors": []}
+        default_class = form.cleaned_data.get("default_class")
+        import_id = uuid.uuid4().hex
 
         try:
-            csv_content = csv_file.read().decode("utf-8-sig")  # Handle BOM
-            csv_reader = csv.DictReader(io.StringIO(csv_content))
-
-            with transaction.atomic():
-                for row_num, row in enumerate(csv_reader, start=2):
-                    try:
-                        student_result = self.process_student_row(
-                            row,
-                            row_num,
-                            default_class,
-                            send_welcome_emails,
-                            update_existing,
-                        )
-
-                        if student_result["action"] == "created":
-                            result["created"] += 1
-                        elif student_result["action"] == "updated":
-                            result["updated"] += 1
-
-                    except Exception as e:
-                        result["errors"].append({"row": row_num, "message": str(e)})
-                        logger.error(f"Error processing row {row_num}: {str(e)}")
-
-        except Exception as e:
-            raise Exception(f"Error reading CSV file: {str(e)}")
-
-        return result
-
-    def process_excel_import(
-        self, excel_file, default_class, send_welcome_emails, update_existing
-    ):
-        """Process Excel file import"""
-        result = {"created": 0, "updated": 0, "errors": []}
-
-        try:
-            import openpyxl
-
-            workbook = openpyxl.load_workbook(excel_file)
-            worksheet = workbook.active
-
-            # Get headers from first row
-            headers = []
-            for cell in worksheet[1]:
-                headers.append(
-                    cell.value.lower().replace(" ", "_") if cell.value else ""
-                )
-
-            with transaction.atomic():
-                for row_num, row in enumerate(
-                    worksheet.iter_rows(min_row=2, values_only=True), start=2
-                ):
-                    try:
-                        # Convert row to dictionary
-                        row_dict = {}
-                        for i, value in enumerate(row):
-                            if i < len(headers) and headers[i]:
-                                row_dict[headers[i]] = value
-
-                        student_result = self.process_student_row(
-                            row_dict,
-                            row_num,
-                            default_class,
-                            send_welcome_emails,
-                            update_existing,
-                        )
-
-                        if student_result["action"] == "created":
-                            result["created"] += 1
-                        elif student_result["action"] == "updated":
-                            result["updated"] += 1
-
-                    except Exception as e:
-                        result["errors"].append({"row": row_num, "message": str(e)})
-                        logger.error(f"Error processing row {row_num}: {str(e)}")
-
-        except Exception as e:
-            raise Exception(f"Error reading Excel file: {str(e)}")
-
-        return result
-
-    def process_student_row(
-        self, row, row_num, default_class, send_welcome_emails, update_existing
-    ):
-        """
-        Process a single student row from import file
-        Updated to work without user account creation
-        """
-        # Clean and validate row data
-        student_data = self.clean_row_data(row)
-
-        # Validate required fields
-        required_fields = [
-            "first_name",
-            "last_name",
-            "admission_number",
-            "emergency_contact_name",
-            "emergency_contact_number",
-        ]
-        for field in required_fields:
-            if not student_data.get(field):
-                raise ValidationError(f"Missing required field: {field}")
-
-        # Handle class assignment
-        if not student_data.get("current_class") and default_class:
-            student_data["current_class"] = default_class
-        elif student_data.get("class_name"):
-            try:
-                student_data["current_class"] = Class.objects.get(
-                    name=student_data["class_name"]
-                )
-            except Class.DoesNotExist:
-                if default_class:
-                    student_data["current_class"] = default_class
-                else:
-                    raise ValidationError(
-                        f"Class '{student_data['class_name']}' not found"
-                    )
-
-        # Check if student already exists
-        admission_number = student_data["admission_number"]
-        existing_student = Student.objects.filter(
-            admission_number=admission_number
-        ).first()
-
-        if existing_student:
-            if update_existing:
-                # Update existing student
-                for field, value in student_data.items():
-                    if (
-                        field != "admission_number" and value
-                    ):  # Don't update admission number
-                        setattr(existing_student, field, value)
-
-                existing_student.save()
-
-                if send_welcome_emails and existing_student.email:
-                    try:
-                        StudentService.send_welcome_email(existing_student)
-                    except Exception as e:
-                        logger.error(f"Failed to send welcome email: {str(e)}")
-
-                return {"action": "updated", "student": existing_student}
-            else:
-                raise ValidationError(
-                    f"Student with admission number {admission_number} already exists"
-                )
-        else:
-            # Create new student (without user account)
-            student = StudentService.create_student(
-                student_data, created_by=self.request.user
+            file_path = StudentImportService.save_upload(import_file, import_id)
+            StudentImportService.set_status(
+                import_id,
+                status="pending",
+                file_name=import_file.name,
+                current_record="Waiting to start",
             )
+            import_students_task.delay(
+                import_id,
+                file_path,
+                default_class_id=default_class.id if default_class else None,
+                send_welcome_emails=form.cleaned_data.get("send_welcome_emails", False),
+                update_existing=form.cleaned_data.get("update_existing", False),
+                validate_before_import=form.cleaned_data.get(
+                    "validate_before_import", False
+                ),
+                created_by_id=self.request.user.id,
+            )
+        except Exception as e:
+            logger.error(f"Error starting student import: {str(e)}")
+            messages.error(self.request, f"Import failed: {str(e)}")
+            return self.form_invalid(form)
 
-            if send_welcome_emails and student.email:
-                try:
-                    StudentService.send_welcome_email(student)
-                except Exception as e:
-                    logger.error(f"Failed to send welcome email: {str(e)}")
-
-            return {"action": "created", "student": student}
-
-    def clean_row_data(self, row):
-        """Clean and normalize row data for student creation"""
-        cleaned_data = {}
-
-        # Field mapping (CSV/Excel header -> model field)
-        field_mapping = {
-            "first_name": "first_name",
-            "last_name": "last_name",
-            "email": "email",
-            "phone_number": "phone_number",
-            "phone": "phone_number",
-            "date_of_birth": "date_of_birth",
-            "birth_date": "date_of_birth",
-            "gender": "gender",
-            "address": "address",
-            "admission_number": "admission_number",
-            "admission_date": "admission_date",
-            "class_name": "class_name",
-            "class": "class_name",
-            "roll_number": "roll_number",
-            "blood_group": "blood_group",
-            "medical_conditions": "medical_conditions",
-            "emergency_contact_name": "emergency_contact_name",
-            "emergency_name": "emergency_contact_name",
-            "emergency_contact_number": "emergency_contact_number",
-            "emergency_phone": "emergency_contact_number",
-            "emergency_contact_relationship": "emergency_contact_relationship",
-            "previous_school": "previous_school",
-            "status": "status",
-        }
-
-        for csv_field, model_field in field_mapping.items():
-            value = row.get(csv_field)
-            if value is not None:
-                cleaned_data[model_field] = self.clean_field_value(model_field, value)
-
-        return cleaned_data
-
-    def clean_field_value(self, field_name, value):
-        """Clean individual field values"""
-        if value is None or str(value).strip() == "":
-            return None
-
-        value = str(value).strip()
-
-        # Field-specific cleaning
-        if field_name in ["first_name", "last_name", "emergency_contact_name"]:
-            return value.title()
-
-        elif field_name == "email":
-            return value.lower() if value else None
-
-        elif field_name == "admission_number":
-            return value.upper()
-
-        elif field_name == "gender":
-            gender_map = {"male": "M", "female": "F", "m": "M", "f": "F"}
-            return gender_map.get(value.lower(), value.upper()[:1])
-
-        elif field_name == "blood_group":
-            return StudentUtils.normalize_blood_group(value)
-
-        elif field_name in ["date_of_birth", "admission_date"]:
-            return self.parse_date(value)
-
-        elif field_name == "status":
-            status_map = {
-                "active": "Active",
-                "inactive": "Inactive",
-                "graduated": "Graduated",
-            }
-            return status_map.get(value.lower(), value.title())
-
-        return value
-
-    def parse_date(self, date_value):
-        """Parse date from various formats"""
-        if not date_value:
-            return None
-
-        # Handle Excel date serial numbers
-        if isinstance(date_value, (int, float)):
-            try:
-                # Excel date serial number
-                from datetime import date, timedelta
-
-                excel_epoch = date(1900, 1, 1)
-                return excel_epoch + timedelta(days=int(date_value) - 2)
-            except:
-                return None
-
-        # Handle string dates
-        date_formats = [
-            "%Y-%m-%d",
-            "%m/%d/%Y",
-            "%d/%m/%Y",
-            "%Y/%m/%d",
-            "%m-%d-%Y",
-            "%d-%m-%Y",
-        ]
-
-        for date_format in date_formats:
-            try:
-                return datetime.strptime(str(date_value), date_format).date()
-            except ValueError:
-                continue
-
-        return None
+        messages.info(
+            self.request,
+            "Your file is being imported in the background. "
+            "This page shows its progress and any rows that could not be imported.",
+        )
+        return redirect(f"{reverse('students:import-status')}?import_id={import_id}")
 
 
 class StudentExportView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
@@ -390,7 +114,9 @@ class StudentExportView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
         status_filter = form.cleaned_data.get("status_filter")
 
         # Build queryset
-        queryset = Student.objects.all().select_related("current_class")
+        queryset = Student.objects.with_related().order_by("admission_number")
+        if "parents" in include_fields:
+            queryset = queryset.with_parents()
 
         if class_filter:
             queryset = queryset.filter(current_class=class_filter)
@@ -398,85 +124,54 @@ class StudentExportView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
 
+        if export_format not in ("csv", "excel", "json"):
+            messages.error(self.request, "Invalid export format")
+            return self.form_invalid(form)
+
+        if should_run_in_background(queryset):
+            # Written as CSV or XLSX; large JSON exports fall back to CSV
+            export_data_task.delay(
+                self.request.user.id,
+                "students",
+                "xlsx" if export_format == "excel" else "csv",
+                {
+                    "status": status_filter,
+                    "class_id": str(class_filter.pk) if class_filter else None,
+                    "fields": include_fields,
+                },
+            )
+            messages.info(self.request, BACKGROUND_EXPORT_MESSAGE)
+            return redirect(self.request.path)
+
         # Generate export
         if export_format == "csv":
             return self.export_csv(queryset, include_fields)
         elif export_format == "excel":
             return self.export_excel(queryset, include_fields)
-        elif export_format == "json":
-            return self.export_json(queryset, include_fields)
         else:
-            messages.error(self.request, "Invalid export format")
-            return self.form_invalid(form)
+            return self.export_json(queryset, include_fields)
 
     def export_csv(self, queryset, include_fields):
         """Export students to CSV format"""
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = (
-            f'attachment; filename="students_export_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
+        return csv_response(
+            export_filename("students_export", "csv"),
+            self.get_export_headers(include_fields),
+            self.iter_export_rows(queryset, include_fields),
         )
 
-        writer = csv.writer(response)
-
-        # Write header
-        headers = self.get_export_headers(include_fields)
-        writer.writerow(headers)
-
-        # Write data
-        for student in queryset:
-            row = self.get_student_export_row(student, include_fields)
-            writer.writerow(row)
-
-        return response
-
     def export_excel(self, queryset, include_fields):
         """Export students to Excel format"""
-        workbook = Workbook()
-        worksheet = workbook.active
-        worksheet.title = "Students"
-
-        # Style for headers
-        header_font = Font(bold=True)
-        header_fill = PatternFill(
-            start_color="CCCCCC", end_color="CCCCCC", fill_type="solid"
-        )
-
-        # Write headers
-        headers = self.get_export_headers(include_fields)
-        for col, header in enumerate(headers, 1):
-            cell = worksheet.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-
-        # Write data
-        for row_num, student in enumerate(queryset, 2):
-            row_data = self.get_student_export_row(student, include_fields)
-            for col, value in enumerate(row_data, 1):
-                worksheet.cell(row=row_num, column=col, value=value)
-
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-
-        # Prepare response
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = (
-            f'attachment; filename="students_export_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx"'
+        return xlsx_response(
+            export_filename("students_export", "xlsx"),
+            self.get_export_headers(include_fields),
+            self.iter_export_rows(queryset, include_fields),
+            title="Students",
         )
 
-        workbook.save(response)
-        return response
+    def iter_export_rows(self, queryset, include_fields):
+        """Yield export rows, fetching students a chunk at a time"""
+        for student in queryset.iterator(chunk_size=get_export_setting("CHUNK_SIZE")):
+            yield self.get_student_export_row(student, include_fields)
 
     def export_json(self, queryset, include_fields):
         """Export students to JSON format"""
@@ -583,7 +278,9 @@ class StudentExportView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
             "status": lambda s: s.status,
             "is_active": lambda s: "Yes" if s.is_active else "No",
             "date_joined": lambda s: s.date_joined,
-            "parents": lambda s: ", ".join([p.full_name for p in s.get_parents()]),
+            "parents": lambda s: ", ".join(
+                [rel.parent.full_name for rel in s.student_parent_relations.all()]
+            ),
         }
 
 
@@ -919,37 +616,17 @@ class ExportParentsView(LoginRequiredMixin, PermissionRequiredMixin, View):
         filters = {
             "relation": request.GET.get("relation", ""),
             "emergency_contact": request.GET.get("emergency_contact", ""),
+            "search": request.GET.get("search", ""),
         }
 
-        # Build queryset based on filters
-        queryset = Parent.objects.all().with_related()
+        prefix, header, rows, queryset = build_bulk_export("parents", filters)
 
-        # Apply filters
-        if filters["relation"]:
-            queryset = queryset.filter(relation_with_student=filters["relation"])
+        if should_run_in_background(queryset):
+            export_data_task.delay(request.user.id, "parents", "csv", filters)
+            messages.info(request, BACKGROUND_EXPORT_MESSAGE)
+            return redirect("students:parent-list")
 
-        if filters["emergency_contact"]:
-            queryset = queryset.filter(
-                emergency_contact=filters["emergency_contact"] == "true"
-            )
-
-        # Apply search
-        search_query = request.GET.get("search", "")
-        if search_query:
-            queryset = queryset.search(search_query)
-
-        # Generate CSV content
-        csv_content = ParentService.export_parents_to_csv(queryset)
-
-        # Create HTTP response with CSV content
-        timestamp = timezone.now().strftime("%Y%m%d_%H%M%S")
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = (
-            f'attachment; filename="parents_export_{timestamp}.csv"'
-        )
-        response.write(csv_content)
-
-        return response
+        return csv_response(export_filename(prefix, "csv"), header, rows)
 
 
 class DownloadCSVTemplateView(LoginRequiredMixin, View):
@@ -1070,14 +747,16 @@ class ImportStatusView(LoginRequiredMixin, TemplateView):
     template_name = "students/import_status.html"
 
     def get(self, request, *args, **kwargs):
+        # The page itself; its script polls this view for the JSON status
+        if request.headers.get("X-Requested-With") != "XMLHttpRequest":
+            return super().get(request, *args, **kwargs)
+
         import_id = request.GET.get("import_id")
 
         if not import_id:
             return JsonResponse({"error": "Import ID required"}, status=400)
 
-        # Get import status from cache (this would be set during import process)
-        cache_key = f"import_status_{import_id}"
-        status = cache.get(cache_key)
+        status = StudentImportService.get_status(import_id)
 
         if status is None:
             return JsonResponse({"error": "Import not found"}, status=404)
@@ -1096,88 +775,56 @@ class BulkExportView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
             "export_type"
         )  # students, parents, relationships
         format_type = request.POST.get("format", "csv")  # csv, xlsx, pdf
-        include_photos = request.POST.get("include_photos") == "on"
 
-        try:
-            if export_type == "students":
-                queryset = Student.objects.all().with_related().with_parents()
-
-                # Apply filters from form
-                filters = {}
-                for key in ["status", "class", "blood_group", "admission_year"]:
-                    value = request.POST.get(key)
-                    if value:
-                        filters[key] = value
-
-                if filters:
-                    queryset = StudentService.search_students("", filters)
-
-                if format_type == "csv":
-                    response = self._export_students_csv(queryset)
-                elif format_type == "xlsx":
-                    response = self._export_students_xlsx(queryset)
-                elif format_type == "pdf":
-                    response = self._export_students_pdf(queryset, include_photos)
-                else:
-                    messages.error(request, "Invalid export format")
-                    return redirect(request.path)
+        if export_type not in ("students", "parents"):
+            messages.error(request, "Invalid export type")
+            return redirect(request.path)
 
-            elif export_type == "parents":
-                queryset = Parent.objects.all().with_related().with_students()
+        if format_type not in ("csv", "xlsx", "pdf"):
+            messages.error(request, "Invalid export format")
+            return redirect(request.path)
 
-                # Apply filters
-                relation = request.POST.get("relation")
-                if relation:
-                    queryset = queryset.filter(relation_with_student=relation)
+        if export_type == "parents" and format_type == "pdf":
+            messages.error(request, "Format not supported for parents export")
+            return redirect(request.path)
 
-                if format_type == "csv":
-                    response = self._export_parents_csv(queryset)
-                else:
-                    messages.error(request, "Format not supported for parents export")
-                    return redirect(request.path)
+        # Apply filters from form
+        filter_keys = {
+            "students": ["status", "class", "blood_group", "admission_year"],
+            "parents": ["relation"],
+        }[export_type]
+        filters = {
+            key: request.POST.get(key) for key in filter_keys if request.POST.get(key)
+        }
 
-            else:
-                messages.error(request, "Invalid export type")
+        try:
+            prefix, header, rows, queryset = build_bulk_export(export_type, filters)
+
+            if should_run_in_background(queryset):
+                export_data_task.delay(
+                    request.user.id,
+                    export_type,
+                    "xlsx" if format_type == "xlsx" else "csv",
+                    filters,
+                )
+                messages.info(request, BACKGROUND_EXPORT_MESSAGE)
                 return redirect(request.path)
 
-            return response
+            if format_type == "xlsx":
+                return xlsx_response(
+                    export_filename(prefix, "xlsx"),
+                    header,
+                    rows,
+                    title=export_type.title(),
+                )
+
+            # PDF export is not implemented yet; fall back to CSV
+            return csv_response(export_filename(prefix, "csv"), header, rows)
 
         except Exception as e:
             messages.error(request, f"Export failed: {str(e)}")
             return redirect(request.path)
 
-    def _export_students_csv(self, queryset):
-        csv_content = StudentService.export_students_to_csv(queryset)
-        timestamp = timezone.now().strftime("%Y%m%d_%H%M%S")
-
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = (
-            f'attachment; filename="students_export_{timestamp}.csv"'
-        )
-        response.write(csv_content)
-        return response
-
-    def _export_parents_csv(self, queryset):
-        csv_content = ParentService.export_parents_to_csv(queryset)
-        timestamp = timezone.now().strftime("%Y%m%d_%H%M%S")
-
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = (
-            f'attachment; filename="parents_export_{timestamp}.csv"'
-        )
-        response.write(csv_content)
-        return response
-
-    def _export_students_xlsx(self, queryset):
-        # Excel export implementation would go here
-        # For now, fallback to CSV
-        return self._export_students_csv(queryset)
-
-    def _export_students_pdf(self, queryset, include_photos=False):
-        # PDF export implementation would go here
-        # For now, fallback to CSV
-        return self._export_students_csv(queryset)
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["export_types"] = [
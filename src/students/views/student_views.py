@@ -36,6 +36,7 @@ from ..forms import (
     StudentSearchForm,
 )
 from ..models import Parent, Student, StudentParentRelation
+from ..services.search_index import suggest_students
 from ..services.student_service import InvalidStudentDataError, StudentService
 
 
@@ -71,6 +72,9 @@ class StudentListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
             if blood_group_filter:
                 queryset = queryset.filter(blood_group=blood_group_filter)
 
+            if query:
+                return queryset.order_by("-search_rank", "-date_joined")
+
         return queryset.order_by("-date_joined")
 
     def get_context_data(self, **kwargs):
@@ -454,7 +458,7 @@ def student_search_ajax(request):
         return JsonResponse({"students": []})
 
     try:
-        students = Student.objects.search(query).select_related("current_class")[:10]
+        students = suggest_students(query, 10)
 
         results = [
             {